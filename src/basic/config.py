@@ -1,23 +1,45 @@
+import atexit
 import os
-from typing import Optional, List
+import threading
+from typing import Optional, List, Set
 
 from basic import config_utils
+from basic.log_utils import log
+
+FLUSH_INTERVAL: float = 2  # 延迟保存的配置 最多多少秒后写入文件
+
+_dirty_holder_set: Set['ConfigHolder'] = set()
+_dirty_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
 
 
 class ConfigHolder:
 
     def __init__(self, module_name: str,
                  account_idx: Optional[int] = None,
-                 sample: bool = True, sub_dir: Optional[List[str]] = None, mock: bool = False):
+                 sample: bool = True, sub_dir: Optional[List[str]] = None, mock: bool = False,
+                 write_behind: bool = False):
+        """
+        :param module_name: 配置名
+        :param account_idx: 脚本账号ID
+        :param sample: 是否有样例配置
+        :param sub_dir: 子目录
+        :param mock: 不读写文件
+        :param write_behind: 延迟保存 save 只标记有修改 由后台定时合并写入 适合运行记录这类频繁修改的
+        """
         self.mod: str = module_name
         self.account_idx: Optional[int] = account_idx
         self.sample: bool = sample
         self.sub_dir: Optional[List[str]] = sub_dir
         self.data: dict = {}
         self.mock: bool = mock  # 不读取文件
+        self.write_behind: bool = write_behind
+        self._dirty: bool = False  # 有未写入文件的修改
+        self._data_lock = threading.RLock()
         self.refresh()
 
     def refresh(self):
+        self.flush()  # 先把未写入的修改保存 避免重新读取后丢失
         self._read_config()
         self._init_after_read_file()
 
@@ -36,9 +58,27 @@ class ConfigHolder:
     def save(self):
         if self.mock:
             return
-        config_utils.save_config(self.data, self.mod,
-                                 script_account_idx=self.account_idx,
-                                 sub_dir=self.sub_dir)
+        if self.write_behind:
+            with self._data_lock:
+                self._dirty = True
+            _mark_dirty(self)
+        else:
+            self._save_to_file()
+
+    def flush(self):
+        """
+        立刻写入未保存的修改
+        :return:
+        """
+        if self._dirty:
+            self._save_to_file()
+
+    def _save_to_file(self):
+        with self._data_lock:
+            self._dirty = False
+            config_utils.save_config(self.data, self.mod,
+                                     script_account_idx=self.account_idx,
+                                     sub_dir=self.sub_dir)
 
     def save_diy(self, text: str):
         """
@@ -50,8 +90,7 @@ class ConfigHolder:
             return
 
         file_path = config_utils.get_config_file_path(self.mod, sub_dir=self.sub_dir)
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(text)
+        config_utils.save_file_atomically(file_path, text)
 
     def _init_after_read_file(self):
         pass
@@ -60,17 +99,21 @@ class ConfigHolder:
         return self.data[prop] if prop in self.data else value
 
     def update(self, key: str, value, save: bool = True):
-        if self.data is None:
-            self.data = {}
-        self.data[key] = value
+        with self._data_lock:
+            if self.data is None:
+                self.data = {}
+            self.data[key] = value
         if save:
             self.save()
 
     def delete(self):
         """
-        删除配置文件
+        删除配置文件 并丢弃未写入的修改 否则延迟保存时会把文件重新写回来
         :return:
         """
+        with self._data_lock:
+            self._dirty = False
+        _unmark_dirty(self)
         if os.path.exists(self.config_file_path):
             os.remove(self.config_file_path)
 
@@ -83,6 +126,58 @@ class ConfigHolder:
         将当前配置移动到对应的脚本账号中
         :return:
         """
-        self.delete()  # 删除旧的配置
-        self.account_idx = account_idx
-        self.save()  # 保存新的配置
+        with self._data_lock:
+            self.delete()  # 删除旧的配置
+            self.account_idx = account_idx
+            if not self.mock:
+                self._save_to_file()  # 保存新的配置 立刻写入 之后按账号读取的配置才是最新的
+
+
+def _mark_dirty(holder: ConfigHolder):
+    """
+    记录有修改的配置 并在一段时间后统一写入
+    同一段时间内的多次修改只会写入一次
+    :param holder: 配置
+    :return:
+    """
+    global _flush_timer
+    with _dirty_lock:
+        _dirty_holder_set.add(holder)
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(FLUSH_INTERVAL, flush_all)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def _unmark_dirty(holder: ConfigHolder):
+    """
+    不再需要写入的配置 例如已删除的
+    :param holder: 配置
+    :return:
+    """
+    with _dirty_lock:
+        _dirty_holder_set.discard(holder)
+
+
+def flush_all():
+    """
+    写入所有延迟保存的配置 程序退出时也会调用
+    :return:
+    """
+    global _flush_timer
+    with _dirty_lock:
+        holder_list = list(_dirty_holder_set)
+        _dirty_holder_set.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+
+    for holder in holder_list:
+        try:
+            holder.flush()
+        except Exception:
+            log.error('保存配置失败 %s', holder.mod, exc_info=True)
+            holder.save()  # 下次重试
+
+
+atexit.register(flush_all)
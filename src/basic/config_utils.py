@@ -98,8 +98,22 @@ def save_config(data: dict, name: str,
     """
     sub_dir = get_sub_dir_with_account(script_account_idx, sub_dir)
     path = get_config_file_path(name, sub_dir=sub_dir)
-    with open(path, 'w', encoding='utf-8') as file:
-        yaml.dump(data, file)
+    save_file_atomically(path, yaml.dump(data))
+
+
+def save_file_atomically(path: str, text: str):
+    """
+    先写入临时文件再替换 避免写入中途退出导致文件内容不完整
+    :param path: 文件路径
+    :param text: 文件内容
+    :return:
+    """
+    temp_path = '%s.tmp' % path
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
 
 
 def deep_copy_missing_prop(source: dict, target: dict):
@@ -1,9 +1,10 @@
 import gettext
-from typing import Optional
+from typing import Optional, Tuple
 
 from basic import os_utils
 
 _gt = {}
+_gt_tuple = {}  # 整组翻译的结果 {(model, lang): {原文元组: 译文元组}}
 _default_lang = 'cn'
 
 
@@ -32,6 +33,26 @@ def gt(msg: str, model: str = 'ocr', lang: str = None) -> str:
     return _gt[model][lang].gettext(msg)
 
 
+def gt_tuple(msg_tuple: Tuple[str, ...], model: str = 'ocr', lang: str = None) -> Tuple[str, ...]:
+    """
+    翻译一整组常量 按语言缓存结果
+    用于识别时反复使用的候选词列表 例如祝福、奇物名称 原文元组应在模块加载时构建好
+    :param msg_tuple: 原文
+    :param model: 模块
+    :param lang: 语言
+    :return: 译文 与原文一一对应
+    """
+    if lang is None:
+        lang = _default_lang
+    key = (model, lang)
+    if key not in _gt_tuple:
+        _gt_tuple[key] = {}
+    table = _gt_tuple[key]
+    if msg_tuple not in table:
+        table[msg_tuple] = tuple(gt(msg, model, lang) for msg in msg_tuple)
+    return table[msg_tuple]
+
+
 def coalesce_gt(msg: Optional[str], default: str, model: str = 'ocr', lang: str = None) -> str:
     """
     带有默认值的获取多语言
@@ -46,6 +67,8 @@ def coalesce_gt(msg: Optional[str], default: str, model: str = 'ocr', lang: str
 
 def update_default_lang(lang: str):
     global _default_lang
+    if lang != _default_lang:
+        _gt_tuple.clear()
     _default_lang = lang
 
 
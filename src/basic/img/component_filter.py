@@ -0,0 +1,80 @@
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from basic import Point
+
+
+def select_components(mask: MatLike, connectivity: int = 8,
+                      min_area: Optional[int] = None, max_area: Optional[int] = None,
+                      min_width: Optional[int] = None, max_width: Optional[int] = None,
+                      min_height: Optional[int] = None, max_height: Optional[int] = None,
+                      seed_mask: Optional[MatLike] = None,
+                      seed_point_list: Optional[List[Point]] = None) -> MatLike:
+    """
+    连通性检测后 按条件选出连通块
+    先用各连通块的统计信息算出每个标签是否保留 再对标签图查表一次得到结果
+    避免每个标签都对整张图做一次 labels == label 的比较
+    :param mask: 黑白图 非0的部分参与连通性检测
+    :param connectivity: 连通性检测方向 4 or 8
+    :param min_area: 最小面积 包含
+    :param max_area: 最大面积 包含
+    :param min_width: 外接矩形最小宽度 包含
+    :param max_width: 外接矩形最大宽度 包含
+    :param min_height: 外接矩形最小高度 包含
+    :param max_height: 外接矩形最大高度 包含
+    :param seed_mask: 只保留与这个掩码有重叠的连通块
+    :param seed_point_list: 只保留包含其中某个点的连通块
+    :return: 选出的连通块为255 其余为0
+    """
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=connectivity)
+
+    keep = np.ones((num_labels,), dtype=bool)
+    keep[0] = False  # 背景
+    for stat_idx, lower, upper in [
+        (cv2.CC_STAT_AREA, min_area, max_area),
+        (cv2.CC_STAT_WIDTH, min_width, max_width),
+        (cv2.CC_STAT_HEIGHT, min_height, max_height),
+    ]:
+        if lower is not None:
+            keep &= stats[:, stat_idx] >= lower
+        if upper is not None:
+            keep &= stats[:, stat_idx] <= upper
+
+    if seed_mask is not None or seed_point_list is not None:
+        seeded = np.zeros((num_labels,), dtype=bool)
+        if seed_mask is not None:
+            seeded[labels[seed_mask > 0]] = True
+        if seed_point_list is not None:
+            for p in seed_point_list:
+                if 0 <= p.y < labels.shape[0] and 0 <= p.x < labels.shape[1]:
+                    seeded[labels[p.y, p.x]] = True
+        keep &= seeded
+
+    table = np.where(keep, 255, 0).astype(np.uint8)
+    return table[labels]
+
+
+def remove_small_components(mask: MatLike, threshold: int, connectivity: int = 8) -> MatLike:
+    """
+    去掉白色部分中 面积小于阈值的连通块
+    :param mask: 黑白图
+    :param threshold: 小于多少连通时 认为是噪点
+    :param connectivity: 连通性检测方向 4 or 8
+    :return: 新的掩码图 原图不变
+    """
+    return cv2.bitwise_and(mask, select_components(mask, connectivity=connectivity, min_area=threshold))
+
+
+def fill_small_holes(mask: MatLike, threshold: int, connectivity: int = 8) -> MatLike:
+    """
+    把黑色部分中 面积小于阈值的连通块 填充为白色
+    :param mask: 黑白图
+    :param threshold: 小于多少连通时 认为是噪点
+    :param connectivity: 连通性检测方向 4 or 8
+    :return: 新的掩码图 原图不变
+    """
+    return cv2.bitwise_or(mask, select_components(cv2.bitwise_not(mask), connectivity=connectivity,
+                                                  max_area=threshold - 1))
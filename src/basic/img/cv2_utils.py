@@ -7,7 +7,7 @@ import numpy as np
 from cv2.typing import MatLike
 
 from basic import Rect, os_utils
-from basic.img import MatchResult, MatchResultList
+from basic.img import MatchResult, MatchResultList, component_filter
 
 feature_detector = cv2.SIFT_create()
 
@@ -153,6 +153,49 @@ def match_template(source: MatLike, template: MatLike, threshold,
     return match_result_list
 
 
+def match_template_in_area(source: MatLike, template: MatLike, threshold: float, area_mask: MatLike,
+                           mask: np.ndarray = None, ignore_inf: bool = False) -> MatchResultList:
+    """
+    只在模板窗口覆盖到 area_mask 白色部分的位置上匹配 返回全部结果
+    这些位置上的结果与整张图调用 match_template(only_best=False) 一致 其它位置认为不会匹配
+    用于目标只会出现在少数区域的大图 例如在大地图中找特殊点
+    :param source: 原图
+    :param template: 模板
+    :param threshold: 阈值
+    :param area_mask: 目标可能出现的区域 与原图大小一致
+    :param mask: 模板掩码
+    :param ignore_inf: 是否忽略无限大的结果
+    :return: 所有匹配结果
+    """
+    th, tw = template.shape[0], template.shape[1]
+    match_result_list = MatchResultList(only_best=False)
+    if th > source.shape[0] or tw > source.shape[1]:
+        return match_result_list
+
+    # 左上角在 (x, y) 时 模板窗口为 [x, x+tw) [y, y+th) 窗口内有白色的位置才需要匹配
+    kernel = np.ones((th, tw), dtype=np.uint8)
+    pos_mask = cv2.dilate(area_mask, kernel, anchor=(0, 0))[:source.shape[0] - th + 1, :source.shape[1] - tw + 1]
+    num_labels, _, stats, _ = cv2.connectedComponentsWithStats(pos_mask, connectivity=8)
+
+    found = {}
+    for label in range(1, num_labels):
+        x1, y1, w, h = stats[label, :4]
+        part = source[y1:y1 + h + th - 1, x1:x1 + w + tw - 1]
+        result = cv2.matchTemplate(part, template, cv2.TM_CCOEFF_NORMED, mask=mask)
+        filtered_locations = np.where(np.logical_and(
+            result >= threshold,
+            np.isfinite(result) if ignore_inf else np.ones_like(result))
+        )
+        for py, px in zip(*filtered_locations):
+            found[(y1 + py, x1 + px)] = result[py, px]
+
+    # 与 match_template 一样按行遍历 保证合并后的结果一致
+    for y, x in sorted(found.keys()):
+        match_result_list.append(MatchResult(found[(y, x)], x, y, tw, th))
+
+    return match_result_list
+
+
 def concat_vertically(img: MatLike, next_img: MatLike, decision_height: int = 150):
     """
     垂直拼接图片。
@@ -294,13 +337,26 @@ def feature_keypoints_from_np(np_arr):
 
 
 def feature_match(source_kp, source_desc, template_kp, template_desc,
-                  source_mask: Optional[MatLike] = None):
+                  source_mask: Optional[MatLike] = None,
+                  trained_matcher: Optional[cv2.DescriptorMatcher] = None):
+    """
+    特征匹配
+    :param source_kp: 源图特征点
+    :param source_desc: 源图描述子
+    :param template_kp: 模板特征点
+    :param template_desc: 模板描述子
+    :param source_mask: 源图掩码
+    :param trained_matcher: 已经用源图描述子训练好的匹配器 例如 FLANN 索引 为空时使用暴力匹配
+    :return:
+    """
     if len(source_kp) == 0 or len(template_kp) == 0:
         return None, None, None, None
 
-    # feature_matcher = cv2.FlannBasedMatcher()
-    feature_matcher = cv2.BFMatcher()
-    matches = feature_matcher.knnMatch(template_desc, source_desc, k=2)
+    if trained_matcher is not None:
+        matches = trained_matcher.knnMatch(template_desc, k=2)
+    else:
+        feature_matcher = cv2.BFMatcher()
+        matches = feature_matcher.knnMatch(template_desc, source_desc, k=2)
     # 应用比值测试，筛选匹配点
     good_matches = []
     for m, n in matches:
@@ -492,18 +548,10 @@ def connection_erase(mask: MatLike, threshold: int = 50, erase_white: bool = Tru
     :param connectivity: 连通性检测方向 4 or 8
     :return: 消除噪点后的图
     """
-    to_check_connection = mask if erase_white else cv2.bitwise_not(mask)
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(to_check_connection, connectivity=connectivity)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < threshold:
-            large_components.append(label)
-
-    result = mask.copy()
-    for label in large_components:
-        result[labels == label] = 0 if erase_white else 255
-
-    return result
+    if erase_white:
+        return component_filter.remove_small_components(mask, threshold, connectivity=connectivity)
+    else:
+        return component_filter.fill_small_holes(mask, threshold, connectivity=connectivity)
 
 
 def crop_image(img, rect: Rect = None, copy: bool = False) -> Tuple[MatLike, Optional[Rect]]:
@@ -0,0 +1,86 @@
+import threading
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from basic import Rect
+
+
+class KeypointIndex:
+
+    def __init__(self, kps, desc: np.ndarray, cell_size: int = 64):
+        """
+        按坐标分格的特征点索引 用于快速取出某个区域内的特征点和描述子
+        特征点按所在格子排序 同一行相邻格子的特征点是连续的 因此一个区域每行只需要一次切片
+        :param kps: 特征点
+        :param desc: 描述子 与特征点一一对应
+        :param cell_size: 格子大小
+        """
+        self.kps: np.ndarray = np.asarray(kps, dtype=object)
+        self.desc: np.ndarray = desc
+        self.cell_size: int = cell_size
+
+        if len(self.kps) > 0:
+            pts = np.array([kp.pt for kp in self.kps], dtype=np.float32)
+        else:
+            pts = np.zeros((0, 2), dtype=np.float32)
+        cx = np.maximum(pts[:, 0] // cell_size, 0).astype(np.int32)
+        cy = np.maximum(pts[:, 1] // cell_size, 0).astype(np.int32)
+        self.cols: int = int(cx.max()) + 1 if len(cx) > 0 else 1
+        self.rows: int = int(cy.max()) + 1 if len(cy) > 0 else 1
+
+        cell_id = cy * self.cols + cx
+        self.order: np.ndarray = np.argsort(cell_id, kind='stable')
+        self.pts: np.ndarray = pts[self.order].astype(np.int32)  # 与 Point 一致 取整后比较
+        # 第 i 个格子的特征点为 order[cell_start[i]:cell_start[i+1]]
+        self.cell_start: np.ndarray = np.searchsorted(cell_id[self.order], np.arange(self.rows * self.cols + 1))
+
+        self._flann: Optional[cv2.FlannBasedMatcher] = None
+        self._flann_lock = threading.Lock()
+
+    def query_idx(self, rect: Rect) -> np.ndarray:
+        """
+        区域内特征点的下标 坐标取整后包含边界 与 cal_utils.in_rect 一致
+        :param rect: 区域
+        :return: 原特征点列表中的下标
+        """
+        c1 = max(rect.x1 // self.cell_size, 0)
+        c2 = min(rect.x2 // self.cell_size, self.cols - 1)
+        r1 = max(rect.y1 // self.cell_size, 0)
+        r2 = min(rect.y2 // self.cell_size, self.rows - 1)
+        if c1 > c2 or r1 > r2:
+            return np.zeros((0,), dtype=np.int64)
+
+        pos_list = [np.arange(self.cell_start[r * self.cols + c1], self.cell_start[r * self.cols + c2 + 1])
+                    for r in range(r1, r2 + 1)]
+        pos = np.concatenate(pos_list)
+        pts = self.pts[pos]
+        inside = (pts[:, 0] >= rect.x1) & (pts[:, 0] <= rect.x2) & (pts[:, 1] >= rect.y1) & (pts[:, 1] <= rect.y2)
+        return self.order[pos[inside]]
+
+    def query(self, rect: Optional[Rect]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        区域内的特征点和描述子
+        :param rect: 区域 为空时返回全部
+        :return: 特征点, 描述子
+        """
+        if rect is None:
+            return self.kps, self.desc
+        idx = self.query_idx(rect)
+        return self.kps[idx], self.desc[idx]
+
+    @property
+    def flann(self) -> cv2.FlannBasedMatcher:
+        """
+        全部描述子的 FLANN 索引 第一次使用时构建 适合不限定区域的全图匹配
+        :return:
+        """
+        if self._flann is None:
+            with self._flann_lock:
+                if self._flann is None:
+                    matcher = cv2.FlannBasedMatcher(dict(algorithm=1, trees=4), dict(checks=32))  # 1 = KDTree
+                    matcher.add([self.desc.astype(np.float32)])
+                    matcher.train()
+                    self._flann = matcher
+        return self._flann
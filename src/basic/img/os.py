@@ -1,8 +1,13 @@
+import atexit
 import os
+import queue
+import threading
 import time
-from typing import Optional
+from collections import deque
+from typing import Optional, Tuple
 
 import cv2
+import numpy as np
 from cv2.typing import MatLike
 
 from basic import os_utils
@@ -23,7 +28,12 @@ def get_debug_image_path(filename, suffix: str = '.png') -> str:
 
 
 def get_debug_image(filename, suffix: str = '.png') -> MatLike:
-    return cv2_utils.read_image(get_debug_image_path(filename, suffix))
+    debug_image_writer.flush()  # 可能还在后台写入
+    path = get_debug_image_path(filename, suffix)
+    npy_path = get_debug_image_path(filename, '.npy')
+    if not os.path.exists(path) and os.path.exists(npy_path):
+        return np.load(npy_path)
+    return cv2_utils.read_image(path)
 
 
 def get_test_image_dir(sub_dir: str = None):
@@ -44,10 +54,127 @@ def get_test_image(filename, suffix: str = '.png', sub_dir: str = None) -> MatLi
     return cv2_utils.read_image(get_test_image_path(filename, suffix, sub_dir))
 
 
-def save_debug_image(image, file_name: Optional[str] = None, prefix: str = '') -> str:
+class DebugImageWriter:
+
+    def __init__(self, max_queue_size: int = 20, png_compression: int = 1,
+                 save_as_npy: bool = False, max_disk_mb: int = 500):
+        """
+        调试图片的后台写入 避免识别失败时在移动等循环里等待图片编码和磁盘IO
+        - 队列满时丢弃新的图片 并记录丢弃数量
+        - 本次运行写入的图片超过磁盘预算时 删除最早写入的
+        :param max_queue_size: 最多等待写入的图片数量
+        :param png_compression: PNG压缩等级 0~9 越小越快
+        :param save_as_npy: 直接保存原始数组 不进行编码 读取时使用 np.load
+        :param max_disk_mb: 本次运行最多占用的磁盘空间 MB
+        """
+        self.png_compression: int = png_compression
+        self.save_as_npy: bool = save_as_npy
+        self.max_disk_bytes: int = max_disk_mb * 1024 * 1024
+
+        self.written_cnt: int = 0  # 写入的图片数量
+        self.dropped_cnt: int = 0  # 队列满丢弃的图片数量
+        self.removed_cnt: int = 0  # 超出预算删除的图片数量
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._written_file_list: deque = deque()  # (路径, 大小)
+        self._written_bytes: int = 0
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def update_config(self, png_compression: int, save_as_npy: bool, max_disk_mb: int):
+        self.png_compression = png_compression
+        self.save_as_npy = save_as_npy
+        self.max_disk_bytes = max_disk_mb * 1024 * 1024
+
+    def put(self, image: MatLike, file_name: str) -> bool:
+        """
+        放入后台写入队列 不等待
+        :param image: 图片 会复制一份 调用方之后可以继续修改
+        :param file_name: 文件名 不含后缀
+        :return: 是否放入成功 队列满时丢弃
+        """
+        self._start_thread()
+        try:
+            self._queue.put_nowait((image.copy(), file_name))
+            return True
+        except queue.Full:
+            self.dropped_cnt += 1
+            log.debug('调试图片写入队列已满 丢弃 %s 累计丢弃 %d', file_name, self.dropped_cnt)
+            return False
+
+    def _start_thread(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='debug_image_writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            image, file_name = self._queue.get()
+            try:
+                path, size = self._write(image, file_name)
+                self._add_to_budget(path, size)
+            except Exception:
+                log.error('调试图片保存失败 %s', file_name, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, image: MatLike, file_name: str) -> Tuple[str, int]:
+        if self.save_as_npy:
+            path = get_debug_image_path(file_name, '.npy')
+            np.save(path, image)
+        else:
+            path = get_debug_image_path(file_name)
+            cv2.imwrite(path, image, [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression])
+        self.written_cnt += 1
+        return path, os.path.getsize(path)
+
+    def _add_to_budget(self, path: str, size: int):
+        """
+        记录写入的文件 超出预算时删除最早写入的
+        只会删除本次运行后台写入的文件 不影响其它调试文件
+        """
+        self._written_file_list.append((path, size))
+        self._written_bytes += size
+        while self._written_bytes > self.max_disk_bytes and len(self._written_file_list) > 1:
+            old_path, old_size = self._written_file_list.popleft()
+            self._written_bytes -= old_size
+            if os.path.exists(old_path):
+                os.remove(old_path)
+            self.removed_cnt += 1
+
+    def flush(self):
+        """
+        等待队列中的图片写入完成
+        :return:
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+
+debug_image_writer = DebugImageWriter()
+atexit.register(debug_image_writer.flush)
+
+
+def save_debug_image(image, file_name: Optional[str] = None, prefix: str = '',
+                     async_write: bool = True) -> str:
+    """
+    保存调试图片
+    :param image: 图片
+    :param file_name: 文件名 不含后缀 为空时使用前缀+时间戳
+    :param prefix: 前缀
+    :param async_write: 是否在后台写入 后台写入在队列满时会丢弃图片 需要确保保存的应传入False
+    :return: 文件名
+    """
     if file_name is None:
         file_name = '%s_%d' % (prefix, round(time.time() * 1000))
-    path = get_debug_image_path(file_name)
-    log.debug('临时图片保存 %s', path)
-    cv2.imwrite(path, image)
+    if async_write:
+        log.debug('临时图片后台保存 %s', file_name)
+        debug_image_writer.put(image, file_name)
+    else:
+        path = get_debug_image_path(file_name)
+        log.debug('临时图片保存 %s', path)
+        cv2.imwrite(path, image)
     return file_name
@@ -0,0 +1,115 @@
+import time
+from typing import Callable, Optional, List
+
+import numpy as np
+from cv2.typing import MatLike
+
+from basic import Rect
+from basic.img import cv2_utils
+
+
+class ScreenWaitResult:
+
+    def __init__(self, success: bool, screen: Optional[MatLike], latency: float, frame_cnt: int):
+        """
+        等待画面的结果
+        :param success: 是否在超时前等到
+        :param screen: 最后一张截图
+        :param latency: 实际等待的秒数
+        :param frame_cnt: 截图次数
+        """
+        self.success: bool = success
+        self.screen: Optional[MatLike] = screen
+        self.latency: float = latency
+        self.frame_cnt: int = frame_cnt
+
+
+def screen_diff(screen_1: MatLike, screen_2: MatLike, rects: Optional[List[Rect]] = None, step: int = 4) -> float:
+    """
+    两张截图在指定区域的差异 隔几个像素取一个 只用于判断画面是否变化
+    :param screen_1: 截图
+    :param screen_2: 截图
+    :param rects: 区域 为空时使用整张图
+    :param step: 采样间隔
+    :return: 各区域平均像素差中的最大值
+    """
+    diff: float = 0
+    for rect in (rects if rects is not None else [None]):
+        part_1 = cv2_utils.crop_image_only(screen_1, rect)[::step, ::step]
+        part_2 = cv2_utils.crop_image_only(screen_2, rect)[::step, ::step]
+        if part_1.size == 0 or part_1.shape != part_2.shape:
+            continue
+        d = np.abs(part_1.astype(np.int16) - part_2.astype(np.int16)).mean()
+        diff = max(diff, float(d))
+    return diff
+
+
+def wait_for_screen(screenshot: Callable[[], MatLike],
+                    predicate: Optional[Callable[[MatLike], bool]] = None,
+                    rects: Optional[List[Rect]] = None,
+                    timeout: float = 1,
+                    min_interval: float = 0.05,
+                    max_interval: float = 0.3,
+                    diff_threshold: float = 3,
+                    stable_time: float = 0.2,
+                    should_stop: Optional[Callable[[], bool]] = None) -> ScreenWaitResult:
+    """
+    不断截图 直到画面满足条件 用于替代点击后固定时间的等待
+    - 传入 predicate 时 等到 predicate 返回True 只有区域内画面变化后才会再次调用 predicate
+    - 不传入 predicate 时 等到区域内画面变化 并且连续 stable_time 秒没有再变化
+    画面没有变化时 截图间隔逐渐变长 有变化时恢复最短间隔
+    :param screenshot: 截图方法
+    :param predicate: 画面需要满足的条件
+    :param rects: 判断变化的区域 为空时使用整个画面
+    :param timeout: 超时时间 秒
+    :param min_interval: 最短截图间隔
+    :param max_interval: 最长截图间隔
+    :param diff_threshold: 平均像素差超过这个值认为画面有变化
+    :param stable_time: 不传入 predicate 时 画面需要保持不变的最短时间 避免动画中间短暂停顿就返回
+    :param should_stop: 返回True时停止等待 例如脚本被暂停
+    :return: 结果
+    """
+    start_time = time.time()
+    screen = screenshot()
+    frame_cnt = 1
+    if predicate is not None and predicate(screen):
+        return ScreenWaitResult(True, screen, time.time() - start_time, frame_cnt)
+
+    base_screen = screen  # 上一次判断条件的截图
+    last_screen = screen
+    changed: bool = False  # 不传入 predicate 时 画面是否已经变化过
+    stable_screen: Optional[MatLike] = None  # 开始稳定时的截图
+    stable_start: float = 0  # 开始稳定的时间
+    interval = min_interval
+    while time.time() - start_time + interval < timeout:
+        if should_stop is not None and should_stop():
+            break
+        time.sleep(interval)
+        screen = screenshot()
+        frame_cnt += 1
+
+        if predicate is not None:
+            if screen_diff(base_screen, screen, rects) > diff_threshold:
+                base_screen = screen
+                interval = min_interval
+                if predicate(screen):
+                    return ScreenWaitResult(True, screen, time.time() - start_time, frame_cnt)
+            else:
+                interval = min(interval * 2, max_interval)
+        else:
+            moving = screen_diff(last_screen, screen, rects) > diff_threshold
+            if not changed:
+                changed = moving or screen_diff(base_screen, screen, rects) > diff_threshold
+            if changed:
+                if moving or stable_screen is None or screen_diff(stable_screen, screen, rects) > diff_threshold:
+                    stable_screen = screen  # 还在变化 重新计算稳定时间
+                    stable_start = time.time()
+                elif time.time() - stable_start >= stable_time:  # 变化后稳定下来了
+                    return ScreenWaitResult(True, screen, time.time() - start_time, frame_cnt)
+            interval = min_interval if moving else min(interval * 2, max_interval)
+        last_screen = screen
+
+    remain = timeout - (time.time() - start_time)
+    if remain > 0 and (should_stop is None or not should_stop()):  # 保证最少等待原来的时间
+        time.sleep(remain)
+    return ScreenWaitResult(False, last_screen, time.time() - start_time, frame_cnt)
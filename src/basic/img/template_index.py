@@ -0,0 +1,114 @@
+import os
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+class TemplateFeatureIndex:
+
+    def __init__(self, template_id_list: List[str], desc: np.ndarray, labels: np.ndarray, source_hash: str = ''):
+        """
+        多个模板的描述子叠在一起的索引 一次查询就能找出最可能的模板 用于替代逐个模板做特征匹配
+        :param template_id_list: 模板id
+        :param desc: 全部模板的描述子 叠在一起
+        :param labels: 每个描述子属于第几个模板
+        :param source_hash: 构建时模板源文件的哈希 用于判断是否过期
+        """
+        self.template_id_list: List[str] = template_id_list
+        self.source_hash: str = source_hash
+        self.desc: np.ndarray = desc.astype(np.float32)
+        self.labels: np.ndarray = labels.astype(np.int32)
+
+        self.matcher = cv2.FlannBasedMatcher(dict(algorithm=1, trees=4), dict(checks=32))  # 1 = KDTree
+        if len(self.desc) > 0:
+            self.matcher.add([self.desc])
+            self.matcher.train()
+
+    @staticmethod
+    def from_desc_list(template_id_list: List[str], desc_list: List[Optional[np.ndarray]], source_hash: str = ''):
+        """
+        由各个模板的描述子构建
+        :param template_id_list: 模板id
+        :param desc_list: 各模板的描述子 与模板id一一对应
+        :param source_hash: 模板源文件的哈希
+        :return:
+        """
+        stack_list = []
+        label_list = []
+        for idx, desc in enumerate(desc_list):
+            if desc is None or len(desc) == 0:
+                continue
+            stack_list.append(desc.astype(np.float32))
+            label_list.append(np.full((len(desc),), idx, dtype=np.int32))
+        if len(stack_list) > 0:
+            desc = np.concatenate(stack_list)
+            labels = np.concatenate(label_list)
+        else:
+            desc = np.zeros((0, 128), dtype=np.float32)
+            labels = np.zeros((0,), dtype=np.int32)
+        return TemplateFeatureIndex(template_id_list, desc, labels, source_hash=source_hash)
+
+    def save(self, file_path: str):
+        """
+        保存到文件
+        :param file_path: 文件路径 .npz
+        :return:
+        """
+        np.savez_compressed(file_path, template_id=np.array(self.template_id_list), desc=self.desc, labels=self.labels,
+                            source_hash=np.array(self.source_hash))
+
+    @staticmethod
+    def load(file_path: str):
+        """
+        从文件读取
+        :param file_path: 文件路径 .npz
+        :return: 文件不存在时返回None
+        """
+        if not os.path.exists(file_path):
+            return None
+        with np.load(file_path) as data:
+            source_hash = str(data['source_hash']) if 'source_hash' in data.files else ''
+            return TemplateFeatureIndex([str(i) for i in data['template_id']], data['desc'], data['labels'],
+                                        source_hash=source_hash)
+
+    def vote(self, desc_list: List[Optional[np.ndarray]], knn_distance_percent: float = 0.7) -> List[List[int]]:
+        """
+        多张图一次查询 每个描述子找最近的模板描述子 通过比值测试的给对应模板投一票
+        比值测试的次近邻取其它模板的描述子 同一模板内相似的特征点不会互相抵消
+        :param desc_list: 各张图的描述子
+        :param knn_distance_percent: 越小要求匹配程度越高
+        :return: 各张图的候选模板下标 按票数从高到低 没有票的模板不返回
+        """
+        result: List[List[int]] = [[] for _ in desc_list]
+        query_list = []
+        owner_list = []
+        for idx, desc in enumerate(desc_list):
+            if desc is None or len(desc) == 0:
+                continue
+            query_list.append(desc.astype(np.float32))
+            owner_list.append(np.full((len(desc),), idx, dtype=np.int32))
+        if len(query_list) == 0 or len(self.desc) < 2:
+            return result
+
+        query = np.concatenate(query_list)
+        owner = np.concatenate(owner_list)
+        k = min(4, len(self.desc))
+        votes = np.zeros((len(desc_list), len(self.template_id_list)), dtype=np.int32)
+        for query_idx, matches in enumerate(self.matcher.knnMatch(query, k=k)):
+            if len(matches) == 0:
+                continue
+            best = matches[0]
+            best_label = self.labels[best.trainIdx]
+            second = None
+            for m in matches[1:]:
+                if self.labels[m.trainIdx] != best_label:
+                    second = m
+                    break
+            if second is None or best.distance < knn_distance_percent * second.distance:
+                votes[owner[query_idx], best_label] += 1
+
+        for idx in range(len(desc_list)):
+            order = np.argsort(-votes[idx], kind='stable')
+            result[idx] = [int(i) for i in order if votes[idx, i] > 0]
+        return result
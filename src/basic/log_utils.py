@@ -1,11 +1,24 @@
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
+from typing import Optional
 
 from basic import os_utils
 
+_listener: Optional[QueueListener] = None
+
 
 def get_logger():
+    """
+    日志只放入队列 由后台线程写入文件和控制台 避免在识别等耗时敏感的线程中等待IO
+    :return:
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
     logger = logging.getLogger('StarRailOneDragon')
     logger.handlers.clear()
     logger.setLevel(logging.DEBUG if os_utils.is_debug() else logging.INFO)
@@ -16,14 +29,38 @@ def get_logger():
     archive_handler = TimedRotatingFileHandler(log_file_path, when='midnight', interval=1, backupCount=3, encoding='utf-8')
     archive_handler.setLevel(logging.DEBUG if os_utils.is_debug() else logging.INFO)
     archive_handler.setFormatter(formatter)
-    logger.addHandler(archive_handler)
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.DEBUG if os_utils.is_debug() else logging.INFO)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, archive_handler, console_handler, respect_handler_level=True)
+    _listener.start()
 
     return logger
 
 
+def add_log_handler(handler: logging.Handler):
+    """
+    增加一个在后台线程中处理日志的handler
+    :param handler:
+    :return:
+    """
+    _listener.handlers = _listener.handlers + (handler,)
+
+
+def stop_listener():
+    """
+    处理完队列中剩余的日志 程序退出时调用
+    :return:
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 log = get_logger()
+atexit.register(stop_listener)
@@ -1,5 +1,6 @@
 import re
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Tuple
 
 from basic.log_utils import log
 
@@ -44,25 +45,126 @@ def find_by_lcs(source: str, target: str, percent: float = 0.3,
 def longest_common_subsequence_length(str1: str, str2: str) -> int:
     """
     找两个字符串的最长公共子序列长度
+    使用位并行算法 str1的每个字符对应一个二进制位 每读入str2的一个字符只需要几次整数运算
     :param str1:
     :param str2:
     :return: 长度
     """
-    m = len(str1)
-    n = len(str2)
+    char_mask: dict[str, int] = {}
+    for i, c in enumerate(str1):
+        char_mask[c] = char_mask.get(c, 0) | (1 << i)
+    full_mask = (1 << len(str1)) - 1
 
-    # 创建一个二维数组用于存储中间结果
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    v = _bit_parallel_lcs(char_mask, full_mask, str2)
+    return len(str1) - v.bit_count()
 
-    # 动态规划求解
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if str1[i - 1] == str2[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1] + 1
-            else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
 
-    return dp[m][n]
+def _bit_parallel_lcs(char_mask: dict[str, int], full_mask: int, text: str) -> int:
+    """
+    位并行计算最长公共子序列 Allison-Dix / Hyyro
+    :param char_mask: 模式串中 每个字符出现位置对应的二进制位
+    :param full_mask: 模式串全部位置对应的二进制位
+    :param text: 文本
+    :return: 结果向量 模式串对应位置中 为0的位数就是最长公共子序列长度
+    """
+    v = full_mask
+    for c in text:
+        m = char_mask.get(c)
+        if m is None:  # 不在模式串中的字符不会改变结果
+            continue
+        u = v & m
+        v = ((v + u) | (v - u)) & full_mask
+    return v
+
+
+class LcsMatcher:
+
+    def __init__(self, word_list: List[str], ignore_case: bool = False):
+        """
+        按候选词列表预先构建的最长公共子序列匹配器 用于一个OCR结果同时跟多个候选词比较
+        所有候选词按位拼接成一个大整数 候选词之间空出一位阻断加法的进位
+        因此对OCR结果只需要遍历一次 就能得到跟所有候选词的最长公共子序列长度
+        :param word_list: 候选词列表
+        :param ignore_case: 是否忽略大小写
+        """
+        self.word_list: List[str] = word_list
+        self.ignore_case: bool = ignore_case
+        self.offset_list: List[int] = []  # 每个候选词在大整数中的起始位
+        self.len_list: List[int] = []
+        self.char_mask: dict[str, int] = {}
+        self.full_mask: int = 0
+
+        offset = 0
+        for word in word_list:
+            word_usage = word.lower() if ignore_case else word
+            self.offset_list.append(offset)
+            self.len_list.append(len(word_usage))
+            for i, c in enumerate(word_usage):
+                self.char_mask[c] = self.char_mask.get(c, 0) | (1 << (offset + i))
+            self.full_mask |= ((1 << len(word_usage)) - 1) << offset
+            offset += len(word_usage) + 1
+
+    def lcs_list(self, text: str) -> List[int]:
+        """
+        文本跟每个候选词的最长公共子序列长度
+        :param text: 文本 通常是OCR结果
+        :return: 与候选词列表一一对应
+        """
+        if text is None:
+            return [0] * len(self.word_list)
+        text_usage = text.lower() if self.ignore_case else text
+        v = _bit_parallel_lcs(self.char_mask, self.full_mask, text_usage)
+        zero = ~v & self.full_mask
+        return [((zero >> offset) & ((1 << length) - 1)).bit_count()
+                for offset, length in zip(self.offset_list, self.len_list)]
+
+    def find_best_match_with_percent(self, text: str,
+                                     lcs_percent_threshold: Optional[float] = None) -> Tuple[Optional[int], float]:
+        """
+        在候选词中 找出LCS占候选词长度比例最大的 比例相同时取靠前的
+        :param text: 文本 通常是OCR结果
+        :param lcs_percent_threshold: 要求的LCS阈值
+        :return: 最符合的候选词的下标, LCS比例
+        """
+        target_idx: Optional[int] = None
+        target_lcs_percent: float = 0
+
+        for idx, lcs in enumerate(self.lcs_list(text)):
+            if lcs == 0:  # 至少要有一个匹配
+                continue
+            lcs_percent = lcs * 1.0 / self.len_list[idx]
+            if lcs_percent_threshold is not None and lcs_percent < lcs_percent_threshold:
+                continue
+            if target_idx is None or lcs_percent > target_lcs_percent:
+                target_idx = idx
+                target_lcs_percent = lcs_percent
+
+        return target_idx, target_lcs_percent
+
+    def find_best_match(self, text: str, lcs_percent_threshold: Optional[float] = None) -> Optional[int]:
+        """
+        在候选词中 找出LCS比例最大的
+        :param text: 文本 通常是OCR结果
+        :param lcs_percent_threshold: 要求的LCS阈值
+        :return: 最符合的候选词的下标
+        """
+        return self.find_best_match_with_percent(text, lcs_percent_threshold)[0]
+
+
+@lru_cache(maxsize=64)
+def _get_lcs_matcher(word_tuple: Tuple[str, ...], ignore_case: bool) -> LcsMatcher:
+    return LcsMatcher(list(word_tuple), ignore_case=ignore_case)
+
+
+def get_lcs_matcher(word_list: List[str], ignore_case: bool = False) -> LcsMatcher:
+    """
+    获取候选词列表对应的匹配器 相同的候选词列表会复用之前构建好的
+    候选词通常经过 gt 翻译 切换语言后列表不同 自然会构建新的
+    :param word_list: 候选词列表
+    :param ignore_case: 是否忽略大小写
+    :return:
+    """
+    return _get_lcs_matcher(tuple(word_list), ignore_case)
 
 
 def get_positive_digits(v: str, err: Optional[int] = 0) -> Optional[int]:
@@ -97,18 +199,4 @@ def find_best_match_by_lcs(word: str, target_word_list: List[str],
     :param lcs_percent_threshold: 要求的LCS阈值
     :return: 最符合的目标词的下标
     """
-    target_idx: Optional[int] = None
-    target_lcs_percent: Optional[float] = None
-
-    for idx, target_word in enumerate(target_word_list):
-        lcs = longest_common_subsequence_length(word, target_word)
-        if lcs == 0:  # 至少要有一个匹配
-            continue
-        lcs_percent = lcs * 1.0 / len(target_word)
-        if lcs_percent_threshold is not None and lcs_percent < lcs_percent_threshold:
-            continue
-        if target_idx is None or lcs_percent > target_lcs_percent:
-            target_idx = idx
-            target_lcs_percent = lcs_percent
-
-    return target_idx
+    return get_lcs_matcher(target_word_list).find_best_match(word, lcs_percent_threshold)
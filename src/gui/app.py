@@ -1,3 +1,4 @@
+import importlib
 import logging
 import threading
 from typing import Optional
@@ -7,15 +8,10 @@ import keyboard
 
 from basic import os_utils
 from basic.i18_utils import gt, update_default_lang
-from gui import log_view, calibrator_view, version, one_stop_view, scheduler, snack_bar
-from gui.settings import gui_config, settings_game_config_view, settings_trailblaze_power_view, \
-    settings_echo_of_war_view, \
-    settings_world_patrol_view, settings_mys_view, settings_treasures_lightward_view, settings_sim_uni_view, \
-    settings_basic_view
+from gui import log_view, version, one_stop_view, scheduler, snack_bar
+from gui.settings import gui_config
 from gui.settings.gui_config import ThemeColors, GuiConfig
-from gui.sim_uni import sim_uni_draft_route_view, sim_uni_challenge_config_view
 from gui.sr_basic_view import SrBasicView
-from gui.world_patrol import world_patrol_run_view, world_patrol_draft_route_view, world_patrol_whitelist_view
 from sr.context import get_context, Context
 
 
@@ -245,38 +241,46 @@ class StarRailOneDragon:
             return one_stop_view.get(self.flet_page, self.sr_ctx)
         elif self.app_rail.selected_index == 1:
             if self.world_patrol_rail.selected_index == 0:
-                return world_patrol_run_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.world_patrol.world_patrol_run_view')
             if self.world_patrol_rail.selected_index == 1:
-                return world_patrol_draft_route_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.world_patrol.world_patrol_draft_route_view')
             if self.world_patrol_rail.selected_index == 2:
-                return world_patrol_whitelist_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.world_patrol.world_patrol_whitelist_view')
         elif self.app_rail.selected_index == 2:
             if self.sim_uni_rail.selected_index == 0:
-                return sim_uni_draft_route_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.sim_uni.sim_uni_draft_route_view')
             elif self.sim_uni_rail.selected_index == 1:
-                return sim_uni_challenge_config_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.sim_uni.sim_uni_challenge_config_view')
         elif self.app_rail.selected_index == 3:
-            return calibrator_view.get(self.flet_page, self.sr_ctx)
+            return self._get_view('gui.calibrator_view')
         elif self.app_rail.selected_index == 4:
             if self.settings_rail.selected_index == 0:
-                return settings_basic_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_basic_view')
             elif self.settings_rail.selected_index == 1:
-                return settings_game_config_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_game_config_view')
             elif self.settings_rail.selected_index == 2:
-                return settings_world_patrol_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_world_patrol_view')
             elif self.settings_rail.selected_index == 3:
-                return settings_trailblaze_power_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_trailblaze_power_view')
             elif self.settings_rail.selected_index == 4:
-                return settings_echo_of_war_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_echo_of_war_view')
             elif self.settings_rail.selected_index == 5:
-                return settings_treasures_lightward_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_treasures_lightward_view')
             elif self.settings_rail.selected_index == 6:
-                return settings_sim_uni_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_sim_uni_view')
             elif self.settings_rail.selected_index == 7:
-                return settings_mys_view.get(self.flet_page, self.sr_ctx)
+                return self._get_view('gui.settings.settings_mys_view')
 
         return None
 
+    def _get_view(self, module_name: str) -> SrBasicView:
+        """
+        获取某个页面 页面模块在第一次打开时才导入
+        :param module_name: 页面所在模块
+        :return:
+        """
+        return importlib.import_module(module_name).get(self.flet_page, self.sr_ctx)
+
     def on_key_press(self, event):
         """
         监听F9 判断能否开始某个功能
@@ -293,11 +297,11 @@ class StarRailOneDragon:
             t = threading.Thread(target=one_stop_view.get(self.flet_page, self.sr_ctx).on_click_start, args=[None])
         elif self.app_rail.selected_index == 1:
             if self.world_patrol_rail.selected_index == 0:
-                t = threading.Thread(target=world_patrol_run_view.get(self.flet_page, self.sr_ctx).start, args=[None])
+                t = threading.Thread(target=self._get_view('gui.world_patrol.world_patrol_run_view').start, args=[None])
             elif self.world_patrol_rail.selected_index == 1:
-                t = threading.Thread(target=world_patrol_draft_route_view.get(self.flet_page, self.sr_ctx).test_existed, args=[None])
+                t = threading.Thread(target=self._get_view('gui.world_patrol.world_patrol_draft_route_view').test_existed, args=[None])
         elif self.app_rail.selected_index == 3:
-            t = threading.Thread(target=calibrator_view.get(self.flet_page, self.sr_ctx).start, args=[None])
+            t = threading.Thread(target=self._get_view('gui.calibrator_view').start, args=[None])
         if t is not None:
             t.start()
 
@@ -311,6 +315,7 @@ def run_app(page: ft.Page):
 
     scheduler.start()
     StarRailOneDragon(page, ctx)
+    ctx.preheat_in_background()
     snack_bar.show_message('本脚本开源免费 如有付费请立即申请退款', page)
 
 
@@ -1,28 +1,74 @@
 import logging
+import threading
+import time
+from collections import deque
 
 import flet as ft
 
 from basic import os_utils
-from basic.log_utils import log
+from basic.log_utils import add_log_handler
 from gui import components
 from gui.sr_basic_view import SrBasicView
 from sr.context import Context
 
 
 class GuiHandler(logging.Handler):
-    def __init__(self, sp: ft.Page, list_view: ft.ListView):
+    def __init__(self, sp: ft.Page, list_view: ft.ListView,
+                 max_len: int = 100, refresh_interval: float = 0.2):
+        """
+        日志只放入环形缓冲区 由界面线程按固定频率批量刷新 避免每条日志都等待一次界面更新
+        :param sp: 页面
+        :param list_view: 显示日志的列表
+        :param max_len: 最多显示多少条日志
+        :param refresh_interval: 刷新间隔 秒
+        """
         super().__init__()
         self.list_view = list_view
         self.sp = sp
         self.setLevel(logging.DEBUG if os_utils.is_debug() else logging.INFO)
+        self.max_len: int = max_len
+        self.refresh_interval: float = refresh_interval
+
+        self.record_buffer: deque = deque(maxlen=max_len)
+        self.emit_cnt: int = 0  # 累计收到的日志条数
+        self.shown_cnt: int = 0  # 累计显示过的日志条数
+        self.buffer_lock = threading.Lock()
+        self.new_record_event = threading.Event()
+
+        self.refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self.refresh_thread.start()
 
     def emit(self, record):
-        if self.list_view.page is not None:
-            msg = self.format(record)
-            self.list_view.controls.append(ft.Text(msg, size=10))
-            if len(self.list_view.controls) > 100:  # 日志限制条数
-                self.list_view.controls.pop(0)
-            self.list_view.update()
+        with self.buffer_lock:
+            self.record_buffer.append(record)
+            self.emit_cnt += 1
+        self.new_record_event.set()
+
+    def _refresh_loop(self):
+        while True:
+            self.new_record_event.wait()
+            self.new_record_event.clear()
+            try:
+                self._refresh()
+            except Exception:
+                pass  # 这里不能再输出日志
+            time.sleep(self.refresh_interval)  # 限制刷新频率 期间的日志下一次一起显示
+
+    def _refresh(self):
+        if self.list_view.page is None:
+            return
+        with self.buffer_lock:
+            new_cnt = min(self.emit_cnt - self.shown_cnt, len(self.record_buffer))
+            record_list = list(self.record_buffer)[len(self.record_buffer) - new_cnt:]
+            self.shown_cnt = self.emit_cnt
+        if len(record_list) == 0:
+            return
+
+        controls = self.list_view.controls
+        controls.extend(ft.Text(self.format(record), size=10) for record in record_list)
+        if len(controls) > self.max_len:  # 日志限制条数
+            del controls[:len(controls) - self.max_len]
+        self.list_view.update()
 
 
 class LogView(components.Card, SrBasicView):
@@ -32,7 +78,7 @@ class LogView(components.Card, SrBasicView):
         self.ctx: Context = ctx
 
         log_list = ft.ListView(spacing=10, auto_scroll=True)
-        log.addHandler(GuiHandler(page, list_view=log_list))
+        add_log_handler(GuiHandler(page, list_view=log_list))
 
         title = components.CardTitleText('日志记录')
 
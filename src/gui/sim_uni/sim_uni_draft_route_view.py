@@ -582,7 +582,7 @@ class SimUniDraftRouteView(ft.Row, SrBasicView):
         lm_info = self.sr_ctx.ih.get_large_map(self.chosen_route.region)
         last_pos = self.chosen_route.last_pos
         possible_pos = (last_pos.x, last_pos.y, 20)
-        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.gray.shape, self.mini_map_image.shape[:2], possible_pos)
+        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.shape, self.mini_map_image.shape[:2], possible_pos)
         pos: MatchResult = cal_pos.sim_uni_cal_pos_by_gray(self.sr_ctx.im, lm_info, mm_info, lm_rect=lm_rect,
                                                            scale_list=[1], match_threshold=0.3)
 
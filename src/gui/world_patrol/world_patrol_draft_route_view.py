@@ -18,7 +18,7 @@ from sr.app.world_patrol.world_patrol_whitelist_config import WorldPatrolWhiteli
 from sr.app.world_patrol.world_patrol_app import WorldPatrol
 from sr.const import map_const, operation_const
 from sr.const.map_const import Planet, get_planet_by_cn, PLANET_LIST, PLANET_2_REGION, get_region_by_cn, Region, \
-    REGION_2_SP, TransportPoint, region_with_another_floor
+    TransportPoint, region_with_another_floor
 from sr.context import Context
 
 
@@ -192,15 +192,13 @@ class WorldPatrolDraftRouteView(components.Card, SrBasicView):
         self.draw_route_and_display()
 
     def update_sp_list_by_floor(self):
-        sp_arr = REGION_2_SP.get(self.chosen_region.pr_id)
-        self.tp_dropdown.options = [ft.dropdown.Option(text=sp.cn, key=sp.cn) for sp in sp_arr if sp.region == self.chosen_region]
+        sp_arr = map_const.get_region_sp_index(self.chosen_region).get_by_floor(self.chosen_region)
+        self.tp_dropdown.options = [ft.dropdown.Option(text=sp.cn, key=sp.cn) for sp in sp_arr]
 
     def on_sp_change(self, e):
-        sp_arr = REGION_2_SP.get(self.chosen_region.pr_id)
-        for sp in sp_arr:
-            if sp.region == self.chosen_region and sp.cn == self.tp_dropdown.value:
-                self.chosen_sp = sp
-                break
+        sp = map_const.get_region_sp_index(self.chosen_region).get_by_cn(self.tp_dropdown.value, self.chosen_region)
+        if sp is not None:
+            self.chosen_sp = sp
 
         self.switch_floor_dropdown.value = self.floor_dropdown.value
 
@@ -22,7 +22,8 @@ class AppRunRecord(ConfigHolder):
         self.run_time: str = ''
         self.run_time_float: float = 0
         self.run_status: int = AppRunRecord.STATUS_WAIT  # 0=未运行 1=成功 2=失败 3=运行中
-        super().__init__(app_id, account_idx=account_idx, sub_dir=['app_run_record'], sample=False)
+        super().__init__(app_id, account_idx=account_idx, sub_dir=['app_run_record'], sample=False,
+                         write_behind=True)
 
     def _init_after_read_file(self):
         self.dt = self.get('dt', self.get_current_dt())
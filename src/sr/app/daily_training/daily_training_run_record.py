@@ -24,13 +24,3 @@ class DailyTrainingRunRecord(AppRunRecord):
     @score.setter
     def score(self, new_value: int):
         self.update('score', new_value)
-
-
-_daily_training_record: Optional[DailyTrainingRunRecord] = None
-
-
-def get_record() -> DailyTrainingRunRecord:
-    global _daily_training_record
-    if _daily_training_record is None:
-        _daily_training_record = DailyTrainingRunRecord()
-    return _daily_training_record
@@ -47,13 +47,3 @@ class EchoOfWarRunRecord(AppRunRecord):
     @left_times.setter
     def left_times(self, new_value: int):
         self.update('left_times', new_value)
-
-
-echo_of_war_record: Optional[EchoOfWarRunRecord] = None
-
-
-def get_record() -> EchoOfWarRunRecord:
-    global echo_of_war_record
-    if echo_of_war_record is None:
-        echo_of_war_record = EchoOfWarRunRecord()
-    return echo_of_war_record
@@ -134,7 +134,7 @@ class LargeMapRecorder(Application2):
                 return
             screen = self.screenshot()
             map_part = cv2_utils.crop_image_only(screen, large_map.CUT_MAP_RECT)
-            save_debug_image(map_part, '%s_%02d_%02d' % (self.current_region.prl_id, self.row, self.col))
+            save_debug_image(map_part, '%s_%02d_%02d' % (self.current_region.prl_id, self.row, self.col), async_write=False)
             if len(img) == 0 or not cv2_utils.is_same_image(img[len(img) - 1], map_part):
                 img.append(map_part)
                 self.drag_to_next_col()
@@ -191,7 +191,8 @@ class LargeMapRecorder(Application2):
                 return
             screen = self.screenshot()
             map_part = cv2_utils.crop_image_only(screen, large_map.CUT_MAP_RECT)
-            save_debug_image(map_part, LargeMapRecorder.region_part_image_name(self.current_region, self.row, self.col))
+            save_debug_image(map_part, LargeMapRecorder.region_part_image_name(self.current_region, self.row, self.col),
+                             async_write=False)
             cv2_utils.show_image(map_part, win_name='screenshot_vertically_map_part')
             if len(img) == 0 or not cv2_utils.is_same_image(img[len(img) - 1], map_part):
                 img.append(map_part)
@@ -1,6 +1,9 @@
-from typing import List, Optional, ClassVar
+import threading
+import time
+from typing import List, Optional, ClassVar, Any
 
 from basic.i18_utils import gt
+from basic.log_utils import log
 from sr.app.app_description import AppDescriptionEnum
 from sr.app.app_run_record import AppRunRecord
 from sr.app.application_base import Application, Application2
@@ -21,6 +24,28 @@ from sr.operation import Operation, OperationOneRoundResult, StateOperationEdge,
 from sr.operation.unit.enter_game import LoginWithAnotherAccount
 
 
+class AccountPreparation:
+
+    def __init__(self, account_idx: int):
+        """
+        在运行上一个账号时 后台预加载的下一个账号
+        :param account_idx: 账号下标
+        """
+        self.account_idx: int = account_idx
+        self.thread: Optional[threading.Thread] = None
+        self.config: Optional[dict[str, Any]] = None  # 预加载的配置 切换账号时交给 Context 使用
+        self.app_id_list: List[str] = []  # 预加载时判断需要运行的应用
+        self.prepare_seconds: float = 0  # 预加载耗时 原本需要在切换账号时串行执行
+        self.wait_seconds: float = 0  # 切换账号时等待预加载完成的时间
+
+    @property
+    def saved_seconds(self) -> float:
+        """
+        :return: 切换账号时节省的时间
+        """
+        return max(self.prepare_seconds - self.wait_seconds, 0)
+
+
 class OneStopServiceApp(Application2):
 
     STATUS_ACCOUNT_FINISHED: ClassVar[str] = '所有账号已完成'
@@ -50,6 +75,8 @@ class OneStopServiceApp(Application2):
         self.original_account_idx: Optional[int] = None  # 最初启用的账号
         self.current_account_idx: Optional[int] = None  # 当前运行的账号
         self.current_app_id: Optional[str] = None  # 当前运行的应用ID
+        self.next_account_preparation: Optional[AccountPreparation] = None  # 正在后台预加载的下一个账号
+        self.account_preparation_list: List[AccountPreparation] = []  # 已使用的预加载结果 用于统计
 
     def _init_before_execute(self):
         super()._init_before_execute()
@@ -57,6 +84,8 @@ class OneStopServiceApp(Application2):
         self.original_account_idx = None
         self.current_account_idx = None
         self.current_app_id = None
+        self.next_account_preparation = None
+        self.account_preparation_list = []
 
     def _init_account_order(self) -> OperationOneRoundResult:
         """
@@ -93,13 +122,90 @@ class OneStopServiceApp(Application2):
         self.current_account_idx = next_account_idx
         self.current_app_id = None
 
+        prepared_config = self._take_account_preparation(next_account_idx)
         if self.ctx.one_dragon_config.current_active_account.idx != next_account_idx:
-            self.ctx.active_account(self.current_account_idx)
-            op = LoginWithAnotherAccount(self.ctx)
-            return Operation.round_by_op(op.execute())
+            self.ctx.active_account(self.current_account_idx, prepared_config=prepared_config)
+            self._start_account_preparation()
+            return Operation.round_by_op(self._login_another_account())
 
+        self._start_account_preparation()
         return Operation.round_success()
 
+    def _login_another_account(self) -> OperationResult:
+        """
+        登录已经启用的另一个账号
+        :return:
+        """
+        op = LoginWithAnotherAccount(self.ctx)
+        return op.execute()
+
+    def _start_account_preparation(self):
+        """
+        当前账号运行期间 在后台预加载下一个账号的配置和运行记录
+        :return:
+        """
+        next_account_idx = self._get_next_account_idx()
+        if next_account_idx is None:
+            return
+        prep = AccountPreparation(next_account_idx)
+        prep.thread = threading.Thread(target=self._prepare_account, args=(prep,), daemon=True,
+                                       name='one_stop_prepare_account')
+        self.next_account_preparation = prep
+        prep.thread.start()
+
+    def _prepare_account(self, prep: AccountPreparation):
+        """
+        预加载一个账号 在后台线程运行
+        :param prep: 预加载的账号
+        :return:
+        """
+        start_time = time.time()
+        try:
+            prep.config = self.ctx.prepare_account_config(prep.account_idx,
+                                                          lambda: self._warm_up_account(prep))
+        except Exception:
+            prep.config = None
+            log.error('预加载账号 %02d 失败', prep.account_idx, exc_info=True)
+        prep.prepare_seconds = time.time() - start_time
+
+    def _warm_up_account(self, prep: AccountPreparation):
+        """
+        读取账号的一条龙配置和各应用的运行记录 判断需要运行的应用
+        在 Context.prepare_account_config 中调用 通过 ctx 获取的都是预加载账号的配置
+        :param prep: 预加载的账号
+        :return:
+        """
+        run_app_list = self.ctx.one_stop_service_config.run_app_id_list
+        if AppDescriptionEnum.ASSIGNMENTS.value.id in run_app_list and self.ctx.mys_config.is_login:
+            self.ctx.mys_config.update_note()  # 委托的状态依赖米游社便签 网络请求也提前完成
+        prep.app_id_list = []
+        for app_id in self.ctx.one_stop_service_config.order_app_id_list:
+            if app_id not in run_app_list:
+                continue
+            record = self.get_app_run_record_by_id(app_id, self.ctx)
+            if record is not None and record.run_status_under_now == AppRunRecord.STATUS_SUCCESS:
+                continue
+            prep.app_id_list.append(app_id)
+
+    def _take_account_preparation(self, account_idx: int) -> Optional[dict[str, Any]]:
+        """
+        切换账号时 取出后台预加载的结果 还没加载完的话等待加载完
+        :param account_idx: 即将切换的账号
+        :return: 预加载的配置 没有预加载或者加载失败时返回空
+        """
+        prep = self.next_account_preparation
+        self.next_account_preparation = None
+        if prep is None or prep.account_idx != account_idx:
+            return None
+
+        start_time = time.time()
+        prep.thread.join()
+        prep.wait_seconds = time.time() - start_time
+        self.account_preparation_list.append(prep)
+        log.info('账号 %02d 已预加载 需运行应用 %s 预加载耗时 %.3f秒 切换时等待 %.3f秒',
+                 account_idx, prep.app_id_list, prep.prepare_seconds, prep.wait_seconds)
+        return prep.config
+
     def _get_next_account_idx(self) -> Optional[int]:
         """
         获取下一个启用的账号ID
@@ -134,11 +240,11 @@ class OneStopServiceApp(Application2):
             return Operation.round_success(OneStopServiceApp.STATUS_ACCOUNT_APP_FINISHED)
 
         self.current_app_id = next_app_id
-        record = OneStopServiceApp.get_app_run_record_by_id(self.current_app_id, self.ctx)
+        record = self.get_app_run_record_by_id(self.current_app_id, self.ctx)
         if record.run_status_under_now == AppRunRecord.STATUS_SUCCESS:
             return Operation.round_success()
 
-        OneStopServiceApp.update_app_run_record_before_start(self.current_app_id, self.ctx)
+        record.check_and_update_status()
         app: Application = self.get_app_by_id(self.current_app_id, self.ctx)
 
         if app is None:
@@ -167,7 +273,7 @@ class OneStopServiceApp(Application2):
                 after_current_app = True
                 continue
             if self.current_app_id is None or after_current_app:
-                record = OneStopServiceApp.get_app_run_record_by_id(app_id, self.ctx)
+                record = self.get_app_run_record_by_id(app_id, self.ctx)
                 if record.run_status_under_now == AppRunRecord.STATUS_SUCCESS:
                     continue
                 next_app_id = app_id
@@ -184,9 +290,11 @@ class OneStopServiceApp(Application2):
             self.ctx.active_account(self.original_account_idx)
 
             if self.original_account_idx != self.current_account_idx:
-                op = LoginWithAnotherAccount(self.ctx)
-                return Operation.round_by_op(op.execute())
+                return Operation.round_by_op(self._login_another_account())
 
+        if len(self.account_preparation_list) > 0:
+            log.info('预加载账号 %d 个 切换账号共节省 %.3f秒', len(self.account_preparation_list),
+                     sum(prep.saved_seconds for prep in self.account_preparation_list))
         return Operation.round_success()
 
     @property
@@ -269,14 +377,3 @@ class OneStopServiceApp(Application2):
         elif app_id == AppDescriptionEnum.MYS.value.id:
             return ctx.mys_run_record
         return None
-
-    @staticmethod
-    def update_app_run_record_before_start(app_id: str, ctx: Context):
-        """
-        每次开始前 根据外部信息更新运行状态
-        :param app_id:
-        :return:
-        """
-        record: Optional[AppRunRecord] = OneStopServiceApp.get_app_run_record_by_id(app_id, ctx)
-        if record is not None:
-            record.check_and_update_status()
@@ -31,7 +31,7 @@ class ScreenRecorder(Application):
         img = self.ctrl.screenshot()
         no_uid = fill_uid_black(img, self.ctrl.win)
         cv2_utils.show_image(no_uid, win_name='no_uid')
-        save_debug_image(no_uid)
+        save_debug_image(no_uid, async_write=False)  # 主动截图 不能丢弃或被轮换删除
 
     def mouse_position(self):
         rect = self.ctrl.win.get_win_rect()
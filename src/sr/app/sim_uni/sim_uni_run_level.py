@@ -104,6 +104,10 @@ class SimUniRunLevel(StateOperation):
         if self.route is None:
             return Operation.round_retry('匹配路线失败', wait=1)
 
+        # 同一层都使用这张大地图 提前准备好定位需要的图 之后每帧只需要截取
+        lm_info = self.ctx.ih.get_large_map(self.route.region)
+        _ = lm_info.origin_gray, lm_info.mask
+
         return Operation.round_success()
 
     def _route_op(self) -> OperationOneRoundResult:
@@ -6,24 +6,65 @@ import cv2
 import numpy as np
 from cv2.typing import MatLike
 
-import basic.cal_utils
 from basic import cal_utils, Rect, Point
 from basic.img import MatchResult, cv2_utils, MatchResultList
 from basic.log_utils import log
 from sr.const import map_const
 from sr.image import ImageMatcher
 from sr.image.sceenshot import mini_map, MiniMapInfo, LargeMapInfo
-from sr.performance_recorder import record_performance
+from sr.performance_recorder import record_performance, bind_current_span
 
 cal_pos_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix='cal_pos')
 
 
+class ScaleHistory:
+
+    def __init__(self, max_len: int = 10, neighbour_range: float = 0.05, early_exit_confidence: float = 0.7):
+        """
+        最近几次定位成功使用的小地图缩放比例
+        移动时连续两帧的缩放比例基本不变 因此优先尝试上一次的缩放比例及其相邻的
+        一次移动操作持有一个 在移动过程中的多次定位间共用
+        :param max_len: 最多保留多少个记录
+        :param neighbour_range: 与上一次相差多少以内的缩放比例优先尝试
+        :param early_exit_confidence: 优先尝试的结果达到这个置信度时 不再尝试其它缩放比例
+        """
+        self.max_len: int = max_len
+        self.neighbour_range: float = neighbour_range
+        self.early_exit_confidence: float = early_exit_confidence
+        self.scale_list: List[float] = []
+
+    def add(self, scale: float):
+        self.scale_list.append(scale)
+        if len(self.scale_list) > self.max_len:
+            self.scale_list.pop(0)
+
+    @property
+    def last(self) -> Optional[float]:
+        return self.scale_list[-1] if len(self.scale_list) > 0 else None
+
+    def split_scale_list(self, scale_list: List[float]) -> Tuple[List[float], List[float]]:
+        """
+        把缩放比例分成优先尝试的和剩余的
+        :param scale_list: 全部缩放比例
+        :return: 优先尝试的 按与上一次的差距排序, 剩余的
+        """
+        last = self.last
+        if last is None:
+            return [], scale_list
+        preferred = sorted([i for i in scale_list if abs(i - last) <= self.neighbour_range + 1e-6],
+                           key=lambda x: abs(x - last))
+        rest = [i for i in scale_list if i not in preferred]
+        return preferred, rest
+
+
+@record_performance
 def cal_character_pos(im: ImageMatcher,
                       lm_info: LargeMapInfo, mm_info: MiniMapInfo,
                       possible_pos: Optional[Tuple[int, int, float]] = None,
                       lm_rect: Rect = None, show: bool = False,
                       retry_without_rect: bool = True,
-                      running: bool = False) -> Optional[Point]:
+                      running: bool = False,
+                      scale_history: Optional[ScaleHistory] = None) -> Optional[Point]:
     """
     根据小地图 匹配大地图 判断当前的坐标
     :param im: 图片匹配器
@@ -34,6 +75,7 @@ def cal_character_pos(im: ImageMatcher,
     :param retry_without_rect: 失败时是否去除特定区域进行全图搜索
     :param show: 是否显示结果
     :param running: 角色是否在移动 移动时候小地图会缩小
+    :param scale_history: 最近使用的缩放比例 匹配成功后会记录本次的缩放比例
     :return:
     """
     result: Optional[MatchResult] = None
@@ -51,13 +93,15 @@ def cal_character_pos(im: ImageMatcher,
         # result = r2
 
     if result is None:  # 使用模板匹配 用灰度图的
-        result = cal_character_pos_by_gray(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show)
+        result = cal_character_pos_by_gray(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show,
+                                           scale_history=scale_history)
         if not is_valid_result_with_possible_pos(result, possible_pos, mm_info.angle):
             result = None
 
     # 上面灰度图中 道理掩码部分有些楼梯扣不出来 所以下面用两个都扣不出楼梯的掩码图来匹配
     if result is None:  # 使用模板匹配 用道路掩码的
-        result = cal_character_pos_by_road_mask(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show)
+        result = cal_character_pos_by_road_mask(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show,
+                                                scale_history=scale_history)
         if not is_valid_result_with_possible_pos(result, possible_pos, mm_info.angle):
             result = None
     #
@@ -72,10 +116,14 @@ def cal_character_pos(im: ImageMatcher,
 
     if result is None:
         if lm_rect is not None and retry_without_rect:  # 整张大地图试试
-            return cal_character_pos(im, lm_info, mm_info, running=running, show=show)
+            return cal_character_pos(im, lm_info, mm_info, running=running, show=show,
+                                     scale_history=scale_history)
         else:
             return None
 
+    if scale_history is not None:
+        scale_history.add(result.template_scale)
+
     offset_x = result.x
     offset_y = result.y
     scale = result.template_scale
@@ -107,20 +155,13 @@ def cal_character_pos_by_feature_match(lm_info: LargeMapInfo, mm_info: MiniMapIn
     gray, feature_mask = mini_map.merge_all_map_mask(gray, mm_info.road_mask, mm_info.sp_mask)
     template_mask = mm_info.road_mask
     template_kps, template_desc = cv2_utils.feature_detect_and_compute(gray, mask=template_mask)
-    source_kps, source_desc = lm_info.kps, lm_info.desc
-
-    # 筛选范围内的特征点
-    if lm_rect is not None:
-        kps = []
-        desc = []
-        for i in range(len(source_kps)):
-            p: cv2.KeyPoint = source_kps[i]
-            d = source_desc[i]
-            if basic.cal_utils.in_rect(Point(p.pt[0], p.pt[1]), lm_rect):
-                kps.append(p)
-                desc.append(d)
-        source_kps = kps
-        source_desc = np.array(desc)
+    kp_index = lm_info.kp_index
+    if kp_index is None:
+        return None
+
+    # 筛选范围内的特征点 不限定范围时使用全图的FLANN索引
+    source_kps, source_desc = kp_index.query(lm_rect)
+    trained_matcher = kp_index.flann if lm_rect is None else None
 
     if len(template_kps) == 0 or len(source_kps) == 0:
         return None
@@ -130,7 +171,7 @@ def cal_character_pos_by_feature_match(lm_info: LargeMapInfo, mm_info: MiniMapIn
     good_matches, offset_x, offset_y, template_scale = cv2_utils.feature_match(
         source_kps, source_desc,
         template_kps, template_desc,
-        source_mask)
+        source_mask, trained_matcher=trained_matcher)
 
     if show:
         source = lm_info.origin
@@ -160,7 +201,8 @@ def cal_character_pos_by_gray(im: ImageMatcher,
                               lm_info: LargeMapInfo, mm_info: MiniMapInfo,
                               lm_rect: Rect = None,
                               running: bool = False,
-                              show: bool = False) -> Optional[MatchResult]:
+                              show: bool = False,
+                              scale_history: Optional[ScaleHistory] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用灰度图进行匹配
@@ -170,10 +212,10 @@ def cal_character_pos_by_gray(im: ImageMatcher,
     :param lm_rect: 圈定的大地图区域 传入后更准确
     :param running: 任务是否在跑动
     :param show: 是否显示调试结果
+    :param scale_history: 最近使用的缩放比例 优先尝试
     :return:
     """
-    source, lm_rect = cv2_utils.crop_image(lm_info.origin, lm_rect)
-    source = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+    source, lm_rect = cv2_utils.crop_image(lm_info.origin_gray, lm_rect)
     # 使用道路掩码
     mm_del_radio = mm_info.origin_del_radio
     template = cv2.cvtColor(mm_del_radio, cv2.COLOR_BGR2GRAY)
@@ -185,7 +227,7 @@ def cal_character_pos_by_gray(im: ImageMatcher,
 
     target: MatchResult = template_match_with_scale_list_parallely(im, source, template, template_mask,
                                                                    mini_map.get_mini_map_scale_list(running),
-                                                                   0.3)
+                                                                   0.3, scale_history=scale_history)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -334,7 +376,8 @@ def cal_character_pos_by_road_mask(im: ImageMatcher,
                                    lm_rect: Rect = None,
                                    running: bool = False,
                                    show: bool = False,
-                                   scale_list: List[float] = None) -> Optional[MatchResult]:
+                                   scale_list: List[float] = None,
+                                   scale_history: Optional[ScaleHistory] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用处理过后的道路掩码图
@@ -345,6 +388,7 @@ def cal_character_pos_by_road_mask(im: ImageMatcher,
     :param running: 任务是否在跑动
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
+    :param scale_history: 最近使用的缩放比例 优先尝试
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.mask, lm_rect)
@@ -362,7 +406,7 @@ def cal_character_pos_by_road_mask(im: ImageMatcher,
 
     target: MatchResult = template_match_with_scale_list_parallely(im, source, template, template_mask,
                                                                    scale_list,
-                                                                   0.4)
+                                                                   0.4, scale_history=scale_history)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -391,35 +435,73 @@ def merge_road_mask(road_mask, edge_mask):
 def template_match_with_scale_list_parallely(im: ImageMatcher,
                                              source: MatLike, template: MatLike, template_mask: MatLike,
                                              scale_list: List[float],
-                                             threshold: float) -> MatchResult:
+                                             threshold: float,
+                                             scale_history: Optional[ScaleHistory] = None) -> MatchResult:
     """
     按一定缩放比例进行模板匹配，并行处理不同的缩放比例，返回置信度最高的结果
+    有缩放历史时 先尝试上一次的缩放比例及相邻的 置信度足够高时直接返回 否则再尝试剩余的
     :param im: 图片匹配器
     :param source: 原图
     :param template: 模板图
     :param template_mask: 模板掩码
     :param scale_list: 模板的缩放比例
     :param threshold: 匹配阈值
+    :param scale_history: 缩放历史
     :return: 置信度最高的结果
     """
+    if scale_history is None:
+        return _template_match_with_scale_list(im, source, template, template_mask, scale_list, threshold)
+
+    preferred, rest = scale_history.split_scale_list(scale_list)
+    target = _template_match_with_scale_list(im, source, template, template_mask, preferred, threshold)
+    if target is not None and target.confidence >= scale_history.early_exit_confidence:
+        return target
+
+    rest_target = _template_match_with_scale_list(im, source, template, template_mask, rest, threshold,
+                                                  early_exit_confidence=scale_history.early_exit_confidence)
+    if target is None or (rest_target is not None and rest_target.confidence > target.confidence):
+        target = rest_target
+    return target
+
+
+def _template_match_with_scale_list(im: ImageMatcher,
+                                    source: MatLike, template: MatLike, template_mask: MatLike,
+                                    scale_list: List[float],
+                                    threshold: float,
+                                    early_exit_confidence: Optional[float] = None) -> Optional[MatchResult]:
+    """
+    并行处理不同的缩放比例 返回置信度最高的结果
+    :param early_exit_confidence: 有结果达到这个置信度时 取消还没开始的 并直接返回
+    :return:
+    """
+    if len(scale_list) == 0:
+        return None
     future_list: List[Future] = []
     for scale in scale_list:
-        future_list.append(cal_pos_executor.submit(template_match_with_scale, im,  source, template, template_mask, scale, threshold))
+        future_list.append(cal_pos_executor.submit(bind_current_span(template_match_with_scale),
+                                                   im,  source, template, template_mask, scale, threshold))
 
     target: Optional[MatchResult] = None
-    for future in future_list:
-        try:
-            result: MatchResult = future.result(1)
+    try:
+        for future in concurrent.futures.as_completed(future_list, timeout=len(future_list)):
+            result: MatchResult = future.result()
             if result is not None:
                 # log.debug('缩放比例 %.2f 置信度 %.2f', result.template_scale, result.confidence)
                 if target is None or result.confidence > target.confidence:
                     target = result
-        except concurrent.futures.TimeoutError:
-            log.error('模板匹配超时', exc_info=True)
+            if early_exit_confidence is not None and target is not None \
+                    and target.confidence >= early_exit_confidence:
+                break
+    except concurrent.futures.TimeoutError:
+        log.error('模板匹配超时', exc_info=True)
+
+    for future in future_list:
+        future.cancel()  # 已经开始执行的无法取消 只会取消还在排队的
 
     return target
 
 
+@record_performance
 def template_match_with_scale(im: ImageMatcher,
                               source: MatLike, template: MatLike, template_mask: MatLike, scale: float,
                               threshold: float) -> MatchResult:
@@ -464,13 +546,15 @@ def template_match_with_scale(im: ImageMatcher,
     return result.max
 
 
+@record_performance
 def sim_uni_cal_pos(
         im: ImageMatcher,
         lm_info: LargeMapInfo, mm_info: MiniMapInfo,
         possible_pos: Optional[Tuple[int, int, float]] = None,
         pos_to_cal_angle: Optional[Point] = None,
         lm_rect: Rect = None, show: bool = False,
-        running: bool = False) -> Optional[Point]:
+        running: bool = False,
+        scale_history: Optional[ScaleHistory] = None) -> Optional[Point]:
     """
     根据小地图 匹配大地图 判断当前的坐标。模拟宇宙中使用
     :param im: 图片匹配器
@@ -481,6 +565,7 @@ def sim_uni_cal_pos(
     :param lm_rect: 大地图特定区域
     :param show: 是否显示结果
     :param running: 角色是否在移动 移动时候小地图会缩小
+    :param scale_history: 最近使用的缩放比例 匹配成功后会记录本次的缩放比例
     :return:
     """
     # 匹配结果 是缩放后的 offset 和宽高
@@ -489,19 +574,24 @@ def sim_uni_cal_pos(
     # 模拟宇宙中不需要考虑特殊点
 
     if result is None:  # 使用模板匹配 用原图的
-        result = sim_uni_cal_pos_by_gray(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show)
+        result = sim_uni_cal_pos_by_gray(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show,
+                                         scale_history=scale_history)
         if not is_valid_result_with_possible_pos(result, possible_pos, mm_info.angle, pos_to_cal_angle=pos_to_cal_angle):
             result = None
 
     # 使用模板匹配 道路掩码误。报率高 仅在限定范围时可使用
     if result is None and lm_rect is not None:
-        result = sim_uni_cal_pos_by_road_mask(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show)
+        result = sim_uni_cal_pos_by_road_mask(im, lm_info, mm_info, lm_rect=lm_rect, running=running, show=show,
+                                              scale_history=scale_history)
         if not is_valid_result_with_possible_pos(result, possible_pos, mm_info.angle, pos_to_cal_angle=pos_to_cal_angle):
             result = None
 
     if result is None:
         return None
 
+    if scale_history is not None:
+        scale_history.add(result.template_scale)
+
     scale = result.template_scale
     # 小地图缩放后中心点在大地图的位置 即人物坐标
     target = result.center
@@ -522,7 +612,8 @@ def sim_uni_cal_pos_by_gray(im: ImageMatcher,
                             running: bool = False,
                             show: bool = False,
                             scale_list: List[float] = None,
-                            match_threshold: float = 0.3) -> Optional[MatchResult]:
+                            match_threshold: float = 0.3,
+                            scale_history: Optional[ScaleHistory] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用灰度图进行匹配 使用v4的道路掩码 适合在单层地图中使用
@@ -534,10 +625,10 @@ def sim_uni_cal_pos_by_gray(im: ImageMatcher,
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
     :param match_threshold: 模板匹配的阈值
+    :param scale_history: 最近使用的缩放比例 优先尝试
     :return:
     """
-    source, lm_rect = cv2_utils.crop_image(lm_info.origin, lm_rect)
-    source = cv2.cvtColor(source, cv2.COLOR_BGR2GRAY)
+    source, lm_rect = cv2_utils.crop_image(lm_info.origin_gray, lm_rect)
     # 使用道路掩码
     template = cv2.cvtColor(mm_info.origin_del_radio, cv2.COLOR_BGR2GRAY)
     # road_mask = mini_map.get_road_mask_v4(mm,
@@ -554,7 +645,8 @@ def sim_uni_cal_pos_by_gray(im: ImageMatcher,
 
     if scale_list is None:
         scale_list = mini_map.get_mini_map_scale_list(running)
-    target: MatchResult = template_match_with_scale_list_parallely(im, source, template, template_mask, scale_list, match_threshold)
+    target: MatchResult = template_match_with_scale_list_parallely(im, source, template, template_mask, scale_list, match_threshold,
+                                                                   scale_history=scale_history)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -580,7 +672,8 @@ def sim_uni_cal_pos_by_road_mask(im: ImageMatcher,
                                  running: bool = False,
                                  show: bool = False,
                                  scale_list: List[float] = None,
-                                 match_threshold: float = 0.3) -> Optional[MatchResult]:
+                                 match_threshold: float = 0.3,
+                                      scale_history: Optional[ScaleHistory] = None) -> Optional[MatchResult]:
     """
     使用模板匹配 在大地图上匹配小地图的位置 会对小地图进行缩放尝试
     使用模拟宇宙专用的道路掩码图
@@ -591,6 +684,7 @@ def sim_uni_cal_pos_by_road_mask(im: ImageMatcher,
     :param running: 任务是否在跑动
     :param show: 是否显示调试结果
     :param scale_list: 缩放比例
+    :param scale_history: 最近使用的缩放比例 优先尝试
     :return:
     """
     source, lm_rect = cv2_utils.crop_image(lm_info.mask, lm_rect)
@@ -612,7 +706,8 @@ def sim_uni_cal_pos_by_road_mask(im: ImageMatcher,
 
     target: MatchResult = template_match_with_scale_list_parallely(im, source, template, template_mask,
                                                                    scale_list,
-                                                                   threshold=match_threshold)
+                                                                   threshold=match_threshold,
+                                                                   scale_history=scale_history)
 
     if show:
         scale = target.template_scale if target is not None else 1
@@ -98,6 +98,38 @@ class GameConfig(ConfigHolder):
         """
         self.update('game_path', new_value)
 
+    @property
+    def ocr_server_port(self) -> int:
+        """
+        本地OCR服务的端口 0代表不使用服务 在本进程内加载模型
+        :return:
+        """
+        return self.get('ocr_server_port', 0)
+
+    @ocr_server_port.setter
+    def ocr_server_port(self, new_value: int):
+        """
+        更新本地OCR服务的端口
+        :return:
+        """
+        self.update('ocr_server_port', new_value)
+
+    @property
+    def ocr_backend(self) -> str:
+        """
+        本进程加载OCR模型时使用的推理后端
+        :return:
+        """
+        return self.get('ocr_backend', game_config_const.OCR_BACKEND_PADDLE)
+
+    @ocr_backend.setter
+    def ocr_backend(self, new_value: str):
+        """
+        更新OCR推理后端
+        :return:
+        """
+        self.update('ocr_backend', new_value)
+
     @property
     def planet_lcs_percent(self):
         return ocr_const.PLANET_LCS_PERCENT[self.lang]
@@ -33,3 +33,12 @@ LANG_OPTS = {
     '简体中文': LANG_CN,
     'English': LANG_EN
 }
+
+# OCR推理后端
+OCR_BACKEND_PADDLE = 'paddle'
+OCR_BACKEND_ONNX = 'onnx'
+
+OCR_BACKEND_OPTS = {
+    'PaddleOCR': OCR_BACKEND_PADDLE,
+    'ONNX Runtime': OCR_BACKEND_ONNX
+}
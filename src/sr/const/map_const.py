@@ -1,7 +1,8 @@
-from typing import Optional, List, Dict
+import bisect
+from typing import Optional, List, Dict, Tuple
 
-from basic import cal_utils, Rect, Point, str_utils
-from basic.i18_utils import gt
+from basic import Rect, Point, str_utils
+from basic.i18_utils import gt, gt_tuple
 
 
 class Planet:
@@ -41,6 +42,7 @@ P03 = Planet(3, "XZLF", "仙舟「罗浮」")
 P04 = Planet(4, "PNKN", "匹诺康尼")
 
 PLANET_LIST = [P01, P02, P03, P04]
+PLANET_NAME_TUPLE: Tuple[str, ...] = tuple(p.cn for p in PLANET_LIST)
 
 
 def get_planet_by_cn(cn: str) -> Optional[Planet]:
@@ -61,7 +63,7 @@ def best_match_planet_by_name(ocr_word: str) -> Optional[Planet]:
     :param ocr_word: OCR结果
     :return:
     """
-    planet_names = [gt(p.cn, 'ocr') for p in PLANET_LIST]
+    planet_names = gt_tuple(PLANET_NAME_TUPLE, 'ocr')
     idx = str_utils.find_best_match_by_lcs(ocr_word, target_word_list=planet_names)
     if idx is None:
         return None
@@ -207,6 +209,9 @@ PLANET_2_REGION: Dict[str, List[Region]] = {
                 P03_R07, P03_R08_F1, P03_R08_F2, P03_R09, P03_R10],
     P04.np_id: [P04_R01_F1, P04_R01_F2, P04_R01_F3, P04_R02_F1, P04_R02_F2, P04_R02_F3, P04_R03, P04_R04, P04_R05_F1, P04_R05_F2, P04_R05_F3]
 }
+PLANET_2_REGION_NAME: Dict[str, Tuple[str, ...]] = {
+    np_id: tuple(r.cn for r in region_list) for np_id, region_list in PLANET_2_REGION.items()
+}
 
 
 def get_region_by_cn(cn: str, planet: Planet, floor: int = 0) -> Optional[Region]:
@@ -242,9 +247,9 @@ def best_match_region_by_name(ocr_word: Optional[str], planet: Optional[Planet]
     for np_id, region_list in PLANET_2_REGION.items():
         if planet is not None and planet.np_id != np_id:
             continue
-        for region in region_list:
-            region_name = gt(region.cn, 'ocr')
-            lcs = str_utils.longest_common_subsequence_length(region_name, ocr_word)
+        region_name_list = gt_tuple(PLANET_2_REGION_NAME[np_id], 'ocr')
+        lcs_list = str_utils.get_lcs_matcher(region_name_list).lcs_list(ocr_word)
+        for region, region_name, lcs in zip(region_list, region_name_list, lcs_list):
             lcs_percent = lcs / len(region_name)
             if lcs > best_lcs or (lcs == best_lcs and lcs_percent > best_lcs_percent):
                 best_region = region
@@ -677,13 +682,114 @@ REGION_2_SP = {
 }
 
 
+class RegionSpIndex:
+
+    def __init__(self, sp_list: List[TransportPoint]):
+        """
+        一个区域内特殊点的索引 用于按矩形范围和最近距离查询
+        特殊点按横坐标排序 查询时二分找到横坐标范围 再判断纵坐标
+        查询结果保持特殊点在 REGION_2_SP 中的原有顺序
+        :param sp_list: 区域内的特殊点 包含该区域所有楼层
+        """
+        self.sp_list: List[TransportPoint] = sp_list
+        self.sorted_idx: List[int] = sorted(range(len(sp_list)), key=lambda i: (sp_list[i].lm_pos.x, i))
+        self.sorted_x: List[int] = [sp_list[i].lm_pos.x for i in self.sorted_idx]
+        self.sorted_y: List[int] = [sp_list[i].lm_pos.y for i in self.sorted_idx]
+        self.cn_2_sp: Dict[str, List[TransportPoint]] = {}
+        for sp in sp_list:
+            if sp.cn not in self.cn_2_sp:
+                self.cn_2_sp[sp.cn] = []
+            self.cn_2_sp[sp.cn].append(sp)
+
+    def in_rect(self, rect: Optional[Rect]) -> List[TransportPoint]:
+        """
+        获取矩形内的特殊点
+        :param rect: 矩形 为空时返回全部
+        :return: 特殊点
+        """
+        if rect is None:
+            return list(self.sp_list)
+        start = bisect.bisect_left(self.sorted_x, rect.x1)
+        end = bisect.bisect_right(self.sorted_x, rect.x2)
+        idx_list = [self.sorted_idx[i] for i in range(start, end) if rect.y1 <= self.sorted_y[i] <= rect.y2]
+        idx_list.sort()
+        return [self.sp_list[i] for i in idx_list]
+
+    def nearest(self, pos: Point, template_id: Optional[str] = None,
+                exclude: Optional[TransportPoint] = None) -> Optional[TransportPoint]:
+        """
+        获取距离最近的特殊点 从横坐标最接近的位置开始往两边找
+        横坐标的差距已经超过当前最近距离时停止
+        :param pos: 大地图上的坐标
+        :param template_id: 只找这种模板的特殊点 为空时不限制
+        :param exclude: 排除的特殊点 通常是自己
+        :return: 最近的特殊点 没有时返回None
+        """
+        best_idx: int = -1
+        best_dis: int = 0  # 距离的平方
+        right = bisect.bisect_left(self.sorted_x, pos.x)
+        left = right - 1
+        while left >= 0 or right < len(self.sorted_x):
+            # 每次取横坐标更接近的一边
+            if right >= len(self.sorted_x) or (left >= 0 and pos.x - self.sorted_x[left] <= self.sorted_x[right] - pos.x):
+                i = left
+                left -= 1
+            else:
+                i = right
+                right += 1
+            dx = self.sorted_x[i] - pos.x
+            if best_idx >= 0 and dx * dx > best_dis:
+                break
+            sp = self.sp_list[self.sorted_idx[i]]
+            if sp is exclude or (template_id is not None and sp.template_id != template_id):
+                continue
+            dy = self.sorted_y[i] - pos.y
+            dis = dx * dx + dy * dy
+            if best_idx < 0 or dis < best_dis or (dis == best_dis and self.sorted_idx[i] < best_idx):
+                best_idx = self.sorted_idx[i]
+                best_dis = dis
+        return self.sp_list[best_idx] if best_idx >= 0 else None
+
+    def get_by_cn(self, cn: str, region: Optional[Region] = None) -> Optional[TransportPoint]:
+        """
+        按中文名称获取特殊点
+        :param cn: 中文名称
+        :param region: 限定楼层 为空时不限制
+        :return:
+        """
+        for sp in self.cn_2_sp.get(cn, []):
+            if region is None or sp.region == region:
+                return sp
+        return None
+
+    def get_by_floor(self, region: Region) -> List[TransportPoint]:
+        """
+        获取某一楼层的特殊点
+        :param region: 区域 包含楼层
+        :return:
+        """
+        return [sp for sp in self.sp_list if sp.region == region]
+
+
+_REGION_2_SP_INDEX: Dict[str, RegionSpIndex] = {}
+
+
+def get_region_sp_index(region: Region) -> RegionSpIndex:
+    """
+    获取区域的特殊点索引 第一次使用时构建
+    同一区域不同楼层共用一个索引
+    :param region: 区域
+    :return:
+    """
+    if region.pr_id not in _REGION_2_SP_INDEX:
+        _REGION_2_SP_INDEX[region.pr_id] = RegionSpIndex(REGION_2_SP.get(region.pr_id, []))
+    return _REGION_2_SP_INDEX[region.pr_id]
+
+
 def get_sp_by_cn(planet_cn: str, region_cn: str, floor: int, tp_cn: str) -> TransportPoint:
     p: Planet = get_planet_by_cn(planet_cn)
     r: Region = get_region_by_cn(region_cn, p, floor)
-    for i in REGION_2_SP.get(r.pr_id):
-        if i.cn != tp_cn:
-            continue
-        return i
+    return get_region_sp_index(r).get_by_cn(tp_cn)
 
 
 def region_with_another_floor(region: Region, floor: int) -> Optional[Region]:
@@ -703,12 +809,10 @@ def get_sp_type_in_rect(region: Region, rect: Rect) -> dict:
     :param rect: 矩形 为空时返回全部
     :return: 特殊点
     """
-    sp_list = REGION_2_SP.get(region.pr_id)
     sp_map = {}
-    for sp in sp_list:
-        if rect is None or cal_utils.in_rect(sp.lm_pos, rect):
-            if sp.template_id not in sp_map:
-                sp_map[sp.template_id] = []
-            sp_map[sp.template_id].append(sp)
+    for sp in get_region_sp_index(region).in_rect(rect):
+        if sp.template_id not in sp_map:
+            sp_map[sp.template_id] = []
+        sp_map[sp.template_id].append(sp)
 
     return sp_map
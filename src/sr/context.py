@@ -1,50 +1,47 @@
 import subprocess
 import threading
 import time
-from typing import Optional, List
+from typing import Optional, List, Callable, Any, TYPE_CHECKING
 
-import keyboard
-import pyautogui
-
-from basic import os_utils
+from basic import os_utils, config
 from basic.i18_utils import gt
-from basic.img.os import save_debug_image
+from basic.img.os import save_debug_image, debug_image_writer
 from basic.log_utils import log
-from sr.app.assignments.assignments_run_record import AssignmentsRunRecord
-from sr.app.buy_xianzhou_parcel.buy_xianzhou_parcel_run_record import BuyXianZhouParcelRunRecord
-from sr.app.daily_training.daily_training_run_record import DailyTrainingRunRecord
-from sr.app.echo_of_war.echo_of_war_config import EchoOfWarConfig
-from sr.app.echo_of_war.echo_of_war_run_record import EchoOfWarRunRecord
-from sr.app.email.email_run_record import EmailRunRecord
-from sr.app.mys.mys_run_record import MysRunRecord
-from sr.app.nameless_honor.nameless_honor_run_record import NamelessHonorRunRecord
-from sr.app.one_stop_service.one_stop_service_config import OneStopServiceConfig
-from sr.app.sim_uni.sim_uni_config import SimUniConfig
-from sr.app.sim_uni.sim_uni_run_record import SimUniRunRecord
-from sr.app.support_character.support_character_run_record import SupportCharacterRunRecord
-from sr.app.trailblaze_power.trailblaze_power_config import TrailblazePowerConfig
-from sr.app.trailblaze_power.trailblaze_power_run_record import TrailblazePowerRunRecord
-from sr.app.treasures_lightward.treasures_lightward_config import TreasuresLightwardConfig
-from sr.app.treasures_lightward.treasures_lightward_record import TreasuresLightwardRunRecord
-from sr.app.world_patrol.world_patrol_config import WorldPatrolConfig
-from sr.app.world_patrol.world_patrol_run_record import WorldPatrolRunRecord
 from sr.config.game_config import GameConfig
 from sr.const import game_config_const
 from sr.const.character_const import Character, TECHNIQUE_BUFF, TECHNIQUE_BUFF_ATTACK, TECHNIQUE_ATTACK
 from sr.control import GameController
-from sr.control.pc_controller import PcController
 from sr.image import ImageMatcher
-from sr.image.cn_ocr_matcher import CnOcrMatcher
 from sr.image.cv2_matcher import CvImageMatcher
-from sr.image.en_ocr_matcher import EnOcrMatcher
 from sr.image.image_holder import ImageHolder
 from sr.image.ocr_matcher import OcrMatcher
 from sr.image.sceenshot import fill_uid_black
-from sr.mystools.one_dragon_mys_config import MysConfig
 from sr.one_dragon_config import OneDragonConfig, OneDragonAccount
 from sr.performance_recorder import PerformanceRecorder, get_recorder, log_all_performance
-from sr.sim_uni.sim_uni_challenge_config import SimUniChallengeAllConfig
-from sr.win import Window
+
+# 以下模块较重 或只有部分功能会用到 均在第一次使用时才导入
+if TYPE_CHECKING:
+    from sr.app.assignments.assignments_run_record import AssignmentsRunRecord
+    from sr.app.buy_xianzhou_parcel.buy_xianzhou_parcel_run_record import BuyXianZhouParcelRunRecord
+    from sr.app.daily_training.daily_training_run_record import DailyTrainingRunRecord
+    from sr.app.echo_of_war.echo_of_war_config import EchoOfWarConfig
+    from sr.app.echo_of_war.echo_of_war_run_record import EchoOfWarRunRecord
+    from sr.app.email.email_run_record import EmailRunRecord
+    from sr.app.mys.mys_run_record import MysRunRecord
+    from sr.app.nameless_honor.nameless_honor_run_record import NamelessHonorRunRecord
+    from sr.app.one_stop_service.one_stop_service_config import OneStopServiceConfig
+    from sr.app.sim_uni.sim_uni_config import SimUniConfig
+    from sr.app.sim_uni.sim_uni_run_record import SimUniRunRecord
+    from sr.app.support_character.support_character_run_record import SupportCharacterRunRecord
+    from sr.app.trailblaze_power.trailblaze_power_config import TrailblazePowerConfig
+    from sr.app.trailblaze_power.trailblaze_power_run_record import TrailblazePowerRunRecord
+    from sr.app.treasures_lightward.treasures_lightward_config import TreasuresLightwardConfig
+    from sr.app.treasures_lightward.treasures_lightward_record import TreasuresLightwardRunRecord
+    from sr.app.world_patrol.world_patrol_config import WorldPatrolConfig
+    from sr.app.world_patrol.world_patrol_run_record import WorldPatrolRunRecord
+    from sr.mystools.one_dragon_mys_config import MysConfig
+    from sr.sim_uni.sim_uni_challenge_config import SimUniChallengeAllConfig
+    from sr.win import Window
 
 
 class Context:
@@ -69,34 +66,14 @@ class Context:
 
         self.one_dragon_config: OneDragonConfig = OneDragonConfig()
         self.game_config: Optional[GameConfig] = None
+        debug_image_writer.update_config(self.one_dragon_config.debug_image_compression,
+                                         self.one_dragon_config.debug_image_npy,
+                                         self.one_dragon_config.debug_image_max_mb)
 
-        self.world_patrol_config: Optional[WorldPatrolConfig] = None
-        self.world_patrol_run_record: Optional[WorldPatrolRunRecord] = None
-
-        self.tp_config: Optional[TrailblazePowerConfig] = None
-        self.tp_run_record: Optional[TrailblazePowerRunRecord] = None
-
-        self.echo_config: Optional[EchoOfWarConfig] = None
-        self.echo_run_record: Optional[EchoOfWarRunRecord] = None
-
-        self.tl_config: Optional[TreasuresLightwardConfig] = None
-        self.tl_run_record: Optional[TreasuresLightwardRunRecord] = None
-
-        self.sim_uni_config: Optional[SimUniConfig] = None
-        self.sim_uni_challenge_all_config: Optional[SimUniChallengeAllConfig] = None
-        self.sim_uni_run_record: Optional[SimUniRunRecord] = None
-
-        self.mys_config: Optional[MysConfig] = None
-        self.mys_run_record: Optional[MysRunRecord] = None
-
-        self.assignments_run_record: Optional[AssignmentsRunRecord] = None
-        self.buy_xz_parcel_run_record: Optional[BuyXianZhouParcelRunRecord] = None
-        self.daily_training_run_record: Optional[DailyTrainingRunRecord] = None
-        self.email_run_record: Optional[EmailRunRecord] = None
-        self.nameless_honor_run_record: Optional[NamelessHonorRunRecord] = None
-        self.support_character_run_record: Optional[SupportCharacterRunRecord] = None
-
-        self.one_stop_service_config: Optional[OneStopServiceConfig] = None
+        self._account_idx: Optional[int] = None
+        self._account_config: dict[str, Any] = {}  # 按需加载的各应用配置和运行记录
+        self._account_config_lock = threading.RLock()
+        self._prepare_local = threading.local()  # 后台预加载其他账号时 该线程使用的配置缓存
 
         self.init_if_no_account()
         self.init_config_by_account()
@@ -119,98 +96,220 @@ class Context:
         account: OneDragonAccount = self.one_dragon_config.create_new_account(True)
         account_idx = account.idx
 
+        from sr.app.assignments.assignments_run_record import AssignmentsRunRecord
+        from sr.app.buy_xianzhou_parcel.buy_xianzhou_parcel_run_record import BuyXianZhouParcelRunRecord
+        from sr.app.daily_training.daily_training_run_record import DailyTrainingRunRecord
+        from sr.app.echo_of_war.echo_of_war_config import EchoOfWarConfig
+        from sr.app.echo_of_war.echo_of_war_run_record import EchoOfWarRunRecord
+        from sr.app.email.email_run_record import EmailRunRecord
+        from sr.app.mys.mys_run_record import MysRunRecord
+        from sr.app.nameless_honor.nameless_honor_run_record import NamelessHonorRunRecord
+        from sr.app.one_stop_service.one_stop_service_config import OneStopServiceConfig
+        from sr.app.sim_uni.sim_uni_config import SimUniConfig
+        from sr.app.sim_uni.sim_uni_run_record import SimUniRunRecord
+        from sr.app.support_character.support_character_run_record import SupportCharacterRunRecord
+        from sr.app.trailblaze_power.trailblaze_power_config import TrailblazePowerConfig
+        from sr.app.trailblaze_power.trailblaze_power_run_record import TrailblazePowerRunRecord
+        from sr.app.treasures_lightward.treasures_lightward_config import TreasuresLightwardConfig
+        from sr.app.treasures_lightward.treasures_lightward_record import TreasuresLightwardRunRecord
+        from sr.app.world_patrol.world_patrol_config import WorldPatrolConfig
+        from sr.app.world_patrol.world_patrol_run_record import WorldPatrolRunRecord
+        from sr.mystools.one_dragon_mys_config import MysConfig
+
         self.game_config = GameConfig()
         self.game_config.move_to_account_idx(account_idx)
 
-        self.mys_config = MysConfig(account_idx)
-        self.mys_run_record = MysRunRecord(account_idx)
-
-        self.world_patrol_config = WorldPatrolConfig()
-        self.world_patrol_config.move_to_account_idx(account_idx)
-        self.world_patrol_run_record = WorldPatrolRunRecord()
-        self.world_patrol_run_record.move_to_account_idx(account_idx)
-
-        self.tp_config = TrailblazePowerConfig()
-        self.tp_config.move_to_account_idx(account_idx)
-        self.tp_run_record = TrailblazePowerRunRecord(self.tp_config, self.mys_config)
-        self.tp_run_record.move_to_account_idx(account_idx)
-
-        self.echo_config = EchoOfWarConfig()
-        self.echo_config.move_to_account_idx(account_idx)
-        self.echo_run_record = EchoOfWarRunRecord()
-        self.echo_run_record.move_to_account_idx(account_idx)
+        mys_config = MysConfig(account_idx)
+        MysRunRecord(account_idx)
 
-        self.tl_config = TreasuresLightwardConfig()
-        self.tl_config.move_to_account_idx(account_idx)
-        self.tl_run_record = TreasuresLightwardRunRecord()
-        self.tl_run_record.move_to_account_idx(account_idx)
+        WorldPatrolConfig().move_to_account_idx(account_idx)
+        WorldPatrolRunRecord().move_to_account_idx(account_idx)
 
-        self.sim_uni_config = SimUniConfig()
-        self.sim_uni_config.move_to_account_idx(account_idx)
-        self.sim_uni_run_record = SimUniRunRecord(self.sim_uni_config)
-        self.sim_uni_run_record.move_to_account_idx(account_idx)
+        tp_config = TrailblazePowerConfig()
+        tp_config.move_to_account_idx(account_idx)
+        TrailblazePowerRunRecord(tp_config, mys_config).move_to_account_idx(account_idx)
 
-        self.assignments_run_record = AssignmentsRunRecord(self.mys_config)
-        self.assignments_run_record.move_to_account_idx(account_idx)
+        EchoOfWarConfig().move_to_account_idx(account_idx)
+        EchoOfWarRunRecord().move_to_account_idx(account_idx)
 
-        self.buy_xz_parcel_run_record = BuyXianZhouParcelRunRecord()
-        self.buy_xz_parcel_run_record.move_to_account_idx(account_idx)
+        TreasuresLightwardConfig().move_to_account_idx(account_idx)
+        TreasuresLightwardRunRecord().move_to_account_idx(account_idx)
 
-        self.daily_training_run_record = DailyTrainingRunRecord()
-        self.daily_training_run_record.move_to_account_idx(account_idx)
+        sim_uni_config = SimUniConfig()
+        sim_uni_config.move_to_account_idx(account_idx)
+        SimUniRunRecord(sim_uni_config).move_to_account_idx(account_idx)
 
-        self.email_run_record = EmailRunRecord()
-        self.email_run_record.move_to_account_idx(account_idx)
+        AssignmentsRunRecord(mys_config).move_to_account_idx(account_idx)
+        BuyXianZhouParcelRunRecord().move_to_account_idx(account_idx)
+        DailyTrainingRunRecord().move_to_account_idx(account_idx)
+        EmailRunRecord().move_to_account_idx(account_idx)
+        NamelessHonorRunRecord().move_to_account_idx(account_idx)
+        SupportCharacterRunRecord().move_to_account_idx(account_idx)
 
-        self.nameless_honor_run_record = NamelessHonorRunRecord()
-        self.nameless_honor_run_record.move_to_account_idx(account_idx)
+        OneStopServiceConfig().move_to_account_idx(account_idx)
 
-        self.support_character_run_record = SupportCharacterRunRecord()
-        self.support_character_run_record.move_to_account_idx(account_idx)
-
-        self.one_stop_service_config = OneStopServiceConfig()
-        self.one_stop_service_config.move_to_account_idx(account_idx)
-
-    def init_config_by_account(self):
+    def init_config_by_account(self, prepared_config: Optional[dict[str, Any]] = None):
         """
         加载账号对应的配置
+        游戏配置在这里加载 其他应用的配置和运行记录在第一次使用时加载
+        :param prepared_config: prepare_account_config 预加载的配置 需要是当前启用账号的
         :return:
         """
         account_idx = self.one_dragon_config.current_active_account.idx
-        self.game_config = GameConfig(account_idx)
+        config.flush_all()  # 之前账号的运行记录可能还没写入
+        with self._account_config_lock:
+            self._account_idx = account_idx
+            self._account_config = {} if prepared_config is None else prepared_config
+        self.game_config = self._get_account_config('game_config', GameConfig)
+
+    def prepare_account_config(self, account_idx: int, prepare: Callable[[], Any]) -> dict[str, Any]:
+        """
+        提前加载另一个账号的配置 用于一条龙在运行当前账号时 在后台准备下一个账号
+        prepare 执行期间 本线程通过各个属性获取的配置和运行记录都是该账号的 其他线程不受影响
+        :param account_idx: 账号下标
+        :param prepare: 需要提前做的准备 例如读取各个运行记录
+        :return: 加载好的配置 切换账号时传给 active_account
+        """
+        prepared_config: dict[str, Any] = {}
+        self._prepare_local.account = (account_idx, prepared_config)
+        try:
+            self._get_account_config('game_config', GameConfig)
+            prepare()
+        finally:
+            self._prepare_local.account = None
+        return prepared_config
 
-        self.mys_config = MysConfig(account_idx)
-        self.mys_run_record = MysRunRecord(account_idx)
+    def _get_account_config(self, key: str, factory: Callable[[Optional[int]], Any]) -> Any:
+        """
+        获取当前账号的某个配置 第一次获取时创建
+        :param key: 配置名称
+        :param factory: 使用账号下标创建配置的方法
+        :return:
+        """
+        preparing = getattr(self._prepare_local, 'account', None)
+        if preparing is not None:  # 正在预加载其他账号 只有本线程会访问 不需要加锁
+            account_idx, prepared_config = preparing
+            if key not in prepared_config:
+                prepared_config[key] = factory(account_idx)
+            return prepared_config[key]
+
+        with self._account_config_lock:
+            if key not in self._account_config:
+                self._account_config[key] = factory(self._account_idx)
+            return self._account_config[key]
 
-        self.world_patrol_config = WorldPatrolConfig(account_idx)
-        self.world_patrol_run_record = WorldPatrolRunRecord(account_idx)
+    @property
+    def mys_config(self) -> 'MysConfig':
+        from sr.mystools.one_dragon_mys_config import MysConfig
+        return self._get_account_config('mys_config', MysConfig)
 
-        self.tp_config = TrailblazePowerConfig(account_idx)
-        self.tp_run_record = TrailblazePowerRunRecord(self.tp_config, self.mys_config, account_idx)
+    @property
+    def mys_run_record(self) -> 'MysRunRecord':
+        from sr.app.mys.mys_run_record import MysRunRecord
+        return self._get_account_config('mys_run_record', MysRunRecord)
 
-        self.echo_config = EchoOfWarConfig(account_idx)
-        self.echo_run_record = EchoOfWarRunRecord(account_idx)
+    @property
+    def world_patrol_config(self) -> 'WorldPatrolConfig':
+        from sr.app.world_patrol.world_patrol_config import WorldPatrolConfig
+        return self._get_account_config('world_patrol_config', WorldPatrolConfig)
 
-        self.tl_config = TreasuresLightwardConfig(account_idx)
-        self.tl_run_record = TreasuresLightwardRunRecord(account_idx)
+    @property
+    def world_patrol_run_record(self) -> 'WorldPatrolRunRecord':
+        from sr.app.world_patrol.world_patrol_run_record import WorldPatrolRunRecord
+        return self._get_account_config('world_patrol_run_record', WorldPatrolRunRecord)
 
-        self.sim_uni_config = SimUniConfig(account_idx)
-        self.sim_uni_challenge_all_config = SimUniChallengeAllConfig()
-        self.sim_uni_run_record = SimUniRunRecord(self.sim_uni_config, account_idx)
+    @property
+    def tp_config(self) -> 'TrailblazePowerConfig':
+        from sr.app.trailblaze_power.trailblaze_power_config import TrailblazePowerConfig
+        return self._get_account_config('tp_config', TrailblazePowerConfig)
+
+    @property
+    def tp_run_record(self) -> 'TrailblazePowerRunRecord':
+        from sr.app.trailblaze_power.trailblaze_power_run_record import TrailblazePowerRunRecord
+        return self._get_account_config(
+            'tp_run_record',
+            lambda account_idx: TrailblazePowerRunRecord(self.tp_config, self.mys_config, account_idx))
+
+    @property
+    def echo_config(self) -> 'EchoOfWarConfig':
+        from sr.app.echo_of_war.echo_of_war_config import EchoOfWarConfig
+        return self._get_account_config('echo_config', EchoOfWarConfig)
 
-        self.assignments_run_record = AssignmentsRunRecord(self.mys_config, account_idx)
-        self.buy_xz_parcel_run_record = BuyXianZhouParcelRunRecord(account_idx)
-        self.daily_training_run_record = DailyTrainingRunRecord(account_idx)
-        self.email_run_record = EmailRunRecord(account_idx)
-        self.nameless_honor_run_record = NamelessHonorRunRecord(account_idx)
-        self.support_character_run_record = SupportCharacterRunRecord(account_idx)
+    @property
+    def echo_run_record(self) -> 'EchoOfWarRunRecord':
+        from sr.app.echo_of_war.echo_of_war_run_record import EchoOfWarRunRecord
+        return self._get_account_config('echo_run_record', EchoOfWarRunRecord)
 
-        self.one_stop_service_config = OneStopServiceConfig(account_idx)
+    @property
+    def tl_config(self) -> 'TreasuresLightwardConfig':
+        from sr.app.treasures_lightward.treasures_lightward_config import TreasuresLightwardConfig
+        return self._get_account_config('tl_config', TreasuresLightwardConfig)
 
-    def active_account(self, account_idx: int):
+    @property
+    def tl_run_record(self) -> 'TreasuresLightwardRunRecord':
+        from sr.app.treasures_lightward.treasures_lightward_record import TreasuresLightwardRunRecord
+        return self._get_account_config('tl_run_record', TreasuresLightwardRunRecord)
+
+    @property
+    def sim_uni_config(self) -> 'SimUniConfig':
+        from sr.app.sim_uni.sim_uni_config import SimUniConfig
+        return self._get_account_config('sim_uni_config', SimUniConfig)
+
+    @property
+    def sim_uni_challenge_all_config(self) -> 'SimUniChallengeAllConfig':
+        from sr.sim_uni.sim_uni_challenge_config import SimUniChallengeAllConfig
+        return self._get_account_config('sim_uni_challenge_all_config',
+                                        lambda account_idx: SimUniChallengeAllConfig())
+
+    @property
+    def sim_uni_run_record(self) -> 'SimUniRunRecord':
+        from sr.app.sim_uni.sim_uni_run_record import SimUniRunRecord
+        return self._get_account_config(
+            'sim_uni_run_record',
+            lambda account_idx: SimUniRunRecord(self.sim_uni_config, account_idx))
+
+    @property
+    def assignments_run_record(self) -> 'AssignmentsRunRecord':
+        from sr.app.assignments.assignments_run_record import AssignmentsRunRecord
+        return self._get_account_config(
+            'assignments_run_record',
+            lambda account_idx: AssignmentsRunRecord(self.mys_config, account_idx))
+
+    @property
+    def buy_xz_parcel_run_record(self) -> 'BuyXianZhouParcelRunRecord':
+        from sr.app.buy_xianzhou_parcel.buy_xianzhou_parcel_run_record import BuyXianZhouParcelRunRecord
+        return self._get_account_config('buy_xz_parcel_run_record', BuyXianZhouParcelRunRecord)
+
+    @property
+    def daily_training_run_record(self) -> 'DailyTrainingRunRecord':
+        from sr.app.daily_training.daily_training_run_record import DailyTrainingRunRecord
+        return self._get_account_config('daily_training_run_record', DailyTrainingRunRecord)
+
+    @property
+    def email_run_record(self) -> 'EmailRunRecord':
+        from sr.app.email.email_run_record import EmailRunRecord
+        return self._get_account_config('email_run_record', EmailRunRecord)
+
+    @property
+    def nameless_honor_run_record(self) -> 'NamelessHonorRunRecord':
+        from sr.app.nameless_honor.nameless_honor_run_record import NamelessHonorRunRecord
+        return self._get_account_config('nameless_honor_run_record', NamelessHonorRunRecord)
+
+    @property
+    def support_character_run_record(self) -> 'SupportCharacterRunRecord':
+        from sr.app.support_character.support_character_run_record import SupportCharacterRunRecord
+        return self._get_account_config('support_character_run_record', SupportCharacterRunRecord)
+
+    @property
+    def one_stop_service_config(self) -> 'OneStopServiceConfig':
+        from sr.app.one_stop_service.one_stop_service_config import OneStopServiceConfig
+        return self._get_account_config('one_stop_service_config', OneStopServiceConfig)
+
+    def active_account(self, account_idx: int, prepared_config: Optional[dict[str, Any]] = None):
         """
         启用一个账号 其他账号将会设置为不启用
         :param account_idx:
+        :param prepared_config: prepare_account_config 预加载的该账号配置 为空时按需重新加载
         :return:
         """
         if account_idx == self.one_dragon_config.current_active_account.idx:
@@ -219,14 +318,18 @@ class Context:
 
         self.one_dragon_config.active_account(account_idx)
         log.info('切换启用账号 %s', self.one_dragon_config.current_active_account.name)
-        self.init_config_by_account()
+        self.init_config_by_account(prepared_config)
 
     def init_keyboard_callback(self):
         """
         注册按键监听
         :return:
         """
-        keyboard.on_press(self.on_key_press)
+        try:
+            import keyboard
+            keyboard.on_press(self.on_key_press)
+        except Exception:  # 无桌面环境时无法监听 例如在Linux上使用模拟器跑离线测试
+            log.error('注册按键监听失败', exc_info=True)
         self.register_key_press('f9', self.switch)
         self.register_key_press('f10', self.stop_running)
         self.register_key_press('f11', self.screenshot)
@@ -361,6 +464,8 @@ class Context:
             del self.stop_callback[id(obj)]
 
     def init_controller(self, renew: bool = False) -> bool:
+        import pyautogui
+        from sr.control.pc_controller import PcController
         self.open_game_by_script = False
         if renew:
             self.controller = None
@@ -406,7 +511,8 @@ class Context:
         if renew:
             self.ocr = None
         if self.ocr is None:
-            self.ocr = get_ocr_matcher(self.game_config.lang)
+            self.ocr = get_ocr_matcher(self.game_config.lang, self.game_config.ocr_server_port,
+                                       self.game_config.ocr_backend)
         log.info('加载OCR识别器完毕')
         return True
 
@@ -420,7 +526,22 @@ class Context:
             log.info('加载工具完毕')
         return result
 
+    def preheat_in_background(self):
+        """
+        在后台线程加载图片匹配器和OCR模型 让界面先显示出来
+        之后真正运行时 init_all 可以直接使用已加载的模型
+        :return:
+        """
+        def _preheat():
+            start_time = time.time()
+            self.init_image_matcher()
+            self.init_ocr_matcher()
+            log.debug('后台预热完毕 耗时 %.2f', time.time() - start_time)
+
+        threading.Thread(target=_preheat, daemon=True, name='context_preheat').start()
+
     def mouse_position(self):
+        import pyautogui
         self.init_controller(False)
         rect = self.controller.win.get_win_rect()
         pos = pyautogui.position()
@@ -432,7 +553,7 @@ class Context:
         :return:
         """
         self.init_controller(False)
-        save_debug_image(fill_uid_black(self.controller.screenshot()))
+        save_debug_image(fill_uid_black(self.controller.screenshot()), async_write=False)  # 主动截图 不能丢弃或被轮换删除
 
     @property
     def is_buff_technique(self) -> bool:
@@ -484,23 +605,64 @@ class Context:
         self.no_technique_recover_consumables = False
 
 
-def get_game_win() -> Window:
+def get_game_win() -> 'Window':
+    from sr.win import Window
     return Window(gt('崩坏：星穹铁道', model='ui'))
 
 
 _ocr_matcher = {}
-
-
-def get_ocr_matcher(lang: str) -> OcrMatcher:
+_ocr_matcher_lock = threading.Lock()
+
+
+def get_ocr_matcher(lang: str, server_port: int = 0,
+                    backend: str = game_config_const.OCR_BACKEND_PADDLE) -> OcrMatcher:
+    """
+    获取OCR 同一语言只加载一次
+    :param lang: 语言
+    :param server_port: 本地OCR服务端口 大于0且服务可用时使用服务 否则在本进程加载模型
+    :param backend: 本进程加载模型时使用的推理后端
+    :return:
+    """
+    with _ocr_matcher_lock:  # 后台预热和运行时可能同时获取 避免重复加载模型
+        if lang not in _ocr_matcher:
+            _ocr_matcher[lang] = _create_ocr_matcher(lang, server_port, backend)
+        return _ocr_matcher[lang]
+
+
+def _create_ocr_matcher(lang: str, server_port: int, backend: str) -> OcrMatcher:
+    """
+    创建OCR 模型相关的模块在这里才导入
+    :param lang: 语言
+    :param server_port: 本地OCR服务端口
+    :param backend: 推理后端
+    :return:
+    """
     matcher: Optional[OcrMatcher] = None
-    if lang not in _ocr_matcher:
+    if server_port > 0:
+        from sr.image.remote_ocr_matcher import RemoteOcrMatcher
+        remote = RemoteOcrMatcher(port=server_port, join_space=lang == game_config_const.LANG_EN)
+        if remote.is_available():
+            log.info('使用本地OCR服务 端口 %d', server_port)
+            matcher = remote
+        else:
+            log.error('本地OCR服务不可用 改为本进程加载模型')
+
+    if matcher is None and backend == game_config_const.OCR_BACKEND_ONNX:
+        from sr.image.onnx_ocr_matcher import OnnxOcrMatcher
+        onnx_matcher = OnnxOcrMatcher(use_space_char=lang == game_config_const.LANG_EN)
+        if onnx_matcher.is_available():
+            log.info('使用ONNX Runtime加载OCR模型')
+            matcher = onnx_matcher
+        else:
+            log.error('ONNX OCR模型不可用 改为使用PaddleOCR')
+
+    if matcher is None:
         if lang == game_config_const.LANG_CN:
+            from sr.image.cn_ocr_matcher import CnOcrMatcher
             matcher = CnOcrMatcher()
         elif lang == game_config_const.LANG_EN:
+            from sr.image.en_ocr_matcher import EnOcrMatcher
             matcher = EnOcrMatcher()
-        _ocr_matcher[lang] = matcher
-    else:
-        matcher = _ocr_matcher[lang]
     return matcher
 
 
@@ -0,0 +1,287 @@
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Tuple, Dict, Deque
+
+from basic.log_utils import log
+
+ACTION_KEY_DOWN: str = 'key_down'
+ACTION_KEY_UP: str = 'key_up'
+ACTION_MOUSE_DOWN: str = 'mouse_down'
+ACTION_MOUSE_UP: str = 'mouse_up'
+ACTION_MOUSE_MOVE: str = 'mouse_move'  # 移动到绝对坐标
+ACTION_MOUSE_MOVE_RELATIVE: str = 'mouse_move_relative'  # 相对移动 用于转向
+ACTION_SCROLL: str = 'scroll'
+ACTION_WAIT: str = 'wait'  # 只等待 不做任何输入
+
+DEFAULT_PRESS_TIME: float = 0.02  # 单击、按键时默认按住的时间 保证游戏能在一帧内收到按下
+
+
+class InputAction:
+
+    def __init__(self, action_type: str, args: tuple = (), duration: float = 0):
+        """
+        一个输入动作
+        :param action_type: 动作类型
+        :param args: 参数 按键动作为 (按键,) 鼠标按键为 (是否主键,) 移动为 (x, y) 滚动为 (滚动量, x, y)
+        :param duration: 执行后至少等待多久才执行下一个动作 例如按住按键的时间
+        """
+        self.action_type: str = action_type
+        self.args: tuple = args
+        self.duration: float = duration
+
+    def __repr__(self):
+        return '%s%s %.3f' % (self.action_type, self.args, self.duration)
+
+
+class InputBackend:
+
+    def now(self) -> float:
+        """
+        当前时间 秒
+        """
+        return time.perf_counter()
+
+    def sleep(self, seconds: float):
+        """
+        等待若干秒
+        """
+        time.sleep(seconds)
+
+    def execute(self, action: InputAction):
+        """
+        实际执行一个输入动作 不需要处理 duration
+        :param action: 动作
+        :return:
+        """
+        pass
+
+
+class RecordingInputBackend(InputBackend):
+
+    def __init__(self):
+        """
+        只记录不执行的后端 使用虚拟时钟 等待时直接推进时间
+        用于在没有桌面的环境中检查输入的时序
+        """
+        self.clock: float = 0
+        self.record_list: List[Tuple[float, str, tuple]] = []  # (时间, 动作类型, 参数)
+
+    def now(self) -> float:
+        return self.clock
+
+    def sleep(self, seconds: float):
+        self.clock += seconds
+
+    def execute(self, action: InputAction):
+        self.record_list.append((self.clock, action.action_type, action.args))
+
+
+class InputScheduler:
+
+    def __init__(self, backend: InputBackend):
+        """
+        输入动作队列 提交后立刻返回 由后台线程按顺序执行 调用方可以同时做截图识别
+        - 每个动作带有明确的持续时间 不再依赖 pyautogui 每次调用后固定的停顿
+        - 提交时合并多余的动作 已按下的按键不再按下 未按下的按键不再松开 连续的鼠标移动合成一次
+        :param backend: 实际执行输入的后端
+        """
+        self.backend: InputBackend = backend
+        self._pending: Deque[InputAction] = deque()
+        self._cond: threading.Condition = threading.Condition()
+        self._busy: bool = False  # 后台线程是否正在执行动作
+        self._thread: Optional[threading.Thread] = None
+        self._key_state: Dict[str, bool] = {}  # 已提交的动作全部执行后 各按键是否按下
+
+        self.executed_cnt: int = 0  # 执行的动作数量
+        self.coalesced_cnt: int = 0  # 合并掉的动作数量
+
+    def submit(self, *action_list: InputAction):
+        """
+        提交动作 不等待执行
+        :param action_list: 按顺序执行的动作
+        :return:
+        """
+        with self._cond:
+            for action in action_list:
+                self._add_action(action)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='input_scheduler')
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _add_action(self, action: InputAction):
+        """
+        合并后放入队列 需要在持有锁时调用
+        :param action: 动作
+        :return:
+        """
+        last: Optional[InputAction] = self._pending[-1] if len(self._pending) > 0 else None
+        key = InputScheduler._get_key(action)
+        if key is not None:
+            down = action.action_type in [ACTION_KEY_DOWN, ACTION_MOUSE_DOWN]
+            if self._key_state.get(key, False) == down:
+                self.coalesced_cnt += 1
+                if action.duration > 0:  # 按键状态不用变 但时间还是要等
+                    self._pending.append(InputAction(ACTION_WAIT, duration=action.duration))
+                return
+            self._key_state[key] = down
+        elif action.action_type == ACTION_MOUSE_MOVE:
+            if last is not None and last.action_type == ACTION_MOUSE_MOVE and last.duration == 0:
+                self.coalesced_cnt += 1
+                last.args = action.args
+                last.duration = action.duration
+                return
+        elif action.action_type == ACTION_MOUSE_MOVE_RELATIVE:
+            if last is not None and last.action_type == ACTION_MOUSE_MOVE_RELATIVE and last.duration == 0:
+                self.coalesced_cnt += 1
+                last.args = (last.args[0] + action.args[0], last.args[1] + action.args[1])
+                last.duration = action.duration
+                return
+        elif action.action_type == ACTION_WAIT:
+            if action.duration <= 0:
+                return
+
+        self._pending.append(action)
+
+    @staticmethod
+    def _get_key(action: InputAction) -> Optional[str]:
+        """
+        按键动作对应的按键
+        :param action: 动作
+        :return: 鼠标按键为 mouse_是否主键 不是按键动作时返回None
+        """
+        if action.action_type in [ACTION_KEY_DOWN, ACTION_KEY_UP]:
+            return action.args[0]
+        elif action.action_type in [ACTION_MOUSE_DOWN, ACTION_MOUSE_UP]:
+            return 'mouse_%s' % action.args[0]
+        else:
+            return None
+
+    def _rollback_key_state(self, action: InputAction):
+        """
+        按键动作执行失败时 按键实际没有变化 回滚提交时记录的状态 之后重新提交的相同动作不会被合并掉
+        队列中还有同一按键的动作时 最终状态由其决定 不需要回滚
+        :param action: 执行失败的动作
+        :return:
+        """
+        key = InputScheduler._get_key(action)
+        if key is None:
+            return
+        with self._cond:
+            if any(InputScheduler._get_key(i) == key for i in self._pending):
+                return
+            self._key_state[key] = action.action_type not in [ACTION_KEY_DOWN, ACTION_MOUSE_DOWN]
+
+    def _run(self):
+        """
+        后台线程 按顺序执行队列中的动作
+        :return:
+        """
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: len(self._pending) > 0)
+                action = self._pending.popleft()
+                self._busy = True
+
+            if action.action_type != ACTION_WAIT:
+                try:
+                    self.backend.execute(action)
+                    self.executed_cnt += 1
+                except Exception:
+                    log.error('执行输入动作失败 %s', action, exc_info=True)
+                    self._rollback_key_state(action)
+            if action.duration > 0:
+                self.backend.sleep(action.duration)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待已提交的动作全部执行完 包括最后一个动作的持续时间
+        :param timeout: 最多等待多少秒 为空时一直等待
+        :return: 是否已经全部执行完
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self._pending) == 0 and not self._busy, timeout)
+
+    def is_idle(self) -> bool:
+        """
+        :return: 是否没有未执行完的动作
+        """
+        with self._cond:
+            return len(self._pending) == 0 and not self._busy
+
+    def key_down(self, key: str, duration: float = 0):
+        self.submit(InputAction(ACTION_KEY_DOWN, (key,), duration))
+
+    def key_up(self, key: str, duration: float = 0):
+        self.submit(InputAction(ACTION_KEY_UP, (key,), duration))
+
+    def press(self, key: str, press_time: float = DEFAULT_PRESS_TIME):
+        """
+        按一次按键
+        :param key: 按键
+        :param press_time: 按住时间
+        :return:
+        """
+        self.submit(InputAction(ACTION_KEY_DOWN, (key,), press_time),
+                    InputAction(ACTION_KEY_UP, (key,)))
+
+    def click(self, x: Optional[int] = None, y: Optional[int] = None,
+              press_time: float = DEFAULT_PRESS_TIME, primary: bool = True):
+        """
+        点击鼠标
+        :param x: 屏幕坐标 为空时在鼠标当前位置点击
+        :param y: 屏幕坐标
+        :param press_time: 按住时间
+        :param primary: 是否点击鼠标主要按键（通常是左键）
+        :return:
+        """
+        action_list = []
+        if x is not None and y is not None:
+            action_list.append(InputAction(ACTION_MOUSE_MOVE, (x, y)))
+        action_list.append(InputAction(ACTION_MOUSE_DOWN, (primary,), press_time))
+        action_list.append(InputAction(ACTION_MOUSE_UP, (primary,)))
+        self.submit(*action_list)
+
+    def move_to(self, x: int, y: int, duration: float = 0):
+        self.submit(InputAction(ACTION_MOUSE_MOVE, (x, y), duration))
+
+    def move_relative(self, dx: int, dy: int = 0):
+        self.submit(InputAction(ACTION_MOUSE_MOVE_RELATIVE, (dx, dy)))
+
+    def drag(self, start: Optional[Tuple[int, int]], end: Tuple[int, int], duration: float = 0.5, step_time: float = 0.02):
+        """
+        按住鼠标左键拖动 中间按固定间隔移动鼠标
+        :param start: 开始的屏幕坐标 为空时从鼠标当前位置开始
+        :param end: 结束的屏幕坐标
+        :param duration: 拖动持续时间
+        :param step_time: 每次移动的间隔
+        :return:
+        """
+        action_list = []
+        if start is not None:
+            action_list.append(InputAction(ACTION_MOUSE_MOVE, start))
+        action_list.append(InputAction(ACTION_MOUSE_DOWN, (True,)))
+        if start is None:  # 不知道起点 只能直接移动到终点
+            action_list.append(InputAction(ACTION_MOUSE_MOVE, end, duration))
+        else:
+            step_cnt = max(1, int(duration / step_time))
+            for i in range(1, step_cnt + 1):
+                x = start[0] + (end[0] - start[0]) * i // step_cnt
+                y = start[1] + (end[1] - start[1]) * i // step_cnt
+                action_list.append(InputAction(ACTION_MOUSE_MOVE, (x, y), duration / step_cnt))
+        action_list.append(InputAction(ACTION_MOUSE_UP, (True,)))
+        self.submit(*action_list)
+
+    def scroll(self, clicks: int, x: int, y: int):
+        self.submit(InputAction(ACTION_SCROLL, (clicks, x, y)))
+
+    def sleep(self, seconds: float):
+        """
+        在队列中插入等待
+        :param seconds: 秒
+        :return:
+        """
+        self.submit(InputAction(ACTION_WAIT, duration=seconds))
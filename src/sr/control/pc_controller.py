@@ -13,17 +13,55 @@ from sr.config import game_config
 from sr.config.game_config import GameConfig
 from sr.const import STANDARD_RESOLUTION_W, STANDARD_RESOLUTION_H
 from sr.control import GameController
+from sr.control.input_scheduler import InputScheduler, InputBackend, InputAction
+from sr.control import input_scheduler
 from sr.image.ocr_matcher import OcrMatcher
 from sr.win import Window, WinRect
 
 
+class PcInputBackend(InputBackend):
+
+    def execute(self, action: InputAction):
+        """
+        使用 pyautogui 执行输入 关闭每次调用后的固定停顿 时间间隔由调度器控制
+        :param action: 动作
+        :return:
+        """
+        t = action.action_type
+        if t == input_scheduler.ACTION_KEY_DOWN:
+            pyautogui.keyDown(action.args[0], _pause=False)
+        elif t == input_scheduler.ACTION_KEY_UP:
+            pyautogui.keyUp(action.args[0], _pause=False)
+        elif t == input_scheduler.ACTION_MOUSE_DOWN:
+            pyautogui.mouseDown(button=pyautogui.PRIMARY if action.args[0] else pyautogui.SECONDARY, _pause=False)
+        elif t == input_scheduler.ACTION_MOUSE_UP:
+            pyautogui.mouseUp(button=pyautogui.PRIMARY if action.args[0] else pyautogui.SECONDARY, _pause=False)
+        elif t == input_scheduler.ACTION_MOUSE_MOVE:
+            pyautogui.moveTo(action.args[0], action.args[1], _pause=False)
+        elif t == input_scheduler.ACTION_MOUSE_MOVE_RELATIVE:
+            ctypes.windll.user32.mouse_event(PcController.MOUSEEVENTF_MOVE, int(action.args[0]), int(action.args[1]))
+        elif t == input_scheduler.ACTION_SCROLL:
+            pyautogui.scroll(action.args[0], action.args[1], action.args[2], _pause=False)
+
+
 class PcController(GameController):
 
     MOUSEEVENTF_MOVE = 0x0001
     MOUSEEVENTF_LEFTDOWN = 0x0002
     MOUSEEVENTF_LEFTUP = 0x0004
 
-    def __init__(self, win: Window, ocr: OcrMatcher, gc: GameConfig):
+    SCREENSHOT_SETTLE_TIME: float = 0.02  # 鼠标移走后等待游戏把悬停效果去掉再截图
+    SCREENSHOT_WAIT_TIMEOUT: float = 0.2  # 截图前最多等待输入队列多久 按住移动等长动作时不再等待
+
+    def __init__(self, win: Window, ocr: OcrMatcher, gc: GameConfig, backend: Optional[InputBackend] = None):
+        """
+        PC端控制器 所有输入都经过 InputScheduler 排队执行
+        没有持续时间的输入提交后直接返回 需要按住一段时间的输入会等待执行完毕 与原来的行为一致
+        :param win: 游戏窗口
+        :param ocr: OCR
+        :param gc: 游戏配置
+        :param backend: 实际执行输入的后端 默认使用 pyautogui
+        """
         super().__init__(ocr)
         self.win: Window = win
         self.gc: GameConfig = gc
@@ -31,17 +69,18 @@ class PcController(GameController):
         self.run_speed: float = 30
         self.is_moving: bool = False
         self.is_running: bool = False  # 是否在疾跑
+        self.input: InputScheduler = InputScheduler(PcInputBackend() if backend is None else backend)
 
     def init(self):
         self.win.active()
         time.sleep(0.5)
 
     def esc(self) -> bool:
-        pyautogui.press(self.gc.key_esc)
+        self.input.press(self.gc.key_esc)
         return True
 
     def open_map(self) -> bool:
-        pyautogui.press(self.gc.key_open_map)
+        self.input.press(self.gc.key_open_map)
         return True
 
     def click(self, pos: Point = None, press_time: float = 0, pc_alt: bool = False) -> bool:
@@ -52,22 +91,22 @@ class PcController(GameController):
         :param pc_alt: 只在PC端有用 使用ALT键进行点击
         :return: 不在窗口区域时不点击 返回False
         """
-        click_pos: Point
+        click_pos: Optional[Point] = None  # 为空时在鼠标当前位置点击
         if pos is not None:
-            click_pos: Point = self.win.game2win_pos(pos)
+            click_pos = self.win.game2win_pos(pos)
             if click_pos is None:
                 log.error('点击非游戏窗口区域 (%s)', pos)
                 return False
-        else:
-            point: pyautogui.Point = pyautogui.position()
-            click_pos = Point(point.x, point.y)
 
         if pc_alt:
-            pyautogui.keyDown('alt')
-            time.sleep(0.01)
-        win_utils.click(click_pos, press_time=press_time)
+            self.input.key_down('alt', duration=0.01)
+        self.input.click(None if click_pos is None else click_pos.x,
+                         None if click_pos is None else click_pos.y,
+                         press_time=max(press_time, input_scheduler.DEFAULT_PRESS_TIME))
         if pc_alt:
-            pyautogui.keyUp('alt')
+            self.input.key_up('alt')
+        if press_time > 0:
+            self.input.wait()
         return True
 
     def screenshot(self) -> MatLike:
@@ -76,10 +115,10 @@ class PcController(GameController):
         :return: 截图
         """
         rect: WinRect = self.win.get_win_rect()
-        try:
-            pyautogui.moveTo(rect.x + 50, rect.y + rect.h - 30)  # 移动到uid位置
-        except Exception:
-            log.error('请将游戏窗口移动至可完整看到')
+        # 移动到uid位置 避免鼠标悬停效果出现在截图中
+        self.input.move_to(rect.x + 50, rect.y + rect.h - 30, duration=PcController.SCREENSHOT_SETTLE_TIME)
+        if not self.input.wait(timeout=PcController.SCREENSHOT_WAIT_TIMEOUT):
+            log.debug('输入队列未执行完 直接截图')
         img = win_utils.screenshot(rect.x, rect.y, rect.w, rect.h)
         result = cv2.resize(img, (const.STANDARD_RESOLUTION_W, const.STANDARD_RESOLUTION_H)) if rect.is_scale() else img
         return result
@@ -92,10 +131,12 @@ class PcController(GameController):
         :return:
         """
         if pos is None:
-            pos = win_utils.get_current_mouse_pos()
-        win_pos = self.win.game2win_pos(pos)
-        # pyautogui.scroll(down, x=win_pos[0], y=win_pos[1])
-        win_utils.scroll(down, win_pos)
+            win_pos = win_utils.get_current_mouse_pos()
+        else:
+            win_pos = self.win.game2win_pos(pos)
+        d = 2000 if win_utils.get_mouse_sensitivity() <= 10 else 1000
+        self.input.move_to(win_pos.x, win_pos.y)
+        self.input.scroll(-d * down, win_pos.x, win_pos.y)
 
     def drag_to(self, end: Point, start: Point = None, duration: float = 0.5):
         """
@@ -105,14 +146,10 @@ class PcController(GameController):
         :param duration: 拖拽持续时间
         :return:
         """
-        from_pos: Point
-        if start is None:
-            from_pos = win_utils.get_current_mouse_pos()
-        else:
-            from_pos = self.win.game2win_pos(start)
-
+        from_pos: Optional[Point] = None if start is None else self.win.game2win_pos(start)
         to_pos = self.win.game2win_pos(end)
-        win_utils.drag_mouse(from_pos, to_pos, duration=duration)
+        self.input.drag(None if from_pos is None else from_pos.tuple(), to_pos.tuple(), duration=duration)
+        self.input.wait()
 
     def turn_by_distance(self, d: float):
         """
@@ -120,7 +157,7 @@ class PcController(GameController):
         :param d: 正数往右转 人物角度增加；负数往左转 人物角度减少
         :return:
         """
-        ctypes.windll.user32.mouse_event(PcController.MOUSEEVENTF_MOVE, int(d), 0)
+        self.input.move_relative(int(d))
 
     def move(self, direction: str, press_time: float = 0, run: bool = False):
         """
@@ -134,15 +171,16 @@ class PcController(GameController):
             log.error('非法的方向移动 %s', direction)
             return False
         if press_time > 0:
-            pyautogui.keyDown(direction)
+            self.input.key_down(direction)
             self.is_moving = True
             self.enter_running(run)
-            time.sleep(press_time)
-            pyautogui.keyUp(direction)
+            self.input.sleep(press_time)
+            self.input.key_up(direction)
+            self.input.wait()
             self.is_moving = False
             self.is_running = False
         else:
-            pyautogui.press(direction)
+            self.input.press(direction)
         return True
 
     def start_moving_forward(self, run: bool = False):
@@ -152,11 +190,11 @@ class PcController(GameController):
         :return:
         """
         self.is_moving = True
-        pyautogui.keyDown('w')
+        self.input.key_down('w')  # 每轮都会调用 已按下时会被合并掉
         self.enter_running(run)
 
     def stop_moving_forward(self):
-        pyautogui.keyUp('w')
+        self.input.key_up('w')
         self.is_moving = False
         self.is_running = False
 
@@ -178,7 +216,7 @@ class PcController(GameController):
         :return:
         """
         if interact_type == GameController.MOVE_INTERACT_TYPE:
-            pyautogui.press(self.gc.key_interact)
+            self.input.press(self.gc.key_interact)
         else:
             self.click(pos)
         return True
@@ -189,14 +227,10 @@ class PcController(GameController):
         :param run: 是否进入疾跑
         :return:
         """
-        if run and not self.is_running:
-            time.sleep(0.02)
-            win_utils.click(primary=False)
-            self.is_running = True
-        elif not run and self.is_running:
-            time.sleep(0.02)
-            win_utils.click(primary=False)
-            self.is_running = False
+        if run != self.is_running:
+            self.input.sleep(0.02)
+            self.input.click(primary=False)
+            self.is_running = run
 
     def switch_character(self, idx: int):
         """
@@ -205,7 +239,7 @@ class PcController(GameController):
         :return:
         """
         log.info('切换角色 %s', str(idx))
-        pyautogui.press(str(idx))
+        self.input.press(str(idx))
 
     def use_technique(self):
         """
@@ -213,7 +247,7 @@ class PcController(GameController):
         :return:
         """
         log.info('使用秘技')
-        pyautogui.press(self.gc.key_technique)
+        self.input.press(self.gc.key_technique)
 
     def close_game(self):
         """
@@ -233,11 +267,14 @@ class PcController(GameController):
         :param interval: 输入间隙 秒
         :return:
         """
-        pyautogui.typewrite(to_input, interval)
+        for c in to_input:
+            self.input.press(c)
+            self.input.sleep(interval)
+        self.input.wait()
 
     def delete_all_input(self):
         """
         删除所有输入文本
         :return:
         """
-        pyautogui.press('delete')
+        self.input.press('delete')
@@ -1,7 +1,7 @@
 import logging
 import os
 import time
-from typing import Optional
+from typing import Optional, List, Tuple
 
 from cv2.typing import MatLike
 from paddleocr import PaddleOCR
@@ -105,3 +105,14 @@ class CnOcrMatcher(OcrMatcher):
             return ""
         log.debug('OCR结果 %s 耗时 %.2f', scan_result, time.time() - start_time)
         return scan_result[0][0]
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        """
+        不使用检测模型 一次推理识别多张图片
+        :param image_list: 图片列表 默认每张图片仅有文字信息
+        :return: 每张图片的 (文本, 置信度)
+        """
+        if len(image_list) == 0:
+            return []
+        scan_result: list = self.ocr.ocr(image_list, det=False, cls=False)
+        return [(i[0], i[1]) for i in scan_result]
@@ -8,6 +8,7 @@ from basic.img import MatchResultList, cv2_utils
 from basic.log_utils import log
 from sr.image import ImageMatcher, TemplateImage
 from sr.image.image_holder import ImageHolder
+from sr.performance_recorder import record_performance
 
 
 class CvImageMatcher(ImageMatcher):
@@ -25,6 +26,7 @@ class CvImageMatcher(ImageMatcher):
         """
         return self.ih.get_template(template_id, sub_dir=template_sub_dir)
 
+    @record_performance
     def match_image(self, source: MatLike, template: MatLike,
                     threshold: float = 0.5, mask: np.ndarray = None,
                     only_best: bool = True,
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import Optional, List, Tuple
 
 from cv2.typing import MatLike
 from paddleocr import PaddleOCR
@@ -95,4 +95,15 @@ class EnOcrMatcher(OcrMatcher):
             log.debug("OCR模型返回的识别结果置信度低于阈值")
             return ""
         log.debug('OCR结果 %s', scan_result)
-        return scan_result[0][0]
\ No newline at end of file
+        return scan_result[0][0]
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        """
+        不使用检测模型 一次推理识别多张图片
+        :param image_list: 图片列表 默认每张图片仅有文字信息
+        :return: 每张图片的 (文本, 置信度)
+        """
+        if len(image_list) == 0:
+            return []
+        scan_result: list = self.ocr.ocr(image_list, det=False, cls=False)
+        return [(i[0], i[1]) for i in scan_result]
@@ -1,42 +1,38 @@
 import os
 from typing import Optional
 
-import cv2
-
 from basic import os_utils
 from basic.img import cv2_utils
+from basic.img.template_index import TemplateFeatureIndex
+from basic.log_utils import log
+from sr.const.character_const import CHARACTER_LIST
 from sr.const.map_const import Region
 from sr.image import TemplateImage, get_large_map_dir_path
 from sr.image.sceenshot import LargeMapInfo
+from sr.image.template_atlas import TemplateAtlas, get_template_atlas_path, get_template_key, read_template_arrays, \
+    get_features_hash
 
 
 class ImageHolder:
 
-    def __init__(self):
+    def __init__(self, template_atlas_path: Optional[str] = None):
+        """
+        :param template_atlas_path: 模板图集文件路径 为空时使用 images/template 下的图集 没有图集时读取各个模板文件
+        """
         self.large_map = {}
         self.template = {}
+        self.character_avatar_index: Optional[TemplateFeatureIndex] = None
+        self.template_atlas_path: Optional[str] = template_atlas_path
+        self._template_atlas: Optional[TemplateAtlas] = None
+        self._template_atlas_opened: bool = False
 
     def load_large_map(self, region: Region) -> LargeMapInfo:
         """
-        加载某张大地图到内存中
+        加载某张大地图到内存中 各张图片在第一次使用时才读取
         :param region: 对应区域
         :return: 地图图片
         """
-        dir_path = get_large_map_dir_path(region)
-        info = LargeMapInfo()
-        info.region = region
-        info.raw = cv2_utils.read_image(os.path.join(dir_path, 'raw.png'))
-        info.origin = cv2_utils.read_image(os.path.join(dir_path, 'origin.png'))
-        info.gray = cv2_utils.read_image(os.path.join(dir_path, 'gray.png'))
-        info.mask = cv2_utils.read_image(os.path.join(dir_path, 'mask.png'))
-        feature_path = os.path.join(dir_path, 'features.xml')
-        if os.path.exists(feature_path):
-            file_storage = cv2.FileStorage(feature_path, cv2.FILE_STORAGE_READ)
-            # 读取特征点和描述符
-            info.kps = cv2_utils.feature_keypoints_from_np(file_storage.getNode("keypoints").mat())
-            info.desc = file_storage.getNode("descriptors").mat()
-            # 释放文件存储对象
-            file_storage.release()
+        info = LargeMapInfo(region, get_large_map_dir_path(region))
         self.large_map[region.prl_id] = info
         return info
 
@@ -65,35 +61,43 @@ class ImageHolder:
 
     def load_template(self, template_id: str, sub_dir: Optional[str] = None) -> Optional[TemplateImage]:
         """
-        加载某个模板到内存
+        加载某个模板到内存 优先使用模板图集 图集中没有或模板文件在打包后被修改过时 读取模板文件
         :param template_id: 模板id
         :param sub_dir: 子文件夹
         :return: 模板图片
         """
+        key = get_template_key(template_id, sub_dir)
         dir_path = os.path.join(os_utils.get_path_under_work_dir('images', 'template', sub_dir), template_id)
-        if not os.path.exists(dir_path):  # 注意上方不要直接用get_path_under_work_dir获取全路径 避免创建空文件夹
+        atlas = self.get_template_atlas()
+        if atlas is not None and key in atlas and not atlas.is_stale(key, dir_path):
+            arrays = atlas.get_arrays(key)
+        elif os.path.exists(dir_path):  # 注意上方不要直接用get_path_under_work_dir获取全路径 避免创建空文件夹
+            arrays = read_template_arrays(dir_path)
+        else:
             return None
+
         template: TemplateImage = TemplateImage()
-        template.origin = cv2_utils.read_image(os.path.join(dir_path, 'origin.png'))
-        template.gray = cv2_utils.read_image(os.path.join(dir_path, 'gray.png'))
-        template.mask = cv2_utils.read_image(os.path.join(dir_path, 'mask.png'))
-
-        feature_path = os.path.join(dir_path, 'features.xml')
-        if os.path.exists(feature_path):
-            file_storage = cv2.FileStorage(feature_path, cv2.FILE_STORAGE_READ)
-            # 读取特征点和描述符
-            template.kps = cv2_utils.feature_keypoints_from_np(file_storage.getNode("keypoints").mat())
-            template.desc = file_storage.getNode("descriptors").mat()
-            # 释放文件存储对象
-            file_storage.release()
-        else:
-            if template.origin is not None and template.mask is not None:
-                template.kps, template.desc = cv2_utils.feature_detect_and_compute(template.origin, template.mask)
+        template.origin = arrays.get('origin')
+        template.gray = arrays.get('gray')
+        template.mask = arrays.get('mask')
+        if 'kps' in arrays:
+            template.kps = cv2_utils.feature_keypoints_from_np(arrays['kps'])
+            template.desc = arrays.get('desc')
 
-        key = '%s:%s' % ('' if sub_dir is None else sub_dir, template_id)
         self.template[key] = template
         return template
 
+    def get_template_atlas(self) -> Optional[TemplateAtlas]:
+        """
+        获取模板图集 第一次使用时打开
+        :return: 没有图集时返回None
+        """
+        if not self._template_atlas_opened:
+            self._template_atlas_opened = True
+            file_path = self.template_atlas_path if self.template_atlas_path is not None else get_template_atlas_path()
+            self._template_atlas = TemplateAtlas.open(file_path)
+        return self._template_atlas
+
     def pop_template(self, template_id: str):
         """
         将某个模板从内存中删除
@@ -110,7 +114,7 @@ class ImageHolder:
         :param sub_dir: 子文件夹
         :return: 模板图片
         """
-        key = '%s:%s' % ('' if sub_dir is None else sub_dir, template_id)
+        key = get_template_key(template_id, sub_dir)
         if key in self.template:
             return self.template[key]
         else:
@@ -139,6 +143,36 @@ class ImageHolder:
         """
         return self.get_template(template_id, sub_dir='character_avatar')
 
+    def get_character_avatar_index(self) -> TemplateFeatureIndex:
+        """
+        获取全部角色头像的特征索引 优先读取保存在头像模板文件夹中的索引
+        角色列表或头像特征文件有变化时 重新构建并保存 没有头像文件夹时(发布后只有图集)只看角色列表
+        :return: 索引 模板id为角色id
+        """
+        if self.character_avatar_index is not None:
+            return self.character_avatar_index
+
+        character_id_list = [c.id for c in CHARACTER_LIST]
+        avatar_dir = os_utils.get_path_under_work_dir('images', 'template', 'character_avatar')
+        file_path = os.path.join(avatar_dir, 'index.npz')
+        source_hash = get_features_hash([os.path.join(avatar_dir, i) for i in character_id_list])
+        index = TemplateFeatureIndex.load(file_path)
+        if (index is None or index.template_id_list != character_id_list
+                or (source_hash is not None and source_hash != index.source_hash)):
+            desc_list = []
+            for character_id in character_id_list:
+                template = self.get_character_avatar_template(character_id)
+                desc_list.append(template.desc if template is not None else None)
+            index = TemplateFeatureIndex.from_desc_list(character_id_list, desc_list,
+                                                        source_hash=source_hash if source_hash is not None else '')
+            try:
+                index.save(file_path)
+            except Exception:
+                log.error('保存角色头像索引失败', exc_info=True)
+
+        self.character_avatar_index = index
+        return index
+
     def get_character_combat_type(self, template_id: str) -> TemplateImage:
         """
         获取角色战斗属性模板
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import bisect
+from typing import List, Optional, Tuple
 
 from cv2.typing import MatLike
 
@@ -45,24 +46,21 @@ class OcrMatcher:
         """
         all_match_result: dict = self.run_ocr(image, threshold, merge_line_distance=merge_line_distance)
         match_key = set()
+        ocr_word_list = [gt(w, 'ocr') for w in words]
+        ocr_target_list = [w.lower() for w in ocr_word_list] if ignore_case else ocr_word_list
+        lcs_matcher = str_utils.get_lcs_matcher(ocr_word_list, ignore_case=True)  # 与 find_by_lcs 一致 LCS总是忽略大小写
         for k in all_match_result.keys():
-            for w in words:
-                ocr_result: str = k
-                ocr_target = gt(w, 'ocr')
-                if ignore_case:
-                    ocr_result = ocr_result.lower()
-                    ocr_target = ocr_target.lower()
-
-                if same_word:
-                    if ocr_result == ocr_target:
-                        match_key.add(k)
-                else:
-                    if lcs_percent == -1:
-                        if ocr_result.find(ocr_target) != -1:
-                            match_key.add(k)
-                    else:
-                        if str_utils.find_by_lcs(ocr_target, ocr_result, percent=lcs_percent):
-                            match_key.add(k)
+            ocr_result: str = k.lower() if ignore_case else k
+            if same_word:
+                if ocr_result in ocr_target_list:
+                    match_key.add(k)
+            elif lcs_percent == -1:
+                if any(ocr_result.find(ocr_target) != -1 for ocr_target in ocr_target_list):
+                    match_key.add(k)
+            else:
+                lcs_list = lcs_matcher.lcs_list(k)
+                if any(lcs >= len(ocr_word) * lcs_percent for lcs, ocr_word in zip(lcs_list, ocr_word_list)):
+                    match_key.add(k)
 
         return {key: all_match_result[key] for key in match_key if key in all_match_result}
 
@@ -81,9 +79,10 @@ class OcrMatcher:
         target_lcs_percent: Optional[float] = None
 
         word_to_find = gt(word, 'ocr')
+        lcs_matcher = str_utils.get_lcs_matcher([word_to_find])
 
         for word, match_result_list in ocr_map.items():
-            current_lcs = str_utils.longest_common_subsequence_length(word_to_find, word)
+            current_lcs = lcs_matcher.lcs_list(word)[0]
             current_lcs_percent = current_lcs / len(word_to_find)
 
             if lcs_percent is not None and current_lcs_percent < lcs_percent:  # 不满足最低阈值
@@ -123,6 +122,59 @@ class OcrMatcher:
         """
         pass
 
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        """
+        单文字OCR 一次识别多张图片 子类可以用一次推理完成
+        :param image_list: 图片列表
+        :return: 每张图片的 (文本, 置信度)
+        """
+        return [(self.run_ocr_without_det(image), 1) for image in image_list]
+
+
+def _group_ocr_result_by_line(ocr_map, line_distance: float) -> List[List[MatchResult]]:
+    """
+    按纵坐标将OCR结果分行
+    按结果顺序 每个结果加入第一个 存在结果与其纵坐标相差不超过 line_distance 的行 没有的话新建一行
+    先对所有纵坐标排序 用线段树记录每个纵坐标上最早的行 每个结果只需要一次区间查询 O(n log n)
+    :param ocr_map: run_ocr的结果
+    :param line_distance: 多少行距内算同一行
+    :return: 按行的顺序 每行的结果按加入的顺序
+    """
+    result_list: List[MatchResult] = [result for result_list in ocr_map.values() for result in result_list]
+    y_list: List[int] = sorted(set(result.center.y for result in result_list))
+    size = len(y_list)
+    no_line = len(result_list)  # 比所有行下标都大
+    tree: List[int] = [no_line] * (2 * size)  # 叶子为 tree[size:] 对应 y_list 每个纵坐标上最早的行
+
+    lines: List[List[MatchResult]] = []
+    for result in result_list:
+        y = result.center.y
+        # 区间 [left, right) 内的纵坐标都在行距内
+        left = bisect.bisect_left(y_list, y - line_distance) + size
+        right = bisect.bisect_right(y_list, y + line_distance) + size
+        line_idx = no_line
+        while left < right:
+            if left & 1:
+                line_idx = min(line_idx, tree[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                line_idx = min(line_idx, tree[right])
+            left >>= 1
+            right >>= 1
+
+        if line_idx == no_line:
+            line_idx = len(lines)
+            lines.append([])
+        lines[line_idx].append(result)
+
+        pos = bisect.bisect_left(y_list, y) + size
+        while pos > 0 and tree[pos] > line_idx:
+            tree[pos] = line_idx
+            pos >>= 1
+
+    return lines
+
 
 def merge_ocr_result_to_single_line(ocr_map, join_space: bool = True) -> str:
     """
@@ -131,33 +183,15 @@ def merge_ocr_result_to_single_line(ocr_map, join_space: bool = True) -> str:
     :param join_space: 连接时是否加入空格
     :return:
     """
-    lines: List[List[MatchResult]] = []
-    for text, result_list in ocr_map.items():
-        for result in result_list:
-            in_line: int = -1
-            for line_idx in range(len(lines)):
-                for line_item in lines[line_idx]:
-                    if abs(line_item.center.y - result.center.y) <= 5:
-                        in_line = line_idx
-                        break
-                if in_line != -1:
-                    break
-
-            if in_line == -1:
-                lines.append([result])
-            else:
-                lines[in_line].append(result)
-
-    result_str: str = None
-    for line in lines:
+    text_list: List[str] = []
+    for line in _group_ocr_result_by_line(ocr_map, 5):
         sorted_line = sorted(line, key=lambda x: x.center.x)
         for result_item in sorted_line:
-            if result_str is None:
-                result_str = result_item.data
-            else:
-                result_str += (' ' if join_space else '') + result_item.data
+            text_list.append(result_item.data)
 
-    return result_str
+    if len(text_list) == 0:
+        return None
+    return (' ' if join_space else '').join(text_list)
 
 
 def merge_ocr_result_to_multiple_line(ocr_map, join_space: bool = True, merge_line_distance: float = 40) -> dict[str, MatchResultList]:
@@ -168,25 +202,8 @@ def merge_ocr_result_to_multiple_line(ocr_map, join_space: bool = True, merge_li
     :param merge_line_distance: 多少行距内合并结果
     :return:
     """
-    lines = []
-    for text, result_list in ocr_map.items():
-        for result in result_list:
-            in_line: int = -1
-            for line_idx in range(len(lines)):
-                for line_item in lines[line_idx]:
-                    if abs(line_item.center.y - result.center.y) <= merge_line_distance:
-                        in_line = line_idx
-                        break
-                if in_line != -1:
-                    break
-
-            if in_line == -1:
-                lines.append([result])
-            else:
-                lines[in_line].append(result)
-
     merge_ocr_result_map: dict[str, MatchResultList] = {}
-    for line in lines:
+    for line in _group_ocr_result_by_line(ocr_map, merge_line_distance):
         line_ocr_map = {}
         merge_result: MatchResult = MatchResult(1, 9999, 9999, 0, 0)
         for ocr_result in line:
@@ -0,0 +1,255 @@
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing.connection import Listener, Connection
+from typing import Optional, List, Any
+
+from basic import os_utils
+from basic.log_utils import log
+from sr.const import game_config_const
+from sr.image.ocr_matcher import OcrMatcher
+
+DEFAULT_PORT: int = 19190
+AUTHKEY_LEN: int = 32
+REQUEST_TIMEOUT_SECONDS: float = 30  # 一个请求最多等待多久 推理线程异常时不会一直卡住
+
+METHOD_PING: str = 'ping'
+METHOD_RUN_OCR: str = 'run_ocr'
+METHOD_RUN_OCR_WITHOUT_DET: str = 'run_ocr_without_det'
+
+
+def get_authkey_path(port: int) -> str:
+    """
+    连接密钥文件的位置 服务每次启动时随机生成 同一台机器上的客户端读取后连接
+    :param port: 服务端口
+    :return:
+    """
+    return os.path.join(os_utils.get_path_under_work_dir('config'), 'ocr_server_%d.key' % port)
+
+
+def create_authkey(port: int) -> bytes:
+    """
+    随机生成连接密钥 并保存到只有当前用户可读的文件中
+    连接使用pickle传输 不能使用固定的密钥 否则本机任何进程都可以连接并执行任意代码
+    :param port: 服务端口
+    :return: 密钥
+    """
+    authkey = os.urandom(AUTHKEY_LEN)
+    path = get_authkey_path(port)
+    if os.path.exists(path):
+        os.remove(path)  # 重新创建 保证权限正确
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        file.write(authkey)
+    return authkey
+
+
+def read_authkey(port: int) -> Optional[bytes]:
+    """
+    读取服务生成的连接密钥
+    :param port: 服务端口
+    :return: 服务未启动过时返回None
+    """
+    path = get_authkey_path(port)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as file:
+        authkey = file.read()
+    return authkey if len(authkey) == AUTHKEY_LEN else None
+
+
+class OcrRequest:
+
+    def __init__(self, method: str, args: tuple):
+        """
+        一个OCR请求 由连接线程放入队列 推理线程处理后唤醒
+        :param method: 方法
+        :param args: 参数
+        """
+        self.method: str = method
+        self.args: tuple = args
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.done: threading.Event = threading.Event()
+
+    def finish(self, result: Any = None, error: Optional[str] = None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+class OcrServer:
+
+    def __init__(self, ocr: OcrMatcher,
+                 port: int = DEFAULT_PORT,
+                 authkey: Optional[bytes] = None,
+                 max_batch_size: int = 16,
+                 batch_wait_seconds: float = 0.005):
+        """
+        本地OCR服务 独占一份模型 供多个进程共享使用
+        每个连接一个线程接收请求 统一由一个推理线程处理 保证模型不会被并发调用
+        推理线程会等待一小段时间收集请求 不需要检测的请求会合并成一次推理
+        :param ocr: 实际使用的OCR
+        :param port: 监听端口 只监听本机
+        :param authkey: 连接密钥 为空时启动时随机生成并保存到 get_authkey_path
+        :param max_batch_size: 一次最多合并多少个请求
+        :param batch_wait_seconds: 收到第一个请求后 最多等待多久收集同一批的请求
+        """
+        self.ocr: OcrMatcher = ocr
+        self.port: int = port
+        self.authkey: Optional[bytes] = authkey
+        self.authkey_file: Optional[str] = None  # 本服务生成的密钥文件 停止时删除
+        self.max_batch_size: int = max_batch_size
+        self.batch_wait_seconds: float = batch_wait_seconds
+        self.request_queue: queue.Queue[OcrRequest] = queue.Queue()
+        self.running: bool = False
+        self.listener: Optional[Listener] = None
+
+    def serve_forever(self):
+        """
+        启动服务 阻塞直到 stop
+        :return:
+        """
+        if self.authkey is None:
+            self.authkey = create_authkey(self.port)
+            self.authkey_file = get_authkey_path(self.port)
+        self.listener = Listener(('127.0.0.1', self.port), backlog=16, authkey=self.authkey)
+        self.running = True
+        threading.Thread(target=self._inference_loop, daemon=True, name='ocr_inference').start()
+        log.info('OCR服务已启动 端口 %d', self.port)
+        while self.running:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                if self.running:
+                    log.error('OCR服务接收连接失败', exc_info=True)
+                continue
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        if self.listener is not None:
+            self.listener.close()
+        while True:  # 还没处理的请求直接返回错误
+            try:
+                self.request_queue.get_nowait().finish(error='OCR服务已停止')
+            except queue.Empty:
+                break
+        if self.authkey_file is not None and os.path.exists(self.authkey_file):
+            os.remove(self.authkey_file)
+            self.authkey_file = None
+
+    def _handle_client(self, conn: Connection):
+        """
+        处理一个客户端连接 客户端每次发送 (方法, 参数) 并等待返回 (错误, 结果)
+        :param conn: 连接
+        :return:
+        """
+        while self.running:
+            try:
+                method, args = conn.recv()
+            except (EOFError, OSError):
+                break
+            req = OcrRequest(method, args)
+            if method == METHOD_PING:
+                req.finish(result=True)
+            else:
+                self.request_queue.put(req)
+                if not req.done.wait(timeout=REQUEST_TIMEOUT_SECONDS):
+                    log.error('OCR服务处理超时 %s', method)
+                    req.finish(error='OCR服务处理超时')
+            try:
+                conn.send((req.error, req.result))
+            except (EOFError, OSError):
+                break
+        conn.close()
+
+    def _inference_loop(self):
+        while self.running:
+            try:
+                first = self.request_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.time() + self.batch_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.request_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.run_batch(batch)
+            except Exception as e:
+                log.error('OCR服务处理请求出错', exc_info=True)
+                for req in batch:
+                    if not req.done.is_set():
+                        req.finish(error=str(e))
+
+    def run_batch(self, batch: List[OcrRequest]):
+        """
+        处理一批请求 不需要检测的请求合并成一次推理
+        :param batch: 请求
+        :return:
+        """
+        rec_list = [req for req in batch if req.method == METHOD_RUN_OCR_WITHOUT_DET]
+        if len(rec_list) > 0:
+            try:
+                result_list = self.ocr.run_ocr_without_det_batch([req.args[0] for req in rec_list])
+                if len(result_list) != len(rec_list):
+                    log.error('OCR服务识别结果数量不一致 请求 %d 结果 %d', len(rec_list), len(result_list))
+                for idx, req in enumerate(rec_list):
+                    if idx >= len(result_list):
+                        req.finish(error='识别结果数量不一致')
+                        continue
+                    text, score = result_list[idx]
+                    threshold = req.args[1] if len(req.args) > 1 else None
+                    req.finish(result='' if threshold is not None and score < threshold else text)
+            except Exception as e:
+                log.error('OCR服务识别出错', exc_info=True)
+                for req in rec_list:
+                    req.finish(error=str(e))
+
+        for req in batch:
+            if req.method == METHOD_RUN_OCR_WITHOUT_DET:
+                continue
+            try:
+                if req.method == METHOD_RUN_OCR:
+                    req.finish(result=self.ocr.run_ocr(*req.args))
+                else:
+                    req.finish(error='未知方法 %s' % req.method)
+            except Exception as e:
+                log.error('OCR服务识别出错', exc_info=True)
+                req.finish(error=str(e))
+
+
+def create_local_ocr_matcher(lang: str, backend: str = game_config_const.OCR_BACKEND_PADDLE) -> OcrMatcher:
+    if backend == game_config_const.OCR_BACKEND_ONNX:
+        from sr.image.onnx_ocr_matcher import OnnxOcrMatcher
+        matcher = OnnxOcrMatcher(use_space_char=lang == game_config_const.LANG_EN)
+        if matcher.is_available():
+            return matcher
+        log.error('ONNX OCR模型不可用 改为使用PaddleOCR')
+    if lang == game_config_const.LANG_EN:
+        from sr.image.en_ocr_matcher import EnOcrMatcher
+        return EnOcrMatcher()
+    else:
+        from sr.image.cn_ocr_matcher import CnOcrMatcher
+        return CnOcrMatcher()
+
+
+def run_server(lang: str = game_config_const.LANG_CN, port: int = DEFAULT_PORT,
+               backend: str = game_config_const.OCR_BACKEND_PADDLE):
+    server = OcrServer(create_local_ocr_matcher(lang, backend), port=port)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    # python src/sr/image/ocr_server.py [语言 cn/en] [端口] [后端 paddle/onnx]
+    run_server(sys.argv[1] if len(sys.argv) > 1 else game_config_const.LANG_CN,
+               int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT,
+               sys.argv[3] if len(sys.argv) > 3 else game_config_const.OCR_BACKEND_PADDLE)
@@ -0,0 +1,416 @@
+import importlib.util
+import math
+import os
+import time
+from typing import Optional, List, Tuple
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+from cv2.typing import MatLike
+
+from basic import os_utils
+from basic.img import MatchResultList, MatchResult
+from basic.log_utils import log
+from sr.image.ocr_matcher import OcrMatcher, merge_ocr_result_to_single_line
+
+DET_MODEL_NAME: str = 'ch_PP-OCRv4_det_infer'
+REC_MODEL_NAME: str = 'ch_PP-OCRv4_rec_infer'
+ONNX_FILE_NAME: str = 'inference.onnx'
+CHAR_DICT_FILE_NAME: str = 'ppocr_keys_v1.txt'
+
+
+class OnnxOcrMatcher(OcrMatcher):
+    """
+    使用 onnxruntime 运行 PP-OCRv4 的检测和识别模型 不依赖 paddlepaddle
+    模型需要先用 paddle2onnx 从 model 目录下的 paddle 模型导出 见 test/src/test/devtools/export_onnx_ocr_model.py
+    字典文件 ppocr_keys_v1.txt 优先使用 model 目录下的 没有时使用已安装的 paddleocr 包里的
+    前后处理与 PaddleOCR 的默认参数保持一致 只是 unclip 使用矩形外扩代替多边形偏移
+    onnxruntime 的会话是线程安全的 可以并发使用
+    """
+
+    def __init__(self, use_space_char: bool = False, drop_score: float = 0.5,
+                 intra_op_num_threads: int = 0,
+                 rec_batch_num: int = 6):
+        """
+        :param use_space_char: 是否识别空格 英文需要
+        :param drop_score: 检测+识别时 低于该置信度的结果会被丢弃
+        :param intra_op_num_threads: 推理使用的线程数 0为 onnxruntime 默认
+        :param rec_batch_num: 识别时一次推理的图片数量
+        """
+        self.use_space_char: bool = use_space_char
+        self.drop_score: float = drop_score
+        self.rec_batch_num: int = rec_batch_num
+
+        self.det_limit_side_len: int = 960
+        self.det_thresh: float = 0.3
+        self.det_box_thresh: float = 0.6
+        self.det_unclip_ratio: float = 1.5
+        self.det_max_candidates: int = 1000
+        self.rec_image_shape: Tuple[int, int, int] = (3, 48, 320)
+
+        self.det_session: Optional[ort.InferenceSession] = None
+        self.rec_session: Optional[ort.InferenceSession] = None
+        self.character: List[str] = []
+        try:
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = intra_op_num_threads
+            options.inter_op_num_threads = 1
+            options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+            self.det_session = ort.InferenceSession(get_onnx_model_path(DET_MODEL_NAME), sess_options=options,
+                                                    providers=['CPUExecutionProvider'])
+            self.rec_session = ort.InferenceSession(get_onnx_model_path(REC_MODEL_NAME), sess_options=options,
+                                                    providers=['CPUExecutionProvider'])
+            self.character = load_character_list(use_space_char)
+        except Exception:
+            log.error('ONNX OCR模型加载出错', exc_info=True)
+
+    def is_available(self) -> bool:
+        """
+        模型是否加载成功
+        :return:
+        """
+        return self.det_session is not None and self.rec_session is not None and len(self.character) > 0
+
+    def ocr_for_single_line(self, image: MatLike, threshold: float = None, strict_one_line: bool = True) -> str:
+        """
+        单行文本识别 手动合成一行 按匹配结果从左到右 从上到下
+        :param image: 图片
+        :param threshold: 阈值
+        :param strict_one_line: True时认为当前只有单行文本 False时依赖程序合并成一行
+        :return:
+        """
+        if strict_one_line:
+            return self.run_ocr_without_det(image, threshold)
+        else:
+            ocr_map: dict = self.run_ocr(image, threshold)
+            return merge_ocr_result_to_single_line(ocr_map, join_space=self.use_space_char)
+
+    def run_ocr(self, image: MatLike, threshold: float = None,
+                merge_line_distance: float = -1) -> dict[str, MatchResultList]:
+        """
+        对图片进行OCR 返回所有匹配结果
+        :param image: 图片
+        :param threshold: 匹配阈值
+        :param merge_line_distance: 多少行距内合并结果 -1为不合并
+        :return: {key_word: []}
+        """
+        start_time = time.time()
+        box_list = self.detect(image)
+        crop_list = [get_rotate_crop_image(image, box) for box in box_list]
+        rec_list = self.run_ocr_without_det_batch(crop_list)
+
+        result_map: dict = {}
+        for box, (text, score) in zip(box_list, rec_list):
+            if score < self.drop_score:
+                continue
+            if threshold is not None and score < threshold:
+                continue
+            if text not in result_map:
+                result_map[text] = MatchResultList(only_best=False)
+            result_map[text].append(MatchResult(score,
+                                                box[0][0],
+                                                box[0][1],
+                                                box[1][0] - box[0][0],
+                                                box[3][1] - box[0][1],
+                                                data=text))
+        log.debug('OCR结果 %s 耗时 %.2f', result_map.keys(), time.time() - start_time)
+        return result_map
+
+    def run_ocr_without_det(self, image: MatLike, threshold: float = None) -> str:
+        """
+        不使用检测模型分析图片内文字的分布
+        默认传入的图片仅有文字信息
+        :param image: 图片
+        :param threshold: 匹配阈值
+        :return:
+        """
+        start_time = time.time()
+        text, score = self.run_ocr_without_det_batch([image])[0]
+        if threshold is not None and score < threshold:
+            log.debug("OCR模型返回的识别结果置信度低于阈值")
+            return ""
+        log.debug('OCR结果 %s 耗时 %.2f', text, time.time() - start_time)
+        return text
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        """
+        不使用检测模型 按宽高比排序后分批推理 同一批的图片补齐到相同宽度
+        :param image_list: 图片列表 默认每张图片仅有文字信息
+        :return: 每张图片的 (文本, 置信度)
+        """
+        result_list: List[Tuple[str, float]] = [('', 0)] * len(image_list)
+        if len(image_list) == 0:
+            return result_list
+
+        ratio_list = [img.shape[1] / float(img.shape[0]) for img in image_list]
+        idx_list = np.argsort(np.array(ratio_list))
+        _, img_h, img_w = self.rec_image_shape
+        for batch_start in range(0, len(image_list), self.rec_batch_num):
+            batch_idx = idx_list[batch_start:batch_start + self.rec_batch_num]
+            max_wh_ratio = img_w / img_h
+            for i in batch_idx:
+                max_wh_ratio = max(max_wh_ratio, ratio_list[i])
+            batch = np.stack([rec_resize_norm(image_list[i], img_h, max_wh_ratio) for i in batch_idx])
+            preds = self.rec_session.run(None, {self.rec_session.get_inputs()[0].name: batch})[0]
+            decode_list = ctc_decode(preds, self.character)
+            for i, decode in zip(batch_idx, decode_list):
+                result_list[i] = decode
+        return result_list
+
+    def detect(self, image: MatLike) -> List[np.ndarray]:
+        """
+        检测文本框
+        :param image: 图片
+        :return: 文本框 每个为 [左上, 右上, 右下, 左下] 按从上到下 从左到右排序
+        """
+        src_h, src_w = image.shape[:2]
+        resized, ratio_h, ratio_w = det_resize(image, self.det_limit_side_len)
+        data = det_normalize(resized)
+        preds = self.det_session.run(None, {self.det_session.get_inputs()[0].name: data})[0]
+        pred = preds[0, 0]
+        box_list = det_boxes_from_bitmap(pred, pred > self.det_thresh,
+                                         box_thresh=self.det_box_thresh,
+                                         unclip_ratio=self.det_unclip_ratio,
+                                         max_candidates=self.det_max_candidates)
+        result = []
+        for box in box_list:
+            box[:, 0] = np.clip(np.round(box[:, 0] / ratio_w), 0, src_w)
+            box[:, 1] = np.clip(np.round(box[:, 1] / ratio_h), 0, src_h)
+            result.append(box)
+        return sorted_boxes(result)
+
+
+def get_onnx_model_path(model_name: str) -> str:
+    return os.path.join(os_utils.get_path_under_work_dir('model', model_name), ONNX_FILE_NAME)
+
+
+def get_character_dict_path() -> Optional[str]:
+    """
+    识别模型的字典文件 优先使用 model 目录下的 其次使用已安装的 paddleocr 包里的
+    只查找 paddleocr 包的位置 不导入 避免加载 paddle
+    :return: 找不到时返回None
+    """
+    path = os.path.join(os_utils.get_path_under_work_dir('model'), CHAR_DICT_FILE_NAME)
+    if os.path.exists(path):
+        return path
+    spec = importlib.util.find_spec('paddleocr')
+    if spec is None or spec.submodule_search_locations is None:
+        return None
+    for package_dir in spec.submodule_search_locations:
+        path = os.path.join(package_dir, 'ppocr', 'utils', CHAR_DICT_FILE_NAME)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_character_list(use_space_char: bool) -> List[str]:
+    """
+    识别模型的字符表 下标0为CTC的空白符
+    :param use_space_char: 是否包含空格
+    :return:
+    """
+    path = get_character_dict_path()
+    if path is None:
+        raise FileNotFoundError(CHAR_DICT_FILE_NAME)
+    with open(path, 'r', encoding='utf-8') as file:
+        character = [line.strip('\n').strip('\r\n') for line in file.readlines()]
+    if use_space_char:
+        character.append(' ')
+    return ['blank'] + character
+
+
+def det_resize(image: MatLike, limit_side_len: int) -> Tuple[MatLike, float, float]:
+    """
+    检测前缩放 最长边不超过限制 宽高都是32的倍数
+    :param image: 图片
+    :param limit_side_len: 最长边限制
+    :return: 缩放后的图片, 高的缩放比例, 宽的缩放比例
+    """
+    h, w = image.shape[:2]
+    ratio = 1.0
+    if max(h, w) > limit_side_len:
+        ratio = float(limit_side_len) / max(h, w)
+    resize_h = max(int(round(h * ratio / 32) * 32), 32)
+    resize_w = max(int(round(w * ratio / 32) * 32), 32)
+    resized = cv2.resize(image, (resize_w, resize_h))
+    return resized, resize_h / float(h), resize_w / float(w)
+
+
+def det_normalize(image: MatLike) -> np.ndarray:
+    """
+    检测模型的归一化 与 PaddleOCR 一致 不转换颜色通道
+    :param image: BGR图片
+    :return: 1xCxHxW
+    """
+    mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+    data = (image.astype(np.float32) / 255.0 - mean) / std
+    return np.expand_dims(data.transpose((2, 0, 1)), axis=0).astype(np.float32)
+
+
+def det_boxes_from_bitmap(pred: np.ndarray, bitmap: np.ndarray,
+                          box_thresh: float = 0.6,
+                          unclip_ratio: float = 1.5,
+                          max_candidates: int = 1000,
+                          min_size: int = 3) -> List[np.ndarray]:
+    """
+    DB后处理 从概率图中提取文本框
+    :param pred: 概率图
+    :param bitmap: 二值图
+    :param box_thresh: 框内平均概率的阈值
+    :param unclip_ratio: 外扩比例
+    :param max_candidates: 最多处理多少个轮廓
+    :param min_size: 最短边小于该值时丢弃
+    :return: 文本框 坐标在概率图上
+    """
+    height, width = bitmap.shape
+    contours, _ = cv2.findContours((bitmap * 255).astype(np.uint8), cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    box_list = []
+    for contour in contours[:max_candidates]:
+        points, sside = get_mini_box(contour)
+        if sside < min_size:
+            continue
+        score = box_score_fast(pred, points)
+        if score < box_thresh:
+            continue
+        box, sside = get_mini_box(unclip_box(points, unclip_ratio))
+        if sside < min_size + 2:
+            continue
+        box[:, 0] = np.clip(np.round(box[:, 0]), 0, width)
+        box[:, 1] = np.clip(np.round(box[:, 1]), 0, height)
+        box_list.append(box.astype(np.float32))
+    return box_list
+
+
+def get_mini_box(contour) -> Tuple[np.ndarray, float]:
+    """
+    轮廓的最小外接矩形 顶点按 [左上, 右上, 右下, 左下] 排列
+    :param contour: 轮廓
+    :return: 顶点, 最短边
+    """
+    bounding_box = cv2.minAreaRect(contour)
+    points = sorted(list(cv2.boxPoints(bounding_box)), key=lambda x: x[0])
+    if points[1][1] > points[0][1]:
+        index_1, index_4 = 0, 1
+    else:
+        index_1, index_4 = 1, 0
+    if points[3][1] > points[2][1]:
+        index_2, index_3 = 2, 3
+    else:
+        index_2, index_3 = 3, 2
+    box = np.array([points[index_1], points[index_2], points[index_3], points[index_4]], dtype=np.float32)
+    return box, min(bounding_box[1])
+
+
+def box_score_fast(pred: np.ndarray, box: np.ndarray) -> float:
+    """
+    文本框内概率的平均值
+    :param pred: 概率图
+    :param box: 文本框
+    :return:
+    """
+    h, w = pred.shape[:2]
+    xmin = int(np.clip(np.floor(box[:, 0].min()), 0, w - 1))
+    xmax = int(np.clip(np.ceil(box[:, 0].max()), 0, w - 1))
+    ymin = int(np.clip(np.floor(box[:, 1].min()), 0, h - 1))
+    ymax = int(np.clip(np.ceil(box[:, 1].max()), 0, h - 1))
+    mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
+    shifted = box.copy()
+    shifted[:, 0] = shifted[:, 0] - xmin
+    shifted[:, 1] = shifted[:, 1] - ymin
+    cv2.fillPoly(mask, shifted.reshape(1, -1, 2).astype(np.int32), 1)
+    return cv2.mean(pred[ymin:ymax + 1, xmin:xmax + 1], mask)[0]
+
+
+def unclip_box(box: np.ndarray, unclip_ratio: float) -> np.ndarray:
+    """
+    文本框外扩 外扩距离与 PaddleOCR 相同 = 面积 * 比例 / 周长
+    矩形使用宽高各加两倍距离 代替多边形偏移
+    :param box: 文本框
+    :param unclip_ratio: 外扩比例
+    :return: 外扩后的四个顶点
+    """
+    area = cv2.contourArea(box)
+    length = cv2.arcLength(box, True)
+    distance = area * unclip_ratio / length if length > 0 else 0
+    (cx, cy), (w, h), angle = cv2.minAreaRect(box)
+    return cv2.boxPoints(((cx, cy), (w + 2 * distance, h + 2 * distance), angle))
+
+
+def sorted_boxes(box_list: List[np.ndarray]) -> List[np.ndarray]:
+    """
+    按从上到下 从左到右排序 同一行(纵坐标相差10以内)按横坐标排序
+    :param box_list: 文本框
+    :return:
+    """
+    boxes = sorted(box_list, key=lambda x: (x[0][1], x[0][0]))
+    for i in range(len(boxes) - 1):
+        for j in range(i, -1, -1):
+            if abs(boxes[j + 1][0][1] - boxes[j][0][1]) < 10 and boxes[j + 1][0][0] < boxes[j][0][0]:
+                boxes[j], boxes[j + 1] = boxes[j + 1], boxes[j]
+            else:
+                break
+    return boxes
+
+
+def get_rotate_crop_image(image: MatLike, box: np.ndarray) -> MatLike:
+    """
+    按文本框透视变换截取 竖排文本会旋转成横排
+    :param image: 图片
+    :param box: 文本框
+    :return:
+    """
+    crop_w = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+    crop_h = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+    crop_w = max(crop_w, 1)
+    crop_h = max(crop_h, 1)
+    pts_std = np.float32([[0, 0], [crop_w, 0], [crop_w, crop_h], [0, crop_h]])
+    m = cv2.getPerspectiveTransform(box.astype(np.float32), pts_std)
+    dst = cv2.warpPerspective(image, m, (crop_w, crop_h),
+                              borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if dst.shape[0] * 1.0 / dst.shape[1] >= 1.5:
+        dst = np.rot90(dst)
+    return dst
+
+
+def rec_resize_norm(image: MatLike, img_h: int, max_wh_ratio: float) -> np.ndarray:
+    """
+    识别前缩放到固定高度 保持宽高比 右侧补0到同一批的最大宽度
+    :param image: 图片
+    :param img_h: 高度
+    :param max_wh_ratio: 同一批的最大宽高比
+    :return: CxHxW
+    """
+    if len(image.shape) == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    img_w = int(img_h * max_wh_ratio)
+    h, w = image.shape[:2]
+    resized_w = min(img_w, int(math.ceil(img_h * w / float(h))))
+    resized = cv2.resize(image, (max(resized_w, 1), img_h)).astype(np.float32)
+    resized = resized.transpose((2, 0, 1)) / 255
+    resized = (resized - 0.5) / 0.5
+    padding = np.zeros((3, img_h, img_w), dtype=np.float32)
+    padding[:, :, 0:resized.shape[2]] = resized
+    return padding
+
+
+def ctc_decode(preds: np.ndarray, character: List[str]) -> List[Tuple[str, float]]:
+    """
+    CTC解码 去掉重复字符和空白符
+    :param preds: 识别模型的输出 NxTxC
+    :param character: 字符表
+    :return: 每张图片的 (文本, 置信度)
+    """
+    preds_idx = preds.argmax(axis=2)
+    preds_prob = preds.max(axis=2)
+    result_list = []
+    for idx, prob in zip(preds_idx, preds_prob):
+        selection = np.ones(len(idx), dtype=bool)
+        selection[1:] = idx[1:] != idx[:-1]
+        selection &= idx != 0
+        text = ''.join([character[i] for i in idx[selection] if i < len(character)])
+        conf = prob[selection]
+        score = float(np.mean(conf)) if len(conf) > 0 else 0
+        result_list.append((text, score))
+    return result_list
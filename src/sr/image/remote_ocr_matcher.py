@@ -0,0 +1,137 @@
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection
+from typing import Optional, Any, List, Tuple
+
+from cv2.typing import MatLike
+
+from basic.img import MatchResultList
+from basic.log_utils import log
+from sr.image import ocr_server
+from sr.image.ocr_matcher import OcrMatcher, merge_ocr_result_to_single_line
+
+
+class RemoteOcrMatcher(OcrMatcher):
+
+    def __init__(self, port: int = ocr_server.DEFAULT_PORT,
+                 authkey: Optional[bytes] = None,
+                 join_space: bool = False,
+                 timeout: float = ocr_server.REQUEST_TIMEOUT_SECONDS + 5):
+        """
+        使用本地OCR服务进行识别 服务见 ocr_server
+        每个线程使用独立的连接 因此可以并发使用 并发的请求会在服务端合并推理
+        :param port: 服务端口
+        :param authkey: 连接密钥 为空时每次连接读取服务生成的密钥文件
+        :param join_space: 合并成一行时是否加入空格 中文不加 英文加
+        :param timeout: 每次请求最多等待多少秒
+        """
+        self.port: int = port
+        self.authkey: Optional[bytes] = authkey
+        self.join_space: bool = join_space
+        self.timeout: float = timeout
+        self._local = threading.local()
+
+    def _get_conn(self) -> Connection:
+        conn: Optional[Connection] = getattr(self._local, 'conn', None)
+        if conn is None:
+            authkey = self.authkey if self.authkey is not None else ocr_server.read_authkey(self.port)
+            if authkey is None:
+                raise ConnectionRefusedError('OCR服务密钥文件不存在 %s' % ocr_server.get_authkey_path(self.port))
+            conn = Client(('127.0.0.1', self.port), authkey=authkey)
+            self._local.conn = conn
+        return conn
+
+    def _close_conn(self):
+        conn: Optional[Connection] = getattr(self._local, 'conn', None)
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        self._local.conn = None
+
+    def _call(self, method: str, *args) -> Tuple[bool, Any]:
+        """
+        调用服务 连接断开时会重连一次
+        :param method: 方法
+        :param args: 参数
+        :return: 是否成功, 结果
+        """
+        for _ in range(2):
+            try:
+                conn = self._get_conn()
+                conn.send((method, args))
+                if not conn.poll(self.timeout):
+                    log.error('OCR服务响应超时 %s', method)
+                    self._close_conn()  # 迟到的结果会错位 不能再使用这个连接
+                    return False, None
+                error, result = conn.recv()
+                if error is not None:
+                    log.error('OCR服务返回错误 %s', error)
+                    return False, None
+                return True, result
+            except (EOFError, OSError, AuthenticationError):
+                self._close_conn()
+        log.error('OCR服务连接失败 端口 %d', self.port)
+        return False, None
+
+    def is_available(self) -> bool:
+        """
+        服务是否可用
+        :return:
+        """
+        success, _ = self._call(ocr_server.METHOD_PING)
+        return success
+
+    def ocr_for_single_line(self, image: MatLike, threshold: float = None, strict_one_line: bool = True) -> str:
+        """
+        单行文本识别 手动合成一行 按匹配结果从左到右 从上到下
+        :param image: 图片
+        :param threshold: 阈值
+        :param strict_one_line: True时认为当前只有单行文本 False时依赖程序合并成一行
+        :return:
+        """
+        if strict_one_line:
+            return self.run_ocr_without_det(image, threshold)
+        else:
+            ocr_map: dict = self.run_ocr(image, threshold)
+            return merge_ocr_result_to_single_line(ocr_map, join_space=self.join_space)
+
+    def run_ocr(self, image: MatLike, threshold: float = None,
+                merge_line_distance: float = -1) -> dict[str, MatchResultList]:
+        """
+        对图片进行OCR 返回所有匹配结果
+        :param image: 图片
+        :param threshold: 匹配阈值
+        :param merge_line_distance: 多少行距内合并结果 -1为不合并
+        :return: {key_word: []}
+        """
+        start_time = time.time()
+        success, result = self._call(ocr_server.METHOD_RUN_OCR, image, threshold, merge_line_distance)
+        if not success:
+            return {}
+        log.debug('OCR结果 %s 耗时 %.2f', result.keys(), time.time() - start_time)
+        return result
+
+    def run_ocr_without_det(self, image: MatLike, threshold: float = None) -> str:
+        """
+        不使用检测模型分析图片内文字的分布
+        :param image: 图片
+        :param threshold: 匹配阈值
+        :return:
+        """
+        start_time = time.time()
+        success, result = self._call(ocr_server.METHOD_RUN_OCR_WITHOUT_DET, image, threshold)
+        if not success:
+            return ''
+        log.debug('OCR结果 %s 耗时 %.2f', result, time.time() - start_time)
+        return result
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        """
+        逐张发送 多个线程同时调用时 服务端才会合并推理
+        :param image_list: 图片列表
+        :return:
+        """
+        return [(self.run_ocr_without_det(image), 1) for image in image_list]
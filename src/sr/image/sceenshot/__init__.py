@@ -1,14 +1,23 @@
-from typing import Optional
+import os
+import struct
+import threading
+from typing import Optional, TYPE_CHECKING, Callable, Tuple
 
 import cv2
 from cv2.typing import MatLike
 
 from basic import Point
+from basic.img import cv2_utils
+from basic.img.keypoint_index import KeypointIndex
 from sr.const.map_const import Region
-from sr.win import Window
 
+if TYPE_CHECKING:
+    from sr.win import Window
 
-def fill_uid_black(screen: MatLike, win: Window = None):
+_NOT_LOADED = object()  # 区分未加载和文件不存在
+
+
+def fill_uid_black(screen: MatLike, win: 'Window' = None):
     """
     将截图的UID部分变成黑色
     :param screen: 屏幕截图
@@ -42,15 +51,173 @@ class MiniMapInfo:
 
 class LargeMapInfo:
 
-    def __init__(self):
-        self.region: Optional[Region] = None  # 区域
-        self.raw: MatLike = None  # 原图
-        self.origin: MatLike = None  # 处理后的原图
-        self.gray: MatLike = None  # 灰度图 用于特征检测
-        self.mask: MatLike = None  # 主体掩码 用于特征匹配
+    def __init__(self, region: Optional[Region] = None, dir_path: Optional[str] = None):
+        """
+        大地图信息 各张图片在第一次使用时才从 dir_path 读取
+        :param region: 区域
+        :param dir_path: 图片所在文件夹 为空时只使用手动设置的图片
+        """
+        self.region: Optional[Region] = region  # 区域
+        self.dir_path: Optional[str] = dir_path
         self.sp_result: Optional[dict] = None  # 特殊点坐标
-        self.kps = None  # 特征点 用于特征匹配
-        self.desc = None  # 描述子 用于特征匹配
+        self._plane: dict[str, Optional[MatLike]] = {}  # 已加载的图片 包括派生出来的图
+        self._lock = threading.RLock()  # 并行匹配时避免重复读取
+
+    def _get_plane(self, key: str, loader: Callable[[], Optional[MatLike]]) -> Optional[MatLike]:
+        """
+        获取某张图 第一次获取时加载
+        :param key: 图片名称
+        :param loader: 加载方法
+        :return:
+        """
+        plane = self._plane.get(key, _NOT_LOADED)
+        if plane is not _NOT_LOADED:
+            return plane
+        with self._lock:
+            if key not in self._plane:
+                self._plane[key] = loader()
+            return self._plane[key]
+
+    def _read(self, file_name: str, flags: int) -> Optional[MatLike]:
+        if self.dir_path is None:
+            return None
+        path = os.path.join(self.dir_path, file_name)
+        if not os.path.exists(path):
+            return None
+        return cv2.imread(path, flags)
+
+    def _read_png_size(self, file_name: str) -> Optional[Tuple[int, int]]:
+        """
+        只读取PNG文件头中的宽高 不解码图片
+        :param file_name: 文件名
+        :return: 高和宽 文件不存在或不是PNG时返回None
+        """
+        if self.dir_path is None:
+            return None
+        path = os.path.join(self.dir_path, file_name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as file:
+            header = file.read(24)
+        if len(header) < 24 or header[:8] != b'\x89PNG\r\n\x1a\n' or header[12:16] != b'IHDR':
+            return None
+        w, h = struct.unpack('>II', header[16:24])
+        return h, w
+
+    def _load_features(self):
+        kps, desc = None, None
+        path = None if self.dir_path is None else os.path.join(self.dir_path, 'features.xml')
+        if path is not None and os.path.exists(path):
+            file_storage = cv2.FileStorage(path, cv2.FILE_STORAGE_READ)
+            # 读取特征点和描述符
+            kps = cv2_utils.feature_keypoints_from_np(file_storage.getNode("keypoints").mat())
+            desc = file_storage.getNode("descriptors").mat()
+            # 释放文件存储对象
+            file_storage.release()
+        self._plane['kps'] = kps
+        self._plane['desc'] = desc
+
+    @property
+    def raw(self) -> MatLike:
+        """原图 运行时一般用不上"""
+        return self._get_plane('raw', lambda: self._read('raw.png', cv2.IMREAD_UNCHANGED))
+
+    @raw.setter
+    def raw(self, value: MatLike):
+        self._plane['raw'] = value
+
+    @property
+    def origin(self) -> MatLike:
+        """处理后的原图"""
+        return self._get_plane('origin', lambda: self._read('origin.png', cv2.IMREAD_UNCHANGED))
+
+    @origin.setter
+    def origin(self, value: MatLike):
+        self._plane['origin'] = value
+        self._plane.pop('origin_gray', None)
+
+    @property
+    def gray(self) -> MatLike:
+        """灰度图 用于特征检测 已合并了道路掩码和特殊点"""
+        return self._get_plane('gray', lambda: self._read('gray.png', cv2.IMREAD_GRAYSCALE))
+
+    @gray.setter
+    def gray(self, value: MatLike):
+        self._plane['gray'] = value
+
+    @property
+    def mask(self) -> MatLike:
+        """主体掩码 用于特征匹配 单通道"""
+        return self._get_plane('mask', lambda: self._read('mask.png', cv2.IMREAD_GRAYSCALE))
+
+    @mask.setter
+    def mask(self, value: MatLike):
+        self._plane['mask'] = value
+
+    @property
+    def origin_gray(self) -> MatLike:
+        """处理后的原图转灰度 用于灰度模板匹配 每个区域只转换一次"""
+        def _convert():
+            origin = self.origin
+            if origin is None or len(origin.shape) == 2:
+                return origin
+            return cv2.cvtColor(origin, cv2.COLOR_BGR2GRAY if origin.shape[2] == 3 else cv2.COLOR_BGRA2GRAY)
+        return self._get_plane('origin_gray', _convert)
+
+    @property
+    def kps(self):
+        """特征点 用于特征匹配"""
+        if 'kps' not in self._plane:
+            with self._lock:
+                if 'kps' not in self._plane:
+                    self._load_features()
+        return self._plane['kps']
+
+    @kps.setter
+    def kps(self, value):
+        self._plane['kps'] = value
+        self._plane.pop('kp_index', None)
+        self._plane.setdefault('desc', None)
+
+    @property
+    def desc(self):
+        """描述子 用于特征匹配"""
+        if 'desc' not in self._plane:
+            with self._lock:
+                if 'desc' not in self._plane:
+                    self._load_features()
+        return self._plane['desc']
+
+    @desc.setter
+    def desc(self, value):
+        self._plane['desc'] = value
+        self._plane.pop('kp_index', None)
+        self._plane.setdefault('kps', None)
+
+    @property
+    def kp_index(self) -> Optional[KeypointIndex]:
+        """特征点的分格索引 用于取出某个区域内的特征点"""
+        def _build():
+            if self.kps is None or self.desc is None:
+                return None
+            return KeypointIndex(self.kps, self.desc)
+        return self._get_plane('kp_index', _build)
+
+    @property
+    def shape(self) -> Optional[Tuple[int, int]]:
+        """
+        大地图的高和宽 各张图大小一致 优先使用已加载的图
+        未加载时从文件头读取 部分区域没有 origin.png 只有 gray.png 和 mask.png
+        """
+        for key in ['origin', 'gray', 'mask']:
+            plane = self._plane.get(key)
+            if plane is not None:
+                return plane.shape[:2]
+        for file_name in ['gray.png', 'mask.png', 'origin.png']:
+            size = self._read_png_size(file_name)
+            if size is not None:
+                return size
+        return None
 
 
 class SimUniLevelInfo:
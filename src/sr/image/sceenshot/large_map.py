@@ -7,7 +7,7 @@ from cv2.typing import MatLike
 
 from basic import os_utils, str_utils, Point, Rect
 from basic.i18_utils import gt
-from basic.img import cv2_utils
+from basic.img import cv2_utils, component_filter
 from basic.log_utils import log
 from sr import const
 from sr.config import game_config
@@ -105,6 +105,8 @@ def get_sp_mask_by_template_match(lm_info: LargeMapInfo, im: ImageMatcher,
     sp_match_result = {}
     source = lm_info.origin if template_type == 'origin' else lm_info.gray
     sp_mask = np.zeros(source.shape[:2], dtype=np.uint8)
+    # 所有种类的特殊点共用 只在彩色区域附近匹配
+    color_mask = get_sp_color_mask(source)
     # 找出特殊点位置
     for prefix in ['mm_tp', 'mm_sp', 'mm_boss']:
         for i in range(100):
@@ -119,11 +121,17 @@ def get_sp_mask_by_template_match(lm_info: LargeMapInfo, im: ImageMatcher,
             template = ti.get(template_type)
             template_mask = ti.mask
 
-            match_result = im.match_image(
-                source, template, mask=template_mask,
-                threshold=const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP,
-                only_best=False,
-                ignore_inf=True)
+            if color_mask is not None and get_sp_color_mask(template, template_mask) is not None:
+                match_result = cv2_utils.match_template_in_area(
+                    source, template, const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP, color_mask,
+                    mask=template_mask,
+                    ignore_inf=True)
+            else:
+                match_result = im.match_image(
+                    source, template, mask=template_mask,
+                    threshold=const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP,
+                    only_best=False,
+                    ignore_inf=True)
 
             if len(match_result) > 0:
                 sp_match_result[template_id] = match_result
@@ -140,6 +148,25 @@ def get_sp_mask_by_template_match(lm_info: LargeMapInfo, im: ImageMatcher,
     return sp_mask, sp_match_result
 
 
+def get_sp_color_mask(image: MatLike, mask: Optional[MatLike] = None,
+                      min_chroma: int = 40) -> Optional[MatLike]:
+    """
+    特殊点的图标是彩色的 地图本身接近灰色 圈出彩色的部分 用于缩小特殊点模板匹配的范围
+    :param image: 地图或者特殊点模板
+    :param mask: 只看掩码内的部分
+    :param min_chroma: 最大通道与最小通道的差值 不小于这个值认为是彩色
+    :return: 彩色部分的掩码 灰度图或者没有彩色部分时返回None
+    """
+    if len(image.shape) < 3 or image.shape[2] != 3:
+        return None
+    b, g, r = cv2.split(image)
+    chroma = cv2.subtract(cv2.max(cv2.max(b, g), r), cv2.min(cv2.min(b, g), r))
+    _, color_mask = cv2.threshold(chroma, min_chroma - 1, 255, cv2.THRESH_BINARY)
+    if mask is not None:
+        color_mask = cv2.bitwise_and(color_mask, mask)
+    return color_mask if cv2.countNonZero(color_mask) > 0 else None
+
+
 def get_map_path(region: Region, mt: str = 'origin') -> str:
     """
     获取某张地图路径
@@ -346,23 +373,10 @@ def get_large_map_road_mask(map_image: MatLike,
     to_check_connection = cv2.bitwise_or(road_mask, sp_mask) if sp_mask is not None else road_mask
 
     # 非道路连通块 < 50的(小的黑色块) 认为是噪点 加入道路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(to_check_connection), connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < 50:
-            large_components.append(label)
-    for label in large_components:
-        to_check_connection[labels == label] = 255
+    to_check_connection = component_filter.fill_small_holes(to_check_connection, 50, connectivity=4)
 
     # 找到多于500个像素点的连通道路(大的白色块) 这些才是真的路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(to_check_connection, connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] > 500:
-            large_components.append(label)
-    real_road_mask = np.zeros(map_image.shape[:2], dtype=np.uint8)
-    for label in large_components:
-        real_road_mask[labels == label] = 255
+    real_road_mask = component_filter.select_components(to_check_connection, connectivity=4, min_area=501)
 
     # 排除掉特殊点
     if sp_mask is not None:
@@ -483,23 +497,10 @@ def get_road_mask_for_sim_uni(map_image: MatLike, sp_mask: Optional[MatLike] = N
     to_check_connection = cv2.bitwise_or(road_mask, sp_mask) if sp_mask is not None else road_mask
 
     # 非道路连通块 < 50的(小的黑色块) 认为是噪点 加入道路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(to_check_connection), connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < 50:
-            large_components.append(label)
-    for label in large_components:
-        to_check_connection[labels == label] = 255
+    to_check_connection = component_filter.fill_small_holes(to_check_connection, 50, connectivity=4)
 
     # 找到多于500个像素点的连通道路(大的白色块) 这些才是真的路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(to_check_connection, connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] > 500:
-            large_components.append(label)
-    real_road_mask = np.zeros(map_image.shape[:2], dtype=np.uint8)
-    for label in large_components:
-        real_road_mask[labels == label] = 255
+    real_road_mask = component_filter.select_components(to_check_connection, connectivity=4, min_area=501)
 
     cv2_utils.show_image(real_road_mask, win_name='road_mask_sim', wait=0)
 
@@ -0,0 +1,160 @@
+import math
+from typing import Optional, Tuple
+
+import cv2
+from cv2.typing import MatLike
+
+from basic import Point, Rect
+from basic.img import MatchResult
+
+
+class LargeMapLocator:
+
+    def __init__(self, lm_origin: MatLike, scale: int = 4, track_radius: int = 120, threshold: float = 0.5):
+        """
+        在完整大地图中定位当前界面显示的部分
+        - 第一次先在缩小的大地图上粗略定位 再用原图在附近精确定位
+        - 拖动后按拖动距离预测新的位置 只在预测位置附近匹配
+        - 以上都匹配不到时 回退到原图的整图匹配
+        :param lm_origin: 完整大地图
+        :param scale: 粗略定位时缩小的倍数
+        :param track_radius: 拖动后在预测位置附近多少像素内匹配
+        :param threshold: 匹配阈值
+        """
+        self.lm_origin: MatLike = lm_origin
+        self.scale: int = scale
+        self.track_radius: int = track_radius
+        self.threshold: float = threshold
+
+        self.small_lm: MatLike = cv2.resize(lm_origin, (lm_origin.shape[1] // scale, lm_origin.shape[0] // scale),
+                                            interpolation=cv2.INTER_AREA)
+        self.offset: Optional[MatchResult] = None  # 上一次定位结果
+        self.predicted: Optional[Point] = None  # 拖动后预测的左上角位置
+        self.stuck: bool = False  # 上一次拖动后位置基本没变 通常是已经到了大地图边缘
+
+    def locate(self, screen_map: MatLike) -> Optional[MatchResult]:
+        """
+        获取当前界面地图在完整大地图中的位置
+        :param screen_map: 屏幕上的地图部分
+        :return: 匹配结果 x y 为左上角在大地图上的坐标
+        """
+        if screen_map.shape[0] > self.lm_origin.shape[0] or screen_map.shape[1] > self.lm_origin.shape[1]:
+            return None
+
+        result: Optional[MatchResult] = None
+        if self.predicted is not None:
+            result = self._match_around(screen_map, self.predicted, self.track_radius)
+        if result is None:
+            result = self._match_by_pyramid(screen_map)
+        if result is None:
+            result = self._match_around(screen_map, None, 0)
+
+        self.stuck = (self.predicted is not None and result is not None and self.offset is not None
+                      and abs(result.x - self.offset.x) + abs(result.y - self.offset.y) < 10)
+        self.offset = result
+        self.predicted = None
+        return result
+
+    def on_drag(self, drag: Point):
+        """
+        拖动地图后调用 地图内容跟着鼠标移动 界面的左上角在大地图上反方向移动
+        :param drag: 鼠标拖动的向量
+        :return:
+        """
+        if self.offset is not None:
+            self.predicted = Point(self.offset.x - drag.x, self.offset.y - drag.y)
+
+    def _match_by_pyramid(self, screen_map: MatLike) -> Optional[MatchResult]:
+        """
+        在缩小的大地图上粗略定位 再用原图在附近精确定位
+        :param screen_map: 屏幕上的地图部分
+        :return:
+        """
+        small_screen = cv2.resize(screen_map, (screen_map.shape[1] // self.scale, screen_map.shape[0] // self.scale),
+                                  interpolation=cv2.INTER_AREA)
+        result = cv2.matchTemplate(self.small_lm, small_screen, cv2.TM_CCOEFF_NORMED)
+        _, _, _, max_loc = cv2.minMaxLoc(result)
+        return self._match_around(screen_map, Point(max_loc[0] * self.scale, max_loc[1] * self.scale), self.scale * 2)
+
+    def _match_around(self, screen_map: MatLike, center: Optional[Point], radius: int) -> Optional[MatchResult]:
+        """
+        用原图 只在左上角位于 center 附近的范围内匹配
+        :param screen_map: 屏幕上的地图部分
+        :param center: 预计的左上角位置 为空时整张图匹配
+        :param radius: 范围
+        :return: 低于阈值时返回None
+        """
+        h, w = screen_map.shape[0], screen_map.shape[1]
+        if center is None:
+            rect = Rect(0, 0, self.lm_origin.shape[1], self.lm_origin.shape[0])
+        else:
+            rect = Rect(max(center.x - radius, 0), max(center.y - radius, 0),
+                        min(center.x + radius + w, self.lm_origin.shape[1]),
+                        min(center.y + radius + h, self.lm_origin.shape[0]))
+        if rect.width < w or rect.height < h:
+            return None
+
+        part = self.lm_origin[rect.y1:rect.y2, rect.x1:rect.x2]
+        result = cv2.matchTemplate(part, screen_map, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.threshold:
+            return None
+        return MatchResult(max_val, rect.x1 + max_loc[0], rect.y1 + max_loc[1], w, h)
+
+
+def _plan_axis(current: int, view_len: int, target: int, map_len: int, margin: int) -> int:
+    """
+    单个方向上 左上角需要移动多少 才能让目标点落在界面内距离边缘 margin 以上的位置
+    大地图边缘无法继续拖动 只移动到边缘
+    """
+    low = max(target - view_len + margin, 0)
+    high = min(target - margin, map_len - view_len)
+    if low > high:  # 目标离大地图边缘太近 移动到最靠近的边缘即可
+        low = high = min(max(target - view_len // 2, 0), map_len - view_len)
+    if current < low:
+        return low - current
+    if current > high:
+        return high - current
+    return 0
+
+
+def plan_drag(offset: Point, view_size: Tuple[int, int], target: Point, map_size: Tuple[int, int],
+              max_drag: Tuple[int, int], margin: int = 100, min_drag: int = 50) -> Point:
+    """
+    计算下一次需要怎么拖动地图 使得目标点出现在界面中
+    需要移动的距离超出单次拖动的范围时 平均分到最少的拖动次数里
+    :param offset: 当前界面左上角在大地图上的坐标
+    :param view_size: 界面显示的地图大小 (宽, 高)
+    :param target: 目标点在大地图上的坐标
+    :param map_size: 大地图大小 (宽, 高)
+    :param max_drag: 单次拖动最多能移动的距离 (宽, 高)
+    :param margin: 目标点在界面外时 拖动后距离界面边缘至少多少
+    :param min_drag: 单次拖动每个方向最少的距离 只拖动几个像素时游戏会当成点击
+    :return: 鼠标拖动的向量 (0, 0) 说明不需要拖动
+    """
+    if 0 <= target.x - offset.x < view_size[0] and 0 <= target.y - offset.y < view_size[1]:
+        return Point(0, 0)  # 已经在界面内 在边距内也不再拖动
+
+    sx = _plan_axis(offset.x, view_size[0], target.x, map_size[0], margin)
+    sy = _plan_axis(offset.y, view_size[1], target.y, map_size[1], margin)
+    if sx == 0 and sy == 0:
+        return Point(0, 0)
+
+    drag_cnt = max(math.ceil(abs(sx) / max_drag[0]), math.ceil(abs(sy) / max_drag[1]))
+    # 左上角向右下移动 需要往左上拖动地图
+    return Point(-_at_least(_div_round(sx, drag_cnt), min_drag),
+                 -_at_least(_div_round(sy, drag_cnt), min_drag))
+
+
+def _at_least(a: int, b: int) -> int:
+    """
+    不为0时 绝对值至少为b 大地图边缘多拖动的部分游戏会忽略
+    """
+    return 0 if a == 0 else int(math.copysign(max(abs(a), b), a))
+
+
+def _div_round(a: int, b: int) -> int:
+    """
+    整数除法 向远离0的方向取整 保证最后一次拖动不会只剩几个像素
+    """
+    return int(math.copysign(math.ceil(abs(a) / b), a))
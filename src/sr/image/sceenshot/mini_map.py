@@ -8,7 +8,7 @@ import numpy as np
 from cv2.typing import MatLike
 
 from basic import cal_utils, Point
-from basic.img import cv2_utils, MatchResultList, MatchResult
+from basic.img import cv2_utils, component_filter, MatchResultList, MatchResult
 from basic.log_utils import log
 from sr import const
 from sr.config import game_config
@@ -85,13 +85,7 @@ def get_arrow_mask(mm: MatLike):
     arrow = extract_arrow(center)
     _, mask = cv2.threshold(arrow, 180, 255, cv2.THRESH_BINARY)
     # 做一个连通性检测 小于50个连通的认为是噪点
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < 50:
-            large_components.append(label)
-    for label in large_components:
-        mask[labels == label] = 0
+    mask = component_filter.remove_small_components(mask, 50, connectivity=8)
 
     whole_mask = np.zeros((h,w), dtype=np.uint8)
     whole_mask[cy-r:cy+r, cx-r:cx+r] = mask
@@ -453,23 +447,10 @@ def get_road_mask_for_world_patrol(mm: MatLike,
     # cv2_utils.show_image(road_mask, win_name='road_mask')
 
     # 非道路连通块 < 50的，认为是噪点 加入道路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(road_mask), connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] < 50:
-            large_components.append(label)
-    for label in large_components:
-        road_mask[labels == label] = 255
-
-    # 找到多于500个像素点的连通道路 这些才是真的路
-    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(road_mask, connectivity=4)
-    large_components = []
-    for label in range(1, num_labels):
-        if stats[label, cv2.CC_STAT_AREA] > 200:
-            large_components.append(label)
-    real_road_mask = np.zeros(road_mask.shape[:2], dtype=np.uint8)
-    for label in large_components:
-        real_road_mask[labels == label] = 255
+    road_mask = component_filter.fill_small_holes(road_mask, 50, connectivity=4)
+
+    # 找到多于200个像素点的连通道路 这些才是真的路
+    real_road_mask = component_filter.select_components(road_mask, connectivity=4, min_area=201)
 
     # cv2_utils.show_image(real_road_mask, win_name='road_mask_2')
 
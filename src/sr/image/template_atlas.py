@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+from typing import Optional, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from basic import os_utils
+from basic.img import cv2_utils
+from basic.log_utils import log
+
+ATLAS_FILE_NAME: str = 'atlas.bin'
+ATLAS_MAGIC: bytes = b'SRTPLATL'
+ATLAS_VERSION: int = 1
+ATLAS_HEADER_FORMAT: str = '<8sIQ'  # 标识 版本 索引长度
+ATLAS_ALIGN: int = 64  # 每个数组的起始位置按此对齐
+
+IMAGE_TYPE_LIST: List[str] = ['origin', 'gray', 'mask']
+SOURCE_FILE_LIST: List[str] = ['origin.png', 'gray.png', 'mask.png', 'features.xml']  # 会被打包的文件 修改后图集过期
+
+
+def get_template_key(template_id: str, sub_dir: Optional[str] = None) -> str:
+    """
+    模板在缓存和图集中使用的key
+    :param template_id: 模板id
+    :param sub_dir: 子文件夹
+    :return:
+    """
+    return '%s:%s' % ('' if sub_dir is None else sub_dir, template_id)
+
+
+def get_template_atlas_path() -> str:
+    return os.path.join(os_utils.get_path_under_work_dir('images', 'template'), ATLAS_FILE_NAME)
+
+
+def get_source_mtime(dir_path: str) -> Optional[int]:
+    """
+    模板文件夹中会被打包的文件的最后修改时间
+    :param dir_path: 模板文件夹
+    :return: 纳秒 没有任何文件时返回None
+    """
+    mtime: Optional[int] = None
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.name not in SOURCE_FILE_LIST:
+                    continue
+                entry_mtime = entry.stat().st_mtime_ns
+                if mtime is None or entry_mtime > mtime:
+                    mtime = entry_mtime
+    except OSError:
+        return None
+    return mtime
+
+
+def get_features_hash(dir_path_list: List[str]) -> Optional[str]:
+    """
+    多个模板文件夹中特征文件的哈希 用于判断由特征构建的索引是否过期
+    只看内容 不受 git checkout 改变修改时间和换行符的影响
+    :param dir_path_list: 模板文件夹
+    :return: 没有任何特征文件时返回None 例如发布后只有图集
+    """
+    md5 = hashlib.md5()
+    found: bool = False
+    for dir_path in dir_path_list:
+        try:
+            with open(os.path.join(dir_path, 'features.xml'), 'rb') as file:
+                content = file.read()
+        except OSError:
+            continue
+        found = True
+        md5.update(os.path.basename(dir_path).encode('utf-8'))
+        md5.update(content.replace(b'\r\n', b'\n'))
+    return md5.hexdigest() if found else None
+
+
+def read_template_arrays(dir_path: str) -> Dict[str, np.ndarray]:
+    """
+    从模板文件夹读取图片和特征
+    :param dir_path: 模板文件夹
+    :return: origin/gray/mask 图片 kps 特征点(np格式) desc 描述符 不存在的不返回
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    for image_type in IMAGE_TYPE_LIST:
+        image = cv2_utils.read_image(os.path.join(dir_path, '%s.png' % image_type))
+        if image is not None:
+            arrays[image_type] = image
+
+    feature_path = os.path.join(dir_path, 'features.xml')
+    if os.path.exists(feature_path):
+        file_storage = cv2.FileStorage(feature_path, cv2.FILE_STORAGE_READ)
+        # 读取特征点和描述符
+        kps = file_storage.getNode("keypoints").mat()
+        desc = file_storage.getNode("descriptors").mat()
+        # 释放文件存储对象
+        file_storage.release()
+        arrays['kps'] = kps if kps is not None else np.zeros((0, 7), dtype=np.float64)
+        if desc is not None:
+            arrays['desc'] = desc
+    elif 'origin' in arrays and 'mask' in arrays:
+        kps, desc = cv2_utils.feature_detect_and_compute(arrays['origin'], arrays['mask'])
+        arrays['kps'] = cv2_utils.feature_keypoints_to_np(kps).reshape((-1, 7))
+        if desc is not None:
+            arrays['desc'] = desc
+
+    return arrays
+
+
+def list_template_dir(template_dir: str) -> List[Tuple[Optional[str], str, str]]:
+    """
+    列出全部模板文件夹 模板只会在 images/template 或其下一层的子文件夹中
+    :param template_dir: images/template
+    :return: (子文件夹, 模板id, 模板文件夹)
+    """
+    result: List[Tuple[Optional[str], str, str]] = []
+    for name in sorted(os.listdir(template_dir)):
+        path = os.path.join(template_dir, name)
+        if not os.path.isdir(path):
+            continue
+        if get_source_mtime(path) is not None:
+            result.append((None, name, path))
+            continue
+        for sub_name in sorted(os.listdir(path)):
+            sub_path = os.path.join(path, sub_name)
+            if os.path.isdir(sub_path) and get_source_mtime(sub_path) is not None:
+                result.append((name, sub_name, sub_path))
+    return result
+
+
+def _align(offset: int) -> int:
+    return (offset + ATLAS_ALIGN - 1) // ATLAS_ALIGN * ATLAS_ALIGN
+
+
+def build_template_atlas(template_dir: Optional[str] = None, atlas_path: Optional[str] = None) -> int:
+    """
+    把全部模板的图片和特征打包成一个图集文件 启动时整体映射到内存 不需要逐个读取和解码
+    文件格式: 文件头 + json索引 + 按 ATLAS_ALIGN 对齐的各个数组的原始数据
+    :param template_dir: 模板根目录 默认 images/template
+    :param atlas_path: 图集文件路径 默认在模板根目录下
+    :return: 打包的模板数量
+    """
+    if template_dir is None:
+        template_dir = os_utils.get_path_under_work_dir('images', 'template')
+    if atlas_path is None:
+        atlas_path = os.path.join(template_dir, ATLAS_FILE_NAME)
+
+    template_index: Dict[str, dict] = {}
+    array_list: List[np.ndarray] = []
+    offset = 0
+    for sub_dir, template_id, dir_path in list_template_dir(template_dir):
+        arrays = read_template_arrays(dir_path)
+        item = {'mtime': get_source_mtime(dir_path), 'arrays': {}}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            offset = _align(offset)
+            item['arrays'][name] = [offset, arr.dtype.str, list(arr.shape)]
+            array_list.append(arr)
+            offset += arr.nbytes
+        template_index[get_template_key(template_id, sub_dir)] = item
+
+    index_bytes = json.dumps({'templates': template_index}, ensure_ascii=False).encode('utf-8')
+    header = struct.pack(ATLAS_HEADER_FORMAT, ATLAS_MAGIC, ATLAS_VERSION, len(index_bytes))
+    data_start = _align(len(header) + len(index_bytes))
+
+    temp_path = atlas_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(header)
+        file.write(index_bytes)
+        file.write(b'\0' * (data_start - len(header) - len(index_bytes)))
+        written = 0
+        for arr in array_list:
+            padding = _align(written) - written
+            file.write(b'\0' * padding)
+            file.write(arr.tobytes())
+            written += padding + arr.nbytes
+    os.replace(temp_path, atlas_path)
+    return len(template_index)
+
+
+class TemplateAtlas:
+
+    def __init__(self, file_path: str, data: np.ndarray, data_start: int, template_index: Dict[str, dict]):
+        """
+        内存映射的模板图集 取出的数组直接指向映射的内存 只读
+        :param file_path: 图集文件路径
+        :param data: 整个文件的映射
+        :param data_start: 数组数据的起始位置
+        :param template_index: 各模板的数组位置
+        """
+        self.file_path: str = file_path
+        self.data: np.ndarray = data
+        self.data_start: int = data_start
+        self.template_index: Dict[str, dict] = template_index
+
+    @staticmethod
+    def open(file_path: str):
+        """
+        打开图集文件
+        :param file_path: 图集文件路径
+        :return: 文件不存在或格式不对时返回None
+        """
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'rb') as file:
+                magic, version, index_len = struct.unpack(ATLAS_HEADER_FORMAT,
+                                                          file.read(struct.calcsize(ATLAS_HEADER_FORMAT)))
+                if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+                    log.error('模板图集版本不对 请重新构建 %s', file_path)
+                    return None
+                template_index = json.loads(file.read(index_len).decode('utf-8'))['templates']
+            data_start = _align(struct.calcsize(ATLAS_HEADER_FORMAT) + index_len)
+            data = np.memmap(file_path, dtype=np.uint8, mode='r').view(np.ndarray)
+        except Exception:
+            log.error('读取模板图集失败 %s', file_path, exc_info=True)
+            return None
+        return TemplateAtlas(file_path, data, data_start, template_index)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.template_index
+
+    def __len__(self) -> int:
+        return len(self.template_index)
+
+    def is_stale(self, key: str, dir_path: str) -> bool:
+        """
+        模板文件在打包后是否被修改过 开发时修改了模板不需要重新构建图集
+        发布时没有模板文件夹 直接使用图集
+        :param key: 模板key
+        :param dir_path: 模板文件夹
+        :return:
+        """
+        mtime = get_source_mtime(dir_path)
+        return mtime is not None and mtime > self.template_index[key]['mtime']
+
+    def get_arrays(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        获取模板的数组
+        :param key: 模板key
+        :return: 与 read_template_arrays 的格式一致 图集中没有该模板时返回None
+        """
+        item = self.template_index.get(key)
+        if item is None:
+            return None
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in item['arrays'].items():
+            dt = np.dtype(dtype)
+            start = self.data_start + offset
+            size = int(np.prod(shape, dtype=np.int64)) * dt.itemsize
+            arrays[name] = self.data[start:start + size].view(dt).reshape(shape)
+        return arrays
+
+
+if __name__ == '__main__':
+    # python src/sr/image/template_atlas.py [模板根目录] [图集文件路径]
+    # 发布前执行 把 images/template 下的模板打包成一个图集文件
+    _cnt = build_template_atlas(sys.argv[1] if len(sys.argv) > 1 else None,
+                                sys.argv[2] if len(sys.argv) > 2 else None)
+    log.info('已打包模板 %d 个', _cnt)
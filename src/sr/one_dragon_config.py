@@ -170,6 +170,42 @@ class OneDragonConfig(ConfigHolder):
         """
         self.update('is_debug', new_value)
 
+    @property
+    def debug_image_compression(self) -> int:
+        """
+        调试图片的PNG压缩等级 0~9 越小写入越快
+        :return:
+        """
+        return self.get('debug_image_compression', 1)
+
+    @debug_image_compression.setter
+    def debug_image_compression(self, new_value: int):
+        self.update('debug_image_compression', new_value)
+
+    @property
+    def debug_image_npy(self) -> bool:
+        """
+        调试图片直接保存原始数组 不进行PNG编码
+        :return:
+        """
+        return self.get('debug_image_npy', False)
+
+    @debug_image_npy.setter
+    def debug_image_npy(self, new_value: bool):
+        self.update('debug_image_npy', new_value)
+
+    @property
+    def debug_image_max_mb(self) -> int:
+        """
+        每次运行调试图片最多占用的磁盘空间 MB
+        :return:
+        """
+        return self.get('debug_image_max_mb', 500)
+
+    @debug_image_max_mb.setter
+    def debug_image_max_mb(self, new_value: int):
+        self.update('debug_image_max_mb', new_value)
+
     @property
     def proxy_type(self) -> str:
         """
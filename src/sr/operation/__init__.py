@@ -7,7 +7,9 @@ from basic import Rect, str_utils
 from basic.i18_utils import gt, coalesce_gt
 from basic.img import cv2_utils
 from basic.img.os import save_debug_image
+from basic.img.screen_wait import ScreenWaitResult, wait_for_screen
 from basic.log_utils import log
+from sr import performance_recorder
 from sr.config.game_config import GameConfig
 from sr.context import Context
 from sr.image.sceenshot import fill_uid_black
@@ -157,7 +159,8 @@ class Operation:
             self.op_round += 1
             try:
                 self.last_screenshot = None
-                round_result = self._execute_one_round()
+                with performance_recorder.span(self.__class__.__name__):
+                    round_result = self._execute_one_round()
                 if type(round_result) == OperationOneRoundResult:
                     round_result = round_result
                 else:  # 兼容旧版本的指令
@@ -235,6 +238,38 @@ class Operation:
         self.last_screenshot = self.ctx.controller.screenshot()
         return self.last_screenshot
 
+    def wait_for_screen(self, predicate: Optional[Callable[[MatLike], bool]] = None,
+                        rects: Optional[List[Rect]] = None,
+                        timeout: float = 1,
+                        stable_time: float = 0.2,
+                        wait_name: Optional[str] = None) -> ScreenWaitResult:
+        """
+        等待画面满足条件或者变化稳定 用于替代点击后固定时间的等待 超时时间通常就是原来固定等待的时间
+        实际等待的时间会记录下来 方便根据数据调整超时时间
+        :param predicate: 画面需要满足的条件 为空时等待画面变化并稳定
+        :param rects: 判断变化的区域 为空时使用整个画面
+        :param timeout: 超时时间 秒
+        :param stable_time: 不传入 predicate 时 画面需要保持不变的最短时间 秒
+        :param wait_name: 记录耗时使用的名称 为空时使用指令类名
+        :return: 结果
+        """
+        result = wait_for_screen(self.screenshot, predicate=predicate, rects=rects, timeout=timeout,
+                                 stable_time=stable_time, should_stop=lambda: self.ctx.running != 1)
+        performance_recorder.add_record('wait_for_screen_%s' % (wait_name if wait_name is not None else self.__class__.__name__),
+                                        result.latency)
+        return result
+
+    def wait_for_area(self, area: ScreenArea, timeout: float = 1) -> bool:
+        """
+        等待区域出现
+        :param area: 目标区域
+        :param timeout: 超时时间 秒
+        :return: 是否出现
+        """
+        result = self.wait_for_screen(predicate=lambda screen: self.find_area(area, screen),
+                                      rects=[area.rect], timeout=timeout)
+        return result.success
+
     @property
     def display_name(self) -> str:
         """
@@ -384,7 +419,7 @@ class Operation:
         if str_utils.find_by_lcs(gt(target_cn, 'ocr'), ocr_result, percent=lcs_percent):
             if self.ctx.controller.click(target_rect.center):
                 if wait_after_success is not None:
-                    time.sleep(wait_after_success)
+                    self.wait_for_screen(timeout=wait_after_success)
                 return Operation.OCR_CLICK_SUCCESS
             else:
                 return Operation.OCR_CLICK_FAIL
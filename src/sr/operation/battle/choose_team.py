@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar, Optional
 
 from cv2.typing import MatLike
@@ -50,7 +49,7 @@ class ChooseTeam(Operation):
         else:
             to_click: Point = num_pos[self.team_num]
             if self.ctx.controller.click(to_click):
-                time.sleep(0.5)
+                self.wait_for_screen(timeout=0.5)
                 if not self.on:
                     return Operation.round_success()
                 if self.ctx.controller.click(ChooseTeam.TURN_ON_RECT.center):
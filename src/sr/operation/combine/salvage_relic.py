@@ -1,4 +1,3 @@
-import time
 from typing import List, ClassVar, Union, Optional
 
 from cv2.typing import MatLike
@@ -42,8 +41,7 @@ class DoSalvageRelic(Operation):
     def _execute_one_round(self) -> OperationOneRoundResult:
         if self.phase == 0:  # 点击过滤
             self.ctx.controller.click(DoSalvageRelic.FILTER_POS)
-            time.sleep(2)
-            if self._filter_shown():
+            if self.wait_for_screen(predicate=self._filter_shown, rects=[DoSalvageRelic.FILTER_RULE_RECT], timeout=2).success:
                 self.phase += 1
                 return Operation.round_wait(wait=1)
             else:
@@ -127,7 +125,7 @@ class DoSalvageRelic(Operation):
                 find = True
                 if click:
                     self.ctx.controller.click(DoSalvageRelic.RARITY_RECT.left_top + mrl.max.center)
-                    time.sleep(0.5)
+                    self.wait_for_screen(rects=[DoSalvageRelic.RARITY_RECT], timeout=0.5)
 
         return find
 
@@ -144,12 +142,12 @@ class DoSalvageRelic(Operation):
         if click_all != Operation.OCR_CLICK_SUCCESS:
             return False
 
-        time.sleep(1.5)
+        self.wait_for_screen(timeout=1.5)
         click_salvage = self.ocr_and_click_one_line('分解', DoSalvageRelic.SALVAGE_RECT, screen)
         if click_salvage != Operation.OCR_CLICK_SUCCESS:
             return False
 
-        time.sleep(1.5)
+        self.wait_for_screen(timeout=1.5)
         return True
 
     def _tip_shown(self, screen: Optional[MatLike] = None) -> bool:
@@ -94,9 +94,9 @@ class BackToNormalWorldPlus(Operation):
         if self.find_area(express_supply, screen):
             express_supply_get = ScreenNormalWorld.EXPRESS_SUPPLY_GET.value
             self.ctx.controller.click(express_supply_get.center)
-            time.sleep(3)  # 暂停一段时间再操作
+            time.sleep(3)  # 第二次点击要等第一段动画完整结束 不能提前返回
             self.ctx.controller.click(express_supply_get.center)  # 领取需要分两个阶段 点击两次
-            time.sleep(1)  # 暂停一段时间再操作
+            self.wait_for_screen(timeout=1)  # 等动画结束再操作
             return Operation.round_wait(wait=2)
 
         # 战斗中 点击右上角后出现的画面 需要需要退出
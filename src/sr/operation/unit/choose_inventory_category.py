@@ -50,7 +50,7 @@ class ChooseInventoryCategory(Operation):
 
         if not in_secondary_ui(screen, self.ctx.ocr, title_cn=self.category.cn):
             click = self.ctx.controller.click(self.category.pos)
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             if click:
                 return Operation.round_wait()
             else:
@@ -1,21 +1,21 @@
 import random
-import time
-from typing import ClassVar
+from typing import ClassVar, Optional
 
 import cv2
 import numpy as np
 from cv2.typing import MatLike
 
-from basic import str_utils, Point, Rect
+from basic import str_utils, Point, Rect, cal_utils
 from basic.i18_utils import gt
 from basic.img import MatchResultList, MatchResult, cv2_utils
 from basic.log_utils import log
 from sr import const
 from sr.config import game_config
-from sr.const import game_config_const
+from sr.const import game_config_const, map_const
 from sr.const.map_const import TransportPoint
 from sr.context import Context
-from sr.image.sceenshot import LargeMapInfo, large_map
+from sr.image.sceenshot import LargeMapInfo, large_map, large_map_locator
+from sr.image.sceenshot.large_map_locator import LargeMapLocator
 from sr.operation import Operation
 
 
@@ -23,28 +23,34 @@ class ChooseTransportPoint(Operation):
 
     tp_name_rect: ClassVar[Rect] = Rect(1485, 120, 1870, 170)  # 右侧显示传送点名称的区域
     drag_distance: ClassVar[int] = -200
+    drag_rect: ClassVar[Rect] = Rect(300, 250, 1800, 1000)  # 拖动地图时鼠标的活动范围 从 EMPTY_MAP_POS 开始拖动
 
     def __init__(self, ctx: Context, tp: TransportPoint):
         super().__init__(ctx, 10, op_name=gt('选择传送点 %s') % tp.display_name)
         self.tp: TransportPoint = tp
         self.lm_info: LargeMapInfo = self.ctx.ih.get_large_map(self.tp.region)
+        self.locator: Optional[LargeMapLocator] = None
+
+    def _init_before_execute(self):
+        super()._init_before_execute()
+        self.locator = None  # 每次执行重新定位
 
     def _execute_one_round(self) -> int:
         screen = self.screenshot()
 
         # 判断地图中间是否有目标点中文可选
         if self.check_and_click_sp_cn(screen):
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             return Operation.WAIT
 
         # 先判断右边是不是出现传送了
         if self.check_and_click_transport(screen):
-            time.sleep(2)
+            self.wait_for_screen(timeout=2)
             return Operation.SUCCESS
 
         # 目标点中文 不是传送 或者不是目标传送点 点击一下地图空白位置
         self.ctx.controller.click(large_map.EMPTY_MAP_POS)
-        time.sleep(0.5)
+        self.wait_for_screen(timeout=0.5)
 
         screen_map, _ = cv2_utils.crop_image(screen, large_map.CUT_MAP_RECT)
         # cv2_utils.show_image(screen_map, win_name='ChooseTransportPoint-screen_map')
@@ -53,25 +59,32 @@ class ChooseTransportPoint(Operation):
         if offset is None:
             log.error('匹配大地图失败')
             self.random_drag()
-            time.sleep(0.5)
+            self.wait_for_screen(rects=[large_map.CUT_MAP_RECT], timeout=0.5)
             return Operation.RETRY
 
-        dx, dy = self.get_map_next_drag(offset)
+        drag = self.get_map_next_drag(offset)
+        if self.locator.stuck:  # 已经拖不动了 直接在当前画面找
+            drag = Point(0, 0)
 
-        if dx == 0 and dy == 0:  # 当前就能找传送点
+        if drag.x == 0 and drag.y == 0:  # 当前就能找传送点
             target: MatchResult = self.get_tp_pos(screen_map, offset)
             if target is None:  # 没找到的话 按计算坐标点击
                 to_click = self.tp.lm_pos - offset.left_top + large_map.CUT_MAP_RECT.left_top
-                self.ctx.controller.click(to_click)
-                time.sleep(0.5)
+                if cal_utils.in_rect(to_click, large_map.CUT_MAP_RECT):
+                    self.ctx.controller.click(to_click)
+                    self.wait_for_screen(timeout=0.5)
+                else:  # 拖不动时目标仍可能在画面外 例如拖动没有生效 随机拖动后重新定位
+                    log.info('传送点不在当前画面 %s 随机拖动', to_click)
+                    self.random_drag()
+                    self.wait_for_screen(rects=[large_map.CUT_MAP_RECT], timeout=0.5)
             else:
                 to_click = target.center + large_map.CUT_MAP_RECT.left_top
                 self.ctx.controller.click(to_click)
-                time.sleep(0.5)
+                self.wait_for_screen(timeout=0.5)
 
-        if dx != 0 or dy != 0:
-            self.drag(dx, dy)
-            time.sleep(0.5)
+        if drag.x != 0 or drag.y != 0:
+            self.drag(drag)
+            self.wait_for_screen(rects=[large_map.CUT_MAP_RECT], timeout=0.5)
 
         return Operation.RETRY
 
@@ -124,32 +137,24 @@ class ChooseTransportPoint(Operation):
         :param screen_map: 屏幕上的地图部分
         :return: 匹配结果 里面就有偏移量
         """
-        result: MatchResultList = self.ctx.im.match_image(self.lm_info.origin, screen_map)
-        return result.max
+        if self.locator is None:
+            self.locator = LargeMapLocator(self.lm_info.origin)
+        return self.locator.locate(screen_map)
 
-    def get_map_next_drag(self, offset: MatchResult):
+    def get_map_next_drag(self, offset: MatchResult) -> Point:
         """
         判断当前地图是否已经涵盖到目标点
-        如果没有 则返回需要往哪个方向拖动
+        如果没有 则返回需要怎么拖动 距离较远时按最少的拖动次数平均拖动
         :param offset: 偏移量
-        :return: 后续拖动方向 正代表坐标需要增加 正代表坐标需要减少
+        :return: 鼠标拖动的向量 (0, 0) 代表不需要拖动
         """
-        # 匹配结果矩形
-        x1, y1 = offset.x, offset.y
-        x2, y2 = x1 + offset.w, y1 + offset.h
-        # 目标点坐标
-        x, y = self.tp.lm_pos.x, self.tp.lm_pos.y
-
-        dx, dy = 0, 0
-        if x > x2:
-            dx = 1
-        elif x < x1:
-            dx = -1
-        if y > y2:
-            dy = 1
-        elif y < y1:
-            dy = -1
-        return dx, dy
+        start = large_map.EMPTY_MAP_POS
+        rect = ChooseTransportPoint.drag_rect
+        max_drag = (min(start.x - rect.x1, rect.x2 - start.x), min(start.y - rect.y1, rect.y2 - start.y))
+        return large_map_locator.plan_drag(
+            offset.left_top, (offset.w, offset.h), self.tp.lm_pos,
+            (self.lm_info.origin.shape[1], self.lm_info.origin.shape[0]),
+            max_drag)
 
     def get_tp_pos(self, screen_map: MatLike, offset: MatchResult):
         """
@@ -163,14 +168,29 @@ class ChooseTransportPoint(Operation):
             sm_offset_y = self.tp.lm_pos.y - offset.y
             sp_rect = Rect(sm_offset_x - 100, sm_offset_y - 100, sm_offset_x + 100, sm_offset_y + 100)
             crop_screen_map, sp_rect = cv2_utils.crop_image(screen_map, sp_rect)
-            result: MatchResultList = self.ctx.im.match_template(crop_screen_map, self.tp.template_id, threshold=const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP)
-
-            if result.max is not None:
-                return MatchResult(result.max.confidence,
-                                   result.max.x + sp_rect.x1,
-                                   result.max.y + sp_rect.y1,
-                                   result.max.w,
-                                   result.max.h
+
+            # 附近有同样图标的特殊点时 最匹配的不一定是目标 取离目标坐标最近的
+            lm_rect = Rect(self.tp.lm_pos.x - 100, self.tp.lm_pos.y - 100, self.tp.lm_pos.x + 100, self.tp.lm_pos.y + 100)
+            same_sp_cnt = len([sp for sp in map_const.get_region_sp_index(self.tp.region).in_rect(lm_rect)
+                               if sp.template_id == self.tp.template_id])
+            result: MatchResultList = self.ctx.im.match_template(crop_screen_map, self.tp.template_id,
+                                                                 threshold=const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP,
+                                                                 only_best=same_sp_cnt <= 1)
+            target: Optional[MatchResult] = result.max
+            if same_sp_cnt > 1:
+                expect_pos = Point(sm_offset_x - sp_rect.x1, sm_offset_y - sp_rect.y1)
+                target = None
+                for r in result:
+                    if target is None or \
+                            cal_utils.distance_between(r.center, expect_pos) < cal_utils.distance_between(target.center, expect_pos):
+                        target = r
+
+            if target is not None:
+                return MatchResult(target.confidence,
+                                   target.x + sp_rect.x1,
+                                   target.y + sp_rect.y1,
+                                   target.w,
+                                   target.h
                                    )
             else:
                 return None
@@ -181,13 +201,20 @@ class ChooseTransportPoint(Operation):
     def random_drag(self):
         dx = 1 if random.randint(0, 1) == 1 else -1
         dy = 1 if random.randint(0, 1) == 1 else -1
-        self.drag(dx, dy)
+        self.drag(Point(ChooseTransportPoint.drag_distance * dx, ChooseTransportPoint.drag_distance * dy))
 
-    def drag(self, dx: int, dy: int):
-        fx, fy = large_map.EMPTY_MAP_POS.tuple()
-        tx, ty = fx + ChooseTransportPoint.drag_distance * dx, fy + ChooseTransportPoint.drag_distance * dy
-        log.info('当前未找到传送点 即将拖动地图 %s -> %s', (fx, fy), (tx, ty))
-        self.ctx.controller.drag_to(end=Point(tx, ty), start=Point(fx, fy), duration=1)
+    def drag(self, drag: Point):
+        """
+        拖动地图 从地图空白区域开始 避免按下时点到地图上的图标 拖动后通知定位器预测新的位置
+        :param drag: 鼠标拖动的向量
+        :return:
+        """
+        start = large_map.EMPTY_MAP_POS
+        end = Point(start.x + drag.x, start.y + drag.y)
+        log.info('当前未找到传送点 即将拖动地图 %s -> %s', start, end)
+        self.ctx.controller.drag_to(end=end, start=start, duration=1)
+        if self.locator is not None:
+            self.locator.on_drag(drag)
 
     def check_and_click_sp_cn(self, screen) -> bool:
         """
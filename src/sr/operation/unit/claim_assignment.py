@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar
 
 from cv2.typing import MatLike
@@ -58,7 +57,7 @@ class ClaimAssignment(Operation):
         if str_utils.find_by_lcs(gt('领取', 'ocr'), ocr_result, percent=lcs_percent):
             self.ctx.controller.click(ClaimAssignment.CLAIM_BTN_RECT.center)
             log.info('检测到【领取】 点击')
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             return True
         return False
 
@@ -72,7 +71,7 @@ class ClaimAssignment(Operation):
         if str_utils.find_by_lcs(gt('再次派遣', 'ocr'), ocr_result, percent=0.3):
             self.ctx.controller.click(ClaimAssignment.RESEND_BTN_RECT.center)
             log.info('检测到【再次派遣】 点击')
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             return True
         return False
 
@@ -88,7 +87,7 @@ class ClaimAssignment(Operation):
         if len(result_list) > 0:  # 有红点
             self.ctx.controller.click(ClaimAssignment.CATEGORY_RECT.left_top + result_list.max.center)
             log.info('检测到【红点】 点击')
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             return True
 
         return False
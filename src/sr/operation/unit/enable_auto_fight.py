@@ -1,5 +1,3 @@
-import time
-
 from basic import os_utils, Point
 from basic.i18_utils import gt
 from basic.img.os import save_debug_image
@@ -31,7 +29,7 @@ class EnableAutoFight(Operation):
             if r is not None:
                 log.info('启动自动战斗')
                 self.ctx.controller.click(r.center)
-                time.sleep(0.5)
+                self.wait_for_screen(timeout=0.5)
             return Operation.RETRY
 
         if not battle.is_fast_battle_on(screen, self.ctx.im):
@@ -42,7 +40,7 @@ class EnableAutoFight(Operation):
             if r is not None:
                 log.info('启动二倍速战斗')
                 self.ctx.controller.click(r.center)
-                time.sleep(0.5)
+                self.wait_for_screen(timeout=0.5)
             return Operation.RETRY
 
         return Operation.SUCCESS
@@ -126,12 +126,9 @@ class Logout(StateOperation):
         if not click:
             return Operation.round_retry('点击返回登陆按钮失败', wait=1)
 
-        time.sleep(2)
-
-        screen = self.screenshot()
-
         area = ScreenDialog.BACK_TO_LOGIN_CONFIRM.value
-        click = self.find_and_click_area(area, screen)
+        self.wait_for_area(area, timeout=2)
+        click = self.find_and_click_area(area)
 
         if click == Operation.OCR_CLICK_SUCCESS:
             return Operation.round_success(wait=15)
@@ -149,9 +146,8 @@ class Logout(StateOperation):
         if not click == Operation.OCR_CLICK_SUCCESS:
             return Operation.round_retry('点击%s失败' % area.text, wait=1)
 
-        time.sleep(1)
-
         area = ScreenLogin.LOGOUT_CONFIRM.value
+        self.wait_for_area(area, timeout=1)
         click = self.find_and_click_area(area)
         if not click == Operation.OCR_CLICK_SUCCESS:
             return Operation.round_success(wait=1)
@@ -237,22 +233,24 @@ class LoginWithPassword(StateOperation):
             return Operation.round_fail('未配置账号密码')
 
         # 输入账号
-        self.ctx.controller.click(ScreenLogin.ACCOUNT_INPUT.value.rect.center)
-        time.sleep(0.5)
+        account_rect = ScreenLogin.ACCOUNT_INPUT.value.rect
+        self.ctx.controller.click(account_rect.center)
+        self.wait_for_screen(rects=[account_rect], timeout=0.5)
         self.ctx.controller.delete_all_input()
         self.ctx.controller.input_str(gc.game_account)
-        time.sleep(0.5)
+        self.wait_for_screen(rects=[account_rect], timeout=0.5)
 
         # 输入密码
-        self.ctx.controller.click(ScreenLogin.PASSWORD_INPUT.value.rect.center)
-        time.sleep(0.5)
+        password_rect = ScreenLogin.PASSWORD_INPUT.value.rect
+        self.ctx.controller.click(password_rect.center)
+        self.wait_for_screen(rects=[password_rect], timeout=0.5)
         self.ctx.controller.delete_all_input()
         self.ctx.controller.input_str(gc.game_account_password)
-        time.sleep(0.5)
+        self.wait_for_screen(rects=[password_rect], timeout=0.5)
 
         # 同意协议
         self.ctx.controller.click(ScreenLogin.APPROVE.value.rect.center)
-        time.sleep(0.5)
+        self.wait_for_screen(rects=[ScreenLogin.APPROVE.value.rect], timeout=0.5)
 
         # 进入游戏
         area = ScreenLogin.LOGIN_BTN.value
@@ -334,9 +332,9 @@ class WaitEnterGame(Operation):
         if self.find_area(area, screen):  # 列车补给(小月卡) - 会先出现主界面
             get_area = ScreenNormalWorld.EXPRESS_SUPPLY_GET.value
             self.ctx.controller.click(get_area.center)
-            time.sleep(3)  # 暂停一段时间再操作
+            time.sleep(3)  # 第二次点击要等第一段动画完整结束 不能提前返回
             self.ctx.controller.click(get_area.center)  # 领取需要分两个阶段 点击两次
-            time.sleep(1)  # 暂停一段时间再操作
+            self.wait_for_screen(timeout=1)  # 等动画结束再操作
             self.claim_express_supply = True
             return Operation.round_wait()
 
@@ -1,4 +1,3 @@
-import time
 from typing import Optional, List
 
 import cv2
@@ -7,6 +6,7 @@ from cv2.typing import MatLike
 
 from basic import Rect, Point, str_utils, cal_utils
 from basic.img import MatchResult, cv2_utils, MatchResultList
+from basic.img.screen_wait import wait_for_screen
 from sr.context import Context
 
 CHOOSE_MISSION_RECT = Rect(10, 261, 1900, 850)
@@ -118,7 +118,8 @@ def get_mission_num_pos(ctx: Context, target_mission_num: int, screen: MatLike,
             drag_from = CHOOSE_MISSION_RECT.center
             drag_to = drag_from + Point((800 if existed_larger else -800), 0)
             ctx.controller.drag_to(drag_to, drag_from, duration=0.3)
-            time.sleep(0.5)
+            wait_for_screen(ctx.controller.screenshot, rects=[CHOOSE_MISSION_RECT], timeout=0.5,
+                            should_stop=lambda: ctx.running != 1)
         return None
 
 
@@ -1,5 +1,3 @@
-import time
-
 from cv2.typing import MatLike
 
 from basic.i18_utils import gt
@@ -28,7 +26,7 @@ class ChooseMission(Operation):
             return Operation.round_retry('未找到关卡')
 
         if self.ctx.controller.click(num_result.center):
-            time.sleep(1.5)  # 等待加载页面
+            self.wait_for_screen(timeout=1.5)  # 等待加载页面
             return Operation.round_success()
         else:
             return Operation.round_retry('点击关卡失败')
@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar, Optional
 
 from cv2.typing import MatLike
@@ -36,7 +35,7 @@ class GetRewardInForgottenHall(Operation):
             click = self.ocr_and_click_one_line('领取', GetRewardInForgottenHall.CLAIM_REWARD_BTN_RECT, wait_after_success=1)
             if click == Operation.OCR_CLICK_SUCCESS:  # 有领取按钮并点击成功
                 self.ctx.controller.click(GetRewardInForgottenHall.EMPTY_POS_AFTER_CLAIM)
-                time.sleep(1)
+                self.wait_for_screen(timeout=1)
                 return Operation.round_wait()
             elif click == Operation.OCR_CLICK_NOT_FOUND:
                 return Operation.round_retry('领取完毕')
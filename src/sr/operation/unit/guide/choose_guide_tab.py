@@ -1,5 +1,3 @@
-import time
-
 from cv2.typing import MatLike
 
 from basic.i18_utils import gt
@@ -35,7 +33,7 @@ class ChooseGuideTab(Operation):
         if not in_secondary_ui(screen, self.ctx.ocr, self.target.cn):
             log.info('指南中点击 %s', self.target.cn)
             self.ctx.controller.click(self.target.area.rect.center)
-            time.sleep(1)
+            self.wait_for_screen(timeout=1)
             return Operation.round_retry()
 
         return Operation.round_success()
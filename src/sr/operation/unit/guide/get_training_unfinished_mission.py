@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar, Optional, List
 
 from cv2.typing import MatLike
@@ -52,7 +51,7 @@ class GetTrainingUnfinishedMission(Operation):
         drag_from = GetTrainingUnfinishedMission.GO_RECT.center
         drag_to = drag_from + Point(-200, 0)
         self.ctx.controller.drag_to(drag_to, drag_from)
-        time.sleep(1)
+        self.wait_for_screen(timeout=1)
 
         return Operation.round_retry('未找到可执行任务')
 
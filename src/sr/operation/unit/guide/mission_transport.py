@@ -62,7 +62,7 @@ class ChooseGuideMissionCategory(Operation):
         point_from = CATEGORY_LIST_RECT.center
         point_to = point_from + (Point(0, -200) if other_before_target else Point(0, 200))
         self.ctx.controller.drag_to(point_to, point_from)
-        time.sleep(0.5)
+        self.wait_for_screen(rects=[CATEGORY_LIST_RECT], timeout=0.5)
         return Operation.round_retry('未找到目标')
 
 
@@ -114,7 +114,7 @@ class ChooseGuideMission(Operation):
             point_from = MISSION_LIST_RECT.center
             point_to = point_from + Point(0, -200)
             self.ctx.controller.drag_to(point_to, point_from)
-            time.sleep(0.5)
+            self.wait_for_screen(rects=[MISSION_LIST_RECT], timeout=0.5)
             return Operation.round_retry('未找到 ' + self.mission.cn)
         else:
             log.info('生存索引中找到 %s 尝试传送', self.mission.cn)
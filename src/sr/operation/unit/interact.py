@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar
 
 import cv2
@@ -41,8 +40,7 @@ class Interact(Operation):
         self.no_move: bool = no_move
 
     def _execute_one_round(self):
-        time.sleep(0.5)  # 稍微等待一下 可能交互按钮还没有出来
-        screen = self.screenshot()
+        screen = self.wait_for_screen(timeout=0.5).screen  # 稍微等待一下 可能交互按钮还没有出来
         return self.check_on_screen(screen)
 
     def check_on_screen(self, screen: MatLike) -> OperationOneRoundResult:
@@ -1,5 +1,3 @@
-import time
-
 from cv2.typing import MatLike
 
 from basic import Point
@@ -32,12 +30,12 @@ class ClickPhoneMenuItem(Operation):
         if result is None:  # 没找到的情况 上下随机滑动
             log.info('菜单中未找到 %s 尝试滑动', self.item.cn)
             self.scroll_menu_area(1 if self.op_round % 2 == 1 else -1)
-            time.sleep(0.5)
+            self.wait_for_screen(rects=[phone_menu.MENU_ITEMS_PART], timeout=0.5)
             return Operation.RETRY
         else:
             log.info('菜单中找到 %s 尝试点击', self.item.cn)
             r = self.ctx.controller.click(result.center)
-            time.sleep(0.5)
+            self.wait_for_screen(timeout=0.5)
             return Operation.SUCCESS if r else Operation.RETRY
 
     def scroll_menu_area(self, d: int = 1):
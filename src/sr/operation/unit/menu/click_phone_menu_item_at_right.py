@@ -31,5 +31,5 @@ class ClickPhoneMenuItemAtRight(Operation):
             return Operation.RETRY
         else:
             r = self.ctx.controller.click(result.center)
-            time.sleep(0.5)
+            self.wait_for_screen(timeout=0.5)
             return Operation.SUCCESS if r else Operation.RETRY
@@ -169,6 +169,7 @@ class MoveDirectly(Operation):
         self.run_mode = game_config_const.RUN_MODE_OFF if no_run else self.ctx.game_config.run_mode
         self.no_battle: bool = no_battle  # 本次移动是否没有战斗
         self.technique_fight: bool = technique_fight  # 是否使用秘技进入战斗
+        self.scale_history: cal_pos.ScaleHistory = cal_pos.ScaleHistory()  # 移动过程中小地图缩放比例变化不大 优先尝试上一次的
 
     def _init_before_execute(self):
         super()._init_before_execute()
@@ -330,7 +331,7 @@ class MoveDirectly(Operation):
         possible_pos = (last_pos.x, last_pos.y, move_distance)
         log.debug('准备计算人物坐标 使用上一个坐标为 %s 移动时间 %.2f 是否在移动 %s', possible_pos,
                   move_time, self.ctx.controller.is_moving)
-        lm_rect = large_map.get_large_map_rect_by_pos(self.lm_info.gray.shape, mm.shape[:2], possible_pos)
+        lm_rect = large_map.get_large_map_rect_by_pos(self.lm_info.shape, mm.shape[:2], possible_pos)
 
         sp_map = map_const.get_sp_type_in_rect(self.region, lm_rect)
         mm_info = mini_map.analyse_mini_map(mm, self.ctx.im, sp_types=set(sp_map.keys()))
@@ -342,7 +343,8 @@ class MoveDirectly(Operation):
             next_pos = cal_pos.cal_character_pos(self.ctx.im, self.lm_info, mm_info,
                                                  possible_pos=possible_pos,
                                                  lm_rect=lm_rect, retry_without_rect=False,
-                                                 running=self.ctx.controller.is_moving)
+                                                 running=self.ctx.controller.is_moving,
+                                                 scale_history=self.scale_history)
         except Exception:
             next_pos = None
             log.error('识别坐标失败', exc_info=True)
@@ -350,7 +352,8 @@ class MoveDirectly(Operation):
             next_pos = cal_pos.cal_character_pos(self.ctx.im, self.next_lm_info, mm_info,
                                                  possible_pos=possible_pos,
                                                  lm_rect=lm_rect, retry_without_rect=False,
-                                                 running=self.ctx.controller.is_moving)
+                                                 running=self.ctx.controller.is_moving,
+                                                 scale_history=self.scale_history)
 
         if next_pos is None:
             log.error('无法判断当前人物坐标')
@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar
 
 from basic import Point, Rect
@@ -30,7 +29,7 @@ class ScaleLargeMap(Operation):
         if self.pos is not None:
             log.info('准备缩放地图 点击 %s %s', self.pos.center,
                      self.ctx.controller.click(self.pos.center))
-            time.sleep(0.5)
+            self.wait_for_screen(timeout=0.5)
             self.click_times += 1
             if self.click_times == abs(self.scale):
                 return Operation.SUCCESS
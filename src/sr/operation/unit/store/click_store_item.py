@@ -1,4 +1,3 @@
-import time
 from typing import ClassVar, Optional
 
 import cv2
@@ -34,7 +33,7 @@ class ClickStoreItem(Operation):
             start_point: Point = ClickStoreItem.STORE_ITEM_LIST.center
             end_point: Point = Point(start_point.x, start_point.y - 100)
             self.ctx.controller.drag_to(end_point, start_point)
-            time.sleep(0.5)
+            self.wait_for_screen(rects=[ClickStoreItem.STORE_ITEM_LIST], timeout=0.5)
             return Operation.RETRY
 
         to_click: Point = best_result.center
@@ -8,6 +8,7 @@ from basic.img import cv2_utils
 from basic.log_utils import log
 from sr.const.character_const import Character, CHARACTER_LIST
 from sr.context import Context
+from sr.image.image_holder import ImageHolder
 from sr.image.sceenshot import screen_state
 from sr.operation import Operation, OperationOneRoundResult, StateOperation, StateOperationNode, StateOperationEdge
 from sr.screen_area import ScreenArea
@@ -138,24 +139,56 @@ class CheckTeamMembersInWorld(Operation):
             ScreenNormalWorld.TEAM_MEMBER_AVATAR_4.value,
         ]
 
+        part_list = []
         for i in range(4):
             if self.character_list[i] is not None:
-                continue
-            area: ScreenArea = area_list[i]
+                part_list.append(None)
+            else:
+                part_list.append(cv2_utils.crop_image_only(screen, area_list[i].rect))
 
-            part = cv2_utils.crop_image_only(screen, area.rect)
-            source_kps, source_desc = cv2_utils.feature_detect_and_compute(part)
+        result_list = match_character_by_avatar(self.ctx.ih, part_list)
+        for i in range(4):
+            if result_list[i] is not None:
+                self.character_list[i] = result_list[i]
+
+
+def match_character_by_avatar(ih: ImageHolder, part_list: List[Optional[MatLike]],
+                              candidate_cnt: int = 3) -> List[Optional[Character]]:
+    """
+    用头像匹配角色 多个头像一起查询头像索引 只对票数最高的几个角色做完整的特征匹配
+    :param ih: 图片加载器
+    :param part_list: 头像截图 为空时跳过
+    :param candidate_cnt: 每个头像最多对几个角色做完整的特征匹配
+    :return: 对应的角色 匹配不到时为None
+    """
+    feature_list = []
+    for part in part_list:
+        if part is None:
+            feature_list.append(([], None))
+        else:
+            feature_list.append(cv2_utils.feature_detect_and_compute(part))
 
-            for character in CHARACTER_LIST:
-                template = self.ctx.ih.get_character_avatar_template(character.id)
+    index = ih.get_character_avatar_index()
+    candidate_list = index.vote([desc for _, desc in feature_list])
+
+    result_list: List[Optional[Character]] = []
+    for i in range(len(part_list)):
+        source_kps, source_desc = feature_list[i]
+        result: Optional[Character] = None
+        for template_idx in candidate_list[i][:candidate_cnt]:
+            character = CHARACTER_LIST[template_idx]
+            template = ih.get_character_avatar_template(character.id)
+
+            mr = cv2_utils.feature_match_for_one(source_kps, source_desc,
+                                            template.kps, template.desc,
+                                            template.origin.shape[1], template.origin.shape[0])
 
-                mr = cv2_utils.feature_match_for_one(source_kps, source_desc,
-                                                template.kps, template.desc,
-                                                template.origin.shape[1], template.origin.shape[0])
+            if mr is not None:
+                result = character
+                break
+        result_list.append(result)
 
-                if mr is not None:
-                    self.character_list[i] = character
-                    break
+    return result_list
 
 
 class SwitchMember(StateOperation):
@@ -1,5 +1,12 @@
-import time
+import json
+import math
 import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Optional, List, Deque, Tuple
+
 import yaml
 import psutil
 
@@ -7,6 +14,51 @@ from basic import os_utils
 from basic.log_utils import log
 
 
+class PerformanceHistogram:
+
+    BUCKET_RATIO: float = 2 ** (1 / 8)
+    """相邻桶之间的比例 约9%的相对误差"""
+
+    def __init__(self):
+        """
+        流式的耗时直方图 按对数分桶 用于在不保留所有样本的情况下计算分位数
+        耗时单位为纳秒
+        """
+        self.buckets: dict[int, int] = {}
+        self.cnt: int = 0
+
+    def add(self, ns: int):
+        idx = PerformanceHistogram.bucket_idx(ns)
+        self.buckets[idx] = self.buckets.get(idx, 0) + 1
+        self.cnt += 1
+
+    @staticmethod
+    def bucket_idx(ns: int) -> int:
+        if ns <= 1:
+            return 0
+        return int(math.log(ns, PerformanceHistogram.BUCKET_RATIO))
+
+    @staticmethod
+    def bucket_upper(idx: int) -> float:
+        return PerformanceHistogram.BUCKET_RATIO ** (idx + 1)
+
+    def percentile(self, p: float) -> float:
+        """
+        获取分位数
+        :param p: 分位 0~100
+        :return: 该分位所在桶的上界 纳秒
+        """
+        if self.cnt == 0:
+            return 0
+        target = max(1, math.ceil(self.cnt * p / 100))
+        acc = 0
+        for idx in sorted(self.buckets.keys()):
+            acc += self.buckets[idx]
+            if acc >= target:
+                return PerformanceHistogram.bucket_upper(idx)
+        return PerformanceHistogram.bucket_upper(max(self.buckets.keys()))
+
+
 class PerformanceRecord:
 
     def __init__(self, id: str):
@@ -15,43 +67,231 @@ class PerformanceRecord:
         self.total = 0
         self.max = 0
         self.min = 999
+        self.histogram: PerformanceHistogram = PerformanceHistogram()
 
     def add(self, t):
+        """
+        增加一次耗时
+        :param t: 耗时 秒
+        :return:
+        """
         self.cnt += 1
         self.total += t
         if t > self.max:
             self.max = t
         if t < self.min:
             self.min = t
+        self.histogram.add(int(t * 1e9))
 
     @property
     def avg(self):
         return self.total / self.cnt if self.cnt > 0 else 0
 
+    def percentile(self, p: float) -> float:
+        """
+        获取分位数耗时 不会超过实际的最大值
+        :param p: 分位 0~100
+        :return: 耗时 秒
+        """
+        return min(self.histogram.percentile(p) / 1e9, self.max)
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'cnt': self.cnt,
+            'avg': self.avg,
+            'min': self.min if self.cnt > 0 else 0,
+            'max': self.max,
+            'p50': self.p50,
+            'p95': self.p95,
+            'p99': self.p99,
+            'total': self.total,
+        }
+
     def __str__(self):
-        return ('[%s] 次数: %d 平均耗时: %.6f 最高耗时: %.6f, 最低耗时: %.6f, 总耗时: %.6f' %
-                (self.id, self.cnt, self.avg, self.max, self.min, self.total))
+        return ('[%s] 次数: %d 平均耗时: %.6f P50: %.6f P95: %.6f P99: %.6f 最高耗时: %.6f, 最低耗时: %.6f, 总耗时: %.6f' %
+                (self.id, self.cnt, self.avg, self.p50, self.p95, self.p99, self.max, self.min, self.total))
+
+
+class PerformanceSpan:
+
+    def __init__(self, recorder, name: str, parent: Optional['PerformanceSpan'] = None):
+        """
+        一段耗时区间 使用 with 包裹需要统计的代码
+        同一线程内会自动嵌套 跨线程时需要显式传入父区间
+        :param recorder: 记录器
+        :param name: 名称 同名区间合并统计
+        :param parent: 父区间 为空时使用当前线程正在执行的区间
+        """
+        self.recorder: PerformanceRecorder = recorder
+        self.name: str = name
+        self.parent: Optional[PerformanceSpan] = parent
+        self.span_id: int = 0
+        self.start_ns: int = 0
+        self.end_ns: int = 0
+        self.tid: int = 0
+
+    def __enter__(self):
+        stack = self.recorder.span_stack()
+        if self.parent is None and len(stack) > 0:
+            self.parent = stack[-1]
+        stack.append(self)
+        self.span_id = self.recorder.next_span_id()
+        self.tid = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end_ns = time.perf_counter_ns()
+        stack = self.recorder.span_stack()
+        if len(stack) > 0 and stack[-1] is self:
+            stack.pop()
+        self.recorder.add_span(self)
+        return False
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    @property
+    def path(self) -> str:
+        """
+        从根区间到当前区间的名称路径
+        :return:
+        """
+        if self.parent is None:
+            return self.name
+        return '%s/%s' % (self.parent.path, self.name)
 
 
 class PerformanceRecorder:
 
-    def __init__(self):
-        self.record_map = {}
+    def __init__(self, max_trace_events: int = 100000):
+        """
+        性能记录器 线程安全
+        :param max_trace_events: 保留多少条区间明细用于导出 超过后丢弃最早的
+        """
+        self.record_map: dict[str, PerformanceRecord] = {}
+        self.trace_events: Deque[Tuple[str, int, int, int, int, int]] = deque(maxlen=max_trace_events)
+        """区间明细 (名称, 线程, 开始纳秒, 耗时纳秒, 区间id, 父区间id)"""
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._span_id: int = 0
+        self._start_ns: int = time.perf_counter_ns()
 
     def record(self, id: str, t: float):
         """
         记录一个耗时
         :param id:
-        :param t:
+        :param t: 耗时 秒
         :return:
         """
-        if id not in self.record_map:
-            self.record_map[id] = PerformanceRecord(id)
+        with self._lock:
+            if id not in self.record_map:
+                self.record_map[id] = PerformanceRecord(id)
 
-        self.record_map[id].add(t)
+            self.record_map[id].add(t)
 
     def get_record(self, id: str):
-        return self.record_map[id] if id in self.record_map else PerformanceRecord(id)
+        with self._lock:
+            return self.record_map[id] if id in self.record_map else PerformanceRecord(id)
+
+    def span_stack(self) -> List[PerformanceSpan]:
+        """
+        当前线程正在执行的区间
+        :return:
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def current_span(self) -> Optional[PerformanceSpan]:
+        """
+        当前线程正在执行的区间 用于提交到线程池前传递父区间
+        :return:
+        """
+        stack = self.span_stack()
+        return stack[-1] if len(stack) > 0 else None
+
+    def next_span_id(self) -> int:
+        with self._lock:
+            self._span_id += 1
+            return self._span_id
+
+    def span(self, name: str, parent: Optional[PerformanceSpan] = None) -> PerformanceSpan:
+        return PerformanceSpan(self, name, parent=parent)
+
+    def add_span(self, span: PerformanceSpan):
+        """
+        记录一个已结束的区间
+        :param span:
+        :return:
+        """
+        duration_ns = span.duration_ns
+        with self._lock:
+            if span.name not in self.record_map:
+                self.record_map[span.name] = PerformanceRecord(span.name)
+            self.record_map[span.name].add(duration_ns / 1e9)
+            self.trace_events.append((span.name, span.tid, span.start_ns, duration_ns,
+                                      span.span_id, span.parent.span_id if span.parent is not None else 0))
+
+    def snapshot(self) -> List[dict]:
+        """
+        当前所有记录的快照 可供界面轮询展示
+        :return: 每个记录的统计 按总耗时倒序
+        """
+        with self._lock:
+            data = [r.to_dict() for r in self.record_map.values()]
+        return sorted(data, key=lambda x: x['total'], reverse=True)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        转化成 Chrome Trace Event 格式 可用 chrome://tracing 、 Perfetto 或 speedscope 打开
+        :return:
+        """
+        with self._lock:
+            events = list(self.trace_events)
+        pid = os.getpid()
+        trace_events = []
+        for name, tid, start_ns, duration_ns, span_id, parent_id in events:
+            trace_events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (start_ns - self._start_ns) / 1000,
+                'dur': duration_ns / 1000,
+                'pid': pid,
+                'tid': tid,
+                'args': {'id': span_id, 'parent': parent_id}
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, path: str):
+        """
+        保存 Chrome Trace 文件
+        :param path: 文件路径
+        :return:
+        """
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_chrome_trace(), file)
+
+    def clear(self):
+        with self._lock:
+            self.record_map.clear()
+            self.trace_events.clear()
 
 
 recorder = PerformanceRecorder()
@@ -65,12 +305,46 @@ def add_record(id: str, t: float):
     recorder.record(id, t)
 
 
+def span(name: str, parent: Optional[PerformanceSpan] = None) -> PerformanceSpan:
+    """
+    统计一段代码的耗时
+    :param name: 名称
+    :param parent: 父区间 跨线程时传入
+    :return:
+    """
+    return recorder.span(name, parent=parent)
+
+
+def current_span() -> Optional[PerformanceSpan]:
+    return recorder.current_span()
+
+
+def bind_current_span(func):
+    """
+    将当前线程的区间绑定到函数上 函数提交到线程池执行时 内部的区间仍会记录在当前区间下
+    :param func: 需要提交到其他线程的函数
+    :return:
+    """
+    parent = recorder.current_span()
+    if parent is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = recorder.span_stack()
+        stack.append(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stack.remove(parent)
+    return wrapper
+
+
 def record_performance(func):
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        t1 = time.time()
-        result = func(*args, **kwargs)
-        add_record(func.__name__, time.time() - t1)
-        return result
+        with recorder.span(func.__name__):
+            return func(*args, **kwargs)
     return wrapper
 
 
@@ -78,11 +352,21 @@ def get(id: str):
     return recorder.get_record(id)
 
 
+def get_snapshot() -> List[dict]:
+    """
+    获取当前性能统计快照
+    :return:
+    """
+    return recorder.snapshot()
+
+
 def log_all_performance():
-    for v in recorder.record_map.values():
-        log.debug(str(v))
+    for v in recorder.snapshot():
+        log.debug(str(recorder.get_record(v['id'])))
 
     save_performance_record()
+    save_performance_trace()
+
 
 def save_performance_record():
     """
@@ -96,8 +380,20 @@ def save_performance_record():
     memory_info = psutil.virtual_memory()
     data['memory_total'] = f"{memory_info.total / (1024.0 ** 3)} GB"
     data['memory_used'] = f"{memory_info.used / (1024.0 ** 3)} GB"
-    for k, v in recorder.record_map.items():
-        data['time_%s' % k] = v.avg
+    for v in recorder.snapshot():
+        data['time_%s' % v['id']] = v['avg']
+        data['p95_%s' % v['id']] = v['p95']
+        data['p99_%s' % v['id']] = v['p99']
 
     with open(path, 'w', encoding='utf-8') as file:
         yaml.dump(data, file)
+
+
+def save_performance_trace() -> str:
+    """
+    保存区间明细 用于在 chrome://tracing 或 speedscope 中查看
+    :return: 文件路径
+    """
+    path = os.path.join(os_utils.get_path_under_work_dir('.log'), 'performance_trace.json')
+    recorder.save_chrome_trace(path)
+    return path
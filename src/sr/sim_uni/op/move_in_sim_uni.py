@@ -76,7 +76,7 @@ class MoveDirectlyInSimUni(MoveDirectly):
         possible_pos = (last_pos.x, last_pos.y, move_distance)
         log.debug('准备计算人物坐标 使用上一个坐标为 %s 移动时间 %.2f 是否在移动 %s', possible_pos,
                   move_time, self.ctx.controller.is_moving)
-        lm_rect = large_map.get_large_map_rect_by_pos(self.lm_info.gray.shape, mm.shape[:2], possible_pos)
+        lm_rect = large_map.get_large_map_rect_by_pos(self.lm_info.shape, mm.shape[:2], possible_pos)
 
         mm_info = mini_map.analyse_mini_map(mm, self.ctx.im)
 
@@ -87,7 +87,8 @@ class MoveDirectlyInSimUni(MoveDirectly):
             next_pos = cal_pos.sim_uni_cal_pos(self.ctx.im, self.lm_info, mm_info,
                                                possible_pos=possible_pos,
                                                pos_to_cal_angle=self.start_pos,
-                                               lm_rect=lm_rect, running=self.ctx.controller.is_moving)
+                                               lm_rect=lm_rect, running=self.ctx.controller.is_moving,
+                                               scale_history=self.scale_history)
         except Exception:
             log.error('计算坐标出错', exc_info=True)
             next_pos = None
@@ -352,7 +353,7 @@ class MoveToNextLevel(StateOperation):
         """
         angle_to_turn = self._get_angle_to_turn(target)
         self.ctx.controller.turn_by_angle(angle_to_turn)
-        time.sleep(0.5)
+        self.wait_for_screen(timeout=0.5)  # 等待转向完成
         self.ctx.controller.start_moving_forward()
         self.start_move_time = time.time()
         self.is_moving = True
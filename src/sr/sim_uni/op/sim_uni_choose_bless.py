@@ -1,4 +1,3 @@
-import time
 from typing import Optional, List, ClassVar
 
 import cv2
@@ -219,7 +218,7 @@ class SimUniChooseBless(Operation):
             return Operation.round_retry('重置祝福', wait=1)
         else:
             self.ctx.controller.click(target_bless_pos.center)
-            time.sleep(0.25)
+            self.wait_for_screen(timeout=0.25)
             if self.before_level_start:
                 confirm_point = SimUniChooseBless.CONFIRM_BEFORE_LEVEL_BTN.center
             else:
@@ -310,7 +309,7 @@ class SimUniDropBless(StateOperation):
         bless_list = [bless.data for bless in bless_pos_list]
         target_idx: int = get_bless_by_priority(bless_list, self.config, can_reset=False, asc=False)
         self.ctx.controller.click(bless_pos_list[target_idx].center)
-        time.sleep(0.25)
+        self.wait_for_screen(timeout=0.25)
         self.ctx.controller.click(SimUniChooseBless.CONFIRM_BTN.center)
         return Operation.round_success(wait=1)
 
@@ -1,4 +1,3 @@
-import time
 from typing import Optional, ClassVar, List
 
 from cv2.typing import MatLike
@@ -86,7 +85,7 @@ class SimUniChooseCurio(StateOperation):
 
         target_curio_pos: Optional[MatchResult] = self._get_curio_to_choose(curio_pos_list)
         self.ctx.controller.click(target_curio_pos.center)
-        time.sleep(0.25)
+        self.wait_for_screen(timeout=0.25)
         self.ctx.controller.click(SimUniChooseCurio.CONFIRM_BTN.center)
         return Operation.round_success(wait=2)
 
@@ -277,7 +276,7 @@ class SimUniDropCurio(StateOperation):
 
         target_curio_pos: Optional[MatchResult] = self._get_curio_to_choose(curio_pos_list)
         self.ctx.controller.click(target_curio_pos.center)
-        time.sleep(0.25)
+        self.wait_for_screen(timeout=0.25)
         self.ctx.controller.click(SimUniChooseCurio.CONFIRM_BTN.center)
         return Operation.round_success(wait=1)
 
@@ -552,7 +552,7 @@ class SimUniRunEliteAfterRoute(StateOperation):
         lm_info = self.ctx.ih.get_large_map(self.route.region)
 
         possible_pos = (self.current_pos.x, self.current_pos.y, self.ctx.controller.run_speed)
-        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.gray.shape, mm.shape[:2], possible_pos)
+        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.shape, mm.shape[:2], possible_pos)
 
         next_pos = cal_pos.sim_uni_cal_pos(self.ctx.im, lm_info, mm_info,
                                            possible_pos=possible_pos,
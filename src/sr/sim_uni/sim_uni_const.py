@@ -1,8 +1,8 @@
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from basic import str_utils
-from basic.i18_utils import gt
+from basic.i18_utils import gt, gt_tuple
 
 
 class SimUniType(Enum):
@@ -115,14 +115,17 @@ def path_of(path_str: str) -> Optional[SimUniPath]:
     return None
 
 
+PATH_LIST: List[SimUniPath] = [path for path in SimUniPath]
+PATH_NAME_TUPLE: Tuple[str, ...] = tuple(path.value for path in PATH_LIST)
+
+
 def match_best_path_by_ocr(path_ocr: str) -> Optional[SimUniPath]:
-    path_list = [path for path in SimUniPath]
-    target_path_list = [gt(path.value, 'ocr') for path in SimUniPath]
+    target_path_list = gt_tuple(PATH_NAME_TUPLE, 'ocr')
     idx = str_utils.find_best_match_by_lcs(path_ocr, target_path_list)
     if idx is None:
         return None
     else:
-        return path_list[idx]
+        return PATH_LIST[idx]
 
 
 class SimUniBlessLevel(Enum):
@@ -413,6 +416,12 @@ for _bless_enum in SimUniBlessEnum:
 
     PATH_BLESS_LIST[_path.value].append(_bless)
 
+# 每个命途下 除命途本身外的祝福名称 顺序与 PATH_BLESS_LIST 一致
+PATH_BLESS_TITLE_TUPLE: dict[str, Tuple[str, ...]] = {
+    path: tuple(bless.title for bless in bless_list if bless.title != bless.path.value)
+    for path, bless_list in PATH_BLESS_LIST.items()
+}
+
 
 def match_best_bless_by_ocr(title_ocr: str, path_ocr: str) -> Optional[SimUniBless]:
     """
@@ -426,7 +435,7 @@ def match_best_bless_by_ocr(title_ocr: str, path_ocr: str) -> Optional[SimUniBle
         return None
 
     bless_list = PATH_BLESS_LIST[path.value]
-    target_title_list = [gt(bless.title, 'ocr') for bless in bless_list if bless.title != bless.path.value]
+    target_title_list = gt_tuple(PATH_BLESS_TITLE_TUPLE[path.value], 'ocr')
 
     idx = str_utils.find_best_match_by_lcs(title_ocr, target_title_list)
     if idx is None:  # 未录入的祝福
@@ -521,13 +530,16 @@ class SimUniCurioEnum(Enum):
     CURIO_060 = SimUniCurio('粉红冲撞', 'fhcz')
 
 
+CURIO_NAME_TUPLE: Tuple[str, ...] = tuple(c.value.name for c in SimUniCurioEnum.__members__.values())
+
+
 def match_best_curio_by_ocr(name_ocr: str) -> Optional[SimUniCurio]:
     """
     根据OCR结果，匹配一个最合适的奇物
     :param name_ocr: OCR得到的奇物名称
     :return:
     """
-    target_list = [gt(c.value.name, 'ocr') for c in SimUniCurioEnum.__members__.values()]
+    target_list = gt_tuple(CURIO_NAME_TUPLE, 'ocr')
     idx = str_utils.find_best_match_by_lcs(name_ocr, target_list)
     if idx is not None:
         return SimUniCurioEnum['CURIO_%03d' % idx].value
@@ -1,4 +1,3 @@
-import time
 from typing import List, Callable, Optional, ClassVar
 
 from basic.i18_utils import gt
@@ -132,7 +131,7 @@ class ChallengeTreasuresLightwardMission(StateOperation):
         ]
 
         self.ctx.controller.click(node_to_click_list[self.current_node_idx].rect.center)
-        time.sleep(1)
+        self.wait_for_screen(timeout=1)
 
         opt_list = [
             ScreenTreasuresLightWard.PF_CACOPHONY_OPT_1.value,
@@ -141,7 +140,7 @@ class ChallengeTreasuresLightwardMission(StateOperation):
         ]
 
         self.ctx.controller.click(opt_list[self.current_node_idx].rect.center)
-        time.sleep(0.25)
+        self.wait_for_area(ScreenTreasuresLightWard.PF_CACOPHONY_CONFIRM.value, timeout=0.25)
 
         click = self.find_and_click_area(ScreenTreasuresLightWard.PF_CACOPHONY_CONFIRM.value)
 
@@ -1,3 +1,6 @@
+import random
+
+import test
 from basic import str_utils
 
 
@@ -5,5 +8,51 @@ def _test_find_by_lcs():
     print(str_utils.find_by_lcs('Artisanship Commission', 'Artisanship Commi55Ion', 0.7))
 
 
+def _lcs_by_dp(str1: str, str2: str) -> int:
+    """
+    动态规划求最长公共子序列长度 作为位并行实现的对照
+    """
+    m = len(str1)
+    n = len(str2)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if str1[i - 1] == str2[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    return dp[m][n]
+
+
+class TestStrUtils(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_longest_common_subsequence_length(self):
+        self.assertEqual(0, str_utils.longest_common_subsequence_length('', 'abc'))
+        self.assertEqual(3, str_utils.longest_common_subsequence_length('开始挑战', '开始挑'))
+        self.assertTrue(str_utils.find_by_lcs('Artisanship Commission', 'Artisanship Commi55Ion', 0.7))
+
+        rnd = random.Random(0)
+        for _ in range(500):
+            str1 = ''.join(rnd.choice('abcd') for _ in range(rnd.randint(0, 80)))  # 超过64位
+            str2 = ''.join(rnd.choice('abcde') for _ in range(rnd.randint(0, 80)))
+            self.assertEqual(_lcs_by_dp(str1, str2), str_utils.longest_common_subsequence_length(str1, str2))
+
+    def test_lcs_matcher(self):
+        word_list = ['开始挑战', '', '退出关卡', '再来一次', 'Confirm']
+        matcher = str_utils.LcsMatcher(word_list, ignore_case=True)
+        for text in ['开始挑', '再来一次退出', 'CONFIRM', '无关']:
+            self.assertEqual([_lcs_by_dp(w.lower(), text.lower()) for w in word_list], matcher.lcs_list(text))
+
+        self.assertEqual((3, 1), matcher.find_best_match_with_percent('再来一次'))
+        self.assertEqual(4, matcher.find_best_match('confirn'))
+        self.assertIsNone(matcher.find_best_match('开始', lcs_percent_threshold=0.8))
+        self.assertIsNone(matcher.find_best_match('无'))
+
+        self.assertIs(str_utils.get_lcs_matcher(word_list), str_utils.get_lcs_matcher(list(word_list)))
+
+
 if __name__ == '__main__':
-    _test_find_by_lcs()
\ No newline at end of file
+    _test_find_by_lcs()
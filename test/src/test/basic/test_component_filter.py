@@ -0,0 +1,103 @@
+import os
+
+import cv2
+import numpy as np
+
+import test
+from basic import os_utils, Point
+from basic.img import cv2_utils, component_filter
+
+
+def _fill_small_holes_by_loop(mask, threshold: int, connectivity: int):
+    """
+    原来的实现 每个标签比较一次整张图 作为对照
+    """
+    mask = mask.copy()
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(cv2.bitwise_not(mask), connectivity=connectivity)
+    for label in range(1, num_labels):
+        if stats[label, cv2.CC_STAT_AREA] < threshold:
+            mask[labels == label] = 255
+    return mask
+
+
+def _remove_small_components_by_loop(mask, threshold: int, connectivity: int):
+    mask = mask.copy()
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=connectivity)
+    for label in range(1, num_labels):
+        if stats[label, cv2.CC_STAT_AREA] < threshold:
+            mask[labels == label] = 0
+    return mask
+
+
+def _select_large_by_loop(mask, threshold: int, connectivity: int):
+    num_labels, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=connectivity)
+    result = np.zeros(mask.shape[:2], dtype=np.uint8)
+    for label in range(1, num_labels):
+        if stats[label, cv2.CC_STAT_AREA] > threshold:
+            result[labels == label] = 255
+    return result
+
+
+class TestComponentFilter(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def _assert_same(self, expected, actual):
+        self.assertEqual(expected.shape, actual.shape)
+        self.assertTrue(np.array_equal(expected, actual))
+
+    def test_road_mask_same_as_loop(self):
+        """
+        大地图和小地图的道路掩码 与原来逐个标签处理的结果一致
+        """
+        map_dir = os_utils.get_path_under_work_dir('images', 'map', 'P01_KJZHT')
+        mm_dir = os.path.join(os_utils.get_path_under_work_dir('test', 'resources', 'images', 'cal_pos'),
+                              'P01_KJZHT', 'R03_SRCD_B1')
+        case_list = [
+            (cv2_utils.read_image(os.path.join(map_dir, 'R01_ZKCD', 'origin.png')), 500),
+            (cv2_utils.read_image(os.path.join(map_dir, 'R03_SRCD_B1', 'origin.png')), 500),
+            (cv2_utils.read_image(os.path.join(mm_dir, '1.png')), 200),
+            (cv2_utils.read_image(os.path.join(mm_dir, '2.png')), 200),
+        ]
+        for image, large_threshold in case_list:
+            road_mask = cv2.inRange(image, np.array([45, 45, 45], dtype=np.uint8), np.array([100, 100, 100], dtype=np.uint8))
+
+            expected = _fill_small_holes_by_loop(road_mask, 50, 4)
+            actual = component_filter.fill_small_holes(road_mask, 50, connectivity=4)
+            self._assert_same(expected, actual)
+
+            self._assert_same(_select_large_by_loop(expected, large_threshold, 4),
+                              component_filter.select_components(actual, connectivity=4, min_area=large_threshold + 1))
+
+    def test_arrow_mask_same_as_loop(self):
+        mm = cv2_utils.read_image(os.path.join(os_utils.get_path_under_work_dir('test', 'resources', 'images', 'mini_map'),
+                                               'mm_arrow.png'))
+        _, mask = cv2.threshold(cv2.cvtColor(mm, cv2.COLOR_BGR2GRAY), 180, 255, cv2.THRESH_BINARY)
+        self._assert_same(_remove_small_components_by_loop(mask, 50, 8),
+                          component_filter.remove_small_components(mask, 50, connectivity=8))
+        self._assert_same(_remove_small_components_by_loop(mask, 50, 8),
+                          cv2_utils.connection_erase(mask, threshold=50))
+
+    def test_select_by_box_and_seed(self):
+        mask = np.zeros((50, 50), dtype=np.uint8)
+        mask[0:5, 0:20] = 255  # 宽20 高5
+        mask[10:30, 10:15] = 255  # 宽5 高20
+        mask[40:45, 40:45] = 255  # 宽5 高5
+
+        result = component_filter.select_components(mask, min_width=10)
+        self.assertEqual(255, result[2, 2])
+        self.assertEqual(0, result[20, 12])
+
+        result = component_filter.select_components(mask, max_width=5, max_height=5)
+        self.assertEqual(255, result[42, 42])
+        self.assertEqual(0, result[20, 12])
+
+        result = component_filter.select_components(mask, seed_point_list=[Point(12, 20), Point(100, 100)])
+        self.assertEqual(255, result[20, 12])
+        self.assertEqual(1, len(np.unique(cv2.connectedComponents(result)[1])) - 1)
+
+        seed_mask = np.zeros_like(mask)
+        seed_mask[44, 44] = 255
+        result = component_filter.select_components(mask, seed_mask=seed_mask)
+        self.assertEqual(255 * 25, int(np.sum(result, dtype=np.int64)))
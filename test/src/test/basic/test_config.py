@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import yaml
+
+import test
+from basic import config, os_utils
+from basic.config import ConfigHolder
+
+
+class TestConfigHolder(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def tearDown(self):
+        shutil.rmtree(os_utils.get_path_under_work_dir('config', '_test_config'), ignore_errors=True)
+
+    def test_write_behind(self):
+        holder = ConfigHolder('write_behind', sample=False, sub_dir=['_test_config'], write_behind=True)
+        for i in range(5):
+            holder.update('cnt', i)
+        self.assertFalse(os.path.exists(holder.config_file_path))  # 还没写入
+
+        config.flush_all()
+        with open(holder.config_file_path, 'r', encoding='utf-8') as file:
+            self.assertEqual({'cnt': 4}, yaml.safe_load(file))
+        self.assertFalse(os.path.exists(holder.config_file_path + '.tmp'))
+
+        holder.update('cnt', 5)
+        holder.refresh()  # 重新读取前会先写入
+        self.assertEqual(5, holder.get('cnt'))
+
+    def test_save_immediately(self):
+        holder = ConfigHolder('save_immediately', sample=False, sub_dir=['_test_config'])
+        holder.update('cnt', 1)
+        with open(holder.config_file_path, 'r', encoding='utf-8') as file:
+            self.assertEqual({'cnt': 1}, yaml.safe_load(file))
+
+    def test_delete_drops_pending_write(self):
+        holder = ConfigHolder('delete_pending', sample=False, sub_dir=['_test_config'], write_behind=True)
+        holder.update('cnt', 1)
+        config.flush_all()
+        self.assertTrue(os.path.exists(holder.config_file_path))
+
+        holder.update('cnt', 2)
+        holder.delete()
+        config.flush_all()  # 定时写入或退出时写入 都不能把删除的文件写回来
+        self.assertFalse(os.path.exists(holder.config_file_path))
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+import test
+from basic.img.os import DebugImageWriter, get_debug_image_path
+
+
+class TestDebugImageWriter(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_write_and_budget(self):
+        image = np.random.default_rng(0).integers(0, 255, (50, 50, 3), dtype=np.uint8)
+        writer = DebugImageWriter(save_as_npy=True, max_disk_mb=0)  # 超出预算 只保留最后一张
+        name_list = ['_test_debug_writer_%d' % i for i in range(3)]
+        try:
+            for name in name_list:
+                self.assertTrue(writer.put(image, name))
+            writer.flush()
+
+            self.assertEqual(3, writer.written_cnt)
+            self.assertEqual(2, writer.removed_cnt)
+            self.assertFalse(os.path.exists(get_debug_image_path(name_list[0], '.npy')))
+            self.assertTrue(np.array_equal(image, np.load(get_debug_image_path(name_list[2], '.npy'))))
+        finally:
+            for name in name_list:
+                path = get_debug_image_path(name, '.npy')
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def test_drop_when_full(self):
+        writer = DebugImageWriter(max_queue_size=1)
+        writer._thread = object()  # 不启动后台线程 模拟写入很慢
+        image = np.zeros((5, 5, 3), dtype=np.uint8)
+        self.assertTrue(writer.put(image, '_test_drop_0'))
+        self.assertFalse(writer.put(image, '_test_drop_1'))
+        self.assertEqual(1, writer.dropped_cnt)
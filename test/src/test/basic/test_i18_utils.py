@@ -0,0 +1,24 @@
+import test
+from basic import i18_utils
+
+
+class TestI18Utils(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_gt_tuple(self):
+        origin_lang = i18_utils.get_default_lang()
+        msg_tuple = ('确认', '取消')
+        try:
+            i18_utils.update_default_lang('cn')
+            cn_tuple = i18_utils.gt_tuple(msg_tuple, 'ocr')
+            self.assertEqual(('确认', '取消'), cn_tuple)
+            self.assertIs(cn_tuple, i18_utils.gt_tuple(msg_tuple, 'ocr'))
+
+            i18_utils.update_default_lang('en')  # 切换语言后重新翻译
+            en_tuple = i18_utils.gt_tuple(msg_tuple, 'ocr')
+            self.assertEqual(tuple(i18_utils.gt(msg, 'ocr', 'en') for msg in msg_tuple), en_tuple)
+            self.assertEqual('Confirm', en_tuple[0])
+        finally:
+            i18_utils.update_default_lang(origin_lang)
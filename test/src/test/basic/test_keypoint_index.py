@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+
+import test
+from basic import Rect, Point, cal_utils
+from basic.img.keypoint_index import KeypointIndex
+
+
+class TestKeypointIndex(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_query(self):
+        rng = np.random.default_rng(0)
+        pts = rng.uniform(0, 500, size=(2000, 2))
+        kps = [cv2.KeyPoint(x=float(p[0]), y=float(p[1]), size=1) for p in pts]
+        desc = rng.random((len(kps), 128), dtype=np.float32)
+        index = KeypointIndex(kps, desc, cell_size=32)
+
+        for rect in [Rect(0, 0, 500, 500), Rect(100, 120, 260, 300), Rect(64, 64, 64, 64), Rect(600, 600, 700, 700)]:
+            expected = [i for i, kp in enumerate(kps) if cal_utils.in_rect(Point(kp.pt[0], kp.pt[1]), rect)]
+            self.assertEqual(expected, sorted(index.query_idx(rect).tolist()))
+
+            sub_kps, sub_desc = index.query(rect)
+            self.assertEqual(len(expected), len(sub_kps))
+            self.assertEqual(len(expected), len(sub_desc))
+
+        all_kps, all_desc = index.query(None)
+        self.assertEqual(len(kps), len(all_kps))
+
+    def test_flann(self):
+        rng = np.random.default_rng(1)
+        kps = [cv2.KeyPoint(x=float(i), y=float(i), size=1) for i in range(200)]
+        desc = rng.random((len(kps), 128), dtype=np.float32)
+        index = KeypointIndex(kps, desc)
+
+        matches = index.flann.knnMatch(desc[10:20], k=2)
+        self.assertEqual(list(range(10, 20)), [m[0].trainIdx for m in matches])
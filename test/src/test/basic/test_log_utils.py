@@ -0,0 +1,36 @@
+import logging
+
+import test
+from basic import log_utils
+
+
+class RecordListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.record_list = []
+
+    def emit(self, record):
+        self.record_list.append(record)
+
+
+class TestLogUtils(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def tearDown(self):
+        if log_utils._listener is None:  # 恢复全局日志
+            log_utils.get_logger()
+
+    def test_add_log_handler(self):
+        handler = RecordListHandler()
+        log_utils.add_log_handler(handler)
+        for i in range(1000):
+            log_utils.log.info('test_add_log_handler %d', i)
+
+        # 停止时处理完队列中剩余的日志
+        log_utils.stop_listener()
+        self.assertIsNone(log_utils._listener)
+        message_list = [r.getMessage() for r in handler.record_list if r.getMessage().startswith('test_add_log_handler')]
+        self.assertEqual(['test_add_log_handler %d' % i for i in range(1000)], message_list)
@@ -0,0 +1,37 @@
+import os
+
+import cv2
+import numpy as np
+
+import test
+from basic import os_utils
+from basic.img import cv2_utils
+
+
+class TestMatchTemplateInArea(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_same_as_full_match(self):
+        template_dir = os_utils.get_path_under_work_dir('images', 'template')
+        template = cv2_utils.read_image(os.path.join(template_dir, 'mm_tp_03', 'origin.png'))
+        mask = cv2_utils.read_image(os.path.join(template_dir, 'mm_tp_03', 'mask.png'))
+
+        rng = np.random.default_rng(0)
+        gray = rng.integers(40, 100, (300, 400), dtype=np.uint8)
+        source = cv2.merge([gray, gray, gray])
+        for x, y in [(20, 30), (300, 200), (349, 249)]:
+            source[y:y + template.shape[0], x:x + template.shape[1]] = template
+
+        area_mask = np.zeros(source.shape[:2], dtype=np.uint8)
+        area_mask[50:60, 40:50] = 255  # 只覆盖第1个
+        area_mask[299, 399] = 255  # 只覆盖第3个
+
+        expected = cv2_utils.match_template(source, template, 0.7, mask=mask, only_best=False, ignore_inf=True)
+        actual = cv2_utils.match_template_in_area(source, template, 0.7, area_mask, mask=mask, ignore_inf=True)
+        self.assertEqual(3, len(expected))
+        self.assertEqual([(20, 30), (349, 249)], [(r.x, r.y) for r in actual])
+        for r in actual:
+            e = [i for i in expected if i.x == r.x and i.y == r.y][0]
+            self.assertAlmostEqual(e.confidence, r.confidence, places=4)
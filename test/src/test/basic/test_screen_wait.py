@@ -0,0 +1,75 @@
+import numpy as np
+
+import test
+from basic import Rect
+from basic.img import screen_wait
+
+
+class FakeScreen:
+
+    def __init__(self, change_at: int, stable_at: int):
+        """
+        第 change_at 张截图开始变化 第 stable_at 张截图后稳定
+        """
+        self.change_at: int = change_at
+        self.stable_at: int = stable_at
+        self.cnt: int = 0
+
+    def screenshot(self):
+        self.cnt += 1
+        screen = np.zeros((100, 100, 3), dtype=np.uint8)
+        if self.cnt >= self.change_at:
+            value = min(self.cnt, self.stable_at) * 20
+            screen[10:50, 10:50] = value
+        return screen
+
+
+class TestScreenWait(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_wait_for_change(self):
+        fake = FakeScreen(change_at=3, stable_at=5)
+        result = screen_wait.wait_for_screen(fake.screenshot, timeout=2, min_interval=0.01, max_interval=0.02)
+        self.assertTrue(result.success)
+        self.assertGreater(result.frame_cnt, 6)  # 第5张后稳定 还需要保持一段时间
+        self.assertGreaterEqual(result.latency, 0.2)
+        self.assertLess(result.latency, 1)
+
+        fake = FakeScreen(change_at=3, stable_at=5)  # 变化的区域不在关心的范围
+        result = screen_wait.wait_for_screen(fake.screenshot, rects=[Rect(60, 60, 100, 100)],
+                                             timeout=0.2, min_interval=0.01, max_interval=0.02)
+        self.assertFalse(result.success)
+        self.assertGreaterEqual(result.latency, 0.2)
+
+    def test_pause_in_animation(self):
+        values = [0, 0, 20, 40, 40, 60, 80]  # 动画中间停顿了一张
+
+        def screenshot():
+            screen = np.zeros((100, 100, 3), dtype=np.uint8)
+            screen[10:50, 10:50] = values.pop(0) if len(values) > 1 else values[0]
+            return screen
+
+        result = screen_wait.wait_for_screen(screenshot, timeout=2, min_interval=0.01, max_interval=0.02)
+        self.assertTrue(result.success)
+        self.assertEqual(80, result.screen[20, 20, 0])  # 停顿时没有提前返回
+
+    def test_wait_for_predicate(self):
+        fake = FakeScreen(change_at=3, stable_at=5)
+        checked = []
+
+        def predicate(screen) -> bool:
+            checked.append(fake.cnt)
+            return screen[20, 20, 0] >= 80
+
+        result = screen_wait.wait_for_screen(fake.screenshot, predicate=predicate,
+                                             timeout=2, min_interval=0.01, max_interval=0.02)
+        self.assertTrue(result.success)
+        self.assertEqual([1, 3, 4], checked)  # 第2张没有变化 不需要判断
+
+    def test_stop(self):
+        fake = FakeScreen(change_at=100, stable_at=100)
+        result = screen_wait.wait_for_screen(fake.screenshot, timeout=5, should_stop=lambda: fake.cnt >= 2)
+        self.assertFalse(result.success)
+        self.assertLess(result.latency, 1)
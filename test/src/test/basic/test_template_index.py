@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import numpy as np
+
+import test
+from basic.img.template_index import TemplateFeatureIndex
+
+
+class TestTemplateIndex(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_vote(self):
+        rng = np.random.default_rng(0)
+        desc_list = [rng.integers(0, 255, (30, 128)).astype(np.float32) for _ in range(3)]
+        index = TemplateFeatureIndex.from_desc_list(['a', 'b', 'c', 'd'], desc_list + [None])
+
+        query_1 = desc_list[1][:10] + rng.normal(0, 1, (10, 128)).astype(np.float32)
+        query_2 = desc_list[2][5:20] + rng.normal(0, 1, (15, 128)).astype(np.float32)
+        result = index.vote([query_1, None, query_2])
+        self.assertEqual([1], result[0])
+        self.assertEqual([], result[1])
+        self.assertEqual([2], result[2])
+
+    def test_save_and_load(self):
+        rng = np.random.default_rng(0)
+        desc_list = [rng.integers(0, 255, (10, 128)).astype(np.float32) for _ in range(2)]
+        index = TemplateFeatureIndex.from_desc_list(['a', 'b'], desc_list, source_hash='abc')
+
+        file_path = os.path.join(tempfile.mkdtemp(), 'index.npz')
+        self.assertIsNone(TemplateFeatureIndex.load(file_path))
+        index.save(file_path)
+        loaded = TemplateFeatureIndex.load(file_path)
+        self.assertEqual(['a', 'b'], loaded.template_id_list)
+        self.assertEqual('abc', loaded.source_hash)
+        self.assertTrue(np.array_equal(index.desc, loaded.desc))
+        self.assertEqual([1], loaded.vote([desc_list[1]])[0])
+        os.remove(file_path)
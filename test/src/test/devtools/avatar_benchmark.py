@@ -0,0 +1,111 @@
+import os
+import sys
+from typing import List, Optional, Tuple
+
+import cv2
+from cv2.typing import MatLike
+
+from basic import os_utils
+from basic.img import cv2_utils
+from basic.log_utils import log
+from sr.const.character_const import Character, CHARACTER_LIST, RUANMEI, TINGYUN, JINGLIU, LUOCHA, HERTA, \
+    DANHENGIMBIBITORLUNAE
+from sr.image.image_holder import ImageHolder
+from sr.operation.unit.team import match_character_by_avatar
+from sr.screen_area.screen_normal_world import ScreenNormalWorld
+from test.devtools.benchmark import Benchmark
+
+AVATAR_AREA_LIST = [
+    ScreenNormalWorld.TEAM_MEMBER_AVATAR_1.value,
+    ScreenNormalWorld.TEAM_MEMBER_AVATAR_2.value,
+    ScreenNormalWorld.TEAM_MEMBER_AVATAR_3.value,
+    ScreenNormalWorld.TEAM_MEMBER_AVATAR_4.value,
+]
+
+
+def _match_by_loop(ih: ImageHolder, part_list: List[MatLike]) -> List[Optional[Character]]:
+    """
+    原来的实现 每个头像逐个角色做特征匹配 作为对照
+    """
+    result_list = []
+    for part in part_list:
+        source_kps, source_desc = cv2_utils.feature_detect_and_compute(part)
+        result = None
+        for character in CHARACTER_LIST:
+            template = ih.get_character_avatar_template(character.id)
+            mr = cv2_utils.feature_match_for_one(source_kps, source_desc,
+                                            template.kps, template.desc,
+                                            template.origin.shape[1], template.origin.shape[0])
+            if mr is not None:
+                result = character
+                break
+        result_list.append(result)
+    return result_list
+
+
+def _get_screen(*sub_path: str) -> MatLike:
+    return cv2_utils.read_image(os.path.join(os_utils.get_path_under_work_dir('test', 'resources'), *sub_path))
+
+
+def make_case_list(ih: ImageHolder) -> List[Tuple[str, List[MatLike], List[Character]]]:
+    """
+    组队截图中的真实头像 加上把每个角色的头像模板贴到队伍位置上的合成样例 覆盖全部角色
+    :param ih: 图片加载器
+    :return: (样例id, 4个头像截图, 答案)
+    """
+    case_list = []
+    members_1 = _get_screen('sr', 'operation', 'unit', 'test_team', 'members_1.png')
+    members_2 = _get_screen('sr', 'operation', 'unit', 'test_get_team_member_in_world', '1.png')
+    for case_id, screen, answer in [
+        ('members_1', members_1, [RUANMEI, TINGYUN, JINGLIU, LUOCHA]),
+        ('members_2', members_2, [TINGYUN, LUOCHA, HERTA, DANHENGIMBIBITORLUNAE]),
+    ]:
+        case_list.append((case_id, [cv2_utils.crop_image_only(screen, a.rect) for a in AVATAR_AREA_LIST], answer))
+
+    for start in range(0, len(CHARACTER_LIST), 4):
+        screen = members_1.copy()
+        answer = CHARACTER_LIST[start:start + 4]
+        for character, area in zip(answer, AVATAR_AREA_LIST):
+            template = ih.get_character_avatar_template(character.id)
+            height = area.rect.height
+            width = min(area.rect.width, template.origin.shape[1] * height // template.origin.shape[0])
+            avatar = cv2.resize(template.origin, (width, height))
+            screen[area.rect.y1:area.rect.y1 + height, area.rect.x1:area.rect.x1 + width] = avatar
+        case_list.append(('roster_%02d' % start,
+                          [cv2_utils.crop_image_only(screen, a.rect) for a in AVATAR_AREA_LIST[:len(answer)]],
+                          answer))
+
+    return case_list
+
+
+def run_avatar_benchmark(round_cnt: int = 3) -> Benchmark:
+    """
+    分别使用逐个角色匹配和头像索引 识别队伍头像
+    :param round_cnt: 重复次数
+    :return:
+    """
+    ih = ImageHolder()
+    ih.get_character_avatar_index()  # 预热 对应实际使用时复用的情况
+    for character in CHARACTER_LIST:
+        ih.get_character_avatar_template(character.id)
+
+    benchmark = Benchmark('avatar')
+    case_list = make_case_list(ih)
+    for i in range(round_cnt):
+        for case_id, part_list, answer in case_list:
+            benchmark.run_case('avatar_by_loop', '%s_%d' % (case_id, i),
+                               lambda: _match_by_loop(ih, part_list),
+                               lambda result: result == answer)
+            benchmark.run_case('avatar_by_index', '%s_%d' % (case_id, i),
+                               lambda: match_character_by_avatar(ih, part_list),
+                               lambda result: result == answer)
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python avatar_benchmark.py
+    # 对比逐个角色匹配和头像索引的准确率和耗时
+    result = run_avatar_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
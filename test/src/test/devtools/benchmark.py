@@ -0,0 +1,189 @@
+import json
+import os
+import time
+from typing import Callable, Any, Optional, List
+
+from basic import os_utils
+from basic.log_utils import log
+from sr.performance_recorder import PerformanceRecord
+
+
+class BenchmarkStage:
+
+    def __init__(self, name: str):
+        """
+        基准测试的一个阶段 统计准确率和耗时分位数
+        :param name: 阶段名称
+        """
+        self.name: str = name
+        self.record: PerformanceRecord = PerformanceRecord(name)
+        self.success_cnt: int = 0
+        self.fail_case_list: List[str] = []
+
+    def add(self, case_id: str, correct: bool, t: float):
+        """
+        增加一个样例结果
+        :param case_id: 样例id
+        :param correct: 结果是否正确
+        :param t: 耗时 秒
+        :return:
+        """
+        self.record.add(t)
+        if correct:
+            self.success_cnt += 1
+        else:
+            self.fail_case_list.append(case_id)
+
+    @property
+    def cnt(self) -> int:
+        return self.record.cnt
+
+    @property
+    def accuracy(self) -> float:
+        return self.success_cnt / self.cnt if self.cnt > 0 else 0
+
+    def to_dict(self) -> dict:
+        data = self.record.to_dict()
+        data['accuracy'] = self.accuracy
+        data['fail_case_list'] = self.fail_case_list
+        return data
+
+
+class Benchmark:
+
+    def __init__(self, name: str):
+        """
+        离线基准测试 按阶段记录每个样例的正确性和耗时
+        :param name: 名称 用于保存结果文件
+        """
+        self.name: str = name
+        self.stage_map: dict[str, BenchmarkStage] = {}
+
+    def get_stage(self, stage: str) -> BenchmarkStage:
+        if stage not in self.stage_map:
+            self.stage_map[stage] = BenchmarkStage(stage)
+        return self.stage_map[stage]
+
+    def run_case(self, stage: str, case_id: str,
+                 func: Callable[[], Any],
+                 check: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        执行一个样例
+        :param stage: 阶段名称
+        :param case_id: 样例id
+        :param func: 需要计时的函数
+        :param check: 判断结果是否正确 为空时只计时
+        :return: 函数的返回值 抛出异常时返回None
+        """
+        t1 = time.perf_counter_ns()
+        try:
+            result = func()
+        except Exception:
+            log.error('%s %s 执行出错', stage, case_id, exc_info=True)
+            self.get_stage(stage).add(case_id, False, (time.perf_counter_ns() - t1) / 1e9)
+            return None
+        t = (time.perf_counter_ns() - t1) / 1e9
+        correct = True if check is None else check(result)
+        self.get_stage(stage).add(case_id, correct, t)
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'time': os_utils.now_timestamp_str(),
+            'stages': {k: v.to_dict() for k, v in self.stage_map.items()}
+        }
+
+    def save(self, path: Optional[str] = None) -> str:
+        """
+        保存结果
+        :param path: 文件路径 为空时保存到 .debug/benchmark 下
+        :return: 文件路径
+        """
+        if path is None:
+            path = os.path.join(os_utils.get_path_under_work_dir('.debug', 'benchmark'),
+                                '%s_%s.json' % (self.name, os_utils.now_timestamp_str()))
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+        return path
+
+    def log_result(self):
+        for stage in self.stage_map.values():
+            log.info('[%s] 样例 %d 准确率 %.2f%% P50 %.2fms P95 %.2fms P99 %.2fms 最高 %.2fms',
+                     stage.name, stage.cnt, stage.accuracy * 100,
+                     stage.record.p50 * 1000, stage.record.p95 * 1000, stage.record.p99 * 1000,
+                     stage.record.max * 1000)
+            for case_id in stage.fail_case_list:
+                log.info('[%s] 错误样例 %s', stage.name, case_id)
+
+    def compare_with_baseline(self, baseline: dict,
+                              latency_tolerance: float = 0.2,
+                              accuracy_tolerance: float = 0) -> List[str]:
+        """
+        与基线对比
+        :param baseline: 基线结果 即之前保存的 to_dict
+        :param latency_tolerance: 允许P95耗时上涨的比例
+        :param accuracy_tolerance: 允许准确率下降的值
+        :return: 退化的描述 为空代表没有退化
+        """
+        regression_list: List[str] = []
+        current = self.to_dict()['stages']
+        for stage_name, base in baseline.get('stages', {}).items():
+            if stage_name not in current:
+                regression_list.append('%s 缺少该阶段' % stage_name)
+                continue
+            now = current[stage_name]
+            if now['accuracy'] < base['accuracy'] - accuracy_tolerance:
+                regression_list.append('%s 准确率下降 %.2f%% -> %.2f%%' %
+                                       (stage_name, base['accuracy'] * 100, now['accuracy'] * 100))
+            if base['p95'] > 0 and now['p95'] > base['p95'] * (1 + latency_tolerance):
+                regression_list.append('%s P95耗时上涨 %.2fms -> %.2fms' %
+                                       (stage_name, base['p95'] * 1000, now['p95'] * 1000))
+            new_fail = set(now['fail_case_list']) - set(base.get('fail_case_list', []))
+            for case_id in sorted(new_fail):
+                regression_list.append('%s 新增错误样例 %s' % (stage_name, case_id))
+        return regression_list
+
+
+def get_baseline_path(name: str) -> str:
+    """
+    基线文件的路径 跟随代码提交
+    :param name: 基准测试名称
+    :return:
+    """
+    return os.path.join(os_utils.get_path_under_work_dir('test', 'resources', 'benchmark'), '%s_baseline.json' % name)
+
+
+def load_baseline(name: str) -> Optional[dict]:
+    path = get_baseline_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def run_and_compare(benchmark: Benchmark, save_as_baseline: bool = False) -> bool:
+    """
+    输出结果 保存 并与基线对比
+    :param benchmark: 已执行完的基准测试
+    :param save_as_baseline: 是否把本次结果保存为基线
+    :return: 是否没有退化
+    """
+    benchmark.log_result()
+    path = benchmark.save()
+    log.info('结果已保存到 %s', path)
+
+    if save_as_baseline:
+        benchmark.save(get_baseline_path(benchmark.name))
+        log.info('已更新基线')
+        return True
+
+    baseline = load_baseline(benchmark.name)
+    if baseline is None:
+        log.info('未找到基线 跳过对比')
+        return True
+
+    regression_list = benchmark.compare_with_baseline(baseline)
+    for r in regression_list:
+        log.error('退化 %s', r)
+    return len(regression_list) == 0
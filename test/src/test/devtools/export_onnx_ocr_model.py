@@ -0,0 +1,70 @@
+import os
+import shutil
+import subprocess
+import sys
+from typing import List
+
+from basic import os_utils
+from basic.log_utils import log
+from sr.image import onnx_ocr_matcher
+
+PADDLE_MODEL_FILE_NAME: str = 'inference.pdmodel'
+PADDLE_PARAMS_FILE_NAME: str = 'inference.pdiparams'
+
+
+def get_export_cmd(model_name: str, opset_version: int = 11) -> List[str]:
+    """
+    使用 paddle2onnx 导出一个模型的命令
+    :param model_name: model 目录下的模型名称
+    :param opset_version: onnx 的算子集版本
+    :return:
+    """
+    model_dir = os_utils.get_path_under_work_dir('model', model_name)
+    return [sys.executable, '-m', 'paddle2onnx.command',
+            '--model_dir', model_dir,
+            '--model_filename', PADDLE_MODEL_FILE_NAME,
+            '--params_filename', PADDLE_PARAMS_FILE_NAME,
+            '--save_file', onnx_ocr_matcher.get_onnx_model_path(model_name),
+            '--opset_version', str(opset_version),
+            '--enable_onnx_checker', 'True']
+
+
+def export_model(model_name: str) -> bool:
+    """
+    把 model 目录下的 paddle 模型导出成 onnx 模型 保存在同一个目录
+    :param model_name: 模型名称
+    :return: 是否成功
+    """
+    model_dir = os_utils.get_path_under_work_dir('model', model_name)
+    if not os.path.exists(os.path.join(model_dir, PADDLE_PARAMS_FILE_NAME)):
+        log.error('%s 缺少 %s 请先使用 paddle 后端运行一次OCR 下载模型', model_name, PADDLE_PARAMS_FILE_NAME)
+        return False
+    process = subprocess.run(get_export_cmd(model_name), capture_output=True, text=True)
+    if process.returncode != 0:
+        log.error('导出 %s 失败 需要先安装 paddle2onnx %s', model_name, process.stderr[-2000:])
+        return False
+    log.info('导出 %s 成功', onnx_ocr_matcher.get_onnx_model_path(model_name))
+    return True
+
+
+def copy_character_dict() -> bool:
+    """
+    把 paddleocr 包里的字典文件复制到 model 目录 打包后没有 paddleocr 包时也能使用
+    :return: 是否成功
+    """
+    src_path = onnx_ocr_matcher.get_character_dict_path()
+    if src_path is None:
+        log.error('找不到 %s 需要先安装 paddleocr', onnx_ocr_matcher.CHAR_DICT_FILE_NAME)
+        return False
+    target_path = os.path.join(os_utils.get_path_under_work_dir('model'), onnx_ocr_matcher.CHAR_DICT_FILE_NAME)
+    if os.path.abspath(src_path) != os.path.abspath(target_path):
+        shutil.copyfile(src_path, target_path)
+    return True
+
+
+if __name__ == '__main__':
+    # pip install paddle2onnx 后运行 python export_onnx_ocr_model.py
+    success = copy_character_dict()
+    for name in [onnx_ocr_matcher.DET_MODEL_NAME, onnx_ocr_matcher.REC_MODEL_NAME]:
+        success = export_model(name) and success
+    sys.exit(0 if success else 1)
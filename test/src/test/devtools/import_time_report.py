@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+from typing import List
+
+from basic import os_utils
+from basic.log_utils import log
+
+
+class ImportTime:
+
+    def __init__(self, module: str, self_us: int, cumulative_us: int, depth: int):
+        """
+        一个模块的导入耗时 来自 python -X importtime
+        :param module: 模块名
+        :param self_us: 模块自身耗时 微秒
+        :param cumulative_us: 包含子模块的耗时 微秒
+        :param depth: 导入层级 0为最外层
+        """
+        self.module: str = module
+        self.self_us: int = self_us
+        self.cumulative_us: int = cumulative_us
+        self.depth: int = depth
+
+
+def parse_import_time(output: str) -> List[ImportTime]:
+    """
+    解析 -X importtime 的输出
+    :param output: 标准错误输出
+    :return:
+    """
+    result: List[ImportTime] = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        result.append(ImportTime(stripped, int(parts[0]), int(parts[1]), (len(name) - len(stripped) - 1) // 2))
+    return result
+
+
+def get_import_time(module: str) -> List[ImportTime]:
+    """
+    在新进程中导入模块并统计耗时
+    :param module: 模块名
+    :return: 导入失败时返回空列表
+    """
+    env = os.environ.copy()
+    src_path = os_utils.get_path_under_work_dir('src')
+    env['PYTHONPATH'] = src_path + os.pathsep + env.get('PYTHONPATH', '')
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+                             env=env, cwd=os_utils.get_work_dir(), capture_output=True, text=True)
+    if process.returncode != 0:
+        log.error('导入 %s 失败 %s', module, process.stderr[-2000:])
+        return []
+    return parse_import_time(process.stderr)
+
+
+def get_total_import_seconds(import_list: List[ImportTime]) -> float:
+    return sum(i.cumulative_us for i in import_list if i.depth == 0) / 1e6
+
+
+def log_report(module: str, top: int = 30):
+    """
+    输出导入耗时最多的模块
+    :param module: 模块名
+    :param top: 输出数量
+    :return:
+    """
+    import_list = get_import_time(module)
+    log.info('导入 %s 总耗时 %.3fs 共 %d 个模块', module, get_total_import_seconds(import_list), len(import_list))
+    for i in sorted(import_list, key=lambda x: x.cumulative_us, reverse=True)[:top]:
+        log.info('%8.1fms %8.1fms %s%s', i.cumulative_us / 1000, i.self_us / 1000, '  ' * i.depth, i.module)
+
+
+if __name__ == '__main__':
+    # python import_time_report.py [模块 默认 gui.app]
+    log_report(sys.argv[1] if len(sys.argv) > 1 else 'gui.app')
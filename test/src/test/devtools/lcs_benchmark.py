@@ -0,0 +1,95 @@
+import random
+import sys
+from typing import List, Optional, Tuple
+
+from basic import str_utils
+from basic.log_utils import log
+from sr.sim_uni.sim_uni_const import SimUniBlessEnum, SimUniCurioEnum
+from test.devtools.benchmark import Benchmark
+
+
+def _lcs_by_dp(str1: str, str2: str) -> int:
+    """
+    原来的动态规划实现 作为对照
+    """
+    m = len(str1)
+    n = len(str2)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if str1[i - 1] == str2[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    return dp[m][n]
+
+
+def _find_best_match_by_dp(word: str, target_word_list: List[str]) -> Optional[int]:
+    target_idx: Optional[int] = None
+    target_lcs_percent: Optional[float] = None
+    for idx, target_word in enumerate(target_word_list):
+        lcs = _lcs_by_dp(word, target_word)
+        if lcs == 0:
+            continue
+        lcs_percent = lcs * 1.0 / len(target_word)
+        if target_idx is None or lcs_percent > target_lcs_percent:
+            target_idx = idx
+            target_lcs_percent = lcs_percent
+    return target_idx
+
+
+def make_ocr_case_list(word_list: List[str], seed: int = 0) -> List[Tuple[str, int]]:
+    """
+    模拟OCR结果 每个词随机删掉一个字 再随机插入一个其它词里的字
+    :param word_list: 候选词列表
+    :param seed: 随机种子
+    :return: (模拟的OCR结果, 答案下标)
+    """
+    rnd = random.Random(seed)
+    all_char = ''.join(word_list)
+    case_list = []
+    for idx, word in enumerate(word_list):
+        chars = list(word)
+        if len(chars) > 2:
+            chars.pop(rnd.randrange(len(chars)))
+        chars.insert(rnd.randrange(len(chars) + 1), rnd.choice(all_char))
+        case_list.append((''.join(chars), idx))
+    return case_list
+
+
+def run_table(benchmark: Benchmark, table: str, word_list: List[str], round_cnt: int = 5):
+    """
+    同一个表格 分别使用动态规划和位并行匹配器
+    :param benchmark: 基准测试
+    :param table: 表格名称 作为阶段名前缀
+    :param word_list: 候选词列表
+    :param round_cnt: 重复次数
+    :return:
+    """
+    case_list = make_ocr_case_list(word_list)
+    str_utils.get_lcs_matcher(word_list)  # 预热 对应实际使用时复用的情况
+    for i in range(round_cnt):
+        for ocr_word, answer in case_list:
+            case_id = '%s_%d' % (word_list[answer], i)
+            benchmark.run_case('%s_dp' % table, case_id,
+                               lambda: _find_best_match_by_dp(ocr_word, word_list),
+                               lambda result: result == answer)
+            benchmark.run_case('%s_lcs_matcher' % table, case_id,
+                               lambda: str_utils.find_best_match_by_lcs(ocr_word, word_list),
+                               lambda result: result == answer)
+
+
+def run_lcs_benchmark() -> Benchmark:
+    benchmark = Benchmark('lcs')
+    run_table(benchmark, 'bless', [i.value.title for i in SimUniBlessEnum])
+    run_table(benchmark, 'curio', [i.value.name for i in SimUniCurioEnum])
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python lcs_benchmark.py
+    # 对比祝福、奇物表格上 动态规划和位并行的匹配耗时
+    result = run_lcs_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
@@ -0,0 +1,293 @@
+import sys
+import time
+from typing import List, Optional, Tuple, Dict
+
+import cv2
+from cv2.typing import MatLike
+
+from basic import Point, cal_utils
+from basic.log_utils import log
+from sr.app.sim_uni.sim_uni_route_holder import get_sim_uni_route_list
+from sr.app.world_patrol.world_patrol_route import WorldPatrolRoute, load_all_route_id
+from sr.const import map_const, operation_const
+from sr.context import get_context, Context
+from sr.image.sceenshot import MiniMapInfo, LargeMapInfo
+from sr.operation import OperationOneRoundResult
+from sr.operation.unit.move import MoveDirectly
+from sr.sim_uni.op.move_in_sim_uni import MoveDirectlyInSimUni
+from sr.sim_uni.sim_uni_const import SimUniLevelTypeEnum
+from sr.sim_uni.sim_uni_route import SimUniRoute, SimUniRouteOperation
+from test.devtools.benchmark import Benchmark
+from test.sr.control.sim_controller import SimController
+
+
+class _SimMoveRecorder:
+
+    def __init__(self, benchmark: Benchmark, case_id: str, *args, **kwargs):
+        """
+        记录每一轮的耗时和定位结果 以及每次脱困的耗时
+        需要和移动指令一起继承 放在移动指令之前
+        :param benchmark: 基准测试
+        :param case_id: 样例id
+        """
+        super().__init__(*args, **kwargs)
+        self.benchmark: Benchmark = benchmark
+        self.case_id: str = case_id
+        self.round_cnt: int = 0
+        self.last_cal_pos: Optional[Point] = None
+
+    def _execute_one_round(self) -> OperationOneRoundResult:
+        self.last_cal_pos = None
+        t1 = time.perf_counter()
+        result = super()._execute_one_round()
+        t = time.perf_counter() - t1
+
+        self.round_cnt += 1
+        real_pos = self.ctx.controller.last_screenshot_pos
+        if real_pos is not None:  # 有截图的轮次才统计 脱困失败等轮次不截图
+            correct = self.last_cal_pos is not None and cal_utils.distance_between(self.last_cal_pos, real_pos) <= 10
+            self.benchmark.get_stage('move_round').add('%s_%d' % (self.case_id, self.round_cnt), correct, t)
+            self.ctx.controller.last_screenshot_pos = None
+        return result
+
+    def move_in_stuck(self) -> Optional[OperationOneRoundResult]:
+        stuck_times = self.stuck_times
+        t1 = time.perf_counter()
+        result = super().move_in_stuck()
+        if self.stuck_times > stuck_times:  # 执行了 GetRidOfStuck
+            self.benchmark.get_stage('get_rid_of_stuck').add(
+                '%s_%d_%d' % (self.case_id, self.round_cnt + 1, self.stuck_times),
+                result is None, time.perf_counter() - t1)
+        return result
+
+    def cal_pos(self, mm: MatLike, now_time: float) -> Tuple[Optional[Point], MiniMapInfo]:
+        next_pos, mm_info = super().cal_pos(mm, now_time)
+        self.last_cal_pos = next_pos
+        return next_pos, mm_info
+
+
+class _SimMoveDirectly(_SimMoveRecorder, MoveDirectly):
+    pass
+
+
+class _SimMoveDirectlyInSimUni(_SimMoveRecorder, MoveDirectlyInSimUni):
+    pass
+
+
+def get_walkable_mask_dict(ctx: Context, lm_info: LargeMapInfo, start_pos: Point,
+                           op_list: List[dict], width: int = 15) -> Dict[str, MatLike]:
+    """
+    大地图的道路掩码不包含门、楼梯等位置 而路线上的每一段都是实际走得通的
+    因此在道路掩码上加上路线经过的线段 作为模拟器的可行走区域
+    :param ctx: 上下文
+    :param lm_info: 路线开始的大地图
+    :param start_pos: 路线开始的坐标
+    :param op_list: 路线的指令列表 锄大地和模拟宇宙的格式一致
+    :param width: 线段宽度
+    :return: 每层大地图的可行走区域 key为 prl_id
+    """
+    mask_dict: Dict[str, MatLike] = {}
+
+    def get_mask(lm_info: LargeMapInfo) -> MatLike:
+        if lm_info.region.prl_id not in mask_dict:
+            mask_dict[lm_info.region.prl_id] = lm_info.mask.copy()
+        return mask_dict[lm_info.region.prl_id]
+
+    current_pos: Point = start_pos
+    current_lm_info: LargeMapInfo = lm_info
+    get_mask(current_lm_info)
+    for route_item in op_list:
+        if route_item['op'] not in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE,
+                                    operation_const.OP_NO_POS_MOVE, operation_const.OP_UPDATE_POS]:
+            continue
+        next_pos = Point(route_item['data'][0], route_item['data'][1])
+        next_lm_info = current_lm_info
+        if len(route_item['data']) > 2 and route_item['op'] != operation_const.OP_NO_POS_MOVE:  # 无坐标移动的第3个参数是移动时间
+            next_lm_info = ctx.ih.get_large_map(
+                map_const.region_with_another_floor(current_lm_info.region, route_item['data'][2]))
+        if route_item['op'] != operation_const.OP_UPDATE_POS:
+            for lm_info in {current_lm_info.region.prl_id: current_lm_info, next_lm_info.region.prl_id: next_lm_info}.values():
+                cv2.line(get_mask(lm_info), current_pos.tuple(), next_pos.tuple(), 255, width)
+        current_pos = next_pos
+        current_lm_info = next_lm_info
+
+    return mask_dict
+
+
+def run_route(benchmark: Benchmark, ctx: Context, route: WorldPatrolRoute, turn_error: float = 0) -> List[int]:
+    """
+    在模拟器中执行一条路线的全部移动指令
+    :param benchmark: 基准测试
+    :param ctx: 上下文
+    :param route: 路线
+    :param turn_error: 转向误差
+    :return: 每段移动到达所用的轮数
+    """
+    current_pos: Point = route.tp.tp_pos
+    current_lm_info: LargeMapInfo = ctx.ih.get_large_map(route.tp.region)
+    walkable_mask_dict = get_walkable_mask_dict(ctx, current_lm_info, current_pos, route.route_list)
+    controller = SimController(ctx.im, ctx.game_config.mini_map_pos, current_lm_info, current_pos,
+                               walkable_mask=walkable_mask_dict.get(current_lm_info.region.prl_id),
+                               turn_error=turn_error)
+    ctx.controller = controller
+
+    round_list: List[int] = []
+    for idx, route_item in enumerate(route.route_list):
+        if route_item['op'] == operation_const.OP_UPDATE_POS:
+            current_pos = Point(route_item['data'][0], route_item['data'][1])
+            if len(route_item['data']) > 2:
+                current_lm_info = ctx.ih.get_large_map(
+                    map_const.region_with_another_floor(current_lm_info.region, route_item['data'][2]))
+            controller.set_large_map(current_lm_info, current_pos,
+                                     walkable_mask_dict.get(current_lm_info.region.prl_id))
+            continue
+        if route_item['op'] not in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE]:
+            continue
+
+        # 与 WorldPatrolRunRoute.move 保持一致
+        next_route_item = route.route_list[idx + 1] if idx + 1 < len(route.route_list) else None
+        target = Point(route_item['data'][0], route_item['data'][1])
+        next_lm_info: Optional[LargeMapInfo] = None
+        if len(route_item['data']) > 2:
+            next_lm_info = ctx.ih.get_large_map(
+                map_const.region_with_another_floor(current_lm_info.region, route_item['data'][2]))
+        stop_afterwards = not (next_route_item is not None and
+                               next_route_item['op'] in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE])
+
+        case_id = '%s_%02d' % (route.route_id.unique_id, idx)
+        op = _SimMoveDirectly(benchmark, case_id, ctx, current_lm_info, next_lm_info=next_lm_info,
+                              start=current_pos, target=target,
+                              stop_afterwards=stop_afterwards,
+                              no_run=route_item['op'] == operation_const.OP_SLOW_MOVE)
+        op_result = benchmark.run_case('move_directly', case_id, op.execute,
+                                       lambda result: result.success)
+        if op_result is None or not op_result.success:
+            break  # 后续的起点已经不对了
+
+        round_list.append(op.round_cnt)
+        current_pos = op_result.data
+        if next_lm_info is not None:  # 模拟器中无法走楼梯 到达后直接换层
+            current_lm_info = next_lm_info
+            controller.set_large_map(current_lm_info, walkable_mask=walkable_mask_dict.get(current_lm_info.region.prl_id))
+
+    ctx.controller.stop_moving_forward()
+    return round_list
+
+
+def run_sim_uni_route(benchmark: Benchmark, ctx: Context, route: SimUniRoute, turn_error: float = 0) -> List[int]:
+    """
+    在模拟器中执行一条模拟宇宙路线的全部移动指令
+    模拟器中没有怪物 不执行战斗相关的指令 无坐标移动直接更新到目标点
+    合成的小地图没有模拟宇宙的配色 定位准确率比实际低 只适合对比改动前后的结果
+    :param benchmark: 基准测试
+    :param ctx: 上下文
+    :param route: 模拟宇宙路线
+    :param turn_error: 转向误差
+    :return: 每段移动到达所用的轮数
+    """
+    current_pos: Point = route.start_pos
+    lm_info: LargeMapInfo = ctx.ih.get_large_map(route.region)
+    walkable_mask = get_walkable_mask_dict(ctx, lm_info, current_pos, route.op_list).get(lm_info.region.prl_id)
+    controller = SimController(ctx.im, ctx.game_config.mini_map_pos, lm_info, current_pos,
+                               walkable_mask=walkable_mask,
+                               turn_error=turn_error)
+    ctx.controller = controller
+
+    round_list: List[int] = []
+    for idx, route_item in enumerate(route.op_list):
+        if route_item['op'] == operation_const.OP_NO_POS_MOVE:
+            current_pos = Point(route_item['data'][0], route_item['data'][1])
+            controller.set_large_map(lm_info, current_pos, walkable_mask)
+            continue
+        if route_item['op'] not in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE]:
+            continue
+
+        # 与 SimUniRunRoute.move 保持一致
+        next_route_item: Optional[SimUniRouteOperation] = route.op_list[idx + 1] if idx + 1 < len(route.op_list) else None
+        next_is_move = next_route_item is not None and \
+            next_route_item['op'] in [operation_const.OP_MOVE, operation_const.OP_SLOW_MOVE]
+
+        case_id = '%s_%02d' % (route.uid, idx)
+        op = _SimMoveDirectlyInSimUni(benchmark, case_id, ctx, lm_info,
+                                      start=current_pos, target=Point(route_item['data'][0], route_item['data'][1]),
+                                      stop_afterwards=not next_is_move,
+                                      no_battle=True,
+                                      no_run=route_item['op'] == operation_const.OP_SLOW_MOVE)
+        op_result = benchmark.run_case('move_directly_in_sim_uni', case_id, op.execute,
+                                       lambda result: result.success)
+        if op_result is None or not op_result.success:
+            break  # 后续的起点已经不对了
+
+        round_list.append(op.round_cnt)
+        current_pos = op_result.data
+
+    ctx.controller.stop_moving_forward()
+    return round_list
+
+
+def add_render_time(benchmark: Benchmark, ctx: Context, route_uid: str) -> None:
+    """
+    记录一条路线中合成截图的平均耗时
+    :param benchmark: 基准测试
+    :param ctx: 上下文
+    :param route_uid: 路线唯一标识
+    :return:
+    """
+    controller: SimController = ctx.controller
+    if controller.screenshot_cnt > 0:
+        benchmark.get_stage('render_screenshot').add(route_uid, True,
+                                                     controller.render_time / controller.screenshot_cnt)
+
+
+def run_move_sim_benchmark(route_prefix: Optional[str] = None, turn_error: float = 0) -> Benchmark:
+    """
+    在模拟器中执行锄大地和模拟宇宙路线的移动部分 统计
+    - move_directly 锄大地每段移动的耗时和到达率
+    - move_directly_in_sim_uni 模拟宇宙每段移动的耗时和到达率
+    - move_round 每一轮的耗时和定位准确率 与模拟人物真实坐标相差10以内为准确
+    - get_rid_of_stuck 每次脱困的耗时 以及之后是否还能继续移动
+    - render_screenshot 合成截图的耗时 用于从每轮耗时中扣除模拟器本身的开销
+    :param route_prefix: 只执行 unique_id 以此开头的路线 模拟宇宙路线为 uid 例如 combat_001
+    :param turn_error: 转向误差
+    :return:
+    """
+    ctx = get_context()
+    ctx.init_image_matcher()
+    ctx.running = 1  # 不启动游戏 直接标记为运行中
+
+    benchmark = Benchmark('move_sim')
+    all_round_list: List[int] = []
+    for route_id in load_all_route_id():
+        if route_prefix is not None and not route_id.unique_id.startswith(route_prefix):
+            continue
+        route = WorldPatrolRoute(route_id)
+        log.info('模拟路线 %s', route_id.unique_id)
+        all_round_list += run_route(benchmark, ctx, route, turn_error=turn_error)
+        add_render_time(benchmark, ctx, route_id.unique_id)
+
+    sim_uni_route_id_list: List[str] = []  # 多个楼层类型共用同一批路线
+    for level_type in SimUniLevelTypeEnum:
+        if level_type.value.route_id in sim_uni_route_id_list:
+            continue
+        sim_uni_route_id_list.append(level_type.value.route_id)
+        for sim_uni_route in get_sim_uni_route_list(level_type.value):
+            if route_prefix is not None and not sim_uni_route.uid.startswith(route_prefix):
+                continue
+            log.info('模拟路线 %s', sim_uni_route.uid)
+            all_round_list += run_sim_uni_route(benchmark, ctx, sim_uni_route, turn_error=turn_error)
+            add_render_time(benchmark, ctx, sim_uni_route.uid)
+
+    if len(all_round_list) > 0:
+        log.info('到达轮数 平均 %.2f 最多 %d', sum(all_round_list) / len(all_round_list), max(all_round_list))
+    ctx.running = 0
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python move_sim_benchmark.py [路线前缀] [转向误差]
+    # 在模拟器中执行 config/world_patrol 和 config/sim_uni/map 下路线的移动部分 统计到达轮数、定位失败率和每轮耗时
+    result = run_move_sim_benchmark(sys.argv[1] if len(sys.argv) > 1 else None,
+                                    float(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
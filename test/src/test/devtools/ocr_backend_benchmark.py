@@ -0,0 +1,70 @@
+import os
+import sys
+
+from cv2.typing import MatLike
+
+from basic.img import cv2_utils
+from basic.log_utils import log
+from sr.image.cn_ocr_matcher import CnOcrMatcher
+from sr.image.ocr_matcher import OcrMatcher
+from sr.image.onnx_ocr_matcher import OnnxOcrMatcher
+from sr.image.sceenshot.screen_state import TargetRect
+from test.devtools.benchmark import Benchmark
+from test.sr.image.screenshot import test_screen_state
+
+# (图片, 区域, 需要包含的文本)
+CASE_LIST = [
+    ('empty_to_close_1.png', TargetRect.EMPTY_TO_CLOSE.value, '点击空白处关闭'),
+    ('sim_uni_reward.png', TargetRect.EMPTY_TO_CLOSE.value, '点击空白处关闭'),
+]
+
+
+def _read_part(file_name: str, rect) -> MatLike:
+    case_dir = os.path.dirname(test_screen_state.__file__)
+    screen = cv2_utils.read_image(os.path.join(case_dir, file_name))
+    return cv2_utils.crop_image_only(screen, rect)
+
+
+def run_backend(benchmark: Benchmark, backend: str, ocr: OcrMatcher, round_cnt: int = 10):
+    """
+    同一批样例 分别测试单行识别 检测+识别 和批量识别
+    :param benchmark: 基准测试
+    :param backend: 后端名称 作为阶段名前缀
+    :param ocr: OCR
+    :param round_cnt: 每个样例重复的次数
+    :return:
+    """
+    part_list = [(file_name, _read_part(file_name, rect), answer) for file_name, rect, answer in CASE_LIST]
+    ocr.run_ocr_without_det(part_list[0][1])  # 预热
+
+    for i in range(round_cnt):
+        for file_name, part, answer in part_list:
+            benchmark.run_case('%s_ocr_for_single_line' % backend, '%s_%d' % (file_name, i),
+                               lambda: ocr.ocr_for_single_line(part),
+                               lambda result: answer in result)
+            benchmark.run_case('%s_run_ocr' % backend, '%s_%d' % (file_name, i),
+                               lambda: ocr.run_ocr(part),
+                               lambda result: any(answer in k for k in result.keys()))
+        benchmark.run_case('%s_run_ocr_without_det_batch' % backend, str(i),
+                           lambda: ocr.run_ocr_without_det_batch([p[1] for p in part_list]),
+                           lambda result: all(p[2] in r[0] for p, r in zip(part_list, result)))
+
+
+def run_ocr_backend_benchmark() -> Benchmark:
+    benchmark = Benchmark('ocr_backend')
+    run_backend(benchmark, 'paddle', CnOcrMatcher())
+    onnx = OnnxOcrMatcher()
+    if onnx.is_available():
+        run_backend(benchmark, 'onnx', onnx)
+    else:
+        log.error('未找到ONNX模型 请先使用 paddle2onnx 导出')
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python ocr_backend_benchmark.py
+    # 对比 PaddleOCR 和 ONNX Runtime 两个后端的准确率和耗时
+    result = run_ocr_backend_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
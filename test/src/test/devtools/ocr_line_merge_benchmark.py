@@ -0,0 +1,214 @@
+import os
+import random
+import sys
+from typing import List, Optional
+
+import yaml
+
+from basic.img import MatchResult, MatchResultList
+from basic.log_utils import log
+from sr.image import ocr_matcher
+from test.devtools.benchmark import Benchmark
+
+SCENE_LIST: List[str] = ['inventory', 'bless_list', 'dialog', 'random']
+MERGE_LINE_DISTANCE_LIST: List[float] = [10, 40]  # 代码中实际使用的行距
+GOLDEN_CASES_PATH: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                      'sr', 'image', 'ocr_line_merge_cases.yml')
+
+
+def _merge_ocr_result_to_single_line_by_loop(ocr_map, join_space: bool = True) -> str:
+    """
+    原来的实现 每个结果都和已有行的所有结果比较 作为对照
+    """
+    lines: List[List[MatchResult]] = []
+    for text, result_list in ocr_map.items():
+        for result in result_list:
+            in_line: int = -1
+            for line_idx in range(len(lines)):
+                for line_item in lines[line_idx]:
+                    if abs(line_item.center.y - result.center.y) <= 5:
+                        in_line = line_idx
+                        break
+                if in_line != -1:
+                    break
+
+            if in_line == -1:
+                lines.append([result])
+            else:
+                lines[in_line].append(result)
+
+    result_str: str = None
+    for line in lines:
+        sorted_line = sorted(line, key=lambda x: x.center.x)
+        for result_item in sorted_line:
+            if result_str is None:
+                result_str = result_item.data
+            else:
+                result_str += (' ' if join_space else '') + result_item.data
+
+    return result_str
+
+
+def _merge_ocr_result_to_multiple_line_by_loop(ocr_map, join_space: bool = True,
+                                               merge_line_distance: float = 40) -> dict[str, MatchResultList]:
+    lines = []
+    for text, result_list in ocr_map.items():
+        for result in result_list:
+            in_line: int = -1
+            for line_idx in range(len(lines)):
+                for line_item in lines[line_idx]:
+                    if abs(line_item.center.y - result.center.y) <= merge_line_distance:
+                        in_line = line_idx
+                        break
+                if in_line != -1:
+                    break
+
+            if in_line == -1:
+                lines.append([result])
+            else:
+                lines[in_line].append(result)
+
+    merge_ocr_result_map: dict[str, MatchResultList] = {}
+    for line in lines:
+        line_ocr_map = {}
+        merge_result: MatchResult = MatchResult(1, 9999, 9999, 0, 0)
+        for ocr_result in line:
+            if ocr_result.data not in line_ocr_map:
+                line_ocr_map[ocr_result.data] = MatchResultList()
+            line_ocr_map[ocr_result.data].append(ocr_result)
+
+            if ocr_result.x < merge_result.x:
+                merge_result.x = ocr_result.x
+            if ocr_result.y < merge_result.y:
+                merge_result.y = ocr_result.y
+            if ocr_result.x + ocr_result.w > merge_result.x + merge_result.w:
+                merge_result.w = ocr_result.x + ocr_result.w - merge_result.x
+            if ocr_result.y + ocr_result.h > merge_result.y + merge_result.h:
+                merge_result.h = ocr_result.y + ocr_result.h - merge_result.y
+
+        merge_result.data = _merge_ocr_result_to_single_line_by_loop(line_ocr_map, join_space=join_space)
+        if merge_result.data not in merge_ocr_result_map:
+            merge_ocr_result_map[merge_result.data] = MatchResultList()
+        merge_ocr_result_map[merge_result.data].append(merge_result)
+
+    return merge_ocr_result_map
+
+
+def make_ocr_list(scene: str, seed: int = 0, box_cnt: Optional[int] = None) -> List[list]:
+    """
+    模拟OCR的检测结果 同一行的框上下有几个像素的抖动 顺序按检测结果大致从上到下
+    :param scene: 场景 inventory=背包格子 bless_list=祝福卡片 dialog=对话 random=随机
+    :param seed: 随机种子
+    :param box_cnt: 框的数量 只有 random 使用
+    :return: [文本, x, y, w, h] 的列表
+    """
+    rnd = random.Random(seed)
+    word_list = ['星琼', '信用点', '漫游签证', '以太燃素', '命运的足迹', '行迹材料', '存护', '巡猎',
+                 '毁灭', '智识', '同谐', '虚无', '丰饶', '记忆', '自动战斗', '确认', '取消', '1', '12', 'x3']
+    ocr_list = []
+    if scene == 'inventory':  # 7列的物品格子 每格下方有名称和数量
+        for row in range(6):
+            for col in range(7):
+                x = 120 + col * 130 + rnd.randint(-2, 2)
+                y = 200 + row * 160 + rnd.randint(-3, 3)
+                ocr_list.append([rnd.choice(word_list), x, y, 90 + rnd.randint(-10, 10), 24])
+                ocr_list.append([str(rnd.randint(1, 999)), x + 60, y + 30 + rnd.randint(-2, 2), 30, 20])
+    elif scene == 'bless_list':  # 3张祝福卡片 每张有标题和多行描述
+        for card in range(3):
+            x = 200 + card * 520
+            ocr_list.append([rnd.choice(word_list), x + rnd.randint(-3, 3), 300 + rnd.randint(-3, 3), 160, 32])
+            for line in range(5):
+                y = 380 + line * 34 + rnd.randint(-2, 2)
+                for part in range(rnd.randint(1, 3)):
+                    ocr_list.append([rnd.choice(word_list), x + part * 140, y, 130, 26])
+    elif scene == 'dialog':  # 对话和选项 长文本被拆成多段
+        for line in range(8):
+            y = 700 + line * 42 + rnd.randint(-2, 2)
+            x = 300
+            for part in range(rnd.randint(1, 4)):
+                w = rnd.randint(60, 240)
+                ocr_list.append([rnd.choice(word_list), x, y + rnd.randint(-4, 4), w, 28])
+                x += w + rnd.randint(5, 30)
+    else:
+        for _ in range(box_cnt if box_cnt is not None else 200):
+            ocr_list.append([rnd.choice(word_list), rnd.randint(0, 1800), rnd.randint(0, 1000),
+                             rnd.randint(20, 300), rnd.randint(18, 40)])
+        ocr_list.sort(key=lambda i: i[2])
+
+    return ocr_list
+
+
+def to_ocr_map(ocr_list: List[list]) -> dict[str, MatchResultList]:
+    """
+    转换成 run_ocr 的返回格式 相同文本放在同一个列表里
+    """
+    ocr_map: dict[str, MatchResultList] = {}
+    for text, x, y, w, h in ocr_list:
+        if text not in ocr_map:
+            ocr_map[text] = MatchResultList(only_best=False)
+        ocr_map[text].append(MatchResult(1, x, y, w, h, data=text))
+    return ocr_map
+
+
+def to_line_list(merge_map: dict[str, MatchResultList]) -> List[list]:
+    """
+    多行合并结果转换成方便比较和保存的格式
+    """
+    return [[text, r.x, r.y, r.w, r.h] for text, result_list in merge_map.items() for r in result_list]
+
+
+def make_golden_case(scene: str, seed: int) -> dict:
+    """
+    使用原来的实现 记录一个场景的合并结果
+    """
+    ocr_list = make_ocr_list(scene, seed)
+    case = {
+        'scene': scene,
+        'seed': seed,
+        'ocr_list': ocr_list,
+        'single_line': _merge_ocr_result_to_single_line_by_loop(to_ocr_map(ocr_list), join_space=True),
+        'single_line_no_space': _merge_ocr_result_to_single_line_by_loop(to_ocr_map(ocr_list), join_space=False),
+    }
+    for distance in MERGE_LINE_DISTANCE_LIST:
+        case['multiple_line_%d' % distance] = to_line_list(
+            _merge_ocr_result_to_multiple_line_by_loop(to_ocr_map(ocr_list), merge_line_distance=distance))
+    return case
+
+
+def save_golden_cases(seed_cnt: int = 3):
+    """
+    重新生成合并结果的样例 只在样例场景有修改时使用
+    """
+    case_list = [make_golden_case(scene, seed) for scene in SCENE_LIST for seed in range(seed_cnt)]
+    with open(GOLDEN_CASES_PATH, 'w', encoding='utf-8') as file:
+        yaml.dump({'cases': case_list}, file, allow_unicode=True, default_flow_style=None, sort_keys=False)
+
+
+def run_ocr_line_merge_benchmark(round_cnt: int = 5) -> Benchmark:
+    """
+    不同数量的框 分别使用原来的实现和排序后的实现合并成多行
+    :param round_cnt: 每种数量重复的次数
+    :return:
+    """
+    benchmark = Benchmark('ocr_line_merge')
+    for box_cnt in [20, 100, 500, 2000]:
+        for i in range(round_cnt):
+            ocr_map = to_ocr_map(make_ocr_list('random', seed=i, box_cnt=box_cnt))
+            expected = to_line_list(_merge_ocr_result_to_multiple_line_by_loop(ocr_map, merge_line_distance=10))
+            case_id = '%d_%d' % (box_cnt, i)
+            benchmark.run_case('loop_%d' % box_cnt, case_id,
+                               lambda: _merge_ocr_result_to_multiple_line_by_loop(ocr_map, merge_line_distance=10),
+                               lambda result: True)
+            benchmark.run_case('sorted_%d' % box_cnt, case_id,
+                               lambda: ocr_matcher.merge_ocr_result_to_multiple_line(ocr_map, merge_line_distance=10),
+                               lambda result: to_line_list(result) == expected)
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python ocr_line_merge_benchmark.py
+    # 对比不同框数量下 合并多行的耗时
+    result = run_ocr_line_merge_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
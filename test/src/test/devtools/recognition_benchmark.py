@@ -0,0 +1,168 @@
+import os
+import sys
+from typing import Optional, Tuple
+
+import yaml
+from cv2.typing import MatLike
+
+from basic import cal_utils, Point
+from basic.img import cv2_utils
+from basic.log_utils import log
+from sr import cal_pos
+from sr.const import map_const
+from sr.const.map_const import Region
+from sr.context import get_context, Context
+from sr.image.sceenshot import mini_map, screen_state, large_map, LargeMapInfo
+from sr.image.sceenshot.screen_state import TargetRect
+from test.devtools.benchmark import Benchmark, run_and_compare
+from test.sr import cal_pos_standard_test, test_cal_pos, test_cal_pos_for_sim_uni
+from test.sr.image.screenshot import test_screen_state
+
+
+def _read_image(dir_path: str, file_name: str) -> MatLike:
+    return cv2_utils.read_image(os.path.join(dir_path, file_name))
+
+
+def _get_large_map(ctx: Context, region: Region) -> LargeMapInfo:
+    return ctx.ih.get_large_map(region)
+
+
+def _is_near(pos: Optional[Point], answer: Point, max_distance: float) -> bool:
+    return pos is not None and cal_utils.distance_between(pos, answer) <= max_distance
+
+
+def _run_cal_character_pos_case(benchmark: Benchmark, ctx: Context,
+                                case_id: str, region: Region, mm: MatLike,
+                                answer: Point, running: bool, possible_pos: Tuple[int, int, float],
+                                use_possible_pos: bool):
+    lm_info = _get_large_map(ctx, region)
+    lm_rect = large_map.get_large_map_rect_by_pos(lm_info.shape, mm.shape[:2], possible_pos)
+    sp_map = map_const.get_sp_type_in_rect(lm_info.region, lm_rect)
+
+    mm_info = benchmark.run_case('analyse_mini_map', case_id,
+                                 lambda: mini_map.analyse_mini_map(mm, ctx.im, sp_types=set(sp_map.keys())))
+    if mm_info is None:
+        return
+
+    benchmark.run_case('cal_character_pos', case_id,
+                       lambda: cal_pos.cal_character_pos(ctx.im, lm_info, mm_info,
+                                                         possible_pos=possible_pos if use_possible_pos else None,
+                                                         lm_rect=lm_rect, retry_without_rect=False,
+                                                         running=running),
+                       lambda pos: _is_near(pos, answer, 10))
+
+    # 特征匹配目前没有在 cal_character_pos 中启用 这里单独统计准确率和耗时
+    benchmark.run_case('cal_character_pos_by_feature_match', case_id,
+                       lambda: cal_pos.cal_character_pos_by_feature_match(lm_info, mm_info, lm_rect=lm_rect),
+                       lambda result: result is not None and _is_near(result.center, answer, 10))
+
+
+def run_cal_character_pos(benchmark: Benchmark, ctx: Context):
+    """
+    大世界定位 使用 cal_pos_standard_test 和 test_cal_pos 中的样例
+    """
+    for c in cal_pos_standard_test.case_list:
+        mm = cal_pos_standard_test.get_test_cal_pos_image(c.region, c.num)
+        no_possible_pos = not c.running or (c.possible_pos[0] == c.pos.x and c.possible_pos[1] == c.pos.y)
+        _run_cal_character_pos_case(benchmark, ctx, '%s_%02d' % (c.region.prl_id, c.num), c.region, mm,
+                                    c.pos, c.running, c.possible_pos, not no_possible_pos)
+
+    case_dir = os.path.dirname(test_cal_pos.__file__)
+    with open(os.path.join(case_dir, 'test_cases.yml'), 'r', encoding='utf-8') as file:
+        data = yaml.safe_load(file)
+    for row in data['cases']:
+        c = test_cal_pos.TestCalPos.dict_2_case(row)
+        mm = _read_image(case_dir, c.image_name)
+        _run_cal_character_pos_case(benchmark, ctx, c.unique_id, c.region, mm,
+                                    c.pos, c.running, tuple(c.possible_pos), True)
+
+
+def run_sim_uni_cal_pos(benchmark: Benchmark, ctx: Context):
+    """
+    模拟宇宙定位 使用 test_cal_pos_for_sim_uni 中的样例
+    """
+    case_dir = os.path.dirname(test_cal_pos_for_sim_uni.__file__)
+    for c in test_cal_pos_for_sim_uni.standard_case_list:
+        mm = _read_image(case_dir, c.image_name)
+        lm_info = _get_large_map(ctx, c.region)
+        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.shape, mm.shape[:2], c.possible_pos)
+        mm_info = benchmark.run_case('analyse_mini_map', c.unique_id,
+                                     lambda: mini_map.analyse_mini_map(mm, ctx.im))
+        if mm_info is None:
+            continue
+        benchmark.run_case('sim_uni_cal_pos', c.unique_id,
+                           lambda: cal_pos.sim_uni_cal_pos(ctx.im, lm_info, mm_info,
+                                                           possible_pos=c.possible_pos,
+                                                           lm_rect=lm_rect, running=c.running),
+                           lambda pos: _is_near(pos, c.pos, 5))
+
+
+def run_screen_state(benchmark: Benchmark, ctx: Context):
+    """
+    画面状态判断 使用 test_screen_state 中的样例
+    """
+    case_dir = os.path.dirname(test_screen_state.__file__)
+
+    for file_name in ['empty_to_close_1.png', 'sim_uni_finished.png', 'event_get_curio.png',
+                      'event_lose_money.png', 'sim_uni_reward.png']:
+        screen = _read_image(case_dir, file_name)
+        benchmark.run_case('is_empty_to_close', file_name,
+                           lambda: screen_state.is_empty_to_close(screen, ctx.ocr),
+                           lambda result: result)
+
+    for file_name, answer in [('tp_battle_fail.png', screen_state.ScreenState.BATTLE_FAIL.value),
+                              ('tp_battle_success_1.png', screen_state.ScreenState.TP_BATTLE_SUCCESS.value),
+                              ('tp_battle_success_2.png', screen_state.ScreenState.TP_BATTLE_SUCCESS.value)]:
+        screen = _read_image(case_dir, file_name)
+        benchmark.run_case('get_tp_battle_screen_state', file_name,
+                           lambda: screen_state.get_tp_battle_screen_state(screen, ctx.im, ctx.ocr,
+                                                                           in_world=True,
+                                                                           battle_success=True,
+                                                                           battle_fail=True),
+                           lambda result: result == answer)
+
+
+def run_ocr(benchmark: Benchmark, ctx: Context):
+    """
+    OCR单行识别 对固定区域识别并判断是否包含目标文本
+    """
+    case_dir = os.path.dirname(test_screen_state.__file__)
+    for file_name, rect, answer in [
+        ('empty_to_close_1.png', TargetRect.EMPTY_TO_CLOSE.value, '点击空白处关闭'),
+        ('sim_uni_reward.png', TargetRect.EMPTY_TO_CLOSE.value, '点击空白处关闭'),
+    ]:
+        screen = _read_image(case_dir, file_name)
+        part = cv2_utils.crop_image_only(screen, rect)
+        benchmark.run_case('ocr_for_single_line', file_name,
+                           lambda: ctx.ocr.ocr_for_single_line(part),
+                           lambda result: answer in result)
+        benchmark.run_case('run_ocr', file_name,
+                           lambda: ctx.ocr.run_ocr(part),
+                           lambda result: any(answer in k for k in result.keys()))
+
+
+def run_recognition_benchmark() -> Benchmark:
+    """
+    使用测试图片离线执行所有识别阶段
+    :return:
+    """
+    ctx = get_context()
+    ctx.init_image_matcher()
+    ctx.init_ocr_matcher()
+    ctx.ih.preheat_for_world_patrol()  # 预热 避免加载耗时计入第一个样例
+
+    benchmark = Benchmark('recognition')
+    run_cal_character_pos(benchmark, ctx)
+    run_sim_uni_cal_pos(benchmark, ctx)
+    run_screen_state(benchmark, ctx)
+    run_ocr(benchmark, ctx)
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python recognition_benchmark.py [--baseline]
+    # --baseline 把本次结果保存为基线
+    result = run_recognition_benchmark()
+    if not run_and_compare(result, save_as_baseline='--baseline' in sys.argv):
+        log.error('识别基准测试存在退化')
+        sys.exit(1)
@@ -0,0 +1,89 @@
+import random
+import sys
+from typing import List, Optional, Tuple
+
+from basic import Rect, Point, cal_utils
+from basic.log_utils import log
+from sr.const import map_const
+from sr.const.map_const import TransportPoint, Region
+from test.devtools.benchmark import Benchmark
+
+
+def _get_sp_in_rect_by_loop(region: Region, rect: Optional[Rect]) -> List[TransportPoint]:
+    """
+    原来的实现 逐个判断区域内的特殊点 作为对照
+    """
+    return [sp for sp in map_const.REGION_2_SP.get(region.pr_id) if rect is None or cal_utils.in_rect(sp.lm_pos, rect)]
+
+
+def _get_nearest_sp_by_loop(region: Region, pos: Point, template_id: Optional[str] = None) -> Optional[TransportPoint]:
+    best = None
+    best_dis = None
+    for sp in map_const.REGION_2_SP.get(region.pr_id):
+        if template_id is not None and sp.template_id != template_id:
+            continue
+        dis = cal_utils.distance_between(pos, sp.lm_pos)
+        if best_dis is None or dis < best_dis:
+            best = sp
+            best_dis = dis
+    return best
+
+
+def get_region_list() -> List[Region]:
+    """
+    所有有特殊点的区域 每个区域取一个楼层即可
+    """
+    return [sp_list[0].region for sp_list in map_const.REGION_2_SP.values() if len(sp_list) > 0]
+
+
+def make_query_list(region: Region, cnt: int, seed: int = 0) -> List[Tuple[Rect, Point]]:
+    """
+    模拟移动中的查询 在特殊点附近随机取人物坐标 圈出小地图对应的大地图范围
+    :param region: 区域
+    :param cnt: 数量
+    :param seed: 随机种子
+    :return: (矩形, 坐标)
+    """
+    rnd = random.Random(seed)
+    sp_list = map_const.REGION_2_SP.get(region.pr_id)
+    query_list = []
+    for _ in range(cnt):
+        sp = rnd.choice(sp_list)
+        x = sp.lm_pos.x + rnd.randint(-300, 300)
+        y = sp.lm_pos.y + rnd.randint(-300, 300)
+        query_list.append((Rect(x - 200, y - 200, x + 200, y + 200), Point(x, y)))
+    return query_list
+
+
+def run_sp_index_benchmark(query_cnt: int = 1000) -> Benchmark:
+    """
+    每个区域分别用逐个判断和索引 查询矩形范围和最近的特殊点
+    单次查询只有几微秒 因此每个区域的全部查询作为一个样例计时
+    :param query_cnt: 每个区域的查询次数
+    :return:
+    """
+    benchmark = Benchmark('sp_index')
+    for region in get_region_list():
+        index = map_const.get_region_sp_index(region)  # 预热 索引只在第一次使用时构建
+        query_list = make_query_list(region, query_cnt)
+        case_id = region.pr_id
+        expected = benchmark.run_case('rect_by_loop', case_id,
+                                      lambda: [_get_sp_in_rect_by_loop(region, rect) for rect, _ in query_list])
+        benchmark.run_case('rect_by_index', case_id,
+                           lambda: [index.in_rect(rect) for rect, _ in query_list],
+                           lambda result: result == expected)
+        expected = benchmark.run_case('nearest_by_loop', case_id,
+                                      lambda: [_get_nearest_sp_by_loop(region, pos) for _, pos in query_list])
+        benchmark.run_case('nearest_by_index', case_id,
+                           lambda: [index.nearest(pos) for _, pos in query_list],
+                           lambda result: all(i is j for i, j in zip(result, expected)))
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python sp_index_benchmark.py
+    # 对比各区域 逐个判断和网格索引查询特殊点的耗时 并检查结果一致
+    result = run_sp_index_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
@@ -0,0 +1,88 @@
+import os
+import sys
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from basic import os_utils
+from basic.log_utils import log
+from sr import const
+from sr.image import ImageMatcher, TemplateImage
+from sr.image.cv2_matcher import CvImageMatcher
+from sr.image.sceenshot import large_map, LargeMapInfo
+from test.devtools.benchmark import Benchmark
+
+
+def _get_sp_mask_by_full_match(lm_info: LargeMapInfo, im: ImageMatcher):
+    """
+    原来的实现 每种特殊点都在整张地图上匹配 作为对照
+    """
+    sp_match_result = {}
+    source = lm_info.origin
+    sp_mask = np.zeros(source.shape[:2], dtype=np.uint8)
+    for prefix in ['mm_tp', 'mm_sp', 'mm_boss']:
+        for i in range(1, 100):
+            template_id = '%s_%02d' % (prefix, i)
+            ti: TemplateImage = im.get_template(template_id)
+            if ti is None:
+                break
+            match_result = im.match_image(source, ti.origin, mask=ti.mask,
+                                          threshold=const.THRESHOLD_SP_TEMPLATE_IN_LARGE_MAP,
+                                          only_best=False, ignore_inf=True)
+            if len(match_result) > 0:
+                sp_match_result[template_id] = match_result
+            for r in match_result:
+                sp_mask[r.y:r.y+r.h, r.x:r.x+r.w] = cv2.bitwise_or(sp_mask[r.y:r.y+r.h, r.x:r.x+r.w], ti.mask)
+    return sp_mask, sp_match_result
+
+
+def _to_pos_dict(sp_match_result: dict) -> dict:
+    return {k: [(r.x, r.y) for r in v] for k, v in sp_match_result.items()}
+
+
+def get_region_dir_list() -> List[Tuple[str, str]]:
+    """
+    images/map 下所有保存了大地图的区域
+    :return: (区域id, 文件夹)
+    """
+    map_dir = os_utils.get_path_under_work_dir('images', 'map')
+    result = []
+    for planet_id in sorted(os.listdir(map_dir)):
+        planet_dir = os.path.join(map_dir, planet_id)
+        if not os.path.isdir(planet_dir):
+            continue
+        for region_id in sorted(os.listdir(planet_dir)):
+            region_dir = os.path.join(planet_dir, region_id)
+            if os.path.exists(os.path.join(region_dir, 'origin.png')):
+                result.append(('%s_%s' % (planet_id, region_id), region_dir))
+    return result
+
+
+def run_sp_match_benchmark() -> Benchmark:
+    """
+    每个区域分别用整图匹配和彩色区域内匹配 找出特殊点 比较耗时和结果是否一致
+    :return:
+    """
+    im = CvImageMatcher()
+    im.ih.preheat_for_world_patrol()  # 预热 避免模板加载耗时计入第一个区域
+
+    benchmark = Benchmark('sp_match')
+    for case_id, region_dir in get_region_dir_list():
+        lm_info = LargeMapInfo(dir_path=region_dir)
+        expected_mask, expected_result = benchmark.run_case('sp_by_full_match', case_id,
+                                                            lambda: _get_sp_mask_by_full_match(lm_info, im))
+        benchmark.run_case('sp_by_color_area', case_id,
+                           lambda: large_map.get_sp_mask_by_template_match(lm_info, im),
+                           lambda result: np.array_equal(result[0], expected_mask)
+                                          and _to_pos_dict(result[1]) == _to_pos_dict(expected_result))
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python sp_match_benchmark.py
+    # 对比各区域 整图匹配和只在彩色区域附近匹配特殊点的耗时 并检查结果一致
+    result = run_sp_match_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
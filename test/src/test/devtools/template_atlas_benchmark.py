@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from basic import os_utils
+from basic.log_utils import log
+from sr.image import TemplateImage
+from sr.image.image_holder import ImageHolder
+from sr.image.template_atlas import build_template_atlas, list_template_dir
+from test.devtools.benchmark import Benchmark
+
+
+def load_all_template(ih: ImageHolder, template_list: List[Tuple[Optional[str], str, str]]) -> int:
+    """
+    加载全部模板 对应启动后第一次使用各个模板的情况
+    :param ih: 新建的图片加载器
+    :param template_list: 模板列表
+    :return: 成功加载的数量
+    """
+    cnt = 0
+    for sub_dir, template_id, _ in template_list:
+        if ih.load_template(template_id, sub_dir) is not None:
+            cnt += 1
+    return cnt
+
+
+def same_template(t1: TemplateImage, t2: TemplateImage) -> bool:
+    """
+    两个模板的图片和特征是否一致
+    """
+    for t in ['origin', 'gray', 'mask', 'desc']:
+        a1, a2 = getattr(t1, t), getattr(t2, t)
+        if (a1 is None) != (a2 is None):
+            return False
+        if a1 is not None and (a1.dtype != a2.dtype or not np.array_equal(a1, a2)):
+            return False
+    if (t1.kps is None) != (t2.kps is None):
+        return False
+    return t1.kps is None or [(k.pt, k.size, k.angle) for k in t1.kps] == [(k.pt, k.size, k.angle) for k in t2.kps]
+
+
+def run_template_atlas_benchmark(round_cnt: int = 5) -> Benchmark:
+    """
+    每轮新建图片加载器 分别从模板文件和模板图集加载全部模板 统计冷启动的耗时
+    操作系统的文件缓存无法清除 因此第一轮最接近真实的冷启动
+    :param round_cnt: 重复次数
+    :return:
+    """
+    benchmark = Benchmark('template_atlas')
+    template_list = list_template_dir(os_utils.get_path_under_work_dir('images', 'template'))
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:  # 图集仍被映射时可能删不掉
+        atlas_path = os.path.join(temp_dir, 'atlas.bin')
+        missing_path = os.path.join(temp_dir, 'missing.bin')  # 不存在的图集 只读取模板文件
+        benchmark.run_case('build_atlas', 'all', lambda: build_template_atlas(atlas_path=atlas_path),
+                           lambda result: result == len(template_list))
+
+        for i in range(round_cnt):
+            case_id = '%d_%d' % (len(template_list), i)
+            loose_ih = ImageHolder(template_atlas_path=missing_path)
+            benchmark.run_case('loose_load_all', case_id, lambda: load_all_template(loose_ih, template_list),
+                               lambda result: result == len(template_list))
+            atlas_ih = ImageHolder(template_atlas_path=atlas_path)
+            benchmark.run_case('atlas_load_all', case_id, lambda: load_all_template(atlas_ih, template_list),
+                               lambda result: result == len(template_list) and
+                               all(same_template(atlas_ih.template[k], loose_ih.template[k]) for k in loose_ih.template))
+
+            benchmark.run_case('loose_preheat_world_patrol', str(i),
+                               ImageHolder(template_atlas_path=missing_path).preheat_for_world_patrol)
+            benchmark.run_case('atlas_preheat_world_patrol', str(i),
+                               ImageHolder(template_atlas_path=atlas_path).preheat_for_world_patrol)
+
+    return benchmark
+
+
+if __name__ == '__main__':
+    # python template_atlas_benchmark.py
+    # 对比从模板文件和模板图集加载全部模板的耗时
+    result = run_template_atlas_benchmark()
+    result.log_result()
+    log.info('结果已保存到 %s', result.save())
+    sys.exit(0)
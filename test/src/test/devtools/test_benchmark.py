@@ -0,0 +1,33 @@
+import test
+from test.devtools.benchmark import Benchmark
+
+
+class TestBenchmark(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_run_case(self):
+        benchmark = Benchmark('unit')
+        self.assertEqual(2, benchmark.run_case('add', 'case_1', lambda: 1 + 1, lambda r: r == 2))
+        benchmark.run_case('add', 'case_2', lambda: 1 + 2, lambda r: r == 2)
+        self.assertIsNone(benchmark.run_case('add', 'case_3', lambda: 1 / 0))
+
+        stage = benchmark.get_stage('add')
+        self.assertEqual(3, stage.cnt)
+        self.assertEqual(1, stage.success_cnt)
+        self.assertEqual(['case_2', 'case_3'], stage.fail_case_list)
+
+    def test_compare_with_baseline(self):
+        baseline = Benchmark('unit')
+        baseline.run_case('add', 'case_1', lambda: 1, lambda r: True)
+        baseline.run_case('add', 'case_2', lambda: 1, lambda r: True)
+        baseline_data = baseline.to_dict()
+
+        current = Benchmark('unit')
+        current.run_case('add', 'case_1', lambda: 1, lambda r: True)
+        current.run_case('add', 'case_2', lambda: 1, lambda r: False)
+        regression_list = current.compare_with_baseline(baseline_data, latency_tolerance=1000)
+        self.assertEqual(2, len(regression_list))  # 准确率下降 和 新增错误样例
+
+        self.assertEqual(0, len(baseline.compare_with_baseline(baseline_data, latency_tolerance=1000)))
@@ -0,0 +1,64 @@
+import logging
+import time
+
+import test
+from gui.log_view import GuiHandler
+
+
+class FakeListView:
+
+    def __init__(self):
+        self.page = None  # 未显示时不刷新
+        self.controls = []
+        self.update_cnt: int = 0
+
+    def update(self):
+        self.update_cnt += 1
+
+
+def make_record(i: int) -> logging.LogRecord:
+    return logging.LogRecord('test', logging.INFO, __file__, 0, 'record %d', (i,), None)
+
+
+class TestGuiHandler(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_refresh(self):
+        list_view = FakeListView()
+        handler = GuiHandler(None, list_view, max_len=5, refresh_interval=60)
+
+        # 等后台线程处理完第一次刷新 之后60秒内不会再刷新 由测试手动调用
+        handler.emit(make_record(-1))
+        for _ in range(100):
+            if not handler.new_record_event.is_set():
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual([], list_view.controls)
+
+        list_view.page = 'page'
+        handler._refresh()
+        self.assertEqual(['record -1'], [c.value for c in list_view.controls])
+
+        for i in range(3):
+            handler.emit(make_record(i))
+        handler._refresh()
+        self.assertEqual(['record -1', 'record 0', 'record 1', 'record 2'], [c.value for c in list_view.controls])
+
+        # 两次刷新之间超过 max_len 条 只显示最后的
+        for i in range(3, 15):
+            handler.emit(make_record(i))
+        handler._refresh()
+        self.assertEqual(['record %d' % i for i in range(10, 15)], [c.value for c in list_view.controls])
+        self.assertEqual(3, list_view.update_cnt)
+
+        # 没有新日志时不刷新
+        handler._refresh()
+        self.assertEqual(3, list_view.update_cnt)
+
+        for i in range(15, 17):
+            handler.emit(make_record(i))
+        handler._refresh()
+        self.assertEqual(['record %d' % i for i in range(12, 17)], [c.value for c in list_view.controls])
@@ -0,0 +1,166 @@
+import threading
+import time
+from typing import List, Optional, Set, Tuple
+
+import test
+from sr.app.app_run_record import AppRunRecord
+from sr.app.one_stop_service.one_stop_service_app import OneStopServiceApp
+from sr.context import Context
+from sr.one_dragon_config import OneDragonAccount
+from sr.operation import Operation, OperationResult
+
+
+class FakeOneDragonConfig:
+
+    def __init__(self, account_cnt: int):
+        self.account_list: List[OneDragonAccount] = [
+            OneDragonAccount(idx, '账号%02d' % idx, idx == 1, True)
+            for idx in range(1, account_cnt + 1)
+        ]
+
+    @property
+    def current_active_account(self) -> OneDragonAccount:
+        for account in self.account_list:
+            if account.active:
+                return account
+
+    def active_account(self, account_idx: int):
+        for account in self.account_list:
+            account.active = account.idx == account_idx
+
+
+class FakeOneStopServiceConfig:
+
+    def __init__(self, order_app_id_list: List[str], run_app_id_list: List[str]):
+        self.order_app_id_list: List[str] = order_app_id_list
+        self.run_app_id_list: List[str] = run_app_id_list
+
+
+class FakeRunRecord:
+
+    def __init__(self, run_status: int):
+        self.run_status_under_now: int = run_status
+
+    def check_and_update_status(self):
+        pass
+
+
+class FakeContext(Context):
+
+    def __init__(self, account_cnt: int, success_set: Set[Tuple[int, str]], load_seconds: float):
+        """
+        不读写配置文件的上下文 读取运行记录时等待一段时间 模拟读取文件
+        :param account_cnt: 账号数量
+        :param success_set: 已经运行成功的 (账号, 应用)
+        :param load_seconds: 读取一个运行记录的耗时
+        """
+        self.running: int = 1
+        self.press_event: dict = {}
+        self.start_callback: dict = {}
+        self.pause_callback: dict = {}
+        self.resume_callback: dict = {}
+        self.stop_callback: dict = {}
+        self.one_dragon_config = FakeOneDragonConfig(account_cnt)
+        self.game_config = None
+        self._account_idx: Optional[int] = 1
+        self._account_config: dict = {}
+        self._account_config_lock = threading.RLock()
+        self._prepare_local = threading.local()
+
+        self.success_set: Set[Tuple[int, str]] = success_set
+        self.load_seconds: float = load_seconds
+        self.event_list: List[tuple] = []  # (事件, 账号, 应用, 线程名)
+        self._event_lock = threading.Lock()
+
+    def add_event(self, event: str, account_idx: int, app_id: Optional[str] = None):
+        with self._event_lock:
+            self.event_list.append((event, account_idx, app_id, threading.current_thread().name))
+
+    def _get_account_config(self, key, factory):
+        if key == 'game_config':  # 不读取游戏配置
+            factory = lambda account_idx: None
+        return super()._get_account_config(key, factory)
+
+    @property
+    def one_stop_service_config(self) -> FakeOneStopServiceConfig:
+        return self._get_account_config('one_stop_service_config',
+                                        lambda account_idx: FakeOneStopServiceConfig(['a', 'b', 'c'], ['a', 'b']))
+
+    def load_run_record(self, account_idx: int, app_id: str) -> FakeRunRecord:
+        time.sleep(self.load_seconds)
+        self.add_event('load', account_idx, app_id)
+        success = (account_idx, app_id) in self.success_set
+        return FakeRunRecord(AppRunRecord.STATUS_SUCCESS if success else AppRunRecord.STATUS_WAIT)
+
+
+class FakeApp:
+
+    def __init__(self, ctx: FakeContext, app_id: str, run_seconds: float):
+        self.ctx: FakeContext = ctx
+        self.app_id: str = app_id
+        self.run_seconds: float = run_seconds
+        self.init_context_before_start: bool = True
+        self.stop_context_after_stop: bool = True
+
+    def execute(self) -> OperationResult:
+        self.ctx.add_event('start', self.ctx.one_dragon_config.current_active_account.idx, self.app_id)
+        time.sleep(self.run_seconds)
+        self.ctx.add_event('end', self.ctx.one_dragon_config.current_active_account.idx, self.app_id)
+        return Operation.op_success()
+
+
+class FakeOneStopServiceApp(OneStopServiceApp):
+
+    def __init__(self, ctx: FakeContext):
+        super().__init__(ctx)
+        self.init_context_before_start = False
+        self.stop_context_after_stop = False
+
+    def _login_another_account(self) -> OperationResult:
+        self.ctx.add_event('login', self.ctx.one_dragon_config.current_active_account.idx)
+        return Operation.op_success()
+
+    @staticmethod
+    def get_app_by_id(app_id: str, ctx: FakeContext) -> Optional[FakeApp]:
+        return FakeApp(ctx, app_id, run_seconds=0.2)
+
+    @staticmethod
+    def get_app_run_record_by_id(app_id: str, ctx: FakeContext) -> Optional[FakeRunRecord]:
+        return ctx._get_account_config('record_%s' % app_id,
+                                       lambda account_idx: ctx.load_run_record(account_idx, app_id))
+
+
+class TestOneStopServiceApp(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_prepare_next_account(self):
+        ctx = FakeContext(3, success_set={(2, 'a')}, load_seconds=0.05)
+        app = FakeOneStopServiceApp(ctx)
+        result = app.execute()
+        self.assertTrue(result.success)
+
+        run_list = [(e[1], e[2]) for e in ctx.event_list if e[0] == 'start']
+        self.assertEqual([(1, 'a'), (1, 'b'), (2, 'b'), (3, 'a'), (3, 'b')], run_list)
+        login_list = [e[1] for e in ctx.event_list if e[0] == 'login']
+        self.assertEqual([2, 3, 1], login_list)
+        self.assertEqual(1, ctx.one_dragon_config.current_active_account.idx)
+
+        # 后面的账号都在上一个账号运行时就加载好了 切换后不再读取
+        for account_idx in [2, 3]:
+            load_list = [i for i, e in enumerate(ctx.event_list) if e[0] == 'load' and e[1] == account_idx]
+            self.assertEqual(2, len(load_list))
+            last_run_of_previous = max(i for i, e in enumerate(ctx.event_list)
+                                       if e[0] == 'end' and e[1] == account_idx - 1)
+            for i in load_list:
+                self.assertLess(i, last_run_of_previous)
+                self.assertEqual('one_stop_prepare_account', ctx.event_list[i][3])
+
+        self.assertEqual([2, 3], [prep.account_idx for prep in app.account_preparation_list])
+        self.assertEqual(['b'], app.account_preparation_list[0].app_id_list)
+        self.assertEqual(['a', 'b'], app.account_preparation_list[1].app_id_list)
+        for prep in app.account_preparation_list:
+            self.assertGreaterEqual(prep.prepare_seconds, 2 * ctx.load_seconds)
+            self.assertLess(prep.wait_seconds, ctx.load_seconds)
+            self.assertGreater(prep.saved_seconds, 0)
@@ -0,0 +1,268 @@
+import math
+import random
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from basic import Point
+from basic.img import cv2_utils
+from sr import const
+from sr.config.game_config import MiniMapPos
+from sr.control import GameController
+from sr.image import ImageMatcher
+from sr.image.ocr_matcher import OcrMatcher
+from sr.image.sceenshot import LargeMapInfo
+from sr.screen_area.screen_normal_world import ScreenNormalWorld
+
+
+class SimController(GameController):
+
+    MOVE_DIRECTION: dict = {'w': 0, 'd': 90, 's': 180, 'a': 270}  # 按键对应相对朝向的移动方向
+
+    def __init__(self, im: ImageMatcher, mm_pos: MiniMapPos,
+                 lm_info: LargeMapInfo, pos: Point, angle: float = 0,
+                 walkable_mask: Optional[MatLike] = None,
+                 ocr: Optional[OcrMatcher] = None,
+                 turn_error: float = 0, seed: int = 0):
+        """
+        不需要游戏的模拟控制器 用于离线测试移动相关的指令
+        使用保存的大地图 按模拟人物的坐标和朝向合成小地图截图
+        人物只能在可行走的区域内移动 撞到障碍物时停下
+        时间使用真实时间 人物位置在每次调用时按经过的时间更新
+        :param im: 图片匹配器 用于获取合成截图需要的模板
+        :param mm_pos: 小地图在截图中的位置
+        :param lm_info: 人物所在的大地图
+        :param pos: 人物的初始坐标
+        :param angle: 人物的初始朝向 正右方为0 顺时针为正
+        :param walkable_mask: 可行走的区域 为空时使用大地图的道路掩码
+        :param ocr: OCR 移动不需要使用
+        :param turn_error: 转向的误差比例 模拟转向不准确
+        :param seed: 随机种子
+        """
+        super().__init__(ocr)
+        self.im: ImageMatcher = im
+        self.mm_pos: MiniMapPos = mm_pos
+        self.turn_dx: float = 1  # 模拟器中 转向距离就是角度
+        self.run_speed: float = 30  # 与 PcController 一致
+        self.sprint_speed: float = 40  # 疾跑速度
+        self.is_moving: bool = False
+        self.is_running: bool = False  # 是否在疾跑
+        self.turn_error: float = turn_error
+        self.rnd: random.Random = random.Random(seed)
+
+        self.lm_info: LargeMapInfo = lm_info
+        self.walkable_mask: MatLike = lm_info.mask if walkable_mask is None else walkable_mask
+        self.x: float = pos.x
+        self.y: float = pos.y
+        self.angle: float = angle
+        self.move_direction: float = 0  # 移动方向 相对朝向的角度
+        self.last_update_time: float = time.time()
+
+        # 以下为统计数据
+        self.screenshot_cnt: int = 0  # 截图次数
+        self.render_time: float = 0  # 合成截图的总耗时
+        self.blocked_cnt: int = 0  # 撞到障碍物的次数
+        self.last_screenshot_pos: Optional[Point] = None  # 最后一次截图时人物的真实坐标
+
+    @property
+    def pos(self) -> Point:
+        return Point(int(round(self.x)), int(round(self.y)))
+
+    def set_large_map(self, lm_info: LargeMapInfo, pos: Optional[Point] = None,
+                      walkable_mask: Optional[MatLike] = None):
+        """
+        切换人物所在的大地图 例如走楼梯换层后
+        :param lm_info: 大地图
+        :param pos: 新的坐标 为空时不变
+        :param walkable_mask: 可行走的区域 为空时使用大地图的道路掩码
+        :return:
+        """
+        self._update()
+        self.lm_info = lm_info
+        self.walkable_mask = lm_info.mask if walkable_mask is None else walkable_mask
+        if pos is not None:
+            self.x, self.y = pos.x, pos.y
+
+    def _is_walkable(self, x: float, y: float) -> bool:
+        """
+        坐标是否可以行走
+        """
+        ix, iy = int(round(x)), int(round(y))
+        mask = self.walkable_mask
+        return 0 <= iy < mask.shape[0] and 0 <= ix < mask.shape[1] and mask[iy, ix] > 0
+
+    def _update(self):
+        """
+        按上次更新后经过的时间 更新人物坐标
+        每次最多走1个像素 遇到障碍物就停在障碍物前
+        :return:
+        """
+        now = time.time()
+        dt = now - self.last_update_time
+        self.last_update_time = now
+        if not self.is_moving or dt <= 0:
+            return
+
+        speed = self.sprint_speed if self.is_running else self.run_speed
+        distance = speed * dt
+        radian = math.radians(self.angle + self.move_direction)
+        dx, dy = math.cos(radian), math.sin(radian)
+        step_cnt = int(math.ceil(distance))
+        step = distance / step_cnt if step_cnt > 0 else 0
+        for _ in range(step_cnt):
+            nx, ny = self.x + dx * step, self.y + dy * step
+            if not self._is_walkable(nx, ny):
+                self.blocked_cnt += 1
+                break
+            self.x, self.y = nx, ny
+
+    def screenshot(self) -> MatLike:
+        """
+        合成当前的游戏画面 只包含小地图和右上角的角色图标
+        :return: 默认分辨率的截图
+        """
+        self._update()
+        t1 = time.time()
+        screen = np.zeros((const.STANDARD_RESOLUTION_H, const.STANDARD_RESOLUTION_W, 3), dtype=np.uint8)
+
+        # 移动时小地图会缩小 对应 mini_map.get_mini_map_scale_list
+        scale = 1.25 if self.is_moving else 1
+        mm = render_mini_map(self.lm_info, self.pos, self.angle, scale, self.mm_pos,
+                             self.im.get_template('mini_map_radio').origin)
+        screen[self.mm_pos.ly:self.mm_pos.ry, self.mm_pos.lx:self.mm_pos.rx] = mm
+
+        area = ScreenNormalWorld.CHARACTER_ICON.value
+        icon = self.im.get_template(area.template_id).origin
+        x = area.rect.x1 + (area.rect.width - icon.shape[1]) // 2
+        y = area.rect.y1 + (area.rect.height - icon.shape[0]) // 2
+        screen[y:y + icon.shape[0], x:x + icon.shape[1]] = icon
+
+        self.screenshot_cnt += 1
+        self.render_time += time.time() - t1
+        self.last_screenshot_pos = self.pos
+        return screen
+
+    def click(self, pos: Point = None, press_time: float = 0, pc_alt: bool = False) -> bool:
+        return True
+
+    def esc(self) -> bool:
+        return True
+
+    def open_map(self) -> bool:
+        return True
+
+    def turn_by_distance(self, d: float):
+        """
+        横向转向 按距离转
+        :param d: 正数往右转 人物角度增加；负数往左转 人物角度减少
+        :return:
+        """
+        self._update()
+        delta = d / self.turn_dx
+        if self.turn_error > 0:
+            delta *= 1 + self.rnd.uniform(-self.turn_error, self.turn_error)
+        self.angle = (self.angle + delta) % 360
+
+    def move(self, direction: str, press_time: float = 0, run: bool = False):
+        """
+        往固定方向移动
+        :param direction: 方向 wsad
+        :param press_time: 持续秒数
+        :param run: 是否启用疾跑
+        :return:
+        """
+        if direction not in SimController.MOVE_DIRECTION:
+            return False
+        self._update()
+        self.move_direction = SimController.MOVE_DIRECTION[direction]
+        self.is_moving = True
+        self.is_running = run
+        time.sleep(press_time if press_time > 0 else 0.1)  # 按一下大概走0.1秒
+        self._update()
+        self.move_direction = 0
+        self.is_moving = False
+        self.is_running = False
+        return True
+
+    def start_moving_forward(self, run: bool = False):
+        """
+        开始往前走
+        :param run: 是否启用疾跑
+        :return:
+        """
+        self._update()
+        self.move_direction = 0
+        self.is_moving = True
+        self.is_running = run
+
+    def stop_moving_forward(self):
+        self._update()
+        self.is_moving = False
+        self.is_running = False
+
+    def enter_running(self, run: bool):
+        """
+        进入疾跑模式
+        :param run: 是否进入疾跑
+        :return:
+        """
+        self._update()
+        self.is_running = run
+
+    def interact(self, pos: Optional[Point] = None, interact_type: int = 0) -> bool:
+        return True
+
+
+def render_mini_map(lm_info: LargeMapInfo, pos: Point, angle: float, scale: float,
+                    mm_pos: MiniMapPos, radio: MatLike) -> MatLike:
+    """
+    用大地图合成小地图截图
+    - 小地图上的道路和大地图颜色接近 直接使用大地图原图 非道路部分压暗 模拟半透明的背景
+    - 中间叠加人物朝向的扇形视野 和 小箭头
+    - 圆形以外涂黑
+    :param lm_info: 大地图
+    :param pos: 人物坐标
+    :param angle: 人物朝向
+    :param scale: 小地图相对大地图的缩小比例 即 cal_pos 中的 template_scale
+    :param mm_pos: 小地图位置
+    :param radio: 朝向正右方时的扇形视野 即 mini_map_radio 模板
+    :return: 小地图截图
+    """
+    d = mm_pos.rx - mm_pos.lx
+    src_d = int(round(d * scale))
+    x1, y1 = pos.x - src_d // 2, pos.y - src_d // 2
+
+    # 超出大地图的部分 视为非道路
+    origin = np.full((src_d, src_d, 3), 210, dtype=np.uint8)
+    road = np.zeros((src_d, src_d), dtype=np.uint8)
+    lm_h, lm_w = lm_info.origin.shape[:2]
+    sx1, sy1 = max(x1, 0), max(y1, 0)
+    sx2, sy2 = min(x1 + src_d, lm_w), min(y1 + src_d, lm_h)
+    if sx1 < sx2 and sy1 < sy2:
+        origin[sy1 - y1:sy2 - y1, sx1 - x1:sx2 - x1] = lm_info.origin[sy1:sy2, sx1:sx2]
+        road[sy1 - y1:sy2 - y1, sx1 - x1:sx2 - x1] = lm_info.mask[sy1:sy2, sx1:sx2]
+
+    origin = cv2.resize(origin, (d, d), interpolation=cv2.INTER_AREA)
+    road = cv2.resize(road, (d, d), interpolation=cv2.INTER_NEAREST)
+    mm = np.where(road[:, :, None] > 0, origin, (origin * 0.15).astype(np.uint8))
+
+    c = d // 2
+    rotated_radio = cv2_utils.image_rotate(radio, 360 - angle)
+    r = radio.shape[0] // 2
+    part = mm[c - r:c - r + radio.shape[0], c - r:c - r + radio.shape[1]]
+    mm[c - r:c - r + radio.shape[0], c - r:c - r + radio.shape[1]] = cv2.add(part, rotated_radio)
+
+    arrow_len = const.TEMPLATE_ARROW_R - 3
+    pts = []
+    for delta, length in [(0, arrow_len), (140, arrow_len * 0.8), (-140, arrow_len * 0.8)]:
+        radian = math.radians(angle + delta)
+        pts.append((c + length * math.cos(radian), c + length * math.sin(radian)))
+    cv2.fillPoly(mm, [np.array(pts, dtype=np.int32)], const.COLOR_ARROW_BGR)
+
+    circle = np.zeros((d, d), dtype=np.uint8)
+    cv2.circle(circle, (c, c), mm_pos.r, 255, -1)
+    mm[circle == 0] = 0
+    return mm
@@ -0,0 +1,153 @@
+import threading
+from typing import Optional
+
+import test
+from sr.control import input_scheduler
+from sr.control.input_scheduler import InputScheduler, RecordingInputBackend, InputAction
+
+
+class BlockingRecordingBackend(RecordingInputBackend):
+
+    def __init__(self):
+        """
+        执行第一个动作时阻塞 直到 release 用于在队列中堆积动作
+        """
+        super().__init__()
+        self.started: threading.Event = threading.Event()
+        self.released: threading.Event = threading.Event()
+
+    def execute(self, action: InputAction):
+        self.started.set()
+        self.released.wait()
+        super().execute(action)
+
+
+class FailOnceRecordingBackend(RecordingInputBackend):
+
+    def __init__(self, fail_action_type: str):
+        """
+        第一次执行指定类型的动作时抛出异常 模拟输入失败
+        :param fail_action_type: 失败的动作类型
+        """
+        super().__init__()
+        self.fail_action_type: Optional[str] = fail_action_type
+
+    def execute(self, action: InputAction):
+        if action.action_type == self.fail_action_type:
+            self.fail_action_type = None
+            raise Exception('模拟输入失败')
+        super().execute(action)
+
+
+class TestInputScheduler(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def assert_records(self, expected, backend: RecordingInputBackend):
+        self.assertEqual(len(expected), len(backend.record_list))
+        for e, r in zip(expected, backend.record_list):
+            self.assertAlmostEqual(e[0], r[0])
+            self.assertEqual(e[1:], r[1:])
+
+    def test_timeline(self):
+        backend = RecordingInputBackend()
+        scheduler = InputScheduler(backend)
+        scheduler.press('a', press_time=0.1)
+        scheduler.key_down('w')
+        scheduler.sleep(0.5)
+        scheduler.click(10, 20)
+        scheduler.key_up('w')
+        self.assertTrue(scheduler.wait(5))
+
+        self.assert_records([
+            (0, input_scheduler.ACTION_KEY_DOWN, ('a',)),
+            (0.1, input_scheduler.ACTION_KEY_UP, ('a',)),
+            (0.1, input_scheduler.ACTION_KEY_DOWN, ('w',)),
+            (0.6, input_scheduler.ACTION_MOUSE_MOVE, (10, 20)),
+            (0.6, input_scheduler.ACTION_MOUSE_DOWN, (True,)),
+            (0.62, input_scheduler.ACTION_MOUSE_UP, (True,)),
+            (0.62, input_scheduler.ACTION_KEY_UP, ('w',)),
+        ], backend)
+
+    def test_coalesce_key_state(self):
+        backend = RecordingInputBackend()
+        scheduler = InputScheduler(backend)
+        scheduler.key_up('w')  # 本来就没按下
+        scheduler.key_down('w')
+        scheduler.key_down('w')
+        scheduler.key_down('w', duration=0.3)  # 不重复按下 但需要保留等待时间
+        scheduler.key_up('w')
+        scheduler.key_up('w')
+        self.assertTrue(scheduler.wait(5))
+
+        self.assert_records([
+            (0, input_scheduler.ACTION_KEY_DOWN, ('w',)),
+            (0.3, input_scheduler.ACTION_KEY_UP, ('w',)),
+        ], backend)
+        self.assertEqual(4, scheduler.coalesced_cnt)
+
+    def test_rollback_key_state_when_failed(self):
+        backend = FailOnceRecordingBackend(input_scheduler.ACTION_KEY_DOWN)
+        scheduler = InputScheduler(backend)
+        scheduler.key_down('w')  # 执行失败 按键实际没有按下
+        self.assertTrue(scheduler.wait(5))
+        scheduler.key_down('w')  # 重新按下不能被合并掉
+        scheduler.key_up('w')
+        self.assertTrue(scheduler.wait(5))
+
+        self.assert_records([
+            (0, input_scheduler.ACTION_KEY_DOWN, ('w',)),
+            (0, input_scheduler.ACTION_KEY_UP, ('w',)),
+        ], backend)
+        self.assertEqual(0, scheduler.coalesced_cnt)
+
+    def test_no_rollback_when_key_pending(self):
+        backend = FailOnceRecordingBackend(input_scheduler.ACTION_KEY_DOWN)
+        scheduler = InputScheduler(backend)
+        scheduler.key_down('w', duration=0.1)
+        scheduler.key_up('w')  # 失败时还在队列中 最终状态以此为准
+        self.assertTrue(scheduler.wait(5))
+        scheduler.key_up('w')
+        self.assertTrue(scheduler.wait(5))
+
+        self.assert_records([
+            (0.1, input_scheduler.ACTION_KEY_UP, ('w',)),
+        ], backend)
+        self.assertEqual(1, scheduler.coalesced_cnt)
+
+    def test_non_blocking_and_coalesce_pending_move(self):
+        backend = BlockingRecordingBackend()
+        scheduler = InputScheduler(backend)
+        scheduler.press('e')
+        self.assertTrue(backend.started.wait(5))
+
+        # 第一个动作还没执行完 后续提交不会阻塞 连续的移动会合并
+        scheduler.move_relative(100)
+        scheduler.move_relative(-30)
+        scheduler.move_to(1, 1)
+        scheduler.move_to(50, 60)
+        self.assertFalse(scheduler.is_idle())
+        self.assertFalse(scheduler.wait(0.05))
+
+        backend.released.set()
+        self.assertTrue(scheduler.wait(5))
+        self.assertTrue(scheduler.is_idle())
+        self.assert_records([
+            (0, input_scheduler.ACTION_KEY_DOWN, ('e',)),
+            (0.02, input_scheduler.ACTION_KEY_UP, ('e',)),
+            (0.02, input_scheduler.ACTION_MOUSE_MOVE_RELATIVE, (70, 0)),
+            (0.02, input_scheduler.ACTION_MOUSE_MOVE, (50, 60)),
+        ], backend)
+
+    def test_drag(self):
+        backend = RecordingInputBackend()
+        scheduler = InputScheduler(backend)
+        scheduler.drag((0, 0), (100, 50), duration=0.1, step_time=0.02)
+        self.assertTrue(scheduler.wait(5))
+
+        self.assertEqual((0, 0), backend.record_list[0][2])
+        self.assertEqual(input_scheduler.ACTION_MOUSE_DOWN, backend.record_list[1][1])
+        self.assertEqual((100, 50), backend.record_list[-2][2])
+        self.assertEqual(input_scheduler.ACTION_MOUSE_UP, backend.record_list[-1][1])
+        self.assertAlmostEqual(0.1, backend.record_list[-1][0])
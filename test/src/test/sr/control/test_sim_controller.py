@@ -0,0 +1,58 @@
+import numpy as np
+
+import test
+from basic import Point, cal_utils
+from sr import cal_pos
+from sr.const import map_const
+from sr.image.cv2_matcher import CvImageMatcher
+from sr.image.image_holder import ImageHolder
+from sr.config.game_config import MiniMapPos
+from sr.image.sceenshot import mini_map, large_map
+from test.sr.control.sim_controller import SimController
+
+
+class TestSimController(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+        self.ih = ImageHolder()
+        self.im = CvImageMatcher(self.ih)
+        self.lm_info = self.ih.get_large_map(map_const.P01_R03_F1)
+        self.mm_pos = MiniMapPos(141, 151, 93)
+
+    def test_screenshot(self):
+        """
+        合成的截图能被正常识别出朝向和坐标
+        """
+        pos = Point(690, 439)
+        for angle in [0, 90, 183, 270]:
+            controller = SimController(self.im, self.mm_pos, self.lm_info, pos, angle=angle)
+            mm = mini_map.cut_mini_map(controller.screenshot(), self.mm_pos)
+            delta = abs(mini_map.analyse_angle(mm) - angle) % 360
+            self.assertLessEqual(min(delta, 360 - delta), 5)
+
+            possible_pos = (pos.x, pos.y, 0)
+            lm_rect = large_map.get_large_map_rect_by_pos(self.lm_info.gray.shape, mm.shape[:2], possible_pos)
+            sp_map = map_const.get_sp_type_in_rect(self.lm_info.region, lm_rect)
+            mm_info = mini_map.analyse_mini_map(mm, self.im, sp_types=set(sp_map.keys()))
+            next_pos = cal_pos.cal_character_pos(self.im, self.lm_info, mm_info, lm_rect=lm_rect,
+                                                 retry_without_rect=False, running=False)
+            self.assertIsNotNone(next_pos)
+            self.assertLessEqual(cal_utils.distance_between(next_pos, pos), 5)
+
+    def test_blocked(self):
+        """
+        不能走出可行走区域
+        """
+        pos = Point(100, 100)
+        walkable_mask = np.zeros_like(self.lm_info.mask)
+        walkable_mask[90:111, 90:121] = 255
+        controller = SimController(self.im, self.mm_pos, self.lm_info, pos, walkable_mask=walkable_mask)
+        controller.start_moving_forward()
+        controller.last_update_time -= 2  # 按30的速度 2秒足够走出可行走区域
+        controller.stop_moving_forward()
+
+        self.assertGreater(controller.blocked_cnt, 0)
+        self.assertLessEqual(controller.pos.x, 120)
+        self.assertGreater(controller.pos.x, 115)
+        self.assertEqual(100, controller.pos.y)
@@ -429,6 +429,10 @@ def init_character_avatar_from_alas():
 
             init_template_feature(character, sub_dir='character_avatar')
 
+    index_path = os.path.join(dir_path, 'index.npz')
+    if os.path.exists(index_path):  # 头像有变化 下次使用时重新构建索引
+        os.remove(index_path)
+
 
 def init_character_combat_type(template_id):
     raw = _read_template_raw_image(template_id, sub_dir='character_combat_type')
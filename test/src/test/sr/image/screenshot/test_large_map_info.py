@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+import test
+from sr.image.sceenshot import LargeMapInfo
+
+
+class TestLargeMapInfo(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_lazy_load(self):
+        with tempfile.TemporaryDirectory() as dir_path:
+            origin = np.zeros((40, 60, 3), dtype=np.uint8)
+            origin[10:20, 10:20] = (0, 0, 255)
+            mask = np.zeros((40, 60, 3), dtype=np.uint8)  # 即使保存成3通道 也按单通道读取
+            mask[10:20, 10:20] = 255
+            cv2.imwrite(os.path.join(dir_path, 'origin.png'), origin)
+            cv2.imwrite(os.path.join(dir_path, 'mask.png'), mask)
+
+            info = LargeMapInfo(dir_path=dir_path)
+            self.assertEqual(0, len(info._plane))
+
+            self.assertEqual((40, 60), info.shape)
+            self.assertEqual(0, len(info._plane))  # 只读取文件头
+
+            self.assertEqual((40, 60), info.origin.shape[:2])
+            self.assertEqual((40, 60), info.shape)
+            self.assertEqual(['origin'], list(info._plane.keys()))
+
+            self.assertEqual((40, 60), info.mask.shape)
+            self.assertIsNone(info.raw)  # 文件不存在
+            self.assertIsNone(info.kps)
+            self.assertIsNone(info.desc)
+
+            gray = info.origin_gray
+            self.assertEqual((40, 60), gray.shape)
+            self.assertIs(gray, info.origin_gray)
+            self.assertEqual(cv2.cvtColor(origin, cv2.COLOR_BGR2GRAY)[15, 15], gray[15, 15])
+
+    def test_shape_without_origin(self):
+        with tempfile.TemporaryDirectory() as dir_path:
+            cv2.imwrite(os.path.join(dir_path, 'gray.png'), np.zeros((30, 50), dtype=np.uint8))
+
+            info = LargeMapInfo(dir_path=dir_path)
+            self.assertEqual((30, 50), info.shape)
+            self.assertIsNone(info.origin)
+            self.assertEqual((30, 50), info.shape)
+
+        self.assertIsNone(LargeMapInfo().shape)
+
+    def test_manual_set(self):
+        info = LargeMapInfo()
+        self.assertIsNone(info.origin)
+
+        info.origin = np.full((5, 5, 3), 100, dtype=np.uint8)
+        self.assertEqual(100, info.origin_gray[0, 0])
+        info.origin = np.full((5, 5, 3), 200, dtype=np.uint8)
+        self.assertEqual(200, info.origin_gray[0, 0])  # 替换原图后重新转换
@@ -0,0 +1,103 @@
+import math
+import os
+
+from cv2.typing import MatLike
+
+import test
+from basic import os_utils, Point
+from basic.img import cv2_utils
+from sr.image.sceenshot import large_map_locator
+from sr.image.sceenshot.large_map_locator import LargeMapLocator
+
+
+class FakeLargeMapScreen:
+
+    def __init__(self, lm_origin: MatLike, view_size, offset: Point, drag_rate: float = 1):
+        """
+        从保存的大地图中截取一部分 模拟游戏中显示的大地图和拖动
+        :param lm_origin: 完整大地图
+        :param view_size: 界面显示的地图大小 (宽, 高)
+        :param offset: 当前左上角位置
+        :param drag_rate: 实际移动距离与拖动距离的比例 模拟拖动的误差
+        """
+        self.lm_origin: MatLike = lm_origin
+        self.view_size = view_size
+        self.offset: Point = offset
+        self.drag_rate: float = drag_rate
+        self.drag_cnt: int = 0
+
+    def screen_map(self) -> MatLike:
+        x, y = self.offset.x, self.offset.y
+        return self.lm_origin[y:y + self.view_size[1], x:x + self.view_size[0]]
+
+    def drag(self, drag: Point):
+        self.drag_cnt += 1
+        x = self.offset.x - int(drag.x * self.drag_rate)
+        y = self.offset.y - int(drag.y * self.drag_rate)
+        # 游戏中无法拖出大地图范围
+        x = min(max(x, 0), self.lm_origin.shape[1] - self.view_size[0])
+        y = min(max(y, 0), self.lm_origin.shape[0] - self.view_size[1])
+        self.offset = Point(x, y)
+
+
+class TestLargeMapLocator(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+        self.lm_origin = cv2_utils.read_image(os.path.join(
+            os_utils.get_path_under_work_dir('images', 'map', 'P02_YLL6', 'R01_XZQ_F1'), 'origin.png'))
+        self.view_size = (400, 300)
+        self.max_drag = (300, 200)
+
+    def _run_until_visible(self, fake: FakeLargeMapScreen, locator: LargeMapLocator, target: Point) -> int:
+        """
+        不断 定位-拖动 直到目标点出现在界面中
+        :return: 拖动次数
+        """
+        map_size = (self.lm_origin.shape[1], self.lm_origin.shape[0])
+        for _ in range(20):
+            offset = locator.locate(fake.screen_map())
+            self.assertIsNotNone(offset)
+            self.assertEqual((fake.offset.x, fake.offset.y), (offset.x, offset.y))
+            drag = large_map_locator.plan_drag(offset.left_top, self.view_size, target, map_size, self.max_drag)
+            if (drag.x == 0 and drag.y == 0) or locator.stuck:
+                break
+            self.assertLessEqual(abs(drag.x), self.max_drag[0])
+            self.assertLessEqual(abs(drag.y), self.max_drag[1])
+            fake.drag(drag)
+            locator.on_drag(drag)
+
+        x, y = target.x - fake.offset.x, target.y - fake.offset.y
+        self.assertTrue(0 <= x < self.view_size[0] and 0 <= y < self.view_size[1])
+        return fake.drag_cnt
+
+    def test_minimum_drags(self):
+        locator = LargeMapLocator(self.lm_origin)
+        fake = FakeLargeMapScreen(self.lm_origin, self.view_size, Point(50, 60))
+        target = Point(900, 1300)
+
+        drag_cnt = self._run_until_visible(fake, locator, target)
+        # 目标点离界面边缘100 需要移动 (900-400+100-50, 1300-300+100-60) = (550, 1040)
+        self.assertEqual(max(math.ceil(550 / self.max_drag[0]), math.ceil(1040 / self.max_drag[1])), drag_cnt)
+
+    def test_drag_error(self):
+        locator = LargeMapLocator(self.lm_origin)
+        fake = FakeLargeMapScreen(self.lm_origin, self.view_size, Point(600, 1200), drag_rate=0.8)
+        self._run_until_visible(fake, locator, Point(150, 200))
+
+    def test_map_edge(self):
+        locator = LargeMapLocator(self.lm_origin)
+        fake = FakeLargeMapScreen(self.lm_origin, self.view_size, Point(300, 300))
+        target = Point(self.lm_origin.shape[1] - 20, 350)  # 贴近大地图边缘 无法留出边距
+        self._run_until_visible(fake, locator, target)
+        self.assertEqual(self.lm_origin.shape[1] - self.view_size[0], fake.offset.x)
+
+    def test_no_small_drag(self):
+        # 目标已经在界面内 即使在边距内也不拖动 几个像素的拖动会被当成点击
+        drag = large_map_locator.plan_drag(Point(1000, 1000), (1300, 870), Point(2203, 1500), (5000, 5000), (1000, 600))
+        self.assertEqual((0, 0), (drag.x, drag.y))
+
+        # 目标在界面外 但离大地图边缘只差几个像素 至少拖动 min_drag
+        drag = large_map_locator.plan_drag(Point(3690, 1000), (1300, 870), Point(5003, 1500), (5000, 5000), (450, 200),
+                                           min_drag=50)
+        self.assertEqual((-50, 0), (drag.x, drag.y))
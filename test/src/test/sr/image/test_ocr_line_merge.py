@@ -0,0 +1,55 @@
+import yaml
+
+import test
+from sr.image import ocr_matcher
+from test.devtools import ocr_line_merge_benchmark
+
+
+class TestOcrLineMerge(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_golden_cases(self):
+        """
+        与原来的实现记录下来的结果一致
+        """
+        with open(ocr_line_merge_benchmark.GOLDEN_CASES_PATH, 'r', encoding='utf-8') as file:
+            case_list = yaml.safe_load(file)['cases']
+        self.assertGreater(len(case_list), 0)
+
+        for case in case_list:
+            ocr_list = case['ocr_list']
+            self.assertEqual(case['single_line'],
+                             ocr_matcher.merge_ocr_result_to_single_line(ocr_line_merge_benchmark.to_ocr_map(ocr_list)))
+            self.assertEqual(case['single_line_no_space'],
+                             ocr_matcher.merge_ocr_result_to_single_line(ocr_line_merge_benchmark.to_ocr_map(ocr_list),
+                                                                         join_space=False))
+            for distance in ocr_line_merge_benchmark.MERGE_LINE_DISTANCE_LIST:
+                merge_map = ocr_matcher.merge_ocr_result_to_multiple_line(ocr_line_merge_benchmark.to_ocr_map(ocr_list),
+                                                                          merge_line_distance=distance)
+                self.assertEqual(case['multiple_line_%d' % distance], ocr_line_merge_benchmark.to_line_list(merge_map))
+
+    def test_same_as_loop(self):
+        """
+        框很密集时 一个框可能和多行都在行距内 应该和原来一样加入最早的一行
+        """
+        for seed in range(20):
+            ocr_list = ocr_line_merge_benchmark.make_ocr_list('random', seed=seed, box_cnt=150)
+            for distance in [5, 10, 40]:
+                expected = ocr_line_merge_benchmark._merge_ocr_result_to_multiple_line_by_loop(
+                    ocr_line_merge_benchmark.to_ocr_map(ocr_list), merge_line_distance=distance)
+                actual = ocr_matcher.merge_ocr_result_to_multiple_line(
+                    ocr_line_merge_benchmark.to_ocr_map(ocr_list), merge_line_distance=distance)
+                self.assertEqual(ocr_line_merge_benchmark.to_line_list(expected),
+                                 ocr_line_merge_benchmark.to_line_list(actual))
+
+        # 中间的框同时在上下两行的行距内 上下两行不会因此合并
+        ocr_list = [['a', 0, 0, 10, 10], ['c', 0, 20, 10, 10], ['b', 20, 10, 10, 10]]
+        merge_map = ocr_matcher.merge_ocr_result_to_multiple_line(ocr_line_merge_benchmark.to_ocr_map(ocr_list),
+                                                                  merge_line_distance=10)
+        self.assertEqual([['a b', 0, 0, 30, 20], ['c', 0, 20, 10, 10]], ocr_line_merge_benchmark.to_line_list(merge_map))
+
+    def test_empty(self):
+        self.assertIsNone(ocr_matcher.merge_ocr_result_to_single_line({}))
+        self.assertEqual({}, ocr_matcher.merge_ocr_result_to_multiple_line({}))
@@ -0,0 +1,37 @@
+import test
+from basic.img import MatchResult, MatchResultList
+from sr.image.ocr_matcher import OcrMatcher
+
+
+class FixedOcrMatcher(OcrMatcher):
+
+    def __init__(self, text_list):
+        """
+        固定返回给定文本的OCR
+        :param text_list: 识别结果
+        """
+        self.text_list = text_list
+
+    def run_ocr(self, image, threshold: float = None, merge_line_distance: float = -1) -> dict[str, MatchResultList]:
+        result = {}
+        for idx, text in enumerate(self.text_list):
+            result[text] = MatchResultList()
+            result[text].append(MatchResult(1, 0, idx * 50, 100, 30, data=text))
+        return result
+
+
+class TestOcrMatchWords(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_match_words_case(self):
+        ocr = FixedOcrMatcher(['CONFIRM', 'Cancel', 'Exit'])
+        self.assertEqual({'CONFIRM', 'Cancel'}, set(ocr.match_words(None, ['confirm', 'cancel'])))
+        self.assertEqual({'Cancel'}, set(ocr.match_words(None, ['confirm', 'Cancel'], ignore_case=False)))
+        self.assertEqual({'CONFIRM'}, set(ocr.match_words(None, ['confirm'], same_word=True)))
+        self.assertEqual(set(), set(ocr.match_words(None, ['confirm'], same_word=True, ignore_case=False)))
+
+        # LCS 与原来的 find_by_lcs 一致 总是忽略大小写
+        self.assertEqual({'CONFIRM'}, set(ocr.match_words(None, ['confirn'], ignore_case=False, lcs_percent=0.8)))
+        self.assertEqual({'CONFIRM'}, set(ocr.match_words(None, ['confirn'], lcs_percent=0.8)))
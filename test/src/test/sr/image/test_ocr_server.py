@@ -0,0 +1,101 @@
+import os
+import socket
+import threading
+import time
+from typing import List, Tuple
+
+import numpy as np
+from cv2.typing import MatLike
+
+import test
+from basic.img import MatchResultList, MatchResult
+from sr.image.ocr_matcher import OcrMatcher
+from sr.image import ocr_server
+from sr.image.ocr_server import OcrServer, OcrRequest
+from sr.image.remote_ocr_matcher import RemoteOcrMatcher
+
+
+class FakeOcrMatcher(OcrMatcher):
+
+    def __init__(self):
+        """
+        使用图片左上角像素值作为识别结果 并记录每次推理的图片数量
+        """
+        self.batch_size_list: List[int] = []
+
+    def run_ocr(self, image: MatLike, threshold: float = None, merge_line_distance: float = -1) -> dict[str, MatchResultList]:
+        text = str(image[0, 0])
+        result = MatchResultList(only_best=False)
+        result.append(MatchResult(1, 0, 0, 10, 10, data=text))
+        return {text: result}
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        time.sleep(0.05)  # 模拟推理耗时 让其他请求进入队列
+        self.batch_size_list.append(len(image_list))
+        return [(str(image[0, 0]), 0.9) for image in image_list]
+
+
+class MissingResultOcrMatcher(FakeOcrMatcher):
+
+    def run_ocr_without_det_batch(self, image_list: List[MatLike]) -> List[Tuple[str, float]]:
+        return super().run_ocr_without_det_batch(image_list)[:-1]  # 少返回一个结果
+
+
+def _get_free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class TestOcrServer(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_remote_ocr(self):
+        fake = FakeOcrMatcher()
+        server = OcrServer(fake, port=_get_free_port(), batch_wait_seconds=0.02)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        time.sleep(0.2)
+
+        remote = RemoteOcrMatcher(port=server.port)
+        self.assertTrue(remote.is_available())
+
+        image = np.full((5, 5), 7, dtype=np.uint8)
+        self.assertEqual('7', remote.ocr_for_single_line(image))
+        self.assertEqual('', remote.ocr_for_single_line(image, threshold=0.95))
+        self.assertEqual('7', remote.ocr_for_single_line(image, strict_one_line=False))
+        self.assertIn('7', remote.run_ocr(image))
+
+        # 并发请求会合并推理
+        result_list = [None] * 8
+
+        def work(idx: int):
+            result_list[idx] = remote.run_ocr_without_det(np.full((5, 5), idx, dtype=np.uint8))
+
+        t_list = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for t in t_list:
+            t.start()
+        for t in t_list:
+            t.join()
+
+        self.assertEqual([str(i) for i in range(8)], result_list)
+        self.assertTrue(max(fake.batch_size_list) > 1)
+
+        # 密钥每次启动随机生成 不知道密钥的客户端无法连接
+        key_path = ocr_server.get_authkey_path(server.port)
+        self.assertTrue(os.path.exists(key_path))
+        self.assertEqual(server.authkey, ocr_server.read_authkey(server.port))
+        self.assertFalse(RemoteOcrMatcher(port=server.port, authkey=b'0' * ocr_server.AUTHKEY_LEN).is_available())
+        server.stop()
+        self.assertFalse(os.path.exists(key_path))
+
+    def test_missing_result(self):
+        server = OcrServer(MissingResultOcrMatcher())
+        batch = [OcrRequest(ocr_server.METHOD_RUN_OCR_WITHOUT_DET, (np.full((5, 5), i, dtype=np.uint8),))
+                 for i in range(3)]
+        server.run_batch(batch)
+
+        self.assertTrue(all(req.done.is_set() for req in batch))
+        self.assertEqual(['0', '1'], [req.result for req in batch[:2]])
+        self.assertIsNotNone(batch[2].error)
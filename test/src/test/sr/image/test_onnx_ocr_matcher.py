@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+import test
+from basic import os_utils
+from sr.image import onnx_ocr_matcher
+
+
+class TestOnnxOcrMatcher(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_ctc_decode(self):
+        character = ['blank', 'a', 'b']
+        # a a blank a b b -> aab
+        idx = [1, 1, 0, 1, 2, 2]
+        preds = np.zeros((1, len(idx), len(character)), dtype=np.float32)
+        for t, i in enumerate(idx):
+            preds[0, t, i] = 0.9
+        text, score = onnx_ocr_matcher.ctc_decode(preds, character)[0]
+        self.assertEqual('aab', text)
+        self.assertAlmostEqual(0.9, score, places=5)
+
+        empty = np.zeros((1, 3, len(character)), dtype=np.float32)
+        empty[0, :, 0] = 1
+        self.assertEqual(('', 0), onnx_ocr_matcher.ctc_decode(empty, character)[0])
+
+    def test_det_boxes_from_bitmap(self):
+        pred = np.zeros((64, 128), dtype=np.float32)
+        pred[30:40, 60:100] = 0.9
+        pred[10:20, 10:50] = 0.9
+        box_list = onnx_ocr_matcher.det_boxes_from_bitmap(pred, pred > 0.3)
+        box_list = onnx_ocr_matcher.sorted_boxes(box_list)
+        self.assertEqual(2, len(box_list))
+
+        # 外扩后包含原区域
+        top = box_list[0]
+        self.assertTrue(top[0][0] <= 10 and top[0][1] <= 10)
+        self.assertTrue(top[2][0] >= 49 and top[2][1] >= 19)
+        self.assertTrue(box_list[1][0][1] > top[0][1])
+
+    def test_rec_resize_norm(self):
+        image = np.full((24, 100, 3), 255, dtype=np.uint8)
+        data = onnx_ocr_matcher.rec_resize_norm(image, 48, 320 / 48)
+        self.assertEqual((3, 48, 320), data.shape)
+        self.assertAlmostEqual(1, data[0, 0, 0])
+        self.assertAlmostEqual(0, data[0, 0, 319])
+
+    def test_det_resize(self):
+        image = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        resized, ratio_h, ratio_w = onnx_ocr_matcher.det_resize(image, 960)
+        self.assertEqual(0, resized.shape[0] % 32)
+        self.assertEqual(0, resized.shape[1] % 32)
+        self.assertTrue(max(resized.shape[:2]) <= 960)
+
+    def test_get_character_dict_path(self):
+        path = os.path.join(os_utils.get_path_under_work_dir('model'), onnx_ocr_matcher.CHAR_DICT_FILE_NAME)
+        if os.path.exists(path):
+            self.assertEqual(path, onnx_ocr_matcher.get_character_dict_path())
+            return
+
+        package_path = onnx_ocr_matcher.get_character_dict_path()  # 没有时使用 paddleocr 包里的
+        if package_path is not None:
+            self.assertTrue(package_path.endswith(os.path.join('ppocr', 'utils', onnx_ocr_matcher.CHAR_DICT_FILE_NAME)))
+
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('a\nb\n')
+        try:
+            self.assertEqual(path, onnx_ocr_matcher.get_character_dict_path())  # model 目录下的优先
+            self.assertEqual(['blank', 'a', 'b', ' '], onnx_ocr_matcher.load_character_list(True))
+        finally:
+            os.remove(path)
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+import test
+from basic import os_utils
+from sr.image.image_holder import ImageHolder
+from sr.image.template_atlas import TemplateAtlas, build_template_atlas, get_template_key, list_template_dir, \
+    get_features_hash
+from test.devtools.template_atlas_benchmark import same_template
+
+
+class TestTemplateAtlas(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_same_as_loose_files(self):
+        template_list = list_template_dir(os_utils.get_path_under_work_dir('images', 'template'))
+        self.assertTrue(any(sub_dir is not None for sub_dir, _, _ in template_list))
+
+        atlas_path = os.path.join(self.temp_dir, 'atlas.bin')
+        self.assertEqual(len(template_list), build_template_atlas(atlas_path=atlas_path))
+
+        atlas_ih = ImageHolder(template_atlas_path=atlas_path)
+        loose_ih = ImageHolder(template_atlas_path=os.path.join(self.temp_dir, 'missing.bin'))
+        self.assertEqual(len(template_list), len(atlas_ih.get_template_atlas()))
+        self.assertIsNone(loose_ih.get_template_atlas())
+        for sub_dir, template_id, _ in template_list:
+            t1 = atlas_ih.get_template(template_id, sub_dir)
+            t2 = loose_ih.get_template(template_id, sub_dir)
+            self.assertTrue(same_template(t1, t2), get_template_key(template_id, sub_dir))
+            if t1.origin is not None:
+                self.assertFalse(t1.origin.flags.writeable)  # 直接指向映射的内存
+
+        self.assertIsNone(atlas_ih.get_template('not_exist_template'))
+
+    def test_stale_and_missing_dir(self):
+        template_dir = os.path.join(self.temp_dir, 'template')
+        dir_path = os.path.join(template_dir, 'sub', 't1')
+        os.makedirs(dir_path)
+        origin = np.arange(48, dtype=np.uint8).reshape((4, 4, 3))
+        cv2.imwrite(os.path.join(dir_path, 'origin.png'), origin)
+
+        atlas_path = os.path.join(self.temp_dir, 'atlas.bin')
+        self.assertEqual(1, build_template_atlas(template_dir, atlas_path))
+        atlas = TemplateAtlas.open(atlas_path)
+        key = get_template_key('t1', 'sub')
+        self.assertIn(key, atlas)
+        self.assertTrue(np.array_equal(origin, atlas.get_arrays(key)['origin']))
+        self.assertNotIn('kps', atlas.get_arrays(key))  # 没有掩码和特征文件 与读取模板文件时一致
+        self.assertFalse(atlas.is_stale(key, dir_path))
+
+        # 打包后修改了模板文件
+        mtime = os.stat(os.path.join(dir_path, 'origin.png')).st_mtime_ns + 10 ** 9
+        os.utime(os.path.join(dir_path, 'origin.png'), ns=(mtime, mtime))
+        self.assertTrue(atlas.is_stale(key, dir_path))
+
+        # 发布时没有模板文件夹
+        shutil.rmtree(dir_path)
+        self.assertFalse(atlas.is_stale(key, dir_path))
+
+        # 不是图集的文件
+        with open(os.path.join(self.temp_dir, 'bad.bin'), 'wb') as file:
+            file.write(b'0' * 64)
+        self.assertIsNone(TemplateAtlas.open(os.path.join(self.temp_dir, 'bad.bin')))
+
+    def test_features_hash(self):
+        dir_list = [os.path.join(self.temp_dir, 'features', i) for i in ['t1', 't2']]
+        self.assertIsNone(get_features_hash(dir_list))  # 发布后没有模板文件夹
+
+        for dir_path in dir_list:
+            os.makedirs(dir_path)
+            with open(os.path.join(dir_path, 'features.xml'), 'wb') as file:
+                file.write(b'<a>\n%s\n</a>' % os.path.basename(dir_path).encode())
+        features_hash = get_features_hash(dir_list)
+        self.assertIsNotNone(features_hash)
+
+        # 只改修改时间和换行符 不算变化
+        file_path = os.path.join(dir_list[0], 'features.xml')
+        mtime = os.stat(file_path).st_mtime_ns + 10 ** 9
+        os.utime(file_path, ns=(mtime, mtime))
+        with open(file_path, 'wb') as file:
+            file.write(b'<a>\r\nt1\r\n</a>')
+        self.assertEqual(features_hash, get_features_hash(dir_list))
+
+        with open(file_path, 'wb') as file:
+            file.write(b'<a>\nt3\n</a>')
+        self.assertNotEqual(features_hash, get_features_hash(dir_list))
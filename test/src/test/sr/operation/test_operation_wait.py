@@ -0,0 +1,64 @@
+import numpy as np
+
+import test
+from basic import Rect
+from sr import performance_recorder
+from sr.operation import Operation
+from sr.screen_area import ScreenArea
+
+
+class FakeController:
+
+    def __init__(self, show_at: int):
+        """
+        第 show_at 张截图开始 区域中出现按钮
+        """
+        self.show_at: int = show_at
+        self.screenshot_cnt: int = 0
+
+    def screenshot(self):
+        self.screenshot_cnt += 1
+        screen = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        if self.screenshot_cnt >= self.show_at:
+            screen[100:200, 100:300] = 255
+        return screen
+
+
+class FakeOcr:
+
+    def ocr_for_single_line(self, image, threshold: float = None, strict_one_line: bool = True) -> str:
+        return '确认' if image.mean() > 128 else ''
+
+
+class FakeContext:
+
+    def __init__(self, show_at: int):
+        self.running: int = 1
+        self.game_config = None
+        self.controller = FakeController(show_at)
+        self.ocr = FakeOcr()
+
+
+class TestOperationWait(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_wait_for_area(self):
+        area = ScreenArea(pc_rect=Rect(100, 100, 300, 200), text='确认')
+        ctx = FakeContext(show_at=3)
+        op = Operation(ctx)
+        self.assertTrue(op.wait_for_area(area, timeout=2))
+        self.assertEqual(3, ctx.controller.screenshot_cnt)  # 出现后立刻返回
+        self.assertIsNotNone(op.last_screenshot)
+        self.assertGreater(performance_recorder.get('wait_for_screen_Operation').cnt, 0)
+
+        ctx = FakeContext(show_at=100)
+        self.assertFalse(Operation(ctx).wait_for_area(area, timeout=0.2))
+
+        ctx = FakeContext(show_at=100)  # 停止后不再等待
+        ctx.running = 0
+        op = Operation(ctx)
+        result = op.wait_for_screen(timeout=5)
+        self.assertFalse(result.success)
+        self.assertLess(result.latency, 1)
@@ -97,6 +97,20 @@ class TestCalPos(test.SrTestBase):
         performance_recorder.log_all_performance()
         self.assertTrue(fail_cnt == 0)
 
+    def test_scale_history(self):
+        history = cal_pos.ScaleHistory(max_len=2, neighbour_range=0.05)
+        scale_list = [1.0, 1.05, 1.1, 1.15, 1.2]
+        self.assertEqual(([], scale_list), history.split_scale_list(scale_list))
+
+        history.add(1.0)
+        history.add(1.2)
+        history.add(1.1)
+        self.assertEqual([1.2, 1.1], history.scale_list)
+        preferred, rest = history.split_scale_list(scale_list)
+        self.assertEqual(1.1, preferred[0])
+        self.assertEqual({1.05, 1.15}, set(preferred[1:]))
+        self.assertEqual([1.0, 1.2], rest)
+
     def test_init_case(self):
         """
         从debug中初始化
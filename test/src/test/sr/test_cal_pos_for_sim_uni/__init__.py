@@ -57,6 +57,24 @@ class TestCalPosForSimUni(test.SrTestBase):
         performance_recorder.log_all_performance()
         self.assertTrue(fail_cnt == 0)
 
+    def test_lm_planes_cached(self):
+        ctx = get_context()
+        ctx.init_image_matcher()
+        case = standard_case_list[0]
+        lm_info = ctx.ih.get_large_map(case.region)
+
+        self.assertIs(lm_info.origin_gray, lm_info.origin_gray)  # 同一层只转换一次
+        self.assertEqual(2, len(lm_info.origin_gray.shape))
+        self.assertEqual(lm_info.shape, lm_info.mask.shape)
+
+        mm = self.get_test_image_new(case.image_name)
+        mm_info = mini_map.analyse_mini_map(mm, ctx.im)
+        lm_rect = large_map.get_large_map_rect_by_pos(lm_info.shape, mm.shape[:2], case.possible_pos)
+        pos = cal_pos.sim_uni_cal_pos(ctx.im, lm_info, mm_info, possible_pos=case.possible_pos,
+                                      lm_rect=lm_rect, running=case.running)
+        self.assertIsNotNone(pos)
+        self.assertTrue(cal_utils.distance_between(pos, case.pos) < 5)
+
     def test_init_case(self):
         screen = get_debug_image('_1708141410981')
         mm = mini_map.cut_mini_map(screen)
@@ -0,0 +1,44 @@
+import test
+from test.devtools import import_time_report
+
+# 导入 sr.context 时不应该加载的模块 均应在第一次使用时才导入
+LAZY_MODULE_LIST = [
+    'paddleocr',
+    'paddle',
+    'onnxruntime',
+    'sr.image.cn_ocr_matcher',
+    'sr.image.en_ocr_matcher',
+    'sr.mystools',
+    'sr.app.trailblaze_power.trailblaze_power_run_record',
+    'sr.app.sim_uni.sim_uni_run_record',
+]
+
+# 导入 sr.context 的耗时上限 秒
+MAX_IMPORT_SECONDS = 3
+
+
+class TestContext(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_import_time(self):
+        import_list = import_time_report.get_import_time('sr.context')
+        module_set = set(i.module for i in import_list)
+        self.assertIn('sr.context', module_set)
+        for module in LAZY_MODULE_LIST:
+            self.assertNotIn(module, module_set, '%s 不应该在启动时导入' % module)
+
+        self.assertLess(import_time_report.get_total_import_seconds(import_list), MAX_IMPORT_SECONDS)
+
+    def test_parse_import_time(self):
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 |   a.b',
+            'import time:        50 |        150 | a',
+            'import time:        10 |         10 | c',
+        ])
+        import_list = import_time_report.parse_import_time(output)
+        self.assertEqual(['a.b', 'a', 'c'], [i.module for i in import_list])
+        self.assertEqual([1, 0, 0], [i.depth for i in import_list])
+        self.assertAlmostEqual(160 / 1e6, import_time_report.get_total_import_seconds(import_list))
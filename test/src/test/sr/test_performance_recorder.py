@@ -0,0 +1,55 @@
+import concurrent.futures
+import time
+
+import test
+from sr.performance_recorder import PerformanceRecorder, PerformanceRecord, bind_current_span
+from sr import performance_recorder
+
+
+class TestPerformanceRecorder(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_percentile(self):
+        record = PerformanceRecord('test')
+        for i in range(1, 101):
+            record.add(i / 1000)
+
+        self.assertEqual(100, record.cnt)
+        self.assertAlmostEqual(0.0505, record.avg)
+        # 分桶误差在10%以内
+        self.assertTrue(abs(record.p50 - 0.05) / 0.05 < 0.1)
+        self.assertTrue(abs(record.p95 - 0.095) / 0.095 < 0.1)
+        self.assertTrue(record.p99 <= record.max)
+
+    def test_span_nested(self):
+        recorder = PerformanceRecorder()
+        with recorder.span('outer') as outer:
+            with recorder.span('inner') as inner:
+                time.sleep(0.001)
+
+        self.assertEqual(outer, inner.parent)
+        self.assertEqual('outer/inner', inner.path)
+        self.assertIsNone(recorder.current_span())
+        snapshot = {i['id']: i for i in recorder.snapshot()}
+        self.assertEqual(1, snapshot['outer']['cnt'])
+        self.assertTrue(snapshot['outer']['max'] >= snapshot['inner']['max'])
+
+    def test_span_in_executor(self):
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+        def work():
+            with performance_recorder.span('worker') as s:
+                return s.parent
+
+        with performance_recorder.span('submit') as parent:
+            future_list = [executor.submit(bind_current_span(work)) for _ in range(8)]
+            for future in future_list:
+                self.assertEqual(parent, future.result())
+
+        trace = performance_recorder.get_recorder().to_chrome_trace()
+        worker_events = [e for e in trace['traceEvents'] if e['name'] == 'worker']
+        self.assertTrue(len(worker_events) >= 8)
+        for e in worker_events[-8:]:
+            self.assertEqual(parent.span_id, e['args']['parent'])
@@ -0,0 +1,51 @@
+import test
+from basic import Rect, Point, cal_utils
+from sr.const import map_const
+from test.devtools import sp_index_benchmark
+
+
+class TestRegionSpIndex(test.SrTestBase):
+
+    def __init__(self, *args, **kwargs):
+        test.SrTestBase.__init__(self, *args, **kwargs)
+
+    def test_in_rect(self):
+        for region in sp_index_benchmark.get_region_list():
+            index = map_const.get_region_sp_index(region)
+            self.assertEqual(map_const.REGION_2_SP.get(region.pr_id), index.in_rect(None))
+            for rect, _ in sp_index_benchmark.make_query_list(region, 50):
+                self.assertEqual(sp_index_benchmark._get_sp_in_rect_by_loop(region, rect), index.in_rect(rect))
+
+        # 边界上的点也算在矩形内
+        sp = map_const.P01_R02_SP01
+        index = map_const.get_region_sp_index(sp.region)
+        self.assertIn(sp, index.in_rect(Rect(sp.lm_pos.x, sp.lm_pos.y, sp.lm_pos.x, sp.lm_pos.y)))
+
+    def test_nearest(self):
+        for region in sp_index_benchmark.get_region_list():
+            index = map_const.get_region_sp_index(region)
+            for _, pos in sp_index_benchmark.make_query_list(region, 50):
+                self.assertIs(sp_index_benchmark._get_nearest_sp_by_loop(region, pos), index.nearest(pos))
+                template_id = map_const.REGION_2_SP.get(region.pr_id)[0].template_id
+                self.assertIs(sp_index_benchmark._get_nearest_sp_by_loop(region, pos, template_id),
+                              index.nearest(pos, template_id=template_id))
+
+        sp = map_const.P01_R02_SP01
+        index = map_const.get_region_sp_index(sp.region)
+        self.assertIs(sp, index.nearest(sp.lm_pos))
+        other = index.nearest(sp.lm_pos, exclude=sp)
+        self.assertIsNotNone(other)
+        self.assertIsNot(sp, other)
+        for i in map_const.REGION_2_SP.get(sp.region.pr_id):
+            if i is not sp:
+                self.assertLessEqual(cal_utils.distance_between(sp.lm_pos, other.lm_pos),
+                                     cal_utils.distance_between(sp.lm_pos, i.lm_pos))
+
+        self.assertIsNone(index.nearest(Point(0, 0), template_id='not_exist'))
+
+    def test_get_sp_by_cn(self):
+        for sp_list in map_const.REGION_2_SP.values():
+            for sp in sp_list:
+                index = map_const.get_region_sp_index(sp.region)
+                self.assertEqual(sp.cn, index.get_by_cn(sp.cn, sp.region).cn)
+                self.assertIn(index.get_by_cn(sp.cn, sp.region), index.get_by_floor(sp.region))